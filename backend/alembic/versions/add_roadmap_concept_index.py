@@ -0,0 +1,70 @@
+"""add roadmap concept index and updated_at
+
+Revision ID: e7b2d4f6a8c1
+Revises: d5a8c3e1f2b4
+Create Date: 2026-10-16 00:00:00.000000
+
+为 roadmap_metadata 添加：
+1. concept_index: 概念定位索引 {concept_id: [stage 下标, module 下标, concept 下标]}
+2. updated_at: framework_data 最后修改时间（进程内框架缓存的版本号）
+
+概念级读取和状态更新按索引定位，不再遍历整个 framework_data。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2d4f6a8c1'
+down_revision = 'd5a8c3e1f2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    添加 concept_index / updated_at 并从 framework_data 回填
+    """
+    op.add_column(
+        'roadmap_metadata',
+        sa.Column('concept_index', sa.JSON(), nullable=True),
+    )
+    op.add_column(
+        'roadmap_metadata',
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    
+    # 回填：与 app.models.database.build_concept_index 一致（下标从 0 开始，重复 ID 取第一次出现）
+    op.execute(
+        """
+        UPDATE roadmap_metadata rm SET
+            concept_index = COALESCE((
+                SELECT json_object_agg(x.concept_id, json_build_array(x.stage_idx, x.module_idx, x.concept_idx))
+                FROM (
+                    SELECT DISTINCT ON (c.concept ->> 'concept_id')
+                        c.concept ->> 'concept_id' AS concept_id,
+                        s.position - 1 AS stage_idx,
+                        m.position - 1 AS module_idx,
+                        c.position - 1 AS concept_idx
+                    FROM json_array_elements(rm.framework_data -> 'stages')
+                            WITH ORDINALITY AS s(stage, position),
+                         json_array_elements(s.stage -> 'modules')
+                            WITH ORDINALITY AS m(module, position),
+                         json_array_elements(m.module -> 'concepts')
+                            WITH ORDINALITY AS c(concept, position)
+                    WHERE c.concept ->> 'concept_id' IS NOT NULL
+                    ORDER BY c.concept ->> 'concept_id', s.position, m.position, c.position
+                ) x
+            ), '{}'::json),
+            updated_at = rm.created_at
+        WHERE rm.framework_data IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    回滚：删除 concept_index / updated_at
+    """
+    op.drop_column('roadmap_metadata', 'updated_at')
+    op.drop_column('roadmap_metadata', 'concept_index')
@@ -0,0 +1,77 @@
+"""add roadmap summary columns
+
+Revision ID: d5a8c3e1f2b4
+Revises: 4642afc7b515
+Create Date: 2026-10-16 00:00:00.000000
+
+为 roadmap_metadata 添加 framework_data 的冗余摘要列：
+1. total_concepts: 概念总数
+2. stages_count: 阶段数量
+3. stage_summaries: 阶段摘要 [{name, description, order}]
+
+列表接口（用户路线图、回收站、精选 Feed、Mentor 元数据工具）只读取摘要列，
+不再加载完整的 framework_data。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8c3e1f2b4'
+down_revision = '4642afc7b515'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    添加摘要列并从 framework_data 回填
+    """
+    op.add_column(
+        'roadmap_metadata',
+        sa.Column('total_concepts', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'roadmap_metadata',
+        sa.Column('stages_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'roadmap_metadata',
+        sa.Column('stage_summaries', sa.JSON(), nullable=True),
+    )
+    
+    # 回填：与 app.models.database.summarize_framework 的计算规则一致
+    # （缺少 order 的阶段使用其在 stages 中的位置）
+    op.execute(
+        """
+        UPDATE roadmap_metadata rm SET
+            stages_count = COALESCE(json_array_length(rm.framework_data -> 'stages'), 0),
+            total_concepts = COALESCE((
+                SELECT SUM(json_array_length(m -> 'concepts'))
+                FROM json_array_elements(rm.framework_data -> 'stages') AS s,
+                     json_array_elements(s -> 'modules') AS m
+            ), 0),
+            stage_summaries = COALESCE((
+                SELECT json_agg(
+                    json_build_object(
+                        'name', COALESCE(t.stage ->> 'name', ''),
+                        'description', t.stage ->> 'description',
+                        'order', COALESCE((t.stage ->> 'order')::int, t.position)
+                    )
+                    ORDER BY t.position
+                )
+                FROM json_array_elements(rm.framework_data -> 'stages')
+                     WITH ORDINALITY AS t(stage, position)
+            ), '[]'::json)
+        WHERE rm.framework_data IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    回滚：删除摘要列
+    """
+    op.drop_column('roadmap_metadata', 'stage_summaries')
+    op.drop_column('roadmap_metadata', 'stages_count')
+    op.drop_column('roadmap_metadata', 'total_concepts')
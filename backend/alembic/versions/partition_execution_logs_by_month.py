@@ -0,0 +1,159 @@
+"""partition execution_logs by month
+
+Revision ID: f3c9e5a7b2d6
+Revises: e7b2d4f6a8c1
+Create Date: 2026-10-16 00:00:00.000000
+
+execution_logs 改为按 created_at 月度范围分区表：
+1. 旧表重命名为 execution_logs_legacy
+2. 创建分区父表（主键 (id, created_at)），索引只保留：
+   - ix_execution_logs_task_created: (task_id, created_at)
+   - ix_execution_logs_task_errors: (task_id, created_at) WHERE level = 'error'
+   原 task_id / roadmap_id / concept_id / level / category / step / agent_name 单列索引不再保留
+3. 创建覆盖历史数据到未来 3 个月的月度分区（execution_logs_pYYYYMM）
+4. 回填历史数据后删除旧表
+
+回填保留全部历史数据；超出 EXECUTION_LOG_RETENTION_DAYS 的分区由应用的分区维护
+（app.db.execution_log_partitions）整体删除。
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c9e5a7b2d6'
+down_revision = 'e7b2d4f6a8c1'
+branch_labels = None
+depends_on = None
+
+
+# 与 settings.EXECUTION_LOG_PARTITIONS_AHEAD 默认值一致
+PARTITIONS_AHEAD = 3
+
+LEGACY_INDEXES = [
+    ('ix_execution_logs_task_id', 'task_id'),
+    ('ix_execution_logs_roadmap_id', 'roadmap_id'),
+    ('ix_execution_logs_concept_id', 'concept_id'),
+    ('ix_execution_logs_level', 'level'),
+    ('ix_execution_logs_category', 'category'),
+    ('ix_execution_logs_step', 'step'),
+    ('ix_execution_logs_agent_name', 'agent_name'),
+]
+
+COLUMNS = (
+    "id, task_id, roadmap_id, concept_id, level, category, step, agent_name, "
+    "message, details, duration_ms, created_at"
+)
+
+
+def upgrade() -> None:
+    """
+    重建 execution_logs 为月度分区表并回填历史数据
+    """
+    op.execute("ALTER TABLE execution_logs RENAME TO execution_logs_legacy")
+    op.execute("ALTER INDEX execution_logs_pkey RENAME TO execution_logs_legacy_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE execution_logs (
+            id VARCHAR NOT NULL,
+            task_id VARCHAR NOT NULL,
+            roadmap_id VARCHAR,
+            concept_id VARCHAR,
+            level VARCHAR NOT NULL DEFAULT 'info',
+            category VARCHAR NOT NULL,
+            step VARCHAR,
+            agent_name VARCHAR,
+            message TEXT,
+            details JSON,
+            duration_ms INTEGER,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_execution_logs_task_created "
+        "ON execution_logs (task_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_execution_logs_task_errors "
+        "ON execution_logs (task_id, created_at) WHERE level = 'error'"
+    )
+
+    # 创建从最早日志所在月份到未来 PARTITIONS_AHEAD 个月的分区
+    # （与 app.db.execution_log_partitions 的命名和边界一致）
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            first_month date;
+            last_month date := (date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months')::date;
+            m date;
+        BEGIN
+            SELECT COALESCE(date_trunc('month', min(created_at)), date_trunc('month', now()))::date
+              INTO first_month
+              FROM execution_logs_legacy;
+            m := first_month;
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF execution_logs FOR VALUES FROM (%L) TO (%L)',
+                    'execution_logs_p' || to_char(m, 'YYYYMM'),
+                    m,
+                    (m + interval '1 month')::date
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$;
+        """
+    )
+
+    # 回填（历史上 created_at 可为空，空值按迁移时间归入当月分区）
+    op.execute(
+        f"""
+        INSERT INTO execution_logs ({COLUMNS})
+        SELECT id, task_id, roadmap_id, concept_id, COALESCE(level, 'info'), category, step, agent_name,
+               message, details, duration_ms, COALESCE(created_at, now()::timestamp)
+        FROM execution_logs_legacy
+        """
+    )
+
+    op.execute("DROP TABLE execution_logs_legacy")
+
+
+def downgrade() -> None:
+    """
+    回滚：恢复为普通表和单列索引（数据回迁）
+    """
+    op.execute("ALTER TABLE execution_logs RENAME TO execution_logs_partitioned")
+    op.execute("ALTER INDEX execution_logs_pkey RENAME TO execution_logs_partitioned_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE execution_logs (
+            id VARCHAR NOT NULL PRIMARY KEY,
+            task_id VARCHAR NOT NULL,
+            roadmap_id VARCHAR,
+            concept_id VARCHAR,
+            level VARCHAR NOT NULL DEFAULT 'info',
+            category VARCHAR NOT NULL,
+            step VARCHAR,
+            agent_name VARCHAR,
+            message TEXT,
+            details JSON,
+            duration_ms INTEGER,
+            created_at TIMESTAMP WITHOUT TIME ZONE
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO execution_logs ({COLUMNS})
+        SELECT {COLUMNS} FROM execution_logs_partitioned
+        """
+    )
+
+    # 删除父表会同时删除所有分区
+    op.execute("DROP TABLE execution_logs_partitioned")
+
+    for index_name, column in LEGACY_INDEXES:
+        op.create_index(index_name, 'execution_logs', [column], unique=False)
@@ -12,8 +12,10 @@ from tenacity import (
 )
 import structlog
 
-from app.utils.prompt_loader import PromptLoader
+from app.utils.prompt_loader import get_prompt_loader
 from app.utils.cost_tracker import cost_tracker
+from app.utils.llm_cache import llm_response_cache
+from app.utils.llm_governor import llm_governor
 
 logger = structlog.get_logger()
 
@@ -49,7 +51,7 @@ class BaseAgent(ABC):
         self.temperature = temperature
         self.max_tokens = max_tokens
         
-        self.prompt_loader = PromptLoader()
+        self.prompt_loader = get_prompt_loader()
         self.cost_tracker = cost_tracker
     
     @retry(
@@ -101,7 +103,26 @@ class BaseAgent(ABC):
             if self.base_url:
                 call_params["custom_llm_provider"] = "openai"
             
-            response = await litellm.acompletion(**call_params)
+            # 响应缓存（按 Agent 开启，高温度调用自动绕过）
+            # 这里只读取；Agent 解析、校验成功后调用 _store_cached_response 写入
+            cache_key = self._get_response_cache_key(messages, tools, response_format)
+            if cache_key:
+                cached_response = await self._get_cached_response(cache_key)
+                if cached_response is not None:
+                    return cached_response
+            elif llm_response_cache.is_enabled_for(self.agent_id):
+                llm_response_cache.record_bypass()
+            
+            # 集群级并发调控（按 provider/model，AIMD 调整上限）
+            async with llm_governor.lease(self.model_provider, self.model_name) as lease:
+                try:
+                    with lease.measure():
+                        response = await litellm.acompletion(**call_params)
+                except litellm.RateLimitError:
+                    lease.mark_rate_limited()
+                    raise
+                usage = getattr(response, 'usage', None)
+                lease.record_usage(getattr(usage, 'completion_tokens', None) if usage else None)
             
             # 追踪成本
             if hasattr(response, 'usage') and response.usage:
@@ -129,6 +150,83 @@ class BaseAgent(ABC):
             logger.error("llm_call_failed", agent_id=self.agent_id, error=str(e))
             raise
     
+    def _get_response_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict] | None,
+        response_format: Dict | None,
+    ) -> str | None:
+        """
+        计算响应缓存键
+        
+        Returns:
+            缓存键；当前 Agent 未开启缓存或温度过高时返回 None
+        """
+        if not llm_response_cache.is_enabled_for(self.agent_id):
+            return None
+        if llm_response_cache.should_bypass(self.temperature):
+            return None
+        return llm_response_cache.make_key(
+            model=f"{self.model_provider}/{self.model_name}",
+            messages=messages,
+            tools=tools,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            response_format=response_format,
+        )
+    
+    async def _get_cached_response(self, cache_key: str) -> Any | None:
+        """
+        读取缓存的 LLM 响应（命中时按零成本记录到 cost_tracker）
+        
+        缓存异常不影响 LLM 调用，返回 None 走正常请求。
+        """
+        try:
+            data = await llm_response_cache.get(cache_key)
+            if data is None:
+                return None
+            response = litellm.ModelResponse(**data)
+        except Exception as e:
+            logger.warning("llm_cache_read_failed", agent_id=self.agent_id, error=str(e))
+            return None
+        
+        usage = data.get("usage") or {}
+        self.cost_tracker.track_cache_hit(
+            agent_id=self.agent_id,
+            model=self.model_name,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+        logger.info(
+            "llm_call_cache_hit",
+            agent_id=self.agent_id,
+            model=self.model_name,
+            cache_key=cache_key[:16],
+        )
+        return response
+    
+    async def _store_cached_response(
+        self,
+        messages: List[Dict[str, str]],
+        response: Any,
+        tools: List[Dict] | None = None,
+        response_format: Dict | None = None,
+    ) -> None:
+        """
+        写入 LLM 响应缓存（失败只记录日志）
+        
+        由 Agent 在响应解析、校验成功后调用，参数与对应的 _call_llm 调用一致。
+        _call_llm 不自动写入：格式错误或被截断的输出一旦写入，
+        会在发送相同消息的解析失败重试中被反复返回。
+        """
+        cache_key = self._get_response_cache_key(messages, tools, response_format)
+        if not cache_key:
+            return
+        try:
+            await llm_response_cache.set(cache_key, response.model_dump())
+        except Exception as e:
+            logger.warning("llm_cache_write_failed", agent_id=self.agent_id, error=str(e))
+    
     async def _call_llm_stream(
         self,
         messages: List[Dict[str, str]],
@@ -169,22 +267,38 @@ class BaseAgent(ABC):
             if self.base_url:
                 call_params["custom_llm_provider"] = "openai"
             
-            # 流式调用
-            response_stream = await litellm.acompletion(**call_params)
-            
             # 累积完整响应用于成本追踪
             full_content = ""
             total_chunks = 0
             
-            async for chunk in response_stream:
-                # 提取 delta 内容
-                if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if hasattr(delta, 'content') and delta.content:
-                        content = delta.content
-                        full_content += content
-                        total_chunks += 1
-                        yield content
+            # 集群级并发调控：租约覆盖整个流式输出过程
+            async with llm_governor.lease(self.model_provider, self.model_name) as lease:
+                try:
+                    # 流式调用
+                    with lease.measure():
+                        response_stream = await litellm.acompletion(**call_params)
+                except litellm.RateLimitError:
+                    lease.mark_rate_limited()
+                    raise
+                
+                chunks = response_stream.__aiter__()
+                while True:
+                    # 只计时等待 provider 的部分，不包含调用方消费 chunk 的时间
+                    with lease.measure():
+                        chunk = await anext(chunks, None)
+                    if chunk is None:
+                        break
+                    # 提取 delta 内容
+                    if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if hasattr(delta, 'content') and delta.content:
+                            content = delta.content
+                            full_content += content
+                            total_chunks += 1
+                            yield content
+                
+                # 流式输出每个 chunk 约为一个 token
+                lease.record_usage(total_chunks)
             
             logger.info(
                 "llm_stream_completed",
@@ -7,6 +7,11 @@ import uuid
 import yaml
 from typing import AsyncIterator
 from app.agents.base import BaseAgent
+from app.agents.curriculum_stream_parser import (
+    STAGE_HEADER_FIELDS,
+    CurriculumStreamEvent,
+    IncrementalCurriculumParser,
+)
 from app.models.domain import (
     IntentAnalysisOutput,
     LearningPreferences,
@@ -506,6 +511,53 @@ def _ensure_unique_concept_ids(framework_dict: dict, roadmap_id: str) -> dict:
     return framework_dict
 
 
+def _prefix_concept_ids(module: dict, roadmap_id: str) -> dict:
+    """
+    为增量解析出的 Module 添加 concept_id 前缀（与 _ensure_unique_concept_ids 规则一致）
+    
+    增量解析时后续模块尚未输出，前置概念一律按同一规则添加前缀。
+    """
+    def prefixed(concept_id):
+        if concept_id and not concept_id.startswith(roadmap_id):
+            return f"{roadmap_id}:{concept_id}"
+        return concept_id
+    
+    module = dict(module)
+    module["concepts"] = [
+        {
+            **concept,
+            "concept_id": prefixed(concept.get("concept_id")),
+            "prerequisites": [prefixed(p) for p in concept.get("prerequisites") or []],
+        }
+        for concept in module.get("concepts") or []
+        if isinstance(concept, dict)
+    ]
+    return module
+
+
+def _partial_framework_event(event: CurriculumStreamEvent, roadmap_id: str) -> dict:
+    """将增量解析事件转换为 design_stream 推送的 module_ready / stage_ready 事件"""
+    if event.kind == "module":
+        return {
+            "type": "module_ready",
+            "roadmap_id": roadmap_id,
+            "stage_index": event.stage_index,
+            "module_index": event.module_index,
+            "stage": event.stage,
+            "module": _prefix_concept_ids(event.module, roadmap_id),
+            "agent": "curriculum_architect",
+        }
+    stage = {k: event.stage[k] for k in STAGE_HEADER_FIELDS if k in event.stage}
+    stage["module_count"] = len(event.stage.get("modules") or [])
+    return {
+        "type": "stage_ready",
+        "roadmap_id": roadmap_id,
+        "stage_index": event.stage_index,
+        "stage": stage,
+        "agent": "curriculum_architect",
+    }
+
+
 class CurriculumArchitectAgent(BaseAgent):
     """
     课程架构师 Agent
@@ -760,6 +812,10 @@ class CurriculumArchitectAgent(BaseAgent):
         """
         流式设计路线图框架
         
+        LLM 输出过程中增量解析框架，每个 Module / Stage 闭合时立即推送
+        module_ready / stage_ready 事件（concept_id 已添加 roadmap_id 前缀），
+        下游可据此提前开始工作；complete 事件仍以完整解析和校验结果为准。
+        
         Args:
             intent_analysis: 需求分析结果
             user_preferences: 用户偏好
@@ -767,6 +823,8 @@ class CurriculumArchitectAgent(BaseAgent):
             
         Yields:
             {"type": "chunk", "content": "...", "agent": "curriculum_architect"}
+            {"type": "module_ready", "roadmap_id": "...", "stage_index": 0, "module_index": 0, "stage": {...}, "module": {...}, ...}
+            {"type": "stage_ready", "roadmap_id": "...", "stage_index": 0, "stage": {...}, ...}
             {"type": "complete", "data": {...}, "agent": "curriculum_architect"}
             {"type": "error", "error": "...", "agent": "curriculum_architect"}
         """
@@ -840,6 +898,11 @@ class CurriculumArchitectAgent(BaseAgent):
             )
             
             full_content = ""
+            parser = IncrementalCurriculumParser(sanitize_yaml=_sanitize_yaml_special_chars)
+            # 增量事件需要最终的 roadmap_id（concept_id 前缀），首个事件前确定
+            streaming_roadmap_id = pre_generated_roadmap_id
+            partial_events = 0
+            
             async for chunk in self._call_llm_stream(messages):
                 full_content += chunk
                 # 推送流式片段
@@ -848,10 +911,24 @@ class CurriculumArchitectAgent(BaseAgent):
                     "content": chunk,
                     "agent": "curriculum_architect"
                 }
+                
+                for event in parser.feed(chunk):
+                    if streaming_roadmap_id is None:
+                        streaming_roadmap_id = _ensure_unique_roadmap_id(parser.roadmap_id or "roadmap")
+                    partial_events += 1
+                    yield _partial_framework_event(event, streaming_roadmap_id)
+            
+            for event in parser.finish():
+                if streaming_roadmap_id is None:
+                    streaming_roadmap_id = _ensure_unique_roadmap_id(parser.roadmap_id or "roadmap")
+                partial_events += 1
+                yield _partial_framework_event(event, streaming_roadmap_id)
             
             logger.debug(
                 "curriculum_design_stream_response_received",
                 response_length=len(full_content),
+                stream_format=parser.format,
+                partial_events=partial_events,
             )
             
             # 解析简洁格式的路线图
@@ -868,6 +945,9 @@ class CurriculumArchitectAgent(BaseAgent):
                     "curriculum_design_stream_using_pre_generated_roadmap_id",
                     pre_generated_id=pre_generated_roadmap_id,
                 )
+            elif streaming_roadmap_id:
+                # 沿用增量事件中已使用的 roadmap_id，保证 concept_id 前后一致
+                framework_dict["roadmap_id"] = streaming_roadmap_id
             else:
                 # 确保 roadmap_id 唯一性（兼容旧的调用方式）
                 original_roadmap_id = framework_dict.get("roadmap_id", "roadmap")
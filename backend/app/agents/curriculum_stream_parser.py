@@ -0,0 +1,415 @@
+"""
+路线图框架增量解析器
+
+CurriculumArchitectAgent.design_stream 的 LLM 输出是一个完整的 YAML 或 JSON 文档，
+原实现在流结束后才整体解析。本模块在流式过程中逐步扫描输出，
+每当一个 Module 或 Stage 闭合时立即解析并产出事件，供下游提前开始工作。
+
+设计说明：
+- 自动识别格式：首个非空白字符（跳过代码块标记）为 `{` 时按 JSON 扫描，否则按 YAML 扫描
+- JSON：逐字符扫描，跟踪字符串/转义状态和容器栈，对象闭合时按路径
+  （...stages[i].modules[j]）判断是否为 Module / Stage
+- YAML：按完整行扫描，根据列表项缩进判断块的开始与闭合，闭合后用 yaml.safe_load 解析该块
+- 增量结果仅用于提前展示和推测执行，最终结果仍以完整解析 + RoadmapFramework 校验为准；
+  单个块解析失败时静默跳过
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+import structlog
+import yaml
+
+logger = structlog.get_logger()
+
+# Stage 头部字段（在 modules 之前输出）
+STAGE_HEADER_FIELDS = ("stage_id", "name", "description", "order")
+
+_JSON_SCALAR_FIELD_RE = r'"{key}"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)'
+_YAML_ROADMAP_ID_RE = re.compile(r'^\s*roadmap_id:\s*["\']?([^"\'\s#]+)', re.MULTILINE)
+_JSON_ROADMAP_ID_RE = re.compile(r'"roadmap_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+@dataclass
+class CurriculumStreamEvent:
+    """增量解析事件"""
+    kind: str  # "module" | "stage"
+    stage_index: int
+    stage: dict  # Stage 头部字段（kind="stage" 时为完整 Stage）
+    module_index: int | None = None
+    module: dict | None = None
+
+
+@dataclass
+class _JSONFrame:
+    """JSON 容器栈帧"""
+    kind: str  # "{" | "["
+    key: str | None  # 容器在父对象中的键（父容器为数组时为 None）
+    start: int
+    stage_index: int | None = None
+    module_index: int | None = None
+    header: dict = field(default_factory=dict)
+
+
+class _JSONScanner:
+    """JSON 增量扫描器"""
+
+    def __init__(self):
+        self.pos = 0
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.last_string: str | None = None
+        self.current_key: str | None = None
+        self.stack: list[_JSONFrame] = []
+        self.stage_count = 0
+        self.module_count = 0
+
+    def _parent_is(self, depth: int, kind: str, key: str | None) -> bool:
+        """检查栈顶往下第 depth 层（1 为栈顶）的容器类型和键"""
+        if len(self.stack) < depth:
+            return False
+        frame = self.stack[-depth]
+        return frame.kind == kind and frame.key == key
+
+    def _at_stage_item(self) -> bool:
+        """栈顶是否为 stages 数组"""
+        return self._parent_is(1, "[", "stages")
+
+    def _at_module_item(self) -> bool:
+        """栈顶是否为某个 Stage 的 modules 数组"""
+        return (
+            self._parent_is(1, "[", "modules")
+            and len(self.stack) >= 2 and self.stack[-2].kind == "{"
+            and self.stack[-2].stage_index is not None
+        )
+
+    def scan(self, buffer: str) -> list[CurriculumStreamEvent]:
+        events: list[CurriculumStreamEvent] = []
+        i = self.pos
+        length = len(buffer)
+
+        while i < length and not self.done:
+            c = buffer[i]
+
+            if not self.started:
+                if c == "{":
+                    self.started = True
+                else:
+                    i += 1
+                    continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    self.last_string = buffer[self.string_start:i + 1]
+            elif c == '"':
+                self.in_string = True
+                self.string_start = i
+            elif c == ":":
+                if self.stack and self.stack[-1].kind == "{" and self.last_string is not None:
+                    try:
+                        self.current_key = json.loads(self.last_string)
+                    except json.JSONDecodeError:
+                        self.current_key = None
+            elif c == ",":
+                self.current_key = None
+                self.last_string = None
+            elif c in "{[":
+                key = self.current_key if self.stack and self.stack[-1].kind == "{" else None
+                frame = _JSONFrame(kind=c, key=key, start=i)
+                if c == "{" and self._at_stage_item():
+                    frame.stage_index = self.stage_count
+                    self.stage_count += 1
+                    self.module_count = 0
+                elif c == "{" and self._at_module_item():
+                    frame.module_index = self.module_count
+                    self.module_count += 1
+                elif c == "[" and key == "modules" and self.stack and self.stack[-1].stage_index is not None:
+                    # modules 数组开始：此前的文本即 Stage 头部
+                    stage_frame = self.stack[-1]
+                    stage_frame.header = _extract_json_header(buffer[stage_frame.start:i])
+                self.stack.append(frame)
+                self.current_key = None
+                self.last_string = None
+            elif c in "}]":
+                if not self.stack:
+                    self.done = True
+                    break
+                frame = self.stack.pop()
+                if frame.module_index is not None:
+                    module = _load_json_block(buffer[frame.start:i + 1])
+                    stage_frame = self.stack[-2]
+                    if module is not None:
+                        events.append(CurriculumStreamEvent(
+                            kind="module",
+                            stage_index=stage_frame.stage_index,
+                            stage=dict(stage_frame.header),
+                            module_index=frame.module_index,
+                            module=module,
+                        ))
+                elif frame.stage_index is not None:
+                    stage = _load_json_block(buffer[frame.start:i + 1])
+                    if stage is not None:
+                        events.append(CurriculumStreamEvent(
+                            kind="stage",
+                            stage_index=frame.stage_index,
+                            stage=stage,
+                        ))
+                if not self.stack:
+                    self.done = True
+            i += 1
+
+        self.pos = i
+        return events
+
+
+def _load_json_block(text: str) -> dict | None:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        logger.debug("curriculum_stream_block_parse_failed", format="json", error=str(e))
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _extract_json_header(text: str) -> dict:
+    """从 Stage 对象的开头部分（modules 之前）提取标量字段"""
+    header = {}
+    for key in STAGE_HEADER_FIELDS:
+        match = re.search(_JSON_SCALAR_FIELD_RE.format(key=key), text)
+        if match:
+            try:
+                header[key] = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                pass
+    return header
+
+
+class _YAMLScanner:
+    """YAML 增量扫描器（按完整行处理）"""
+
+    def __init__(self, sanitize: Callable[[str], str] | None):
+        self.sanitize = sanitize
+        self.pos = 0
+
+        self.stages_key_indent: int | None = None
+        self.stage_item_indent: int | None = None
+        self.stage_lines: list[str] = []
+        self.stage_index = -1
+
+        self.modules_key_indent: int | None = None
+        self.module_item_indent: int | None = None
+        self.module_lines: list[str] = []
+        self.module_index = -1
+        self.stage_header: dict = {}
+
+    def scan(self, buffer: str, final: bool = False) -> list[CurriculumStreamEvent]:
+        events: list[CurriculumStreamEvent] = []
+        while True:
+            newline = buffer.find("\n", self.pos)
+            if newline == -1:
+                if final and self.pos < len(buffer):
+                    events.extend(self._process_line(buffer[self.pos:]))
+                    self.pos = len(buffer)
+                break
+            events.extend(self._process_line(buffer[self.pos:newline]))
+            self.pos = newline + 1
+        if final:
+            events.extend(self._close_module())
+            events.extend(self._close_stage())
+        return events
+
+    def _load_item(self, lines: list[str], indent: int) -> dict | None:
+        """解析一个列表项块（去掉列表项缩进后 safe_load）"""
+        text = "\n".join(line[indent:] if line[:indent].strip() == "" else line.lstrip() for line in lines)
+        if self.sanitize is not None:
+            text = self.sanitize(text)
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            logger.debug("curriculum_stream_block_parse_failed", format="yaml", error=str(e)[:200])
+            return None
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            return data[0]
+        return None
+
+    def _close_module(self) -> list[CurriculumStreamEvent]:
+        if not self.module_lines:
+            return []
+        lines, self.module_lines = self.module_lines, []
+        module = self._load_item(lines, self.module_item_indent)
+        if module is None:
+            return []
+        return [CurriculumStreamEvent(
+            kind="module",
+            stage_index=self.stage_index,
+            stage=dict(self.stage_header),
+            module_index=self.module_index,
+            module=module,
+        )]
+
+    def _close_stage(self) -> list[CurriculumStreamEvent]:
+        self.modules_key_indent = None
+        self.module_item_indent = None
+        if not self.stage_lines:
+            return []
+        lines, self.stage_lines = self.stage_lines, []
+        stage = self._load_item(lines, self.stage_item_indent)
+        if stage is None:
+            return []
+        return [CurriculumStreamEvent(kind="stage", stage_index=self.stage_index, stage=stage)]
+
+    def _process_line(self, line: str) -> list[CurriculumStreamEvent]:
+        events: list[CurriculumStreamEvent] = []
+        stripped = line.strip()
+        blank = not stripped or stripped.startswith("#")
+        indent = len(line) - len(line.lstrip(" "))
+        is_item = stripped.startswith("- ") or stripped == "-"
+
+        if blank:
+            if self.module_lines:
+                self.module_lines.append(line)
+            if self.stage_lines:
+                self.stage_lines.append(line)
+            return events
+
+        # 1. Module 块闭合 / 新 Module 开始
+        if self.modules_key_indent is not None:
+            if self.module_item_indent is None:
+                if is_item and indent >= self.modules_key_indent:
+                    self.module_item_indent = indent
+                else:
+                    self.modules_key_indent = None
+            if self.module_item_indent is not None and indent <= self.module_item_indent:
+                events.extend(self._close_module())
+                if is_item and indent == self.module_item_indent:
+                    self.module_index += 1
+                    self.module_lines = [line]
+                    self.stage_lines.append(line)
+                    return events
+                self.modules_key_indent = None
+                self.module_item_indent = None
+
+        # 2. Stage 块闭合 / 新 Stage 开始
+        if self.stages_key_indent is not None:
+            if self.stage_item_indent is None:
+                if is_item and indent >= self.stages_key_indent:
+                    self.stage_item_indent = indent
+                else:
+                    self.stages_key_indent = None
+            if self.stage_item_indent is not None and indent <= self.stage_item_indent:
+                events.extend(self._close_module())
+                events.extend(self._close_stage())
+                if is_item and indent == self.stage_item_indent:
+                    self.stage_index += 1
+                    self.module_index = -1
+                    self.stage_header = {}
+                    self.stage_lines = [line]
+                    return events
+                self.stages_key_indent = None
+                self.stage_item_indent = None
+
+        # 3. 普通行：追加到当前块，识别 stages: / modules: 键
+        if self.module_lines:
+            self.module_lines.append(line)
+        if self.stage_lines:
+            self.stage_lines.append(line)
+            if (
+                self.modules_key_indent is None
+                and indent > self.stage_item_indent
+                and re.match(r"^modules:\s*$", stripped)
+            ):
+                # modules 之前的行即 Stage 头部
+                header = self._load_item(self.stage_lines[:-1], self.stage_item_indent) or {}
+                self.stage_header = {k: header[k] for k in STAGE_HEADER_FIELDS if k in header}
+                self.modules_key_indent = indent
+        elif self.stages_key_indent is None and re.match(r"^stages:\s*$", stripped):
+            self.stages_key_indent = indent
+
+        return events
+
+
+class IncrementalCurriculumParser:
+    """
+    路线图框架增量解析器
+
+    使用方式：
+        parser = IncrementalCurriculumParser()
+        async for chunk in stream:
+            for event in parser.feed(chunk):
+                ...
+        for event in parser.finish():
+            ...
+    """
+
+    def __init__(self, sanitize_yaml: Callable[[str], str] | None = None):
+        """
+        Args:
+            sanitize_yaml: YAML 块解析前的预处理函数（修复特殊字符）
+        """
+        self._buffer = ""
+        self._sanitize_yaml = sanitize_yaml
+        self._scanner: _JSONScanner | _YAMLScanner | None = None
+        self._roadmap_id: str | None = None
+
+    @property
+    def format(self) -> str | None:
+        """识别出的格式："json" / "yaml"（尚未识别时为 None）"""
+        if isinstance(self._scanner, _JSONScanner):
+            return "json"
+        if isinstance(self._scanner, _YAMLScanner):
+            return "yaml"
+        return None
+
+    @property
+    def roadmap_id(self) -> str | None:
+        """LLM 输出的 roadmap_id（出现后才可用）"""
+        if self._roadmap_id is None and self._scanner is not None:
+            pattern = _JSON_ROADMAP_ID_RE if self.format == "json" else _YAML_ROADMAP_ID_RE
+            match = pattern.search(self._buffer)
+            if match:
+                self._roadmap_id = match.group(1)
+        return self._roadmap_id
+
+    def _detect_format(self) -> None:
+        """跳过空白和代码块标记行，根据首个有效字符识别格式"""
+        for line in self._buffer.splitlines(keepends=True):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith("```"):
+                if not line.endswith("\n"):
+                    return  # 代码块标记行尚未完整
+                continue
+            if stripped.startswith("{"):
+                self._scanner = _JSONScanner()
+            elif line.endswith("\n") or len(stripped) > 1:
+                self._scanner = _YAMLScanner(self._sanitize_yaml)
+            return
+
+    def feed(self, chunk: str) -> list[CurriculumStreamEvent]:
+        """追加一段流式输出，返回此次新闭合的 Module / Stage"""
+        self._buffer += chunk
+        if self._scanner is None:
+            self._detect_format()
+            if self._scanner is None:
+                return []
+        return self._scanner.scan(self._buffer)
+
+    def finish(self) -> list[CurriculumStreamEvent]:
+        """流结束：闭合仍未闭合的块（仅 YAML 需要）"""
+        if self._scanner is None:
+            self._detect_format()
+        if isinstance(self._scanner, _YAMLScanner):
+            return self._scanner.scan(self._buffer, final=True)
+        if isinstance(self._scanner, _JSONScanner):
+            return self._scanner.scan(self._buffer)
+        return []
@@ -185,6 +185,7 @@ class IntentAnalyzerAgent(BaseAgent):
             
             # 使用 Pydantic 验证输出格式
             result = IntentAnalysisOutput.model_validate(result_dict)
+            await self._store_cached_response(messages, response)
             logger.info(
                 "intent_analysis_success",
                 user_id=user_request.user_id,
@@ -525,6 +526,7 @@ class IntentAnalyzerAgent(BaseAgent):
             
             # 使用 Pydantic 验证输出格式
             result = IntentAnalysisOutput.model_validate(result_dict)
+            await self._store_cached_response(messages, response)
             
             logger.info(
                 "intent_analysis_completed",
@@ -0,0 +1,181 @@
+"""
+伴学意图规则预分类器
+
+问题背景：
+- 每轮伴学对话都先调用一次 LLM 意图识别，再开始流式生成回复，
+  首 token 延迟包含一次完整的 LLM 往返
+- 大部分消息意图非常明确（"考考我"、"帮我记笔记"、普通提问），不需要 LLM 判断
+
+设计说明：
+- 进程内关键词/正则规则，微秒级完成，不依赖网络
+- 只在唯一命中、置信度达到阈值时直接采用；多个意图同时命中、
+  测验/笔记关键词前有否定词（"不要出题"）或完全未命中时返回 None，由调用方回退到 LLM
+- 测验/笔记规则只匹配祈使语境（句首动词或"给我/帮我"），同时是提问句时降低置信度
+- qa / explanation_request / analogy_request 都路由到 QAAgent，
+  三者之间误判只影响记录的 intent_type，不影响回复
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.models.domain import IntentRecognitionResult
+
+# 否定词：出现在测验/笔记关键词之前时不采用规则结果
+_NEGATION_RE = re.compile(r"(不要|不用|别|无需|不需要|don't|do not|no need to)\s*$", re.IGNORECASE)
+
+# 超长消息往往混合多种诉求，交给 LLM 判断
+_MAX_MESSAGE_LENGTH = 300
+
+# 祈使语境：动词位于句首（或分句开头、"然后"等连接词之后），或前面有"给我/帮我"。
+# 避免陈述句中的字面命中，如"这道题出题人想考什么"、"我已经记下来了"
+_IMPERATIVE = (
+    r"(?:(?:^|[，,。！!；;]|然后|接着|顺便)\s*(?:请|麻烦你?)?\s*(?:[给帮]我)?|[给帮]我)"
+    r"\s*(?:把[^，,。！!？?]{0,20}?)?(?:再|先)?"
+)
+_EN_IMPERATIVE = r"(?:^|[.,!;]\s*|\b(?:please|help me|can you|could you)\s+)"
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """单条意图规则"""
+    intent: str
+    pattern: re.Pattern
+    confidence: float
+    negatable: bool = False
+
+
+_RULES: list[IntentRule] = [
+    # 测验请求
+    IntentRule(
+        "quiz_request",
+        re.compile(
+            r"考考我|测测我|测试一下我|"
+            + _IMPERATIVE
+            + r"(?:出|来|生成)[一几两三四五六七八九十\d]*[道个套份些点]?(?:测验|测试题|练习题|题目|题)(?![人者])|"
+            r"\b(quiz|test) me\b|\bgive me (a |some )?(quiz|questions|exercises)\b",
+            re.IGNORECASE,
+        ),
+        0.95,
+        negatable=True,
+    ),
+    # 笔记记录
+    IntentRule(
+        "note_record",
+        re.compile(
+            r"^\s*(笔记|note)\s*[:：]|"
+            + _IMPERATIVE
+            + r"(?:(?:记|记录|保存|整理)(?:一下|下来|成|为|到)?(?:笔记|要点|重点)|记下来)(?!了)|"
+            + _EN_IMPERATIVE
+            + r"(take|save|write down) (a |this |these |some )?notes?\b|\bnote (this|that) down\b",
+            re.IGNORECASE,
+        ),
+        0.95,
+        negatable=True,
+    ),
+    # 类比请求
+    IntentRule(
+        "analogy_request",
+        re.compile(r"打个比方|类比|比喻|\banalog(y|ies)\b|\beli5\b", re.IGNORECASE),
+        0.9,
+    ),
+    # 深入解释请求
+    IntentRule(
+        "explanation_request",
+        re.compile(
+            r"(再|更|详细|具体|深入)(一点|一些)?地?(解释|讲讲|讲解|说明)|没(看|听)懂|不太?(明白|理解|懂)|"
+            r"\bexplain (it |this |that )?(again|in more detail|more)\b",
+            re.IGNORECASE,
+        ),
+        0.9,
+    ),
+]
+
+# 普通提问：以问号结尾，或以疑问词开头/以语气词结尾
+_QUESTION_RE = re.compile(
+    r"[?？]\s*$|[吗呢么]\s*$|"
+    r"^\s*(什么|为什么|为啥|怎么|怎样|如何|哪|是否|能否|有没有|请问)|"
+    r"^\s*(what|why|how|when|where|which|who|can|could|is|are|does|do|should)\b",
+    re.IGNORECASE,
+)
+_QA_CONFIDENCE = 0.85
+
+# 路由到 QAAgent 的意图（彼此误判不影响回复）
+_QA_ROUTED_INTENTS = frozenset({"qa", "explanation_request", "analogy_request"})
+
+# 测验/笔记规则命中但消息同时是提问句（"能给我出几道题吗？"）时的置信度，
+# 低于 MENTOR_INTENT_RULES_MIN_CONFIDENCE，交给 LLM 判断
+_QUESTION_OVERLAP_CONFIDENCE = 0.7
+
+
+class IntentPreClassifier:
+    """伴学意图规则预分类器"""
+
+    def __init__(self, rules: Optional[list[IntentRule]] = None):
+        self.rules = rules if rules is not None else _RULES
+        self.rule_hits: dict[str, int] = {}
+        self.fallbacks = 0
+
+    def _match(self, message: str) -> Optional[IntentRecognitionResult]:
+        if len(message) > _MAX_MESSAGE_LENGTH:
+            return None
+
+        matched: dict[str, tuple[IntentRule, str]] = {}
+        for rule in self.rules:
+            match = rule.pattern.search(message)
+            if match is None:
+                continue
+            if rule.negatable and _NEGATION_RE.search(message[:match.start()]):
+                return None
+            matched.setdefault(rule.intent, (rule, match.group(0)))
+
+        if len(matched) > 1:
+            return None
+        if matched:
+            rule, keyword = next(iter(matched.values()))
+            confidence = rule.confidence
+            if rule.intent not in _QA_ROUTED_INTENTS and _QUESTION_RE.search(message):
+                confidence = min(confidence, _QUESTION_OVERLAP_CONFIDENCE)
+            return IntentRecognitionResult(
+                intent=rule.intent,
+                confidence=confidence,
+                reason=f"规则预分类命中: {keyword.strip()}",
+            )
+        if _QUESTION_RE.search(message):
+            return IntentRecognitionResult(
+                intent="qa",
+                confidence=_QA_CONFIDENCE,
+                reason="规则预分类: 普通提问",
+            )
+        return None
+
+    def classify(self, message: str, min_confidence: float) -> Optional[IntentRecognitionResult]:
+        """
+        规则预分类
+
+        Args:
+            message: 用户消息
+            min_confidence: 直接采用结果的最低置信度
+
+        Returns:
+            意图识别结果；无法确定时返回 None（调用方应回退到 LLM）
+        """
+        result = self._match(message.strip())
+        if result is None or result.confidence < min_confidence:
+            self.fallbacks += 1
+            return None
+        self.rule_hits[result.intent] = self.rule_hits.get(result.intent, 0) + 1
+        return result
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取预分类统计"""
+        hits = sum(self.rule_hits.values())
+        total = hits + self.fallbacks
+        return {
+            "rule_hits": dict(self.rule_hits),
+            "fallbacks": self.fallbacks,
+            "hit_ratio": round(hits / total * 100, 2) if total else 0.0,
+        }
+
+
+# 全局单例
+intent_pre_classifier = IntentPreClassifier()
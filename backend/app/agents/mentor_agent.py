@@ -3,16 +3,20 @@
 
 作为伴学模式的唯一入口，负责：
 1. 接收用户消息和学习上下文
-2. 调用IntentRecognizerAgent识别意图
+2. 识别意图（本地规则预分类，无法确定时调用IntentRecognizerAgent）
 3. 根据意图路由到相应的子Agent
 4. 支持流式输出
+
+每轮对话只识别一次意图：调用方先 recognize_intent()，再把结果传给
+execute_stream() 并用于持久化 intent_type。
 """
 from typing import AsyncIterator, Optional
 from app.agents.base import BaseAgent
 from app.agents.intent_recognizer import IntentRecognizerAgent
+from app.agents.intent_pre_classifier import intent_pre_classifier
 from app.agents.qa_agent import QAAgent
 from app.agents.note_recorder_agent import NoteRecorderAgent
-from app.models.domain import MentorAgentInput, MentorAgentOutput
+from app.models.domain import IntentRecognitionResult, MentorAgentInput, MentorAgentOutput
 from app.config.settings import settings
 import structlog
 
@@ -59,20 +63,67 @@ class MentorAgent(BaseAgent):
         self.note_agent = NoteRecorderAgent()
         # QuizGeneratorAgent使用现有的，不需要重新创建
     
+    async def recognize_intent(self, input_data: MentorAgentInput) -> IntentRecognitionResult:
+        """
+        识别用户消息的意图
+        
+        先用本地规则预分类，命中且置信度足够时直接返回；否则调用 LLM 意图识别。
+        
+        Args:
+            input_data: 伴学Agent输入
+            
+        Returns:
+            意图识别结果（识别失败时降级为 qa）
+        """
+        if settings.MENTOR_INTENT_RULES_ENABLED:
+            result = intent_pre_classifier.classify(
+                input_data.user_message,
+                min_confidence=settings.MENTOR_INTENT_RULES_MIN_CONFIDENCE,
+            )
+            if result is not None:
+                logger.info(
+                    "mentor_agent_intent_pre_classified",
+                    intent=result.intent,
+                    confidence=result.confidence,
+                    reason=result.reason,
+                )
+                return result
+        
+        try:
+            result = await self.intent_recognizer.execute(input_data)
+            logger.info(
+                "mentor_agent_intent_recognized",
+                intent=result.intent,
+                confidence=result.confidence,
+            )
+            return result
+        except Exception as e:
+            logger.error(
+                "mentor_agent_intent_recognition_failed",
+                error=str(e),
+            )
+            return IntentRecognitionResult(
+                intent="qa",
+                confidence=0.5,
+                reason=f"意图识别失败，默认使用qa: {str(e)}",
+            )
+    
     async def execute_stream(
         self,
         input_data: MentorAgentInput,
+        intent_result: Optional[IntentRecognitionResult] = None,
     ) -> AsyncIterator[str]:
         """
         流式执行伴学对话
         
         流程：
-        1. 意图识别
+        1. 意图识别（已传入 intent_result 时跳过）
         2. 根据意图路由到子Agent
         3. 流式输出子Agent的响应
         
         Args:
             input_data: 伴学Agent输入
+            intent_result: 已识别的意图（调用方需要持久化意图时传入，避免重复识别）
             
         Yields:
             流式文本片段
@@ -86,23 +137,9 @@ class MentorAgent(BaseAgent):
         )
         
         # Step 1: 意图识别
-        try:
-            intent_result = await self.intent_recognizer.execute(input_data)
-            intent = intent_result.intent
-            confidence = intent_result.confidence
-            
-            logger.info(
-                "mentor_agent_intent_recognized",
-                intent=intent,
-                confidence=confidence,
-            )
-        except Exception as e:
-            logger.error(
-                "mentor_agent_intent_recognition_failed",
-                error=str(e),
-            )
-            intent = "qa"
-            confidence = 0.5
+        if intent_result is None:
+            intent_result = await self.recognize_intent(input_data)
+        intent = intent_result.intent
         
         # Step 2: 根据意图路由到子Agent
         try:
@@ -194,17 +231,16 @@ class MentorAgent(BaseAgent):
         Returns:
             完整的响应输出
         """
+        intent_result = await self.recognize_intent(input_data)
+        
         # 收集所有流式输出
         full_response = ""
-        async for chunk in self.execute_stream(input_data):
+        async for chunk in self.execute_stream(input_data, intent_result=intent_result):
             full_response += chunk
         
-        # 获取意图类型
-        intent = await self.get_intent(input_data)
-        
         return MentorAgentOutput(
             response=full_response,
-            intent_type=intent,
+            intent_type=intent_result.intent,
             tool_calls=[],
             metadata={},
         )
@@ -219,5 +255,5 @@ class MentorAgent(BaseAgent):
         Returns:
             意图类型
         """
-        result = await self.intent_recognizer.execute(input_data)
+        result = await self.recognize_intent(input_data)
         return result.intent
@@ -174,6 +174,7 @@ class QuizGeneratorAgent(BaseAgent):
                 total_questions=len(questions),
                 generated_at=datetime.now(),
             )
+            await self._store_cached_response(messages, response)
             
             logger.info(
                 "quiz_generator_success",
@@ -15,9 +15,9 @@ from app.models.domain import (
     SearchQuery,
 )
 from app.core.tool_registry import tool_registry
+from app.tools.search.url_verifier import url_verifier
 from app.config.settings import settings
 import structlog
-import httpx
 import asyncio
 
 logger = structlog.get_logger()
@@ -267,7 +267,8 @@ class ResourceRecommenderAgent(BaseAgent):
         策略:
         - 使用 HEAD 请求检查链接（更快）
         - 模拟浏览器 User-Agent（避免403）
-        - 并发验证提升速度
+        - 进程级共享连接池，全局和每域名并发上限（见 url_verifier）
+        - 近期验证结果缓存在 Redis，避免重复检查同一链接
         - 保留200和403/412状态码的资源（403/412可能需要浏览器访问但资源存在）
         - 过滤404和500+错误的资源
         
@@ -279,92 +280,81 @@ class ResourceRecommenderAgent(BaseAgent):
         """
         verified_resources = []
         
-        # 模拟浏览器 User-Agent
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                         "AppleWebKit/537.36 (KHTML, like Gecko) "
-                         "Chrome/120.0.0.0 Safari/537.36"
-        }
-        
         async def verify_single(resource: Resource) -> Optional[Resource]:
-            """验证单个URL"""
-            try:
-                async with httpx.AsyncClient(
-                    timeout=10.0, 
-                    follow_redirects=True
-                ) as client:
-                    response = await client.head(resource.url, headers=headers)
-                    
-                    # 200: 完全有效
-                    if response.status_code == 200:
-                        # 更新为最终URL（处理重定向）
-                        resource.url = str(response.url)
-                        logger.info(
-                            "url_verified_success",
-                            url=resource.url,
-                            status=200,
-                            title=resource.title[:50]
-                        )
-                        return resource
-                    
-                    # 403/412: 可能需要浏览器访问，但资源可能存在，保留
-                    elif response.status_code in [403, 412]:
-                        logger.info(
-                            "url_possibly_valid",
-                            url=resource.url,
-                            status=response.status_code,
-                            title=resource.title[:50],
-                            reason="需要浏览器访问或Cookie"
-                        )
-                        return resource  # 保留这些资源
-                    
-                    # 404: 确认无效
-                    elif response.status_code == 404:
-                        logger.warning(
-                            "url_not_found",
-                            url=resource.url,
-                            status=404,
-                            title=resource.title[:50]
-                        )
-                        return None  # 过滤掉
-                    
-                    # 500+: 服务器错误
-                    elif response.status_code >= 500:
-                        logger.warning(
-                            "url_server_error",
-                            url=resource.url,
-                            status=response.status_code,
-                            title=resource.title[:50]
-                        )
-                        return None  # 过滤掉
-                    
-                    # 其他状态码：保守处理，保留
-                    else:
-                        logger.info(
-                            "url_unknown_status",
-                            url=resource.url,
-                            status=response.status_code,
-                            title=resource.title[:50]
-                        )
-                        return resource
-                        
-            except httpx.TimeoutException:
+            """验证单个URL（共享客户端 + Redis 结果缓存）"""
+            verdict = await url_verifier.verify(resource.url)
+            
+            # 超时的链接保留（可能是网络问题）
+            if verdict.timed_out:
                 logger.warning(
                     "url_verification_timeout",
                     url=resource.url,
                     title=resource.title[:50]
                 )
-                # 超时的链接保留（可能是网络问题）
                 return resource
-                
-            except Exception as e:
+            
+            # 验证失败的链接保留（保守策略）
+            if verdict.status_code is None:
                 logger.warning(
                     "url_verification_failed",
                     url=resource.url,
-                    error=str(e)[:100],
+                    error=verdict.error,
+                    title=resource.title[:50]
+                )
+                return resource
+            
+            # 200: 完全有效
+            if verdict.status_code == 200:
+                # 更新为最终URL（处理重定向）
+                resource.url = verdict.final_url
+                logger.info(
+                    "url_verified_success",
+                    url=resource.url,
+                    status=200,
+                    title=resource.title[:50],
+                    from_cache=verdict.from_cache,
+                )
+                return resource
+            
+            # 403/412: 可能需要浏览器访问，但资源可能存在，保留
+            elif verdict.status_code in [403, 412]:
+                logger.info(
+                    "url_possibly_valid",
+                    url=resource.url,
+                    status=verdict.status_code,
+                    title=resource.title[:50],
+                    reason="需要浏览器访问或Cookie"
+                )
+                return resource  # 保留这些资源
+            
+            # 404: 确认无效
+            elif verdict.status_code == 404:
+                logger.warning(
+                    "url_not_found",
+                    url=resource.url,
+                    status=404,
+                    title=resource.title[:50]
+                )
+                return None  # 过滤掉
+            
+            # 500+: 服务器错误
+            elif verdict.status_code >= 500:
+                logger.warning(
+                    "url_server_error",
+                    url=resource.url,
+                    status=verdict.status_code,
+                    title=resource.title[:50]
+                )
+                return None  # 过滤掉
+            
+            # 其他状态码：保守处理，保留
+            else:
+                logger.info(
+                    "url_unknown_status",
+                    url=resource.url,
+                    status=verdict.status_code,
                     title=resource.title[:50]
                 )
-                # 验证失败的链接保留（保守策略）
                 return resource
         
         # 并发验证所有URL
@@ -513,6 +503,9 @@ class ResourceRecommenderAgent(BaseAgent):
         # 收集所有使用的搜索查询
         all_search_queries = []
         
+        # 本轮各次 LLM 调用的 (消息快照, 响应)，最终输出解析成功后写入响应缓存
+        llm_exchanges = []
+        
         # 调用 LLM（支持工具调用）
         max_iterations = 5
         iteration = 0
@@ -526,6 +519,7 @@ class ResourceRecommenderAgent(BaseAgent):
             )
             
             response = await self._call_llm(messages, tools=tools)
+            llm_exchanges.append((list(messages), response))
             message = response.choices[0].message
             
             # 检查是否有工具调用
@@ -653,6 +647,9 @@ class ResourceRecommenderAgent(BaseAgent):
             json_queries = data.get("search_queries_used", [])
             combined_queries = list(set(all_search_queries + json_queries))
             
+            for exchange_messages, exchange_response in llm_exchanges:
+                await self._store_cached_response(exchange_messages, exchange_response, tools=tools)
+            
             # 生成唯一 ID（用于关联 resource_recommendation_metadata 表）
             resource_id = str(uuid.uuid4())
             
@@ -247,6 +247,9 @@ class TutorialGeneratorAgent(BaseAgent):
         # 获取工具定义
         tools = self._get_tools_definition()
         
+        # 本轮各次 LLM 调用的 (消息快照, 响应)，教程解析并上传成功后写入响应缓存
+        llm_exchanges = []
+        
         # 调用 LLM（支持工具调用）
         max_iterations = 5  # 最多允许5轮工具调用
         iteration = 0
@@ -260,6 +263,7 @@ class TutorialGeneratorAgent(BaseAgent):
             )
             
             response = await self._call_llm(messages, tools=tools)
+            llm_exchanges.append((list(messages), response))
             message = response.choices[0].message
             
             # 检查是否有工具调用
@@ -418,6 +422,9 @@ class TutorialGeneratorAgent(BaseAgent):
                 content_version=content_version,  # 传递版本号
             )
             
+            for exchange_messages, exchange_response in llm_exchanges:
+                await self._store_cached_response(exchange_messages, exchange_response, tools=tools)
+            
             logger.info(
                 "tutorial_generation_success",
                 concept_id=concept.concept_id,
@@ -529,10 +536,14 @@ class TutorialGeneratorAgent(BaseAgent):
                 concept_id=concept.concept_id,
             )
             
+            # 工具调用阶段各次 LLM 调用的 (消息快照, 响应)，教程上传成功后写入响应缓存
+            llm_exchanges = []
+            
             # 工具调用阶段（非流式）
             tool_calls_completed = False
             while iteration < max_iterations:
                 response = await self._call_llm(messages, tools=tools)
+                llm_exchanges.append((list(messages), response))
                 message = response.choices[0].message
                 
                 # 检查是否有工具调用
@@ -722,6 +733,9 @@ class TutorialGeneratorAgent(BaseAgent):
                     content_version=content_version,  # 传递版本号
                 )
                 
+                for exchange_messages, exchange_response in llm_exchanges:
+                    await self._store_cached_response(exchange_messages, exchange_response, tools=tools)
+                
                 logger.info(
                     "tutorial_generation_stream_success",
                     concept_id=concept.concept_id,
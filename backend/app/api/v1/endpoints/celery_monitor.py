@@ -2,6 +2,10 @@
 Celery 任务队列监控 API 端点
 
 提供实时的 Celery 任务状态查询功能，用于管理员监控任务队列。
+
+数据来源：
+- 启用 CELERY_EVENT_MONITOR_ENABLED 时读取事件驱动的集群状态快照（无需广播 inspect）
+- 未启用或快照尚未就绪时回退到 celery inspect
 """
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -13,6 +17,7 @@ from pydantic import BaseModel
 import structlog
 
 from app.core.celery_app import celery_app
+from app.core.celery_cluster_state import celery_event_monitor
 from app.models.database import User
 from app.core.auth.deps import current_superuser
 from celery.result import AsyncResult
@@ -69,7 +74,7 @@ class CeleryOverview(BaseModel):
         pending_count: 待处理任务数（预约+保留）
         scheduled_count: 预约任务数
         reserved_count: 保留任务数
-        queue_lengths: 各队列长度统计
+        queue_lengths: 各队列长度统计（事件监控模式下为 broker 中排队的消息数）
         workers: Worker 列表
     """
     active_count: int
@@ -120,6 +125,22 @@ class CeleryWorkerListResponse(BaseModel):
     total: int
 
 
+class CeleryTaskMetricsResponse(BaseModel):
+    """
+    Celery 任务指标（事件监控）
+    
+    Args:
+        queue_depths: 各队列 broker 排队数（LLEN 采样）
+        queue_wait: 按任务名的排队等待时间直方图（秒）
+        runtime: 按任务名的运行时间直方图（秒）
+        updated_at: 快照时间
+    """
+    queue_depths: Dict[str, int]
+    queue_wait: Dict[str, Dict[str, Any]]
+    runtime: Dict[str, Dict[str, Any]]
+    updated_at: Optional[str] = None
+
+
 # ============================================================
 # 工具函数
 # ============================================================
@@ -284,6 +305,38 @@ def extract_task_info_from_reserved(task_data: Dict[str, Any], worker_name: str)
     )
 
 
+def extract_task_info_from_snapshot(task: Dict[str, Any]) -> Optional[CeleryTaskInfo]:
+    """
+    从事件监控快照中的任务数据提取任务信息
+    
+    Args:
+        task: 快照中的任务（TrackedTask 字段）
+        
+    Returns:
+        CeleryTaskInfo 对象；尚未被 Worker 接收的任务返回 None
+    """
+    state = task.get("state")
+    if state == "STARTED":
+        status = "STARTED"
+        started_at = task.get("started_at")
+    elif state == "RECEIVED":
+        status = "SCHEDULED" if task.get("eta") else "RESERVED"
+        started_at = None
+    else:
+        return None
+    
+    return CeleryTaskInfo(
+        task_id=task["task_id"],
+        task_name=task.get("name", "unknown"),
+        queue=task.get("queue") or "default",
+        status=status,
+        worker=task.get("worker"),
+        started_at=task.get("eta") if status == "SCHEDULED" else parse_task_timestamp(started_at),
+        duration=datetime.now().timestamp() - started_at if started_at else None,
+        args=[task["args"]] if task.get("args") else None,
+    )
+
+
 def get_task_result_info(task_id: str) -> CeleryTaskInfo:
     """
     通过 AsyncResult 获取任务详细信息
@@ -351,6 +404,24 @@ async def get_celery_overview(
     )
     
     try:
+        # 事件监控快照（无需广播 inspect）
+        snapshot = await celery_event_monitor.get_snapshot()
+        if snapshot is not None:
+            task_infos = [
+                info for info in map(extract_task_info_from_snapshot, snapshot["tasks"]) if info
+            ]
+            active_count = sum(1 for t in task_infos if t.status == "STARTED")
+            scheduled_count = sum(1 for t in task_infos if t.status == "SCHEDULED")
+            reserved_count = sum(1 for t in task_infos if t.status == "RESERVED")
+            return CeleryOverview(
+                active_count=active_count,
+                pending_count=scheduled_count + reserved_count,
+                scheduled_count=scheduled_count,
+                reserved_count=reserved_count,
+                queue_lengths=snapshot["queue_depths"],
+                workers=[w["hostname"] for w in snapshot["workers"] if w["online"]],
+            )
+        
         # 获取 Inspector 实例
         inspect = celery_app.control.inspect()
         
@@ -469,19 +540,32 @@ async def get_celery_tasks(
     )
     
     try:
-        # 获取 Inspector 实例
-        inspect = celery_app.control.inspect()
-        
         # 收集所有任务
         all_tasks: List[CeleryTaskInfo] = []
         
+        # 事件监控快照（无需广播 inspect）
+        snapshot = await celery_event_monitor.get_snapshot()
+        
         # 并发查询不同状态的任务（带超时控制）
         query_tasks = []
-        if status in [None, "all", "active"]:
+        if snapshot is not None:
+            wanted = {
+                "active": {"STARTED"},
+                "scheduled": {"SCHEDULED"},
+                "reserved": {"RESERVED"},
+            }.get(status, {"STARTED", "SCHEDULED", "RESERVED"})
+            all_tasks = [
+                info for info in map(extract_task_info_from_snapshot, snapshot["tasks"])
+                if info and info.status in wanted
+            ]
+        else:
+            inspect = celery_app.control.inspect()
+        
+        if snapshot is None and status in [None, "all", "active"]:
             query_tasks.append(("active", run_celery_inspect_with_timeout(inspect.active)))
-        if status in [None, "all", "scheduled"]:
+        if snapshot is None and status in [None, "all", "scheduled"]:
             query_tasks.append(("scheduled", run_celery_inspect_with_timeout(inspect.scheduled)))
-        if status in [None, "all", "reserved"]:
+        if snapshot is None and status in [None, "all", "reserved"]:
             query_tasks.append(("reserved", run_celery_inspect_with_timeout(inspect.reserved)))
         
         # 并发执行查询
@@ -616,6 +700,20 @@ async def get_celery_workers(
     )
     
     try:
+        # 事件监控快照（Worker 心跳中包含活跃/已处理任务数）
+        snapshot = await celery_event_monitor.get_snapshot()
+        if snapshot is not None:
+            workers = [
+                CeleryWorkerInfo(
+                    hostname=w["hostname"],
+                    status="online" if w["online"] else "offline",
+                    active_tasks=w["active"],
+                    processed_tasks=w["processed"],
+                )
+                for w in snapshot["workers"]
+            ]
+            return CeleryWorkerListResponse(workers=workers, total=len(workers))
+        
         # 获取 Inspector 实例
         inspect = celery_app.control.inspect()
         
@@ -671,3 +769,31 @@ async def get_celery_workers(
             detail=f"Failed to get Celery workers: {str(e)}"
         )
 
+
+
+@router.get("/metrics", response_model=CeleryTaskMetricsResponse)
+async def get_celery_task_metrics(
+    current_user: User = Depends(current_superuser),
+):
+    """
+    获取 Celery 队列深度和任务耗时直方图
+    
+    按任务名统计排队等待时间（发送 → 开始执行）和运行时间，队列深度来自 broker LLEN 采样。
+    需要启用 CELERY_EVENT_MONITOR_ENABLED。只有超级管理员可以访问。
+    
+    Returns:
+        队列深度和任务耗时直方图
+    """
+    snapshot = await celery_event_monitor.get_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Celery event monitor is disabled or not ready"
+        )
+    
+    return CeleryTaskMetricsResponse(
+        queue_depths=snapshot["queue_depths"],
+        queue_wait=snapshot["queue_wait"],
+        runtime=snapshot["runtime"],
+        updated_at=parse_task_timestamp(snapshot.get("updated_at")),
+    )
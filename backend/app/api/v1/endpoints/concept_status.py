@@ -10,6 +10,8 @@ import structlog
 
 from app.db.session import get_db
 from app.db.repositories.concept_meta_repo import ConceptMetadataRepository
+from app.services.framework_cache import framework_cache
+from app.tasks.concept_scheduler import set_viewing_hint
 from pydantic import BaseModel
 
 logger = structlog.get_logger()
@@ -34,6 +36,11 @@ class ConceptStatusResponse(BaseModel):
     all_content_completed_at: str | None = None
 
 
+class ViewingConceptRequest(BaseModel):
+    """当前查看的 Concept（内容生成优先级提示）"""
+    concept_id: str
+
+
 class RoadmapConceptsStatusResponse(BaseModel):
     """Roadmap 所有 Concept 状态响应"""
     roadmap_id: str
@@ -179,3 +186,41 @@ async def get_concept_status(
         all_content_completed_at=concept.all_content_completed_at.isoformat() if concept.all_content_completed_at else None,
     )
 
+
+
+@router.put(
+    "/roadmaps/{roadmap_id}/viewing",
+    status_code=204,
+    summary="上报当前查看的 Concept",
+    description="前端上报用户当前查看的 Concept，内容生成期间该 Concept 优先生成"
+)
+async def report_viewing_concept(
+    roadmap_id: str,
+    request: ViewingConceptRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    记录用户当前查看的 Concept（优先级提示，有效期 CONTENT_PRIORITY_HINT_TTL_SECONDS）
+    
+    Args:
+        roadmap_id: 路线图 ID
+        request: 当前查看的 Concept
+        db: 数据库会话
+        
+    Raises:
+        HTTPException: 如果路线图不存在或 concept 不属于该路线图
+    """
+    snapshot = await framework_cache.get(db, roadmap_id)
+    if snapshot is None or request.concept_id not in snapshot.concept_index:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Concept '{request.concept_id}' not found in roadmap '{roadmap_id}'"
+        )
+    
+    await set_viewing_hint(roadmap_id, request.concept_id)
+    
+    logger.debug(
+        "viewing_concept_reported",
+        roadmap_id=roadmap_id,
+        concept_id=request.concept_id,
+    )
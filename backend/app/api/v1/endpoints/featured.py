@@ -2,16 +2,17 @@
 Featured Roadmaps API
 
 获取精选路线图，用于首页展示
+
+Feed 由 FeaturedFeedService 物化到 Redis（路线图变更提交后失效并后台重建），
+请求路径不读取 framework_data；支持 ETag / If-None-Match 条件请求。
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 import structlog
 
+from app.config.settings import settings
 from app.db.session import get_db
-from app.models.database import User
-from app.db.repositories.roadmap_repo import RoadmapRepository
-from app.db.repositories.progress_repo import ProgressRepository
+from app.services.featured_feed_service import featured_feed_service
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -46,25 +47,38 @@ class FeaturedRoadmapsResponse(BaseModel):
     featured_user_email: str
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 是否匹配当前 ETag（弱比较）"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 @router.get("/roadmaps", response_model=FeaturedRoadmapsResponse)
 async def get_featured_roadmaps(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
     """
     获取精选路线图列表
     
-    从配置的Featured User (admin@example.com) 获取已完成的路线图，
+    从配置的 Featured User（FEATURED_USER_EMAIL）获取未删除的路线图，
     用于首页Featured Roadmaps模块展示。
     
     Args:
+        response: 响应对象（设置 ETag / Cache-Control）
         limit: 返回数量限制（默认50）
         offset: 分页偏移（默认0）
-        db: 数据库会话
+        if_none_match: 客户端缓存的 ETag，与当前 Feed 一致时返回 304
+        db: 数据库会话（仅在 Feed 未命中时使用）
         
     Returns:
-        精选路线图列表（只包含已完成且未删除的路线图）
+        精选路线图列表（只包含已完成且未删除的路线图，
+        最多 FEATURED_FEED_MAX_ITEMS 条）
         
     Raises:
         HTTPException: 404 - Featured用户不存在
@@ -89,99 +103,42 @@ async def get_featured_roadmaps(
         }
         ```
     """
-    # Featured用户邮箱（硬编码，将来可以从配置文件读取）
-    FEATURED_USER_EMAIL = "admin@example.com"
-    
-    logger.info("get_featured_roadmaps_requested", 
-                email=FEATURED_USER_EMAIL,
-                limit=limit, 
-                offset=offset)
+    feed, cache_status = await featured_feed_service.get_feed(db)
     
-    # 1. 根据邮箱查找Featured用户
-    result = await db.execute(
-        select(User).where(User.email == FEATURED_USER_EMAIL)
-    )
-    featured_user = result.scalar_one_or_none()
-    
-    if not featured_user:
-        logger.warning("featured_user_not_found", email=FEATURED_USER_EMAIL)
+    if feed is None:
         raise HTTPException(
             status_code=404,
-            detail=f"Featured user with email {FEATURED_USER_EMAIL} not found. "
+            detail=f"Featured user with email {settings.FEATURED_USER_EMAIL} not found. "
                    f"Please create this user first using the admin API."
         )
     
-    user_id = featured_user.id
-    logger.info("featured_user_found", 
-                user_id=user_id,
-                email=featured_user.email,
-                username=featured_user.username)
-    
-    # 2. 获取该用户的所有已完成路线图（只包含未删除的）
-    repo = RoadmapRepository(db)
-    roadmaps = await repo.get_roadmaps_by_user(
-        user_id, 
-        limit=limit, 
-        offset=offset
-    )
+    # 分页参数参与 ETag，不同分页的响应互不混淆
+    etag = f'"{feed["etag"]}-{offset}-{limit}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.FEATURED_FEED_HTTP_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={settings.FEATURED_FEED_FRESH_SECONDS}"
+        ),
+        "X-Cache": cache_status.upper(),
+    }
     
-    # 3. 批量获取所有路线图的 Task（解决 N+1 查询问题）
-    roadmap_ids = [r.roadmap_id for r in roadmaps]
-    tasks_by_roadmap = await repo.get_tasks_by_roadmap_ids_batch(roadmap_ids)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     
-    roadmap_items = []
-    
-    # 4. 转换路线图数据
-    for roadmap in roadmaps:
-        # 从 framework_data 中提取概念信息
-        framework_data = roadmap.framework_data or {}
-        stages = framework_data.get("stages", [])
-        
-        total_concepts = 0
-        
-        # 统计总概念数
-        for stage in stages:
-            modules = stage.get("modules", [])
-            for module in modules:
-                concepts = module.get("concepts", [])
-                total_concepts += len(concepts)
-        
-        # 从批量获取的 tasks 中获取 topic（无需额外查询）
-        task = tasks_by_roadmap.get(roadmap.roadmap_id)
-        topic = None
-        if task and task.user_request:
-            learning_goal = task.user_request.get("preferences", {}).get("learning_goal", "")
-            topic = learning_goal.lower()[:50] if learning_goal else None
-        
-        # 提取 stages 信息
-        stage_summaries = []
-        for stage in stages:
-            stage_summaries.append(StageSummary(
-                name=stage.get("name", ""),
-                description=stage.get("description"),
-                order=stage.get("order", len(stage_summaries) + 1),
-            ))
-        
-        # Featured路线图默认为completed状态（因为是精选内容）
-        roadmap_items.append(FeaturedRoadmapItem(
-            roadmap_id=roadmap.roadmap_id,
-            title=roadmap.title,
-            created_at=roadmap.created_at.isoformat() if roadmap.created_at else "",
-            total_concepts=total_concepts,
-            completed_concepts=0,  # Featured路线图不显示完成进度
-            topic=topic,
-            status="completed",
-            stages=stage_summaries if stage_summaries else None,
-        ))
+    response.headers.update(headers)
+    roadmap_items = [
+        FeaturedRoadmapItem(**item) for item in feed["roadmaps"][offset:offset + limit]
+    ]
     
     logger.info("featured_roadmaps_retrieved", 
                 count=len(roadmap_items),
-                user_id=user_id)
+                user_id=feed["featured_user_id"],
+                cache=cache_status)
     
     return FeaturedRoadmapsResponse(
         roadmaps=roadmap_items,
         total=len(roadmap_items),
-        featured_user_id=user_id,
-        featured_user_email=featured_user.email,
+        featured_user_id=feed["featured_user_id"],
+        featured_user_email=feed["featured_user_email"],
     )
-
@@ -638,32 +638,30 @@ async def _get_concept_from_roadmap(
         repo_factory: Repository 工厂
         
     Returns:
-        (Concept 对象, 上下文信息, 路线图元数据) 或 (None, None, None)
+        (Concept 对象, 上下文信息, 路线图框架快照) 或 (None, None, None)
     """
+    from app.services.framework_cache import framework_cache
+    
     async with repo_factory.create_session() as session:
-        roadmap_repo = repo_factory.create_roadmap_meta_repo(session)
-        roadmap_metadata = await roadmap_repo.get_by_roadmap_id(roadmap_id)
+        snapshot = await framework_cache.get(session, roadmap_id)
+    
+    if not snapshot:
+        return None, None, None
     
-    if not roadmap_metadata:
+    # 按概念索引定位
+    located = snapshot.find_concept(concept_id)
+    if not located:
         return None, None, None
     
-    framework_data = roadmap_metadata.framework_data
-    
-    # 遍历查找概念
-    for stage in framework_data.get("stages", []):
-        for module in stage.get("modules", []):
-            for concept_data in module.get("concepts", []):
-                if concept_data.get("concept_id") == concept_id:
-                    concept = Concept.model_validate(concept_data)
-                    context = {
-                        "roadmap_id": roadmap_id,
-                        "stage_name": stage.get("name"),
-                        "module_name": module.get("name"),
-                        "content_version": 1,
-                    }
-                    return concept, context, roadmap_metadata
-    
-    return None, None, None
+    stage, module, concept_data = located
+    concept = Concept.model_validate(concept_data)
+    context = {
+        "roadmap_id": roadmap_id,
+        "stage_name": stage.get("name"),
+        "module_name": module.get("name"),
+        "content_version": 1,
+    }
+    return concept, context, snapshot
 
 
 async def _update_concept_status_in_framework(
@@ -687,50 +685,33 @@ async def _update_concept_status_in_framework(
         result: 可选的结果数据（仅在 completed 状态时需要）
         repo_factory: Repository 工厂
     """
+    # 要更新的状态字段
+    fields: dict = {}
+    if content_type == "tutorial":
+        fields["content_status"] = status
+        # 只有在 completed 状态且有 result 时才更新结果数据
+        if status == "completed" and result:
+            fields["content_ref"] = result.get("content_url")
+            fields["content_summary"] = result.get("summary")
+    elif content_type == "resources":
+        fields["resources_status"] = status
+        if status == "completed" and result:
+            fields["resources_id"] = result.get("resources_id")
+            fields["resources_count"] = result.get("resources_count", 0)
+    elif content_type == "quiz":
+        fields["quiz_status"] = status
+        if status == "completed" and result:
+            fields["quiz_id"] = result.get("quiz_id")
+            fields["quiz_questions_count"] = result.get("questions_count", 0)
+    
+    if not fields:
+        return
+    
+    # 按概念索引原地更新（不反序列化整个框架）
     async with repo_factory.create_session() as session:
         roadmap_repo = repo_factory.create_roadmap_meta_repo(session)
-        roadmap_metadata = await roadmap_repo.get_by_roadmap_id(roadmap_id)
-        
-        if not roadmap_metadata:
-            return
-        
-        framework_data = roadmap_metadata.framework_data
-        
-        # 遍历更新概念状态
-        for stage in framework_data.get("stages", []):
-            for module in stage.get("modules", []):
-                for concept in module.get("concepts", []):
-                    if concept.get("concept_id") == concept_id:
-                        # 更新状态字段
-                        if content_type == "tutorial":
-                            concept["content_status"] = status
-                            # 只有在 completed 状态且有 result 时才更新结果数据
-                            if status == "completed" and result:
-                                concept["content_ref"] = result.get("content_url")
-                                concept["content_summary"] = result.get("summary")
-                        elif content_type == "resources":
-                            concept["resources_status"] = status
-                            if status == "completed" and result:
-                                concept["resources_id"] = result.get("resources_id")
-                                concept["resources_count"] = result.get("resources_count", 0)
-                        elif content_type == "quiz":
-                            concept["quiz_status"] = status
-                            if status == "completed" and result:
-                                concept["quiz_id"] = result.get("quiz_id")
-                                concept["quiz_questions_count"] = result.get("questions_count", 0)
-                        
-                        # 找到后直接退出循环
-                        break
-        
-        # 保存更新后的框架（使用 save_roadmap 确保 flag_modified 被调用）
-        from app.models.domain import RoadmapFramework
-        updated_framework = RoadmapFramework.model_validate(framework_data)
-        await roadmap_repo.save_roadmap(
-            roadmap_id=roadmap_id,
-            user_id=roadmap_metadata.user_id,
-            framework=updated_framework,
-        )
-        await session.commit()
+        if await roadmap_repo.patch_concept_fields(roadmap_id, concept_id, fields):
+            await session.commit()
 
 
 @router.post(
@@ -17,15 +17,12 @@ import structlog
 from app.models.domain import (
     ChatMessageRequest,
     ChatSession,
-    ChatMessage,
     LearningNote,
     MentorAgentInput,
 )
 from app.agents.mentor_agent import MentorAgent
 from app.db.repository_factory import get_repo_factory, RepositoryFactory
-from app.tools.mentor.get_roadmap_metadata_tool import GetRoadmapMetadataTool
-from app.tools.mentor.get_concept_tutorial_tool import GetConceptTutorialTool
-from app.tools.mentor.get_user_profile_tool import GetUserProfileTool
+from app.services.learning_context_service import learning_context_service
 
 logger = structlog.get_logger()
 
@@ -101,104 +98,66 @@ async def chat_stream(
     """
     async def generate():
         try:
-            # 1. 获取或创建会话
+            # 1. 获取或创建会话、保存用户消息、读取历史消息和学习上下文（同一个数据库会话）
             async with repo_factory.create_session() as session:
-                chat_repo = repo_factory.create_chat_repo(session)
-                
-                if request.session_id:
-                    chat_session = await chat_repo.get_session(request.session_id)
-                    if not chat_session:
-                        yield f"data: {json.dumps({'type': 'error', 'message': '会话不存在'})}\n\n"
-                        return
-                else:
-                    # 创建新会话
-                    chat_session = await chat_repo.create_session(
-                        user_id=request.user_id,
-                        roadmap_id=request.roadmap_id,
-                        concept_id=request.concept_id,
-                    )
-                    await session.commit()
-                
-                # 发送会话ID
-                yield f"data: {json.dumps({'type': 'session_id', 'session_id': chat_session.session_id})}\n\n"
-                
-                # 2. 保存用户消息
-                user_msg = await chat_repo.create_message(
-                    session_id=chat_session.session_id,
-                    role="user",
-                    content=request.message,
+                turn = await learning_context_service.prepare_turn(
+                    session,
+                    user_id=request.user_id,
+                    roadmap_id=request.roadmap_id,
+                    concept_id=request.concept_id,
+                    message=request.message,
+                    session_id=request.session_id,
                 )
-                await session.commit()
             
-            # 3. 获取会话历史
-            async with repo_factory.create_session() as session:
-                chat_repo = repo_factory.create_chat_repo(session)
-                history = await chat_repo.get_recent_messages(
-                    chat_session.session_id,
-                    limit=10,
-                )
+            if turn is None:
+                yield f"data: {json.dumps({'type': 'error', 'message': '会话不存在'})}\n\n"
+                return
             
-            # 4. 获取上下文信息
-            context = await _get_learning_context(
-                request.user_id,
-                request.roadmap_id,
-                request.concept_id,
-            )
+            # 发送会话ID
+            yield f"data: {json.dumps({'type': 'session_id', 'session_id': turn.session_id})}\n\n"
             
-            # 5. 构建Agent输入
+            # 2. 构建Agent输入
             mentor_input = MentorAgentInput(
                 user_message=request.message,
                 user_id=request.user_id,
                 roadmap_id=request.roadmap_id,
                 concept_id=request.concept_id,
-                session_history=[
-                    ChatMessage(
-                        message_id=msg.message_id,
-                        session_id=msg.session_id,
-                        role=msg.role,
-                        content=msg.content,
-                        intent_type=msg.intent_type,
-                        created_at=msg.created_at,
-                    )
-                    for msg in history
-                ],
-                **context,
+                session_history=turn.history,
+                **turn.context,
             )
             
-            # 6. 流式调用MentorAgent
+            # 3. 识别意图（只识别一次，同时用于路由和持久化）并流式调用MentorAgent
             mentor_agent = MentorAgent()
+            intent_result = await mentor_agent.recognize_intent(mentor_input)
             full_response = ""
             
-            async for chunk in mentor_agent.execute_stream(mentor_input):
+            async for chunk in mentor_agent.execute_stream(mentor_input, intent_result=intent_result):
                 full_response += chunk
                 # SSE格式
                 yield f"data: {json.dumps({'type': 'content', 'chunk': chunk})}\n\n"
             
-            # 7. 保存AI响应
+            # 4. 保存AI响应
             async with repo_factory.create_session() as session:
                 chat_repo = repo_factory.create_chat_repo(session)
                 
-                # 获取意图类型
-                intent_type = await mentor_agent.get_intent(mentor_input)
-                
                 ai_msg = await chat_repo.create_message(
-                    session_id=chat_session.session_id,
+                    session_id=turn.session_id,
                     role="assistant",
                     content=full_response,
-                    intent_type=intent_type,
+                    intent_type=intent_result.intent,
                 )
                 
                 # 更新会话元数据
-                message_count = await chat_repo.count_messages(chat_session.session_id)
+                message_count = await chat_repo.count_messages(turn.session_id)
                 await chat_repo.update_session_metadata(
-                    session_id=chat_session.session_id,
+                    session_id=turn.session_id,
                     message_count=message_count,
                     last_message_preview=full_response[:100] if full_response else None,
                 )
                 
                 await session.commit()
             
-            # 8. 发送完成标记
+            # 5. 发送完成标记
             yield f"data: {json.dumps({'type': 'done', 'message_id': ai_msg.message_id})}\n\n"
         
         except Exception as e:
@@ -216,72 +175,6 @@ async def chat_stream(
     )
 
 
-async def _get_learning_context(
-    user_id: str,
-    roadmap_id: str,
-    concept_id: Optional[str],
-) -> dict:
-    """
-    获取学习上下文信息
-    
-    Args:
-        user_id: 用户ID
-        roadmap_id: 路线图ID
-        concept_id: 概念ID
-        
-    Returns:
-        上下文信息字典
-    """
-    context = {}
-    
-    # 获取路线图元数据
-    try:
-        from app.tools.mentor.get_roadmap_metadata_tool import GetRoadmapMetadataInput
-        roadmap_tool = GetRoadmapMetadataTool()
-        roadmap_result = await roadmap_tool.execute(GetRoadmapMetadataInput(roadmap_id=roadmap_id))
-        if roadmap_result.success:
-            context["roadmap_title"] = roadmap_result.title
-    except Exception as e:
-        logger.warning("get_roadmap_metadata_failed", error=str(e))
-    
-    # 获取概念信息
-    if concept_id:
-        try:
-            roadmap_tool = GetRoadmapMetadataTool()
-            concept_info = await roadmap_tool.get_concept_info(roadmap_id, concept_id)
-            if concept_info:
-                context["concept_name"] = concept_info.name
-                context["concept_description"] = concept_info.description
-        except Exception as e:
-            logger.warning("get_concept_info_failed", error=str(e))
-        
-        # 获取教程摘要
-        try:
-            from app.tools.mentor.get_concept_tutorial_tool import GetConceptTutorialInput
-            tutorial_tool = GetConceptTutorialTool()
-            tutorial_result = await tutorial_tool.execute(GetConceptTutorialInput(
-                roadmap_id=roadmap_id,
-                concept_id=concept_id,
-            ))
-            if tutorial_result.success:
-                context["tutorial_summary"] = tutorial_result.summary
-        except Exception as e:
-            logger.warning("get_tutorial_summary_failed", error=str(e))
-    
-    # 获取用户画像
-    try:
-        from app.tools.mentor.get_user_profile_tool import GetUserProfileInput
-        profile_tool = GetUserProfileTool()
-        profile_result = await profile_tool.execute(GetUserProfileInput(user_id=user_id))
-        if profile_result.success:
-            context["user_background"] = f"{profile_result.industry or ''} {profile_result.current_role or ''}".strip() or None
-            context["user_level"] = "intermediate" if profile_result.tech_stack else "beginner"
-    except Exception as e:
-        logger.warning("get_user_profile_failed", error=str(e))
-    
-    return context
-
-
 # ============================================================
 # 会话管理端点
 # ============================================================
@@ -9,6 +9,7 @@ from fastapi.responses import StreamingResponse
 from typing import AsyncIterator
 from pydantic import BaseModel, Field
 import structlog
+import asyncio
 import uuid
 import json
 import time
@@ -86,45 +87,141 @@ def _extract_concepts_from_framework(
     for stage in framework_data.get("stages", []):
         for module in stage.get("modules", []):
             for concept_data in module.get("concepts", []):
-                # 构建 Concept 对象
-                concept = Concept(
-                    concept_id=concept_data.get("concept_id"),
-                    name=concept_data.get("name"),
-                    description=concept_data.get("description", ""),
-                    estimated_hours=concept_data.get("estimated_hours", 1.0),
-                    prerequisites=concept_data.get("prerequisites", []),
-                    difficulty=concept_data.get("difficulty", "medium"),
-                    keywords=concept_data.get("keywords", []),
-                )
-                
-                # 构建上下文
-                context = {
-                    "roadmap_id": roadmap_id,
-                    "stage_id": stage.get("stage_id"),
-                    "stage_name": stage.get("name"),
-                    "module_id": module.get("module_id"),
-                    "module_name": module.get("name"),
-                }
-                
+                concept = _build_concept(concept_data)
+                context = _build_concept_context(roadmap_id, stage, module)
                 concepts_with_context.append((concept, context))
     
     return concepts_with_context
 
 
+def _build_concept(concept_data: dict) -> Concept:
+    """从框架数据（字典格式）构建 Concept 对象"""
+    return Concept(
+        concept_id=concept_data.get("concept_id"),
+        name=concept_data.get("name"),
+        description=concept_data.get("description", ""),
+        estimated_hours=concept_data.get("estimated_hours", 1.0),
+        prerequisites=concept_data.get("prerequisites", []),
+        difficulty=concept_data.get("difficulty", "medium"),
+        keywords=concept_data.get("keywords", []),
+    )
+
+
+def _build_concept_context(roadmap_id: str, stage: dict, module: dict) -> dict:
+    """构建教程生成上下文"""
+    return {
+        "roadmap_id": roadmap_id,
+        "stage_id": stage.get("stage_id"),
+        "stage_name": stage.get("name"),
+        "module_id": module.get("module_id"),
+        "module_name": module.get("name"),
+    }
+
+
+def _concept_fingerprint(concept: Concept, context: dict) -> str:
+    """教程生成输入的指纹（概念字段 + 上下文），用于判断推测生成的教程是否仍然有效"""
+    return json.dumps(
+        {"concept": concept.model_dump(mode="json"), "context": context},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+class _SpeculativeTutorials:
+    """
+    推测性教程预生成
+    
+    框架设计流式输出过程中，每当 module_ready 事件到达，为最先闭合的若干概念提前启动教程生成，
+    事件先缓存在内存中；框架设计完成后，概念与最终框架一致（指纹相同）的教程直接复用，
+    有变化或已被删除的概念丢弃（任务取消），按正常流程生成。
+    """
+    
+    def __init__(self, user_preferences: LearningPreferences, max_concepts: int):
+        self.user_preferences = user_preferences
+        self.max_concepts = max_concepts
+        self._generator: TutorialGeneratorAgent | None = None
+        # concept_id -> (指纹, 任务)
+        self._tasks: dict[str, tuple[str, asyncio.Task]] = {}
+    
+    def on_module_ready(self, event: dict) -> None:
+        """
+        处理 module_ready 事件，为模块中的概念启动教程生成（不超过上限）
+        
+        推测生成是尽力而为：流式解析出的概念可能不完整或格式错误，跳过该概念，
+        不影响路线图生成主流程。
+        """
+        stage = event.get("stage", {})
+        module = event.get("module", {})
+        for concept_data in module.get("concepts", []):
+            if len(self._tasks) >= self.max_concepts:
+                return
+            try:
+                concept = _build_concept(concept_data)
+                if not concept.concept_id or concept.concept_id in self._tasks:
+                    continue
+                context = _build_concept_context(event["roadmap_id"], stage, module)
+                if self._generator is None:
+                    self._generator = TutorialGeneratorAgent()
+                task = asyncio.create_task(self._collect(concept, context))
+                self._tasks[concept.concept_id] = (_concept_fingerprint(concept, context), task)
+                logger.info("speculative_tutorial_started", concept_id=concept.concept_id)
+            except Exception as e:
+                logger.warning(
+                    "speculative_tutorial_skipped",
+                    concept_id=concept_data.get("concept_id") if isinstance(concept_data, dict) else None,
+                    error=str(e)[:200],
+                    error_type=type(e).__name__,
+                )
+    
+    async def _collect(self, concept: Concept, context: dict) -> list[dict]:
+        """生成教程并缓存所有事件"""
+        events = []
+        async for event in self._generator.generate_stream(concept, context, self.user_preferences):
+            events.append(event)
+        return events
+    
+    def claim(self, concept: Concept, context: dict) -> asyncio.Task | None:
+        """
+        领取与最终框架一致的推测任务
+        
+        Returns:
+            推测任务（结果为缓存的事件列表）；没有对应任务或概念已变化时返回 None
+        """
+        entry = self._tasks.pop(concept.concept_id, None)
+        if entry is None:
+            return None
+        fingerprint, task = entry
+        if fingerprint != _concept_fingerprint(concept, context):
+            task.cancel()
+            logger.info("speculative_tutorial_discarded", concept_id=concept.concept_id, reason="changed")
+            return None
+        return task
+    
+    def discard_all(self) -> None:
+        """取消所有未被领取的推测任务"""
+        for concept_id, (_, task) in self._tasks.items():
+            task.cancel()
+            logger.info("speculative_tutorial_discarded", concept_id=concept_id, reason="unclaimed")
+        self._tasks = {}
+
+
 async def _generate_tutorials_batch_stream(
     framework_data: dict,
     user_preferences: LearningPreferences,
     batch_size: int = 2,
+    speculative: _SpeculativeTutorials | None = None,
 ) -> AsyncIterator[str]:
     """
     批次流式生成所有教程
     
     每批次并发 batch_size 个教程，完成后继续下一批次。
+    已推测生成且与最终框架一致的教程先输出，不再重新生成。
     
     Args:
         framework_data: 路线图框架数据
         user_preferences: 用户偏好
         batch_size: 每批次并发数量
+        speculative: 推测性预生成的教程（可选）
         
     Yields:
         SSE 格式字符串
@@ -157,13 +254,60 @@ async def _generate_tutorials_batch_stream(
     # 统计
     completed_count = 0
     failed_count = 0
-    total_batches = (total_count + batch_size - 1) // batch_size
+    
+    # 复用推测性预生成的教程（概念与最终框架一致）
+    pending_concepts = concepts_with_context
+    if speculative is not None:
+        pending_concepts = []
+        reused = []
+        for concept, context in concepts_with_context:
+            task = speculative.claim(concept, context)
+            if task is None:
+                pending_concepts.append((concept, context))
+            else:
+                reused.append((concept, task))
+        speculative.discard_all()
+        
+        for concept, task in reused:
+            tutorial_start_event = {
+                "type": "tutorial_start",
+                "concept_id": concept.concept_id,
+                "concept_name": concept.name,
+                "speculative": True,
+            }
+            yield f'data: {json.dumps(tutorial_start_event, ensure_ascii=False)}\n\n'
+            
+            try:
+                events = await task
+            except Exception as e:
+                events = [{
+                    "type": "tutorial_error",
+                    "concept_id": concept.concept_id,
+                    "error": str(e),
+                }]
+            
+            for event in events:
+                yield f'data: {json.dumps(event, ensure_ascii=False)}\n\n'
+                if event.get("type") == "tutorial_complete":
+                    completed_count += 1
+                elif event.get("type") == "tutorial_error":
+                    failed_count += 1
+        
+        if reused:
+            logger.info(
+                "speculative_tutorials_reused",
+                reused_count=len(reused),
+                remaining_count=len(pending_concepts),
+            )
+    
+    pending_count = len(pending_concepts)
+    total_batches = (pending_count + batch_size - 1) // batch_size
     
     # 分批处理
     for batch_index in range(total_batches):
         start_idx = batch_index * batch_size
-        end_idx = min(start_idx + batch_size, total_count)
-        batch = concepts_with_context[start_idx:end_idx]
+        end_idx = min(start_idx + batch_size, pending_count)
+        batch = pending_concepts[start_idx:end_idx]
         
         batch_concept_ids = [concept.concept_id for concept, _ in batch]
         
@@ -277,6 +421,7 @@ async def _generate_sse_stream(
     Yields:
         SSE 格式字符串：
         - chunk: {"type": "chunk", "content": "...", "agent": "..."}
+        - module_ready / stage_ready: 框架设计过程中闭合的 Module / Stage
         - complete: {"type": "complete", "data": {...}, "agent": "..."}
         - tutorials_start: {"type": "tutorials_start", "total_count": N}
         - batch_start: {"type": "batch_start", "batch_index": 1, ...}
@@ -292,6 +437,14 @@ async def _generate_sse_stream(
     task_id = str(uuid.uuid4())  # 生成任务 ID
     tutorial_refs = {}  # 收集生成的教程引用
     
+    # 推测性教程预生成：流式路径没有人工审核，框架设计过程中即可为最先闭合的模块生成教程
+    speculative = None
+    if include_tutorials and settings.CURRICULUM_SPECULATIVE_TUTORIALS_ENABLED:
+        speculative = _SpeculativeTutorials(
+            user_preferences=request.preferences,
+            max_concepts=settings.CURRICULUM_SPECULATIVE_TUTORIALS_MAX_CONCEPTS,
+        )
+    
     try:
         logger.info(
             "sse_stream_started",
@@ -395,8 +548,12 @@ async def _generate_sse_stream(
             # 转发事件到 SSE 流
             yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
             
+            # 模块闭合：推测性提前生成教程
+            if event["type"] == "module_ready" and speculative is not None:
+                speculative.on_module_ready(event)
+            
             # 保存完成结果
-            if event["type"] == "complete":
+            elif event["type"] == "complete":
                 framework_result = event["data"]
                 logger.info("sse_stream_curriculum_design_completed")
                 
@@ -468,6 +625,7 @@ async def _generate_sse_stream(
                 framework_data=framework_data,
                 user_preferences=request.preferences,
                 batch_size=batch_size,
+                speculative=speculative,
             ):
                 yield event_line
                 
@@ -671,6 +829,10 @@ async def _generate_sse_stream(
             "agent": "system",
         }
         yield f'data: {json.dumps(error_event, ensure_ascii=False)}\n\n'
+    finally:
+        # 失败或客户端断开时取消未被领取的推测任务
+        if speculative is not None:
+            speculative.discard_all()
 
 
 async def _chat_modification_stream(
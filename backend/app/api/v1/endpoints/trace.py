@@ -2,15 +2,25 @@
 执行日志追踪 API 端点
 
 提供路线图生成过程的执行日志查询功能，用于调试和监控。
+
+- 日志分页使用 (created_at, id) keyset 游标，翻页成本与页码无关
+- 摘要为单次 GROUPING SETS 聚合，已结束任务的摘要缓存在 Redis
+- 大 trace 可通过 NDJSON 流式导出
 """
-from fastapi import APIRouter, Depends
+import base64
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 import structlog
 
-from app.db.session import get_db
+from app.config.settings import settings
+from app.db.session import get_db, safe_session
 from app.db.repositories.roadmap_repo import RoadmapRepository
+from app.services.trace_summary_cache import trace_summary_cache
 
 router = APIRouter(prefix="/trace", tags=["trace"])
 logger = structlog.get_logger()
@@ -43,6 +53,8 @@ class ExecutionLogListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None  # 下一页游标（没有更多日志时为 None）
+    has_more: bool = False
 
 
 class TraceSummaryResponse(BaseModel):
@@ -56,6 +68,75 @@ class TraceSummaryResponse(BaseModel):
     total_logs: int
 
 
+# ============================================================
+# 辅助函数
+# ============================================================
+
+
+def encode_cursor(created_at: datetime, log_id: str) -> str:
+    """编码 keyset 游标（不透明字符串）"""
+    raw = json.dumps([created_at.isoformat(), log_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    解码 keyset 游标
+
+    Raises:
+        HTTPException: 游标格式无效（400）
+    """
+    try:
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(log_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _to_log_response(log) -> ExecutionLogResponse:
+    return ExecutionLogResponse(
+        id=log.id,
+        task_id=log.task_id,
+        roadmap_id=log.roadmap_id,
+        concept_id=log.concept_id,
+        level=log.level,
+        category=log.category,
+        step=log.step,
+        agent_name=log.agent_name,
+        message=log.message,
+        details=log.details,
+        duration_ms=log.duration_ms,
+        created_at=log.created_at.isoformat() if log.created_at else "",
+    )
+
+
+async def _count_logs(
+    db: AsyncSession,
+    task_id: str,
+    level: Optional[str],
+    category: Optional[str],
+) -> int:
+    """
+    日志总数
+
+    摘要已缓存（已结束任务）且最多一个过滤条件时从摘要读取；
+    否则单独 COUNT，避免进行中任务每次翻页都执行完整的 GROUPING SETS 聚合
+    """
+    if not (level and category):
+        summary = await trace_summary_cache.get_cached(db, task_id)
+        if summary is not None:
+            if level:
+                return summary["level_stats"].get(level, 0)
+            if category:
+                return summary["category_stats"].get(category, 0)
+            return summary["total_logs"]
+    return await RoadmapRepository(db).count_execution_logs_by_trace(
+        task_id=task_id,
+        level=level,
+        category=category,
+    )
+
+
 # ============================================================
 # 路由端点
 # ============================================================
@@ -68,6 +149,7 @@ async def get_logs(
     category: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -80,11 +162,13 @@ async def get_logs(
         level: 过滤日志级别（可选）：debug, info, warning, error
         category: 过滤日志分类（可选）：workflow, agent, tool, database
         limit: 返回数量限制（默认 100，最大 2000）
-        offset: 分页偏移（默认 0）
+        offset: 分页偏移（默认 0，已废弃：仅在未提供 cursor 时兼容旧客户端）
+        cursor: 上一页返回的 next_cursor（keyset 分页）
         db: 数据库会话
         
     Returns:
-        执行日志列表，按时间顺序排列
+        执行日志列表，按 (created_at, id) 顺序排列；has_more 为 True 时
+        使用 next_cursor 请求下一页
         
     Example:
         ```json
@@ -109,7 +193,9 @@ async def get_logs(
             ],
             "total": 150,
             "offset": 0,
-            "limit": 100
+            "limit": 100,
+            "next_cursor": "WyIyMDI0LTAxLTAxVDAwOjAwOjAwIiwgImxvZy0xMjMiXQ==",
+            "has_more": true
         }
         ```
     """
@@ -118,42 +204,76 @@ async def get_logs(
     
     repo = RoadmapRepository(db)
     
-    # 获取总数和日志列表
-    total = await repo.count_execution_logs_by_trace(
-        task_id=task_id,
-        level=level,
-        category=category,
-    )
+    # 多取一条判断是否还有下一页
+    if cursor is not None or offset == 0:
+        logs = await repo.get_execution_logs_page(
+            task_id=task_id,
+            level=level,
+            category=category,
+            limit=limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+        )
+    else:
+        logs = await repo.get_execution_logs_by_trace(
+            task_id=task_id,
+            level=level,
+            category=category,
+            limit=limit + 1,
+            offset=offset,
+        )
     
-    logs = await repo.get_execution_logs_by_trace(
-        task_id=task_id,
-        level=level,
-        category=category,
-        limit=limit,
-        offset=offset,
-    )
+    has_more = len(logs) > limit
+    logs = logs[:limit]
     
     return ExecutionLogListResponse(
-        logs=[
-            ExecutionLogResponse(
-                id=log.id,
-                task_id=log.task_id,
-                roadmap_id=log.roadmap_id,
-                concept_id=log.concept_id,
-                level=log.level,
-                category=log.category,
-                step=log.step,
-                agent_name=log.agent_name,
-                message=log.message,
-                details=log.details,
-                duration_ms=log.duration_ms,
-                created_at=log.created_at.isoformat() if log.created_at else "",
-            )
-            for log in logs
-        ],
-        total=total,  # 使用实际的总记录数
-        offset=offset,
+        logs=[_to_log_response(log) for log in logs],
+        total=await _count_logs(db, task_id, level, category),
+        offset=offset if cursor is None else 0,
         limit=limit,
+        next_cursor=encode_cursor(logs[-1].created_at, logs[-1].id) if has_more else None,
+        has_more=has_more,
+    )
+
+
+@router.get("/{task_id}/logs/export")
+async def export_logs(
+    task_id: str,
+    level: Optional[str] = None,
+    category: Optional[str] = None,
+):
+    """
+    以 NDJSON 流式导出指定 task_id 的全部执行日志
+    
+    每行一个 JSON 对象，按 (created_at, id) 顺序；服务端按 keyset 分批读取，
+    内存占用与 trace 大小无关。
+    
+    Args:
+        task_id: 追踪 ID
+        level: 过滤日志级别（可选）
+        category: 过滤日志分类（可选）
+        
+    Returns:
+        application/x-ndjson 流
+    """
+    async def generate():
+        # 流式响应在端点返回后才开始迭代，使用独立会话而不是请求依赖的会话
+        async with safe_session() as session:
+            repo = RoadmapRepository(session)
+            async for batch in repo.iter_execution_logs(
+                task_id=task_id,
+                level=level,
+                category=category,
+                batch_size=settings.TRACE_EXPORT_BATCH_SIZE,
+            ):
+                yield "".join(
+                    json.dumps(row, ensure_ascii=False, default=str) + "\n"
+                    for row in batch
+                )
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="trace-{task_id}.ndjson"'},
     )
 
 
@@ -203,8 +323,7 @@ async def get_summary(
         }
         ```
     """
-    repo = RoadmapRepository(db)
-    summary = await repo.get_execution_logs_summary(task_id)
+    summary = await trace_summary_cache.get_summary(db, task_id)
     
     return TraceSummaryResponse(**summary)
 
@@ -258,23 +377,7 @@ async def get_errors(
     logs = await repo.get_error_logs_by_trace(task_id, limit=limit)
     
     return ExecutionLogListResponse(
-        logs=[
-            ExecutionLogResponse(
-                id=log.id,
-                task_id=log.task_id,
-                roadmap_id=log.roadmap_id,
-                concept_id=log.concept_id,
-                level=log.level,
-                category=log.category,
-                step=log.step,
-                agent_name=log.agent_name,
-                message=log.message,
-                details=log.details,
-                duration_ms=log.duration_ms,
-                created_at=log.created_at.isoformat() if log.created_at else "",
-            )
-            for log in logs
-        ],
+        logs=[_to_log_response(log) for log in logs],
         total=len(logs),
         offset=0,
         limit=limit,
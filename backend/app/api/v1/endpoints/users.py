@@ -335,26 +335,9 @@ async def get_user_roadmaps(
     
     # 转换已保存的路线图
     for roadmap in roadmaps:
-        # 从 framework_data 中提取概念信息
-        framework_data = roadmap.framework_data or {}
-        stages_data = framework_data.get("stages", [])
-        
-        total_concepts = 0
-        
-        # 统计总概念数，同时提取 Stage 摘要
-        stage_summaries = []
-        for stage in stages_data:
-            modules = stage.get("modules", [])
-            for module in modules:
-                concepts = module.get("concepts", [])
-                total_concepts += len(concepts)
-            
-            # 提取 Stage 摘要信息
-            stage_summaries.append(StageSummary(
-                name=stage.get("name", ""),
-                description=stage.get("description"),
-                order=stage.get("order", 0),
-            ))
+        # 概念总数和 Stage 摘要来自冗余摘要列（不加载 framework_data）
+        total_concepts = roadmap.total_concepts
+        stage_summaries = [StageSummary(**stage) for stage in roadmap.stage_summaries or []]
         
         # 从批量获取的数据中获取已完成概念数（无需额外查询）
         completed_concepts = completed_counts.get(roadmap.roadmap_id, 0)
@@ -446,18 +429,8 @@ async def get_deleted_roadmaps(
     
     # 转换已删除的路线图
     for roadmap in deleted_roadmaps:
-        # 从 framework_data 中提取概念信息
-        framework_data = roadmap.framework_data or {}
-        stages = framework_data.get("stages", [])
-        
-        total_concepts = 0
-        
-        # 统计总概念数
-        for stage in stages:
-            modules = stage.get("modules", [])
-            for module in modules:
-                concepts = module.get("concepts", [])
-                total_concepts += len(concepts)
+        # 概念总数来自冗余摘要列（不加载 framework_data）
+        total_concepts = roadmap.total_concepts
         
         # 从批量获取的数据中获取已完成概念数（无需额外查询）
         completed_concepts = completed_counts.get(roadmap.roadmap_id, 0)
@@ -7,15 +7,28 @@ WebSocket 实时推送端点
 - 任务完成/失败通知
 
 客户端连接后，会实时收到与 task_id 相关的所有事件。
+
+事件多路复用：每个 API 进程只持有一个 Redis 模式订阅（roadmap:task:*），
+由 ConnectionManager 分发到各连接的有界队列，Redis 连接数不随 WebSocket 数量增长。
+
+断线续传：启用 NOTIFICATION_STREAM_ENABLED 后，WebSocket 和 SSE 客户端可携带
+last_event_id 重连，从 Redis Stream 增量补齐错过的事件。
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Request
+from fastapi.responses import StreamingResponse
 from starlette.websockets import WebSocketState
 from typing import Optional
 import json
 import asyncio
 import structlog
 
-from app.services.notification_service import notification_service, TaskEvent
+from app.config.settings import settings
+from app.models.database import beijing_now
+from app.services.notification_service import (
+    notification_service,
+    TaskEvent,
+    parse_stream_id,
+)
 from app.db.repositories.roadmap_repo import RoadmapRepository
 from app.db.session import AsyncSessionLocal
 
@@ -23,6 +36,35 @@ router = APIRouter(prefix="/api/v1")
 logger = structlog.get_logger()
 
 
+class _Subscriber:
+    """单个连接（WebSocket 或 SSE）的订阅状态（有界事件队列）"""
+    
+    __slots__ = ("websocket", "task_id", "queue", "evicted", "last_event_id")
+    
+    def __init__(self, websocket: WebSocket | None, task_id: str, maxsize: int):
+        self.websocket = websocket
+        self.task_id = task_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.evicted = False
+        # 已发送给客户端的最后一个 event_id（回放后用于跳过重复的实时事件）
+        self.last_event_id: str | None = None
+    
+    def is_duplicate(self, event: dict) -> bool:
+        """事件是否已通过回放发送过"""
+        sent = parse_stream_id(self.last_event_id)
+        current = parse_stream_id(event.get("event_id"))
+        return sent is not None and current is not None and current <= sent
+    
+    def mark_sent(self, event: dict):
+        """记录已发送事件的 event_id"""
+        if event.get("event_id"):
+            self.last_event_id = event["event_id"]
+
+
+# 慢消费者驱逐标记（放入队列通知转发协程关闭连接）
+_EVICTED = object()
+
+
 class ConnectionManager:
     """
     WebSocket 连接管理器
@@ -30,25 +72,39 @@ class ConnectionManager:
     管理活跃的 WebSocket 连接，支持：
     - 按 task_id 分组的连接管理
     - 广播消息到指定任务的所有连接
+    - Redis 事件多路复用：每个进程只有一个模式订阅（roadmap:task:*），
+      由后台分发协程按 task_id 投递到各连接的有界队列
+    - 慢消费者驱逐：队列满的连接被断开，不影响其他连接和分发协程
     """
     
-    def __init__(self):
+    def __init__(self, queue_size: int | None = None):
         # task_id -> list of websocket connections
         self.active_connections: dict[str, list[WebSocket]] = {}
+        # task_id -> list of subscribers（与 active_connections 一一对应）
+        self._subscribers: dict[str, list[_Subscriber]] = {}
+        self._queue_size = queue_size or settings.WS_SUBSCRIBER_QUEUE_SIZE
+        self._dispatcher_task: asyncio.Task | None = None
+        
+        # 统计信息
+        self._dispatched_count = 0
+        self._evicted_count = 0
     
-    async def connect(self, websocket: WebSocket, task_id: str):
-        """接受新连接"""
+    async def connect(self, websocket: WebSocket, task_id: str) -> _Subscriber:
+        """接受新连接，返回该连接的订阅（事件队列）"""
         await websocket.accept()
         
         if task_id not in self.active_connections:
             self.active_connections[task_id] = []
         self.active_connections[task_id].append(websocket)
         
+        subscriber = self.subscribe(task_id, websocket)
+        
         logger.info(
             "websocket_connected",
             task_id=task_id,
             total_connections=len(self.active_connections[task_id]),
         )
+        return subscriber
     
     def disconnect(self, websocket: WebSocket, task_id: str):
         """断开连接"""
@@ -60,12 +116,47 @@ class ConnectionManager:
             if not self.active_connections[task_id]:
                 del self.active_connections[task_id]
         
+        for subscriber in list(self._subscribers.get(task_id, [])):
+            if subscriber.websocket is websocket:
+                self._remove_subscriber(subscriber)
+        
         logger.info(
             "websocket_disconnected",
             task_id=task_id,
             remaining_connections=len(self.active_connections.get(task_id, [])),
         )
     
+    def subscribe(self, task_id: str, websocket: WebSocket | None = None) -> _Subscriber:
+        """
+        注册任务事件订阅（WebSocket 连接或 SSE 流）
+        
+        Args:
+            task_id: 任务 ID
+            websocket: 对应的 WebSocket 连接（SSE 订阅为 None）
+            
+        Returns:
+            订阅对象（事件通过其 queue 投递）
+        """
+        subscriber = _Subscriber(websocket, task_id, self._queue_size)
+        self._subscribers.setdefault(task_id, []).append(subscriber)
+        self._ensure_dispatcher()
+        return subscriber
+    
+    def unsubscribe(self, subscriber: _Subscriber):
+        """取消订阅（SSE 流结束时调用）"""
+        self._remove_subscriber(subscriber)
+    
+    def _remove_subscriber(self, subscriber: _Subscriber):
+        """移除订阅"""
+        subscribers = self._subscribers.get(subscriber.task_id)
+        if not subscribers:
+            return
+        remaining = [s for s in subscribers if s is not subscriber]
+        if remaining:
+            self._subscribers[subscriber.task_id] = remaining
+        else:
+            del self._subscribers[subscriber.task_id]
+    
     async def send_to_task(self, task_id: str, message: dict):
         """发送消息到指定任务的所有连接"""
         if task_id not in self.active_connections:
@@ -87,9 +178,103 @@ class ConnectionManager:
         for conn in disconnected:
             self.disconnect(conn, task_id)
     
+    def dispatch(self, task_id: str, event: dict):
+        """
+        将事件投递到指定任务所有订阅的队列（非阻塞）
+        
+        队列已满的订阅视为慢消费者：清空其队列并放入驱逐标记，
+        由对应的转发协程关闭连接。
+        """
+        subscribers = self._subscribers.get(task_id)
+        if not subscribers:
+            return
+        
+        for subscriber in list(subscribers):
+            if subscriber.evicted:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+                self._dispatched_count += 1
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+    
+    def _evict(self, subscriber: _Subscriber):
+        """驱逐慢消费者"""
+        subscriber.evicted = True
+        self._evicted_count += 1
+        
+        # 清空积压事件，腾出位置放入驱逐标记
+        while not subscriber.queue.empty():
+            try:
+                subscriber.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        subscriber.queue.put_nowait(_EVICTED)
+        
+        # 不再向该连接投递事件
+        self._remove_subscriber(subscriber)
+        
+        logger.warning(
+            "websocket_slow_consumer_evicted",
+            task_id=subscriber.task_id,
+            queue_size=self._queue_size,
+        )
+    
+    def _ensure_dispatcher(self):
+        """确保后台分发协程在运行（懒启动）"""
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._dispatcher_task = asyncio.create_task(self._run_dispatcher())
+    
+    async def _run_dispatcher(self):
+        """
+        后台分发协程
+        
+        持有进程唯一的 Redis 模式订阅，连接异常时指数退避重连。
+        """
+        backoff = 1.0
+        while True:
+            try:
+                async for task_id, event in notification_service.listen_all_tasks():
+                    backoff = 1.0
+                    self.dispatch(task_id, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "websocket_dispatcher_error",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    retry_in_seconds=backoff,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+    
+    async def shutdown(self):
+        """停止后台分发协程（应用关闭时调用）"""
+        if self._dispatcher_task is not None and not self._dispatcher_task.done():
+            self._dispatcher_task.cancel()
+            try:
+                await self._dispatcher_task
+            except asyncio.CancelledError:
+                pass
+        self._dispatcher_task = None
+    
     def get_connection_count(self, task_id: str) -> int:
         """获取指定任务的连接数"""
         return len(self.active_connections.get(task_id, []))
+    
+    def get_stats(self) -> dict:
+        """获取连接与分发统计（用于健康检查）"""
+        return {
+            "tasks": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "dispatcher_running": (
+                self._dispatcher_task is not None and not self._dispatcher_task.done()
+            ),
+            "queue_size": self._queue_size,
+            "dispatched": self._dispatched_count,
+            "evicted": self._evicted_count,
+        }
 
 
 # 全局连接管理器
@@ -101,6 +286,9 @@ async def websocket_endpoint(
     websocket: WebSocket,
     task_id: str,
     include_history: bool = Query(False, description="是否包含历史状态"),
+    last_event_id: Optional[str] = Query(
+        None, description="最后收到的事件 ID（断线重连时携带，从事件日志增量补齐）"
+    ),
 ):
     """
     WebSocket 端点：订阅任务进度更新
@@ -114,6 +302,8 @@ async def websocket_endpoint(
     Args:
         task_id: 任务 ID
         include_history: 是否在连接时发送当前状态（默认 False）
+        last_event_id: 最后收到的事件 ID；启用事件日志时优先于 include_history，
+            只补发该 ID 之后的事件，不查询数据库
     
     Message Format:
     ```json
@@ -126,11 +316,19 @@ async def websocket_endpoint(
     }
     ```
     """
-    await manager.connect(websocket, task_id)
+    subscriber = await manager.connect(websocket, task_id)
     
     try:
+        # 断线续传：从事件日志补齐错过的事件（订阅已注册，回放期间的实时事件会在队列中去重）
+        replay_terminal = False
+        if last_event_id and settings.NOTIFICATION_STREAM_ENABLED:
+            for event in await notification_service.read_events_since(task_id, last_event_id):
+                await websocket.send_json(event)
+                subscriber.mark_sent(event)
+                if event.get("type") in (TaskEvent.COMPLETED, TaskEvent.FAILED):
+                    replay_terminal = True
         # 如果请求包含历史状态，先发送当前状态
-        if include_history:
+        elif include_history:
             await _send_current_status(websocket, task_id)
         
         # 发送连接成功消息
@@ -140,11 +338,21 @@ async def websocket_endpoint(
             "message": "WebSocket 连接成功，正在监听任务进度...",
         })
         
+        if replay_terminal:
+            # 任务在断线期间已结束，无需继续监听
+            await websocket.send_json({
+                "type": "closing",
+                "task_id": task_id,
+                "reason": "replayed",
+                "message": "任务已结束，连接即将关闭",
+            })
+            return
+        
         # 创建两个并发任务：
-        # 1. 从 Redis Pub/Sub 接收事件并转发
+        # 1. 从订阅队列接收事件并转发（队列由进程级 Redis 模式订阅填充）
         # 2. 处理客户端发来的消息（如心跳）
         
-        redis_task = asyncio.create_task(_forward_redis_events(websocket, task_id))
+        redis_task = asyncio.create_task(_forward_redis_events(websocket, subscriber))
         client_task = asyncio.create_task(_handle_client_messages(websocket, task_id))
         
         # 等待任一任务完成（通常是客户端断开或任务结束）
@@ -223,24 +431,62 @@ async def _send_current_status(websocket: WebSocket, task_id: str):
             )
 
 
-async def _forward_redis_events(websocket: WebSocket, task_id: str):
-    """从 Redis Pub/Sub 接收事件并转发到 WebSocket"""
+async def _forward_redis_events(websocket: WebSocket, subscriber: _Subscriber):
+    """从订阅队列接收事件并转发到 WebSocket"""
+    task_id = subscriber.task_id
+    timeout_seconds = settings.WS_SUBSCRIPTION_TIMEOUT_SECONDS
+    
     try:
-        async for event in notification_service.subscribe_with_timeout(
-            task_id,
-            timeout_seconds=3600,  # 1 小时超时
-        ):
-            await websocket.send_json(event)
-            
-            # 如果是终止事件，发送关闭消息
-            if event.get("type") in (TaskEvent.COMPLETED, TaskEvent.FAILED, "timeout"):
-                await websocket.send_json({
-                    "type": "closing",
-                    "task_id": task_id,
-                    "reason": event.get("type"),
-                    "message": "任务已结束，连接即将关闭",
-                })
-                break
+        try:
+            async with asyncio.timeout(timeout_seconds):
+                while True:
+                    event = await subscriber.queue.get()
+                    
+                    if event is _EVICTED:
+                        # 慢消费者：告知客户端后关闭，客户端可重连并通过 get_status 补齐状态
+                        await websocket.send_json({
+                            "type": "closing",
+                            "task_id": task_id,
+                            "reason": "slow_consumer",
+                            "message": "消息积压过多，连接即将关闭，请重新连接",
+                        })
+                        await websocket.close(code=1013)
+                        break
+                    
+                    if subscriber.is_duplicate(event):
+                        continue
+                    
+                    await websocket.send_json(event)
+                    subscriber.mark_sent(event)
+                    
+                    # 如果是终止事件，发送关闭消息
+                    if event.get("type") in (TaskEvent.COMPLETED, TaskEvent.FAILED):
+                        await websocket.send_json({
+                            "type": "closing",
+                            "task_id": task_id,
+                            "reason": event.get("type"),
+                            "message": "任务已结束，连接即将关闭",
+                        })
+                        break
+        
+        except TimeoutError:
+            logger.warning(
+                "notification_subscription_timeout",
+                task_id=task_id,
+                timeout_seconds=timeout_seconds,
+            )
+            await websocket.send_json({
+                "type": "timeout",
+                "task_id": task_id,
+                "message": f"订阅超时（{timeout_seconds}秒）",
+                "timestamp": beijing_now().isoformat(),
+            })
+            await websocket.send_json({
+                "type": "closing",
+                "task_id": task_id,
+                "reason": "timeout",
+                "message": "任务已结束，连接即将关闭",
+            })
     
     except asyncio.CancelledError:
         logger.debug("redis_forward_cancelled", task_id=task_id)
@@ -315,3 +561,97 @@ async def _handle_client_messages(websocket: WebSocket, task_id: str):
             error=str(e),
         )
 
+
+
+# ============================================================
+# SSE 端点（与 WebSocket 共享订阅分发和断线续传）
+# ============================================================
+
+def _format_sse(event: dict) -> str:
+    """构建 SSE 消息（携带 id 字段，浏览器 EventSource 重连时自动回传 Last-Event-ID）"""
+    lines = []
+    if event.get("event_id"):
+        lines.append(f"id: {event['event_id']}")
+    lines.append(f"event: {event.get('type', 'message')}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _sse_task_events(request: Request, task_id: str, last_event_id: Optional[str]):
+    """SSE 事件流：先回放错过的事件，再转发实时事件"""
+    subscriber = manager.subscribe(task_id)
+    timeout_seconds = settings.WS_SUBSCRIPTION_TIMEOUT_SECONDS
+    
+    try:
+        if last_event_id and settings.NOTIFICATION_STREAM_ENABLED:
+            for event in await notification_service.read_events_since(task_id, last_event_id):
+                yield _format_sse(event)
+                subscriber.mark_sent(event)
+                if event.get("type") in (TaskEvent.COMPLETED, TaskEvent.FAILED):
+                    return
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds
+        
+        while loop.time() < deadline:
+            if await request.is_disconnected():
+                break
+            
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=15.0)
+            except asyncio.TimeoutError:
+                # 心跳注释行，保持代理连接不被断开
+                yield ": ping\n\n"
+                continue
+            
+            if event is _EVICTED:
+                yield _format_sse({
+                    "type": "closing",
+                    "task_id": task_id,
+                    "reason": "slow_consumer",
+                    "message": "消息积压过多，连接即将关闭，请重新连接",
+                })
+                break
+            
+            if subscriber.is_duplicate(event):
+                continue
+            
+            yield _format_sse(event)
+            subscriber.mark_sent(event)
+            
+            if event.get("type") in (TaskEvent.COMPLETED, TaskEvent.FAILED):
+                break
+    
+    finally:
+        manager.unsubscribe(subscriber)
+
+
+@router.get("/sse/{task_id}")
+async def sse_endpoint(
+    request: Request,
+    task_id: str,
+    last_event_id: Optional[str] = Query(
+        None, description="最后收到的事件 ID（也可通过 Last-Event-ID 请求头传递）"
+    ),
+):
+    """
+    SSE 端点：订阅任务进度更新
+    
+    事件内容与 WebSocket 端点一致。启用事件日志时，每条消息带 id 字段，
+    断线重连时浏览器会自动携带 Last-Event-ID 请求头，服务端只补发之后的事件。
+    
+    Args:
+        task_id: 任务 ID
+        last_event_id: 最后收到的事件 ID
+    """
+    cursor = last_event_id or request.headers.get("last-event-id")
+    
+    return StreamingResponse(
+        _sse_task_events(request, task_id, cursor),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # 禁用 Nginx 缓冲
+        },
+    )
@@ -97,6 +97,32 @@ class Settings(BaseSettings):
         description="数据库连接池最大溢出数（生产环境默认 4，研发环境建议 3）"
     )
     
+    # Celery Worker 数据库连接池
+    # 默认使用 NullPool（每个会话新建连接）。启用后每个 Worker 子进程在持久事件循环上
+    # 懒加载一个小连接池，总连接数 = (CELERY_DB_POOL_SIZE + CELERY_DB_MAX_OVERFLOW) × 子进程数
+    CELERY_DB_POOL_ENABLED: bool = Field(
+        False,
+        description="Celery Worker 使用进程级持久连接池（替代 NullPool）"
+    )
+    CELERY_DB_POOL_SIZE: int = Field(2, description="Celery Worker 子进程连接池基础大小")
+    CELERY_DB_MAX_OVERFLOW: int = Field(3, description="Celery Worker 子进程连接池最大溢出数")
+    CELERY_DB_POOL_RECYCLE: int = Field(300, description="Celery Worker 连接回收时间（秒）")
+    
+    # Celery 监控：API 进程消费 Celery 事件维护集群状态（替代每次请求广播 inspect）
+    CELERY_EVENT_MONITOR_ENABLED: bool = Field(
+        False,
+        description="启用 Celery 事件监控（同时开启 Worker 任务事件和 task-sent 事件）"
+    )
+    CELERY_EVENT_MONITOR_MAX_TASKS: int = Field(5000, description="内存中跟踪的任务数上限")
+    CELERY_EVENT_MONITOR_SYNC_SECONDS: float = Field(
+        2.0,
+        description="队列深度采样和 Redis 快照镜像间隔（秒）"
+    )
+    CELERY_EVENT_MONITOR_QUEUES: str = Field(
+        "content_generation,logs,roadmap_workflow,celery",
+        description="采样队列深度（broker LLEN）的队列名（逗号分隔）"
+    )
+    
     @property
     def DATABASE_URL(self) -> str:
         """
@@ -127,12 +153,56 @@ class Settings(BaseSettings):
     S3_SECRET_ACCESS_KEY: str = Field("minioadmin123", description="访问密钥")
     S3_BUCKET_NAME: str = Field("roadmap-content", description="存储桶名称")
     S3_REGION: str | None = Field("auto", description="区域（R2 使用 'auto'，MinIO 可留空）")
+    S3_CLIENT_POOL_ENABLED: bool = Field(
+        True,
+        description="复用进程级共享 S3 客户端（关闭后每次上传/下载创建新客户端）"
+    )
+    S3_MAX_POOL_CONNECTIONS: int = Field(
+        20,
+        description="共享 S3 客户端的最大 HTTP 连接数（botocore max_pool_connections）"
+    )
     
     # ==================== Web Search 配置 ====================
     TAVILY_API_KEY: str | None = Field(None, description="Tavily API 密钥（可选，单个 Key）")
     TAVILY_API_KEY_LIST: str | None = Field(None, description="Tavily API Key 列表（逗号分隔或 JSON 数组格式，优先于 TAVILY_API_KEY）")
+    TAVILY_API_BASE_URL: str = Field("https://api.tavily.com", description="Tavily API 地址")
+    TAVILY_HTTP_TIMEOUT_SECONDS: float = Field(60.0, description="Tavily 搜索请求超时（秒）")
+    TAVILY_HTTP_MAX_CONNECTIONS: int = Field(20, description="每个 API Key 的最大 HTTP 连接数")
+    TAVILY_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(10, description="每个 API Key 保持的空闲 keep-alive 连接数")
+    TAVILY_HTTP2_ENABLED: bool = Field(True, description="启用 HTTP/2（h2 由 httpx[http2] 依赖安装，未安装时回退到 HTTP/1.1）")
+    SEARCH_CACHE_ENABLED: bool = Field(True, description="启用搜索结果缓存（Redis，节省 Tavily 配额）")
+    SEARCH_CACHE_MAX_TTL_SECONDS: int = Field(
+        7 * 24 * 3600,
+        description="搜索结果缓存最大过期时间（秒），按 time_range 计算的 TTL 不超过该值"
+    )
+    
+    # 资源 URL 验证（ResourceRecommender）
+    URL_VERIFY_TIMEOUT_SECONDS: float = Field(10.0, description="单个 URL 验证请求超时（秒）")
+    URL_VERIFY_MAX_CONCURRENCY: int = Field(20, description="进程内 URL 验证全局并发上限")
+    URL_VERIFY_PER_HOST_LIMIT: int = Field(4, description="同一域名的 URL 验证并发上限")
+    URL_VERIFY_CACHE_ENABLED: bool = Field(True, description="启用 URL 验证结果缓存（Redis）")
+    URL_VERIFY_CACHE_TTL_SECONDS: int = Field(24 * 3600, description="有效链接验证结果缓存时间（秒）")
+    URL_VERIFY_NEGATIVE_CACHE_TTL_SECONDS: int = Field(3600, description="无效链接（404/5xx）验证结果缓存时间（秒）")
     USE_DUCKDUCKGO_FALLBACK: bool = Field(True, description="是否使用 DuckDuckGo 作为备选搜索引擎")
     
+    # ==================== 精选路线图 Feed 配置 ====================
+    FEATURED_USER_EMAIL: str = Field("admin@example.com", description="精选路线图所属用户的邮箱")
+    FEATURED_FEED_CACHE_ENABLED: bool = Field(True, description="启用精选路线图 Feed 物化缓存（Redis）")
+    FEATURED_FEED_FRESH_SECONDS: int = Field(
+        300,
+        description="Feed 新鲜期（秒），超过后返回旧 Feed 并后台重建（兜底未捕获的变更）"
+    )
+    FEATURED_FEED_MAX_STALE_SECONDS: int = Field(
+        24 * 3600,
+        description="Feed 在 Redis 中的最长保留时间（秒），超过后同步重建"
+    )
+    FEATURED_FEED_MAX_ITEMS: int = Field(200, description="Feed 中物化的路线图数量上限")
+    FEATURED_FEED_HTTP_MAX_AGE_SECONDS: int = Field(60, description="Feed 响应 Cache-Control max-age（秒）")
+    
+    # ==================== 路线图框架缓存配置 ====================
+    FRAMEWORK_CACHE_MAX_ENTRIES: int = Field(256, description="进程内缓存的路线图框架数量上限")
+    FRAMEWORK_CACHE_TTL_SECONDS: int = Field(3600, description="框架缓存过期时间（秒），命中前仍会校验 updated_at")
+    
     # ==================== LLM 配置 ====================
     # A1: Intent Analyzer (需求分析师)
     ANALYZER_PROVIDER: str = Field("openai", description="模型提供商")
@@ -176,6 +246,85 @@ class Settings(BaseSettings):
     QUIZ_BASE_URL: str | None = None
     QUIZ_API_KEY: str = Field("your_openai_api_key_here", description="API 密钥")
     
+    # ==================== Prompt 模板配置 ====================
+    PROMPT_PRECOMPILE_ON_STARTUP: bool = Field(
+        True,
+        description="启动时预编译 prompts/ 下的全部 Jinja2 模板"
+    )
+    PROMPT_AUTO_RELOAD: bool = Field(
+        False,
+        description="模板文件变化时自动重新编译（开发模式使用，生产环境关闭以跳过文件 mtime 检查）"
+    )
+    PROMPT_BYTECODE_CACHE_DIR: str = Field(
+        "",
+        description="Jinja2 字节码磁盘缓存目录（为空则不启用），如 /tmp/roadmap_prompt_cache"
+    )
+    
+    # ==================== LLM 响应缓存配置 ====================
+    # 内容寻址缓存：相同 model/messages/tools/temperature/response_format 的调用直接复用结果
+    LLM_CACHE_ENABLED: bool = Field(False, description="启用 LLM 响应缓存")
+    LLM_CACHE_AGENTS: str = Field(
+        "",
+        description="开启缓存的 Agent ID（逗号分隔，'*' 表示全部），如 resource_recommender,intent_analyzer,tutorial_generator,quiz_generator（温度需不高于 LLM_CACHE_MAX_TEMPERATURE；只对写入缓存的 Agent 生效：intent_analyzer、resource_recommender、tutorial_generator、quiz_generator，其他 Agent 忽略）"
+    )
+    LLM_CACHE_MAX_TEMPERATURE: float = Field(
+        0.5,
+        description="温度高于该值的调用绕过缓存（保留输出多样性）"
+    )
+    LLM_CACHE_TTL_SECONDS: int = Field(86400, description="缓存过期时间（秒）")
+    LLM_CACHE_MEMORY_MAX_ENTRIES: int = Field(256, description="进程内 LRU 最大条目数")
+    LLM_CACHE_MEMORY_MAX_BYTES: int = Field(
+        32 * 1024 * 1024,
+        description="进程内 LRU 最大总字节数"
+    )
+    LLM_CACHE_MAX_ENTRY_BYTES: int = Field(
+        512 * 1024,
+        description="单个响应最大缓存字节数（超过则不缓存）"
+    )
+    
+    # ==================== 内容生成分片配置 ====================
+    # 大型路线图按概念分片为 Celery chord 子任务，由所有 content_generation Worker 并行执行
+    CONTENT_GENERATION_SHARDING_ENABLED: bool = Field(False, description="启用内容生成分片模式")
+    CONTENT_GENERATION_SHARD_SIZE: int = Field(5, description="每个分片子任务包含的概念数")
+    CONTENT_GENERATION_SHARD_MIN_CONCEPTS: int = Field(
+        10,
+        description="待生成概念数达到该值时才分片（小型路线图仍在单个任务内生成）"
+    )
+    CONTENT_GENERATION_MAX_CONCURRENT_CONCEPTS: int = Field(
+        10,
+        description="每个 Worker 事件循环内同时生成的概念数上限（按阶段顺序调度，0 表示不限制）"
+    )
+    CONTENT_PRIORITY_HINT_TTL_SECONDS: int = Field(
+        600,
+        description="用户当前查看概念提示的有效期（秒），有效期内该概念优先生成"
+    )
+    
+    # ==================== LLM 并发调控配置（AIMD）====================
+    # 按 provider/model 维护集群共享的并发上限（Redis），所有 Agent 调用都经过调控器
+    LLM_GOVERNOR_ENABLED: bool = Field(False, description="启用集群级 LLM 并发调控")
+    LLM_GOVERNOR_INITIAL_LIMIT: int = Field(8, description="初始并发上限（每个 provider/model）")
+    LLM_GOVERNOR_MIN_LIMIT: int = Field(1, description="并发上限下限")
+    LLM_GOVERNOR_MAX_LIMIT: int = Field(64, description="并发上限上限")
+    LLM_GOVERNOR_ADDITIVE_INCREASE: float = Field(
+        1.0,
+        description="加性增长步长（每一轮成功调用约增加该值）"
+    )
+    LLM_GOVERNOR_DECREASE_FACTOR: float = Field(0.5, description="收到 429 或延迟突增时的乘性缩减系数")
+    LLM_GOVERNOR_DECREASE_COOLDOWN_SECONDS: float = Field(
+        5.0,
+        description="两次缩减的最小间隔（秒），避免同一批 429 连续减半"
+    )
+    LLM_GOVERNOR_LATENCY_SPIKE_FACTOR: float = Field(
+        3.0,
+        description="延迟（按输出 token 归一化）超过 EWMA 的倍数时视为延迟突增"
+    )
+    LLM_GOVERNOR_MIN_LATENCY_SAMPLES: int = Field(20, description="开始检测延迟突增前的最少样本数")
+    LLM_GOVERNOR_LEASE_TTL_SECONDS: int = Field(
+        900,
+        description="租约过期时间（秒），Worker 崩溃时泄漏的租约在此之后自动回收"
+    )
+    LLM_GOVERNOR_ACQUIRE_TIMEOUT_SECONDS: float = Field(600.0, description="等待租约的最长时间（秒）")
+    
     # ==================== Modifier Agents 配置（内容修改）====================
     # 修改意图分析师（Modification Analyzer）
     MODIFICATION_ANALYZER_PROVIDER: str = Field("openai", description="模型提供商")
@@ -305,6 +454,30 @@ class Settings(BaseSettings):
         
         return valid_keys
     
+    # ==================== WebSocket 推送配置 ====================
+    WS_SUBSCRIBER_QUEUE_SIZE: int = Field(
+        256,
+        description="每个 WebSocket 连接的事件队列上限（队列满视为慢消费者并断开）"
+    )
+    WS_SUBSCRIPTION_TIMEOUT_SECONDS: int = Field(
+        3600,
+        description="WebSocket 订阅最长持续时间（秒）"
+    )
+    
+    # ==================== 进度事件日志配置（Redis Streams）====================
+    NOTIFICATION_STREAM_ENABLED: bool = Field(
+        False,
+        description="进度事件同时写入 Redis Stream，支持客户端通过 last_event_id 断线续传"
+    )
+    NOTIFICATION_STREAM_MAXLEN: int = Field(
+        1000,
+        description="每个任务事件日志的最大长度（近似截断）"
+    )
+    NOTIFICATION_STREAM_TTL_SECONDS: int = Field(
+        86400,
+        description="任务事件日志过期时间（秒），每次写入时刷新"
+    )
+    
     # ==================== 外部服务配置 ====================
     # 注意: Tavily 配置已移至 "Web Search 配置" 部分
     
@@ -312,6 +485,44 @@ class Settings(BaseSettings):
     OTEL_ENABLED: bool = Field(False, description="是否启用 OpenTelemetry")
     OTEL_EXPORTER_OTLP_ENDPOINT: str | None = Field(None, description="OTLP 导出端点")
     
+    # ==================== 执行日志配置 ====================
+    EXECUTION_LOG_BATCH_SIZE: int = Field(
+        50,
+        description="执行日志批量发送大小（缓冲区达到该数量时立即发送到 Celery logs 队列）"
+    )
+    EXECUTION_LOG_FLUSH_INTERVAL_SECONDS: float = Field(
+        2.0,
+        description="执行日志后台刷新间隔（秒）"
+    )
+    EXECUTION_LOG_BUFFER_MAX_SIZE: int = Field(
+        10000,
+        description="执行日志本地缓冲区上限（环形缓冲，Broker 不可用时超出部分丢弃最旧日志并计数）"
+    )
+    EXECUTION_LOG_RETENTION_DAYS: int = Field(
+        90,
+        description="执行日志保留天数（按月分区，整个分区都早于保留期时删除该分区）"
+    )
+    EXECUTION_LOG_PARTITIONS_AHEAD: int = Field(
+        3,
+        description="执行日志预先创建的未来月度分区数量"
+    )
+    EXECUTION_LOG_PARTITION_CHECK_INTERVAL_SECONDS: int = Field(
+        3600,
+        description="日志写入 Worker 检查分区（创建未来分区、删除过期分区）的最小间隔（秒）"
+    )
+    TRACE_SUMMARY_CACHE_TTL_SECONDS: int = Field(
+        86400,
+        description="已结束任务的执行日志摘要缓存时间（秒）"
+    )
+    TRACE_SUMMARY_SETTLE_SECONDS: int = Field(
+        60,
+        description="任务结束后多久才缓存摘要（秒），等待缓冲区中的最后一批日志写入"
+    )
+    TRACE_EXPORT_BATCH_SIZE: int = Field(
+        1000,
+        description="执行日志 NDJSON 导出每批读取行数"
+    )
+    
     # ==================== 业务配置 ====================
     MAX_FRAMEWORK_RETRY: int = Field(3, description="路线图结构验证最大重试次数")
     HUMAN_REVIEW_TIMEOUT_HOURS: int = Field(24, description="人工审核超时时间（小时）")
@@ -320,6 +531,32 @@ class Settings(BaseSettings):
     
     # 流式教程生成配置
     TUTORIAL_STREAM_BATCH_SIZE: int = Field(1, description="流式教程生成每批次并发数量（建议设置为1避免MinIO超时）")
+    CURRICULUM_SPECULATIVE_TUTORIALS_ENABLED: bool = Field(
+        False,
+        description="流式生成（无人工审核）时，框架设计过程中为最先闭合的模块提前生成教程；最终框架中概念有变化则丢弃"
+    )
+    CURRICULUM_SPECULATIVE_TUTORIALS_MAX_CONCEPTS: int = Field(
+        3,
+        description="推测性提前生成教程的概念数上限"
+    )
+
+    # ==================== 伴学模式配置 ====================
+    MENTOR_INTENT_RULES_ENABLED: bool = Field(
+        True,
+        description="伴学对话先用本地规则预分类意图，明确的请求不再调用 LLM 意图识别"
+    )
+    MENTOR_INTENT_RULES_MIN_CONFIDENCE: float = Field(
+        0.85,
+        description="规则预分类结果直接采用的最低置信度，低于该值回退到 LLM 意图识别"
+    )
+    MENTOR_CONTEXT_CACHE_TTL_SECONDS: int = Field(
+        300,
+        description="伴学上下文中路线图标题和概念信息的进程内缓存时间（秒）"
+    )
+    MENTOR_CONTEXT_CACHE_MAX_ENTRIES: int = Field(
+        512,
+        description="伴学上下文进程内缓存的路线图数量上限"
+    )
 
     # ==================== 工作流控制配置 ====================
     # 核心 Agent（不可跳过）：Intent Analyzer、Curriculum Architect、Structure Validator、Content Generators
@@ -347,6 +584,16 @@ class Settings(BaseSettings):
         description="任务恢复之间的延迟（秒），避免瞬间压力"
     )
     
+    # ==================== 启动协调配置 ====================
+    STARTUP_JOB_LOCK_TTL_SECONDS: int = Field(
+        60,
+        description="后台启动任务（任务恢复、测验初始化）分布式锁过期时间（秒），执行期间自动续期"
+    )
+    STARTUP_JOB_COOLDOWN_SECONDS: int = Field(
+        600,
+        description="技术栈测验初始化成功后的冷却时间（秒），期间其他副本启动时跳过（滚动发布只执行一次）"
+    )
+    
     # ==================== JWT 认证配置 ====================
     JWT_SECRET_KEY: str = Field(
         "your-super-secret-jwt-key-change-in-production",
@@ -12,9 +12,16 @@ Worker 进程初始化：
 - Celery prefork 模式下，子进程继承父进程的全局状态
 - 在 worker_process_init 信号中重置数据库 engine 缓存
 - 确保每个子进程使用独立的数据库连接
+- 在 worker_init 信号中（父进程，fork 之前）预编译 Prompt 模板，子进程直接复用
 """
 from celery import Celery
-from celery.signals import worker_process_init, task_failure, task_retry
+from celery.signals import (
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    task_failure,
+    task_retry,
+)
 from app.config.settings import settings
 
 # 构建 Redis URL（支持 Upstash 等云服务的完整 URL，或根据配置构建）
@@ -79,6 +86,9 @@ celery_app.conf.update(
         "health_check_interval": 25,  # 与 backend 保持一致
         "max_connections": 50,
     },
+    # 任务事件（供 API 进程的 Celery 事件监控消费）
+    worker_send_task_events=settings.CELERY_EVENT_MONITOR_ENABLED,
+    task_send_sent_event=settings.CELERY_EVENT_MONITOR_ENABLED,
     # 结果存储配置
     result_expires=3600,  # 结果过期时间 1 小时（减少 Redis 存储压力）
     result_backend_always_retry=True,  # 结果后端操作失败时自动重试
@@ -93,6 +103,31 @@ celery_app.conf.update(
 )
 
 
+# ============================================================
+# Worker 父进程初始化钩子（fork 之前执行）
+# ============================================================
+@worker_init.connect
+def on_worker_init(**kwargs):
+    """
+    Worker 主进程启动时调用（prefork 模式下在创建子进程之前）
+    
+    预编译 Prompt 模板：编译好的模板是纯 Python 对象，fork 后子进程直接复用，
+    不必在每个子进程中重新编译。失败时子进程在首次使用时再创建。
+    """
+    import structlog
+    logger = structlog.get_logger()
+    
+    try:
+        from app.utils.prompt_loader import get_prompt_loader
+        get_prompt_loader()
+    except Exception as e:
+        logger.error(
+            "celery_worker_init_error",
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+
+
 # ============================================================
 # Worker 进程初始化钩子（解决数据库连接隔离问题）
 # ============================================================
@@ -119,6 +154,26 @@ def on_worker_process_init(**kwargs):
         except ImportError:
             pass
         
+        # 重置 S3 客户端池（丢弃继承自父进程的客户端引用）
+        from app.tools.storage.s3_client_pool import reset_s3_client_pool
+        reset_s3_client_pool()
+        
+        # 重置 Tavily HTTP 客户端池
+        from app.tools.search.tavily_http_client import reset_tavily_client_pool
+        reset_tavily_client_pool()
+        
+        # 重置 URL 验证器（共享 HTTP 客户端）
+        from app.tools.search.url_verifier import url_verifier
+        url_verifier.reset()
+        
+        # 重置执行日志缓冲区（继承的日志由父进程发送，刷新协程绑定父进程事件循环）
+        from app.services.execution_logger import execution_logger
+        execution_logger.reset()
+        
+        # 注册精选路线图 Feed 失效钩子（Worker 中保存/删除路线图后标记 Feed 过期）
+        from app.services.featured_feed_service import register_featured_feed_invalidation
+        register_featured_feed_invalidation()
+        
         # 打印数据库连接信息（隐藏密码）
         from app.config.settings import settings
         db_url_safe = settings.DATABASE_URL.replace(
@@ -140,6 +195,46 @@ def on_worker_process_init(**kwargs):
         )
 
 
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**kwargs):
+    """
+    Worker 子进程退出时调用
+    
+    在 Worker 持久事件循环上关闭进程级共享资源：
+    - 执行日志缓冲区（发送剩余日志）
+    - Orchestrator 的 checkpointer 连接池（workflow Worker）
+    - Celery 专用数据库引擎（持久连接池模式）
+    - Tavily HTTP 客户端、URL 验证客户端（keep-alive 连接）
+    """
+    import structlog
+    logger = structlog.get_logger()
+    
+    try:
+        from app.tasks.content_utils import run_async
+        from app.core.orchestrator_factory import OrchestratorFactory
+        from app.db.celery_session import cleanup_celery_engine
+        from app.tools.search.tavily_http_client import tavily_client_pool
+        from app.tools.search.url_verifier import url_verifier
+        from app.services.execution_logger import execution_logger
+        
+        async def _cleanup():
+            await execution_logger.stop()
+            if OrchestratorFactory._initialized:
+                await OrchestratorFactory.cleanup()
+            await cleanup_celery_engine()
+            await tavily_client_pool.close()
+            await url_verifier.close()
+        
+        run_async(_cleanup())
+        logger.info("celery_worker_process_shutdown_cleanup_completed")
+    except Exception as e:
+        logger.warning(
+            "celery_worker_process_shutdown_cleanup_failed",
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+
+
 # ============================================================
 # Celery 错误信号处理器（全局异常捕获）
 # ============================================================
@@ -0,0 +1,562 @@
+"""
+Celery 集群状态缓存（事件驱动）
+
+问题背景：
+- 管理后台的 /admin/celery/overview、/tasks、/workers 每次请求都向所有 Worker 广播
+  inspect.active/scheduled/reserved 并等待回复，单次页面加载耗时数秒，且随 Worker 数量增长
+
+设计说明：
+- API 进程内的后台线程消费 Celery 事件（task-sent/received/started/succeeded/failed、
+  worker-heartbeat 等），维护内存状态模型，端点直接读取，不再广播 inspect
+- 多个 API 进程通过 Redis 锁选举一个 leader 消费事件，leader 定期将快照镜像到 Redis，
+  其他进程读取镜像；leader 切换时新 leader 从镜像恢复任务和 Worker 状态
+- 队列深度通过 broker（Redis）LLEN 定期采样，反映真实排队数量
+- 按任务名统计排队等待时间（sent → started）和运行时间直方图（可选导出到 Prometheus）
+
+依赖 Worker 开启任务事件（worker_send_task_events / task_send_sent_event，
+由 CELERY_EVENT_MONITOR_ENABLED 控制）。
+"""
+import asyncio
+import bisect
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.utils.metrics import gauge, histogram
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+celery_task_queue_wait_seconds = histogram(
+    "celery_task_queue_wait_seconds",
+    "Time tasks spend waiting in the queue before a worker starts them",
+    labelnames=["task_name"],
+    buckets=[0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600],
+)
+celery_task_runtime_seconds = histogram(
+    "celery_task_runtime_seconds",
+    "Celery task execution time",
+    labelnames=["task_name"],
+    buckets=[0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600],
+)
+celery_queue_depth = gauge(
+    "celery_queue_depth",
+    "Number of messages waiting in the broker queue",
+    labelnames=["queue"],
+)
+
+# Redis 键
+SNAPSHOT_KEY = "celery_monitor:snapshot"
+LEADER_KEY = "celery_monitor:leader"
+
+# 直方图桶边界（秒）
+QUEUE_WAIT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RUNTIME_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# 每个任务名保留的最近样本数（用于计算分位数）
+_PERCENTILE_WINDOW = 512
+
+# 未收到心跳超过该时间（秒）视为离线
+_WORKER_HEARTBEAT_TIMEOUT = 60.0
+
+# 终止状态（LOST：所在 Worker 离线/心跳超时，不会再收到结束事件）
+FINISHED_STATES = frozenset({"SUCCESS", "FAILURE", "REVOKED", "REJECTED", "LOST"})
+
+# 已被 Worker 领取、依赖 Worker 发送结束事件的状态
+_WORKER_BOUND_STATES = frozenset({"RECEIVED", "STARTED", "RETRY"})
+
+# 等待消费线程退出的最长时间（秒），Receiver 约每秒检查一次 should_stop
+_CONSUMER_JOIN_TIMEOUT = 5.0
+
+
+class DurationHistogram:
+    """固定桶直方图 + 最近样本窗口（计算 p50/p95）"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._recent: deque[float] = deque(maxlen=_PERCENTILE_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def _percentile(self, q: float) -> float | None:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else None,
+            "p50": self._percentile(0.5),
+            "p95": self._percentile(0.95),
+        }
+
+
+@dataclass
+class TrackedTask:
+    """事件流中观察到的任务"""
+    task_id: str
+    name: str = "unknown"
+    queue: str | None = None
+    state: str = "PENDING"
+    worker: str | None = None
+    eta: str | None = None
+    args: str | None = None
+    kwargs: str | None = None
+    sent_at: float | None = None
+    received_at: float | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    runtime: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class TrackedWorker:
+    """事件流中观察到的 Worker"""
+    hostname: str
+    last_heartbeat: float = 0.0
+    active: int = 0
+    processed: int = 0
+    freq: float = 2.0
+    offline: bool = False
+
+    def is_online(self, now: float) -> bool:
+        timeout = max(_WORKER_HEARTBEAT_TIMEOUT, self.freq * 5)
+        return not self.offline and now - self.last_heartbeat < timeout
+
+
+@dataclass
+class CeleryClusterState:
+    """
+    Celery 集群状态模型（线程安全）
+
+    事件消费线程调用 apply_event 更新，API 读取 snapshot。
+    """
+    max_tasks: int = 5000
+    tasks: "OrderedDict[str, TrackedTask]" = field(default_factory=OrderedDict)
+    workers: dict[str, TrackedWorker] = field(default_factory=dict)
+    queue_depths: dict[str, int] = field(default_factory=dict)
+    queue_wait: dict[str, DurationHistogram] = field(default_factory=dict)
+    runtime: dict[str, DurationHistogram] = field(default_factory=dict)
+    events_processed: int = 0
+    lost_tasks: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _get_task(self, task_id: str) -> TrackedTask:
+        task = self.tasks.get(task_id)
+        if task is None:
+            task = TrackedTask(task_id=task_id)
+            self.tasks[task_id] = task
+            self._evict()
+        return task
+
+    def _evict(self) -> None:
+        """超出上限时优先淘汰最早的已结束任务，其次最早的任务"""
+        overflow = len(self.tasks) - self.max_tasks
+        if overflow <= 0:
+            return
+        finished = [tid for tid, t in self.tasks.items() if t.state in FINISHED_STATES][:overflow]
+        for task_id in finished:
+            del self.tasks[task_id]
+        while len(self.tasks) > self.max_tasks:
+            self.tasks.popitem(last=False)
+
+    def _observe(self, histograms: dict, buckets: tuple, name: str, value: float, metric=None) -> None:
+        if value < 0:
+            return
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = DurationHistogram(buckets)
+        histogram.observe(value)
+        if metric is not None:
+            metric.labels(task_name=name).observe(value)
+
+    def apply_event(self, event: dict) -> None:
+        """应用一个 Celery 事件"""
+        event_type = event.get("type", "")
+        timestamp = event.get("timestamp") or time.time()
+
+        with self._lock:
+            self.events_processed += 1
+
+            if event_type.startswith("worker-"):
+                hostname = event.get("hostname")
+                if not hostname:
+                    return
+                worker = self.workers.get(hostname)
+                if worker is None:
+                    worker = self.workers[hostname] = TrackedWorker(hostname=hostname)
+                if event_type == "worker-offline":
+                    worker.offline = True
+                    return
+                worker.offline = False
+                worker.last_heartbeat = timestamp
+                worker.active = event.get("active", worker.active) or 0
+                worker.processed = event.get("processed", worker.processed) or 0
+                worker.freq = event.get("freq", worker.freq) or worker.freq
+                return
+
+            task_id = event.get("uuid")
+            if not event_type.startswith("task-") or not task_id:
+                return
+
+            task = self._get_task(task_id)
+            if event.get("name"):
+                task.name = event["name"]
+
+            if event_type == "task-sent":
+                task.state = "SENT" if task.state == "PENDING" else task.state
+                task.sent_at = timestamp
+                task.queue = event.get("queue") or event.get("routing_key") or task.queue
+            elif event_type == "task-received":
+                if task.state in ("PENDING", "SENT"):
+                    task.state = "RECEIVED"
+                task.received_at = timestamp
+                task.worker = event.get("hostname")
+                task.eta = event.get("eta")
+                task.args = event.get("args")
+                task.kwargs = event.get("kwargs")
+                if not task.queue:
+                    task.queue = (event.get("delivery_info") or {}).get("routing_key")
+            elif event_type == "task-started":
+                task.state = "STARTED"
+                task.started_at = timestamp
+                task.worker = event.get("hostname") or task.worker
+                enqueued_at = task.sent_at or task.received_at
+                if enqueued_at is not None and not task.eta:
+                    self._observe(
+                        self.queue_wait, QUEUE_WAIT_BUCKETS, task.name, timestamp - enqueued_at,
+                        celery_task_queue_wait_seconds,
+                    )
+            elif event_type in ("task-succeeded", "task-failed"):
+                task.state = "SUCCESS" if event_type == "task-succeeded" else "FAILURE"
+                task.finished_at = timestamp
+                runtime = event.get("runtime")
+                if runtime is None and task.started_at is not None:
+                    runtime = timestamp - task.started_at
+                task.runtime = runtime
+                if event_type == "task-failed":
+                    task.error = event.get("exception")
+                if runtime is not None:
+                    self._observe(
+                        self.runtime, RUNTIME_BUCKETS, task.name, runtime,
+                        celery_task_runtime_seconds,
+                    )
+            elif event_type == "task-retried":
+                task.state = "RETRY"
+                task.error = event.get("exception")
+            elif event_type == "task-revoked":
+                task.state = "REVOKED"
+                task.finished_at = timestamp
+            elif event_type == "task-rejected":
+                task.state = "REJECTED"
+                task.finished_at = timestamp
+
+    def expire_lost_tasks(self, now: float | None = None) -> int:
+        """
+        将所在 Worker 已离线（或心跳超时）的 RECEIVED/STARTED/RETRY 任务标记为 LOST
+
+        Worker 崩溃或被强杀时不会发送任务结束事件，这些任务否则会一直显示为运行中。
+        未观察到所在 Worker 心跳的任务，超过心跳超时后同样标记为 LOST。
+
+        Returns:
+            本次标记的任务数
+        """
+        now = now if now is not None else time.time()
+        expired = 0
+        with self._lock:
+            for task in self.tasks.values():
+                if task.state not in _WORKER_BOUND_STATES:
+                    continue
+                worker = self.workers.get(task.worker) if task.worker else None
+                if worker is not None:
+                    if worker.is_online(now):
+                        continue
+                else:
+                    last_seen = task.started_at or task.received_at
+                    if last_seen is None or now - last_seen < _WORKER_HEARTBEAT_TIMEOUT:
+                        continue
+                task.state = "LOST"
+                task.finished_at = now
+                expired += 1
+            self.lost_tasks += expired
+        return expired
+
+    def set_queue_depths(self, depths: dict[str, int]) -> None:
+        with self._lock:
+            self.queue_depths = dict(depths)
+
+    def snapshot(self) -> dict:
+        """导出 JSON 兼容快照（只包含未结束任务，用于端点读取和 Redis 镜像）"""
+        now = time.time()
+        with self._lock:
+            live_tasks = [asdict(t) for t in self.tasks.values() if t.state not in FINISHED_STATES]
+            workers = [
+                {**asdict(w), "online": w.is_online(now)}
+                for w in self.workers.values()
+            ]
+            return {
+                "updated_at": now,
+                "events_processed": self.events_processed,
+                "tasks": live_tasks,
+                "workers": workers,
+                "queue_depths": dict(self.queue_depths),
+                "queue_wait": {name: h.to_dict() for name, h in self.queue_wait.items()},
+                "runtime": {name: h.to_dict() for name, h in self.runtime.items()},
+            }
+
+    def restore(self, snapshot: dict) -> None:
+        """从 Redis 镜像恢复任务和 Worker 状态（leader 切换时调用，直方图重新累计）"""
+        with self._lock:
+            for data in snapshot.get("tasks", []):
+                self.tasks[data["task_id"]] = TrackedTask(**data)
+            for data in snapshot.get("workers", []):
+                data = {k: v for k, v in data.items() if k != "online"}
+                self.workers[data["hostname"]] = TrackedWorker(**data)
+            self._evict()
+
+
+class _EventConsumerThread(threading.Thread):
+    """
+    事件消费线程（每次启动一个新实例）
+
+    停止事件和 Receiver 归线程自身所有：旧线程退出较慢时，
+    不会清空新线程的 Receiver，也不会被新线程的启动重新唤醒。
+    """
+
+    def __init__(self, monitor: "CeleryEventMonitor"):
+        super().__init__(name="celery-event-monitor", daemon=True)
+        self.monitor = monitor
+        self.stop_event = threading.Event()
+        self.receiver = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        receiver = self.receiver
+        if receiver is not None:
+            # Receiver.capture 每次轮询（约 1 秒）检查 should_stop
+            receiver.should_stop = True
+
+    def run(self) -> None:
+        """阻塞消费 Celery 事件，连接断开时退避重连"""
+        from app.core.celery_app import celery_app
+
+        backoff = 1.0
+        while not self.stop_event.is_set():
+            try:
+                with celery_app.connection_for_read() as connection:
+                    self.receiver = celery_app.events.Receiver(
+                        connection,
+                        handlers={"*": self.monitor.state.apply_event},
+                    )
+                    # stop() 可能发生在 Receiver 创建之前
+                    if self.stop_event.is_set():
+                        break
+                    backoff = 1.0
+                    self.receiver.capture(limit=None, timeout=None, wakeup=False)
+            except Exception as e:
+                self.monitor._consumer_errors += 1
+                logger.warning("celery_event_consumer_error", error=str(e), retry_in=backoff)
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                self.receiver = None
+
+
+class CeleryEventMonitor:
+    """
+    Celery 事件监控器（API 进程级单例）
+
+    - start(): 在 FastAPI lifespan 中调用，启动 leader 选举/镜像协程
+    - 成为 leader 后启动事件消费线程，定期采样队列深度并写入 Redis 镜像
+    - get_snapshot(): 端点读取（leader 读内存，其他进程读 Redis 镜像）
+    """
+
+    def __init__(self):
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.state = CeleryClusterState(max_tasks=settings.CELERY_EVENT_MONITOR_MAX_TASKS)
+        self.is_leader = False
+        self._sync_task: asyncio.Task | None = None
+        self._consumer_thread: _EventConsumerThread | None = None
+        self._mirror_cache: tuple[float, dict | None] = (0.0, None)
+        self._consumer_errors = 0
+
+    @property
+    def queues(self) -> list[str]:
+        return [q.strip() for q in settings.CELERY_EVENT_MONITOR_QUEUES.split(",") if q.strip()]
+
+    @property
+    def _lease_seconds(self) -> int:
+        return max(10, int(settings.CELERY_EVENT_MONITOR_SYNC_SECONDS * 5))
+
+    # ---------------- 生命周期 ----------------
+
+    def start(self) -> None:
+        """启动监控（CELERY_EVENT_MONITOR_ENABLED 关闭时不做任何事）"""
+        if not settings.CELERY_EVENT_MONITOR_ENABLED or self._sync_task is not None:
+            return
+        self._sync_task = asyncio.create_task(self._sync_loop())
+        logger.info("celery_event_monitor_started", instance_id=self.instance_id)
+
+    async def stop(self) -> None:
+        """停止监控并释放 leader 锁"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._sync_task = None
+        await self._stop_consumer_thread()
+        if self.is_leader:
+            try:
+                if await redis_client._client.get(LEADER_KEY) == self.instance_id:
+                    await redis_client._client.delete(LEADER_KEY)
+            except Exception as e:
+                logger.warning("celery_event_monitor_release_failed", error=str(e))
+            self.is_leader = False
+
+    # ---------------- leader 选举与镜像 ----------------
+
+    async def _try_acquire_leadership(self) -> bool:
+        client = redis_client._client
+        acquired = await client.set(LEADER_KEY, self.instance_id, nx=True, ex=self._lease_seconds)
+        if acquired:
+            return True
+        if await client.get(LEADER_KEY) == self.instance_id:
+            await client.expire(LEADER_KEY, self._lease_seconds)
+            return True
+        return False
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await redis_client.connect()
+                leader = await self._try_acquire_leadership()
+
+                if leader and not self.is_leader:
+                    self.is_leader = True
+                    mirror = await redis_client.get_json(SNAPSHOT_KEY)
+                    if mirror:
+                        self.state.restore(mirror)
+                    await self._start_consumer_thread()
+                    logger.info("celery_event_monitor_leader_acquired", instance_id=self.instance_id)
+                elif not leader and self.is_leader:
+                    self.is_leader = False
+                    await self._stop_consumer_thread()
+                    logger.info("celery_event_monitor_leader_lost", instance_id=self.instance_id)
+
+                if self.is_leader:
+                    if self._consumer_thread is None or not self._consumer_thread.is_alive():
+                        await self._start_consumer_thread()
+                    lost = self.state.expire_lost_tasks()
+                    if lost:
+                        logger.info("celery_event_monitor_tasks_lost", count=lost)
+                    await self._sample_queue_depths()
+                    await redis_client.set_json(
+                        SNAPSHOT_KEY,
+                        self.state.snapshot(),
+                        ex=self._lease_seconds * 3,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("celery_event_monitor_sync_failed", error=str(e))
+
+            await asyncio.sleep(settings.CELERY_EVENT_MONITOR_SYNC_SECONDS)
+
+    async def _sample_queue_depths(self) -> None:
+        """通过 broker LLEN 采样各队列排队数"""
+        client = redis_client._client
+        pipe = client.pipeline(transaction=False)
+        for queue in self.queues:
+            pipe.llen(queue)
+        lengths = await pipe.execute()
+        depths = dict(zip(self.queues, (int(n or 0) for n in lengths)))
+        self.state.set_queue_depths(depths)
+        for queue, depth in depths.items():
+            celery_queue_depth.labels(queue=queue).set(depth)
+
+    # ---------------- 事件消费线程 ----------------
+
+    async def _start_consumer_thread(self) -> None:
+        # 先等待旧线程退出，避免两个线程同时消费事件
+        await self._stop_consumer_thread()
+        self._consumer_thread = _EventConsumerThread(self)
+        self._consumer_thread.start()
+
+    async def _stop_consumer_thread(self) -> None:
+        thread = self._consumer_thread
+        if thread is None:
+            return
+        self._consumer_thread = None
+        thread.stop()
+        await asyncio.to_thread(thread.join, _CONSUMER_JOIN_TIMEOUT)
+        if thread.is_alive():
+            logger.warning("celery_event_consumer_join_timeout", timeout=_CONSUMER_JOIN_TIMEOUT)
+
+    # ---------------- 读取 ----------------
+
+    async def get_snapshot(self) -> dict | None:
+        """
+        获取集群状态快照
+
+        Returns:
+            快照；监控未启用或尚无数据时返回 None（调用方回退到 inspect）
+        """
+        if not settings.CELERY_EVENT_MONITOR_ENABLED:
+            return None
+        if self.is_leader:
+            return self.state.snapshot()
+
+        cached_at, cached = self._mirror_cache
+        if time.monotonic() - cached_at < settings.CELERY_EVENT_MONITOR_SYNC_SECONDS:
+            return cached
+        try:
+            snapshot = await redis_client.get_json(SNAPSHOT_KEY)
+        except Exception as e:
+            logger.warning("celery_monitor_snapshot_read_failed", error=str(e))
+            snapshot = None
+        self._mirror_cache = (time.monotonic(), snapshot)
+        return snapshot
+
+    def get_stats(self) -> dict:
+        """获取监控器统计（用于健康检查）"""
+        return {
+            "enabled": settings.CELERY_EVENT_MONITOR_ENABLED,
+            "is_leader": self.is_leader,
+            "consumer_alive": bool(self._consumer_thread and self._consumer_thread.is_alive()),
+            "consumer_errors": self._consumer_errors,
+            "events_processed": self.state.events_processed,
+            "tracked_tasks": len(self.state.tasks),
+            "tracked_workers": len(self.state.workers),
+            "lost_tasks": self.state.lost_tasks,
+        }
+
+
+# 全局单例
+celery_event_monitor = CeleryEventMonitor()
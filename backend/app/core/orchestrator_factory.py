@@ -4,6 +4,8 @@
 简化的依赖注入实现，不依赖外部库。
 提供单例和工厂函数来创建 Orchestrator 组件。
 """
+import asyncio
+import os
 import structlog
 from psycopg_pool import AsyncConnectionPool
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
@@ -38,6 +40,9 @@ class OrchestratorFactory:
     
     使用单例模式管理共享组件（StateManager, Checkpointer）
     使用连接池来管理数据库连接，防止长时间运行时连接超时。
+    
+    Celery workflow Worker 通过 get_worker_executor() 复用进程级的连接池和
+    已编译的工作流图，不在每个任务结束时 cleanup()。
     """
     
     _state_manager: StateManager | None = None
@@ -46,6 +51,13 @@ class OrchestratorFactory:
     _agent_factory: AgentFactory | None = None
     _initialized: bool = False
     
+    # 连接池归属（psycopg 异步连接池绑定到创建它的进程和事件循环）
+    _owner_pid: int | None = None
+    _owner_loop_id: int | None = None
+    
+    # Worker 进程级共享的 WorkflowExecutor（图只编译一次）
+    _worker_executor: WorkflowExecutor | None = None
+    
     @classmethod
     async def initialize(cls) -> None:
         """
@@ -133,6 +145,8 @@ class OrchestratorFactory:
             )
             
             cls._initialized = True
+            cls._owner_pid = os.getpid()
+            cls._owner_loop_id = id(asyncio.get_running_loop())
             
         except Exception as e:
             logger.error(
@@ -163,12 +177,75 @@ class OrchestratorFactory:
                     error=str(e),
                 )
         
+        cls._reset_state()
+        logger.info("orchestrator_factory_cleaned_up")
+    
+    @classmethod
+    def _reset_state(cls) -> None:
+        """丢弃所有共享组件引用（不关闭连接池）"""
         cls._checkpointer = None
         cls._connection_pool = None
         cls._state_manager = None
         cls._agent_factory = None
+        cls._worker_executor = None
         cls._initialized = False
-        logger.info("orchestrator_factory_cleaned_up")
+        cls._owner_pid = None
+        cls._owner_loop_id = None
+    
+    @classmethod
+    async def ensure_initialized(cls) -> None:
+        """
+        确保工厂在当前进程和事件循环上已初始化
+        
+        已初始化的组件如果属于其他进程（prefork 继承）或其他事件循环
+        （Worker 持久循环被重建），其连接池无法在当前循环使用，
+        丢弃引用后重新初始化。
+        """
+        if cls._initialized:
+            pid = os.getpid()
+            loop_id = id(asyncio.get_running_loop())
+            if cls._owner_pid == pid and cls._owner_loop_id == loop_id:
+                return
+            
+            logger.warning(
+                "orchestrator_factory_stale_state_dropped",
+                owner_pid=cls._owner_pid,
+                current_pid=pid,
+                owner_loop_id=cls._owner_loop_id,
+                current_loop_id=loop_id,
+            )
+            cls._reset_state()
+        
+        await cls.initialize()
+    
+    @classmethod
+    async def get_worker_executor(cls) -> WorkflowExecutor:
+        """
+        获取 Worker 进程级共享的 WorkflowExecutor
+        
+        连接池打开、checkpointer setup 和工作流图编译在每个子进程中只执行一次，
+        generate_roadmap、resume_after_review、resume_from_checkpoint 共享同一实例。
+        WorkflowExecutor 本身不保存任务状态（通过 thread_id 区分任务），可安全复用。
+        
+        ⚠️ 必须在 Worker 持久事件循环上调用（content_utils.run_async）
+        
+        Returns:
+            WorkflowExecutor 实例
+        """
+        await cls.ensure_initialized()
+        
+        if cls._worker_executor is None:
+            executor = cls.create_workflow_executor()
+            # 预编译工作流图（首次访问时构建）
+            _ = executor.graph
+            cls._worker_executor = executor
+            logger.info(
+                "worker_workflow_executor_created",
+                pid=cls._owner_pid,
+                loop_id=cls._owner_loop_id,
+            )
+        
+        return cls._worker_executor
     
     @classmethod
     def get_state_manager(cls) -> StateManager:
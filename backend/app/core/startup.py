@@ -0,0 +1,235 @@
+"""
+应用启动协调（就绪检查与后台启动任务）
+
+问题背景：
+- lifespan 依次执行 orchestrator 初始化、S3 bucket 检查、中断任务恢复、技术栈测验初始化，
+  全部完成后才开始服务；测验初始化可能调用 LLM 生成缺失题库，冷启动和滚动发布耗时很长
+- 多副本同时启动时，每个副本都会执行任务恢复和测验生成
+
+设计说明：
+- 关键依赖（orchestrator / checkpointer、S3 bucket）并发初始化，阻塞启动
+- 任务恢复、测验初始化作为后台任务在服务开始后执行：
+  - Redis 锁（SET NX EX + 续期）保证同一时刻只有一个副本执行
+  - 幂等的任务（测验初始化）成功后写入冷却标记，滚动发布期间后续启动的副本跳过；
+    任务恢复不设冷却，否则冷却期内崩溃的副本遗留的任务不会被恢复。
+    任务恢复在所有恢复的工作流执行结束后才返回，锁覆盖整个恢复过程，
+    期间启动的副本不会重复恢复同一批任务；持锁副本退出后锁过期，由下一个副本接手
+- /health 为存活检查；/health/ready 报告关键依赖状态和后台任务进度。
+  关键依赖在 lifespan 的 yield 之前完成，应用能响应请求即表示关键依赖已就绪
+  （初始化失败时进程退出），就绪检查不会观察到未就绪状态
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+
+logger = structlog.get_logger()
+
+# Redis 键前缀
+LOCK_KEY_PREFIX = "startup_job:lock:"
+DONE_KEY_PREFIX = "startup_job:done:"
+
+
+@dataclass
+class StartupStep:
+    """启动步骤状态"""
+    name: str
+    critical: bool
+    status: str = "pending"  # pending / running / completed / failed / skipped
+    started_at: float | None = None
+    finished_at: float | None = None
+    duration_ms: int | None = None
+    detail: str | None = None
+    result: dict | None = None
+
+    def mark_running(self) -> None:
+        self.status = "running"
+        self.started_at = time.time()
+
+    def mark_finished(self, status: str, detail: str | None = None, result: dict | None = None) -> None:
+        self.status = status
+        self.finished_at = time.time()
+        if self.started_at is not None:
+            self.duration_ms = int((self.finished_at - self.started_at) * 1000)
+        self.detail = detail
+        self.result = result
+
+
+@dataclass
+class StartupCoordinator:
+    """
+    启动协调器（API 进程级单例）
+
+    - run_critical(): lifespan 中调用，并发初始化关键依赖，任一失败则启动失败
+    - start_background(): lifespan 中调用，以分布式锁保护的后台任务执行非关键初始化
+    - readiness(): 就绪检查端点读取
+    """
+    instance_id: str = field(
+        default_factory=lambda: f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    )
+    steps: dict[str, StartupStep] = field(default_factory=dict)
+    _tasks: list[asyncio.Task] = field(default_factory=list, repr=False)
+
+    @property
+    def ready(self) -> bool:
+        critical = [s for s in self.steps.values() if s.critical]
+        return bool(critical) and all(s.status == "completed" for s in critical)
+
+    # ---------------- 关键依赖 ----------------
+
+    async def run_critical(self, steps: dict[str, Callable[[], Awaitable[Any]]]) -> None:
+        """
+        并发执行关键初始化步骤
+
+        Args:
+            steps: 步骤名 → 无参协程函数
+
+        Raises:
+            第一个失败步骤的异常（阻止应用启动）；其余未完成的步骤被取消
+        """
+        async def run(name: str, factory: Callable[[], Awaitable[Any]]) -> None:
+            step = self.steps[name] = StartupStep(name=name, critical=True)
+            step.mark_running()
+            try:
+                await factory()
+            except asyncio.CancelledError:
+                step.mark_finished("failed", detail="cancelled")
+                raise
+            except Exception as e:
+                step.mark_finished("failed", detail=f"{type(e).__name__}: {e}")
+                raise
+            step.mark_finished("completed")
+            logger.info("startup_step_completed", step=name, duration_ms=step.duration_ms)
+
+        tasks = [asyncio.create_task(run(name, factory)) for name, factory in steps.items()]
+        if not tasks:
+            return
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # 任一步骤失败（或启动被取消）时取消其余步骤，启动立即失败
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+
+    # ---------------- 后台任务 ----------------
+
+    def start_background(
+        self,
+        name: str,
+        factory: Callable[[], Awaitable[dict | None]],
+        cooldown_seconds: int = 0,
+    ) -> None:
+        """
+        启动后台初始化任务（不阻塞启动）
+
+        Args:
+            name: 任务名（同时作为分布式锁名）
+            factory: 无参协程函数，返回结果摘要
+            cooldown_seconds: 成功后的冷却时间（秒），期间其他副本跳过；0 表示不设冷却
+        """
+        step = self.steps[name] = StartupStep(name=name, critical=False)
+        task = asyncio.create_task(self._run_locked(step, factory, cooldown_seconds))
+        self._tasks.append(task)
+
+    async def _run_locked(
+        self,
+        step: StartupStep,
+        factory: Callable[[], Awaitable[dict | None]],
+        cooldown_seconds: int,
+    ) -> None:
+        lock_key = f"{LOCK_KEY_PREFIX}{step.name}"
+        done_key = f"{DONE_KEY_PREFIX}{step.name}"
+        ttl = settings.STARTUP_JOB_LOCK_TTL_SECONDS
+        locked = False
+
+        try:
+            await redis_client.connect()
+            client = redis_client._client
+            finished_by = await client.get(done_key)
+            if finished_by:
+                step.mark_finished("skipped", detail=f"recently completed by {finished_by}")
+                logger.info("startup_job_skipped_cooldown", job=step.name, finished_by=finished_by)
+                return
+            locked = bool(await client.set(lock_key, self.instance_id, nx=True, ex=ttl))
+            if not locked:
+                holder = await client.get(lock_key)
+                step.mark_finished("skipped", detail=f"running on {holder}")
+                logger.info("startup_job_skipped_locked", job=step.name, holder=holder)
+                return
+        except Exception as e:
+            # Redis 不可用时仍然执行（与引入锁之前的行为一致）
+            logger.warning("startup_job_lock_unavailable", job=step.name, error=str(e))
+
+        renew_task = asyncio.create_task(self._renew_lock(lock_key, ttl)) if locked else None
+        step.mark_running()
+        try:
+            result = await factory()
+            step.mark_finished("completed", result=result)
+            logger.info("startup_job_completed", job=step.name, duration_ms=step.duration_ms, result=result)
+            if locked and cooldown_seconds > 0:
+                await redis_client._client.set(done_key, self.instance_id, ex=cooldown_seconds)
+        except asyncio.CancelledError:
+            step.mark_finished("failed", detail="cancelled")
+            raise
+        except Exception as e:
+            # 后台任务失败不影响服务
+            step.mark_finished("failed", detail=f"{type(e).__name__}: {e}")
+            logger.error("startup_job_failed", job=step.name, error=str(e), error_type=type(e).__name__)
+        finally:
+            if renew_task is not None:
+                renew_task.cancel()
+            if locked:
+                try:
+                    if await redis_client._client.get(lock_key) == self.instance_id:
+                        await redis_client._client.delete(lock_key)
+                except Exception as e:
+                    logger.warning("startup_job_lock_release_failed", job=step.name, error=str(e))
+
+    async def _renew_lock(self, lock_key: str, ttl: int) -> None:
+        """定期续期锁（长时间运行的任务不会因锁过期被其他副本重复执行）"""
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                if await redis_client._client.get(lock_key) == self.instance_id:
+                    await redis_client._client.expire(lock_key, ttl)
+            except Exception as e:
+                logger.warning("startup_job_lock_renew_failed", lock_key=lock_key, error=str(e))
+
+    async def shutdown(self) -> None:
+        """取消仍在运行的后台任务"""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    # ---------------- 就绪状态 ----------------
+
+    def readiness(self) -> dict[str, Any]:
+        """就绪检查结果（关键依赖 + 后台任务进度）"""
+        return {
+            "ready": self.ready,
+            "instance_id": self.instance_id,
+            "critical": {
+                name: asdict(step) for name, step in self.steps.items() if step.critical
+            },
+            "background_jobs": {
+                name: asdict(step) for name, step in self.steps.items() if not step.critical
+            },
+        }
+
+
+# 全局单例
+startup_coordinator = StartupCoordinator()
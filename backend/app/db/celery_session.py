@@ -3,18 +3,26 @@ Celery Worker 专用数据库会话管理
 
 设计原则：
 1. 完全独立于 FastAPI 的模块级 engine，避免 Fork 进程继承问题
-2. 使用 NullPool 避免连接池状态跨进程共享
-3. 每次创建 session 都建立新连接，用完即弃
+2. 默认使用 NullPool 避免连接池状态跨进程共享
+3. 可选持久连接池模式（CELERY_DB_POOL_ENABLED）：每个子进程在
+   worker_process_init 之后懒加载一个小连接池，绑定到 Worker 持久事件循环
 
 问题背景：
 - Celery 使用 prefork 模式，子进程继承父进程的连接池引用
 - asyncpg 在建立连接时需要设置 JSON codec（异步操作）
 - Fork 后的进程中，底层网络资源可能已损坏，导致超时
-- 解决方案：为 Celery Worker 使用独立的连接管理，每次创建新连接
+- NullPool 下每个 celery_safe_session_with_retry() 都新建连接，
+  一次内容生成会打开数百个连接
+
+连接池模式的安全约束：
+- 连接池在子进程内首次使用时创建（记录 PID，检测到 fork 时丢弃）
+- asyncpg 连接绑定到事件循环，仅在 content_utils.get_worker_loop() 返回的
+  持久循环上使用连接池；其他循环（如 asyncio.run()）回退到 NullPool 引擎
 """
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
 import asyncio
+import os
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     AsyncEngine,
@@ -30,9 +38,20 @@ from app.config.settings import settings
 logger = structlog.get_logger(__name__)
 
 
+_CELERY_CONNECT_ARGS = {
+    # 应用级配置
+    "server_settings": {
+        "application_name": "roadmap_agent_celery",
+        "jit": "off",
+    },
+    "command_timeout": 120,
+    "timeout": 60,  # 连接超时增加到 60 秒
+}
+
+
 def create_celery_engine() -> AsyncEngine:
     """
-    创建 Celery 专用数据库引擎
+    创建 Celery 专用数据库引擎（NullPool）
     
     关键配置：
     1. 使用 NullPool：每次连接请求都创建新连接，避免连接池状态跨进程共享
@@ -47,15 +66,7 @@ def create_celery_engine() -> AsyncEngine:
         echo=False,
         # 关键：使用 NullPool，避免连接池状态跨进程共享
         poolclass=NullPool,
-        connect_args={
-            # 应用级配置
-            "server_settings": {
-                "application_name": "roadmap_agent_celery",
-                "jit": "off",
-            },
-            "command_timeout": 120,
-            "timeout": 60,  # 连接超时增加到 60 秒
-        },
+        connect_args=_CELERY_CONNECT_ARGS,
     )
     
     logger.debug(
@@ -67,9 +78,52 @@ def create_celery_engine() -> AsyncEngine:
     return engine
 
 
+def create_celery_pooled_engine() -> AsyncEngine:
+    """
+    创建 Celery 子进程持久连接池引擎
+    
+    关键配置：
+    1. pool_size / max_overflow 有上限，每个子进程最多持有少量连接
+    2. pool_pre_ping：复用前检测连接可用性（长时间空闲后数据库可能断开）
+    3. pool_recycle：定期回收连接，避免云数据库空闲超时
+    4. pool_use_lifo：优先复用最近归还的连接，让多余连接自然空闲回收
+    
+    ⚠️ 必须在 Worker 持久事件循环上调用和使用
+    
+    Returns:
+        AsyncEngine: 带连接池的 Celery 数据库引擎
+    """
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        pool_size=settings.CELERY_DB_POOL_SIZE,
+        max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=settings.CELERY_DB_POOL_RECYCLE,
+        pool_timeout=60,
+        pool_use_lifo=True,
+        connect_args=_CELERY_CONNECT_ARGS,
+    )
+    
+    logger.debug(
+        "celery_engine_created",
+        engine_id=id(engine),
+        pool_class="AsyncAdaptedQueuePool",
+        pool_size=settings.CELERY_DB_POOL_SIZE,
+        max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+    )
+    
+    return engine
+
+
 # Celery 专用引擎（懒加载）
 _celery_engine: AsyncEngine | None = None
 
+# 持久连接池引擎（懒加载，绑定到 Worker 持久事件循环）
+_pooled_engine: AsyncEngine | None = None
+_pooled_engine_pid: int | None = None
+_pooled_engine_loop_id: int | None = None
+
 
 def reset_celery_engine_cache() -> None:
     """
@@ -79,28 +133,91 @@ def reset_celery_engine_cache() -> None:
     
     即使使用 NullPool，子进程仍可能继承父进程的 engine 引用。
     重置确保每个子进程创建自己的 engine。
+    继承的连接池引擎不能 dispose（其连接属于父进程），只丢弃引用。
     """
-    global _celery_engine
-    if _celery_engine is not None:
+    global _celery_engine, _pooled_engine, _pooled_engine_pid, _pooled_engine_loop_id
+    if _celery_engine is not None or _pooled_engine is not None:
         logger.info(
             "celery_engine_cache_reset",
-            engine_id=id(_celery_engine),
+            engine_id=id(_celery_engine) if _celery_engine else None,
+            pooled_engine_id=id(_pooled_engine) if _pooled_engine else None,
             message="Celery 专用引擎缓存已重置",
         )
-        _celery_engine = None
+    _celery_engine = None
+    _pooled_engine = None
+    _pooled_engine_pid = None
+    _pooled_engine_loop_id = None
+
+
+def _get_running_loop() -> asyncio.AbstractEventLoop | None:
+    """获取当前运行中的事件循环（不在协程中时返回 None）"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _get_pooled_engine(loop: asyncio.AbstractEventLoop) -> AsyncEngine:
+    """
+    获取当前子进程的持久连接池引擎（懒加载）
+    
+    检测到 PID 或事件循环变化时丢弃旧引擎引用并重建：
+    - PID 变化：引擎继承自父进程
+    - 循环变化：Worker 持久循环被关闭后重建，旧连接绑定到已关闭的循环
+    """
+    global _pooled_engine, _pooled_engine_pid, _pooled_engine_loop_id
+    
+    pid = os.getpid()
+    loop_id = id(loop)
+    
+    if _pooled_engine is not None and (
+        _pooled_engine_pid != pid or _pooled_engine_loop_id != loop_id
+    ):
+        logger.warning(
+            "celery_pooled_engine_stale",
+            engine_pid=_pooled_engine_pid,
+            current_pid=pid,
+            engine_loop_id=_pooled_engine_loop_id,
+            current_loop_id=loop_id,
+            message="持久连接池引擎属于其他进程或事件循环，丢弃并重建",
+        )
+        _pooled_engine = None
+    
+    if _pooled_engine is None:
+        _pooled_engine = create_celery_pooled_engine()
+        _pooled_engine_pid = pid
+        _pooled_engine_loop_id = loop_id
+        logger.info(
+            "celery_pooled_engine_initialized",
+            engine_id=id(_pooled_engine),
+            pid=pid,
+            loop_id=loop_id,
+            pool_size=settings.CELERY_DB_POOL_SIZE,
+            max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+        )
+    
+    return _pooled_engine
 
 
 def get_celery_engine() -> AsyncEngine:
     """
     获取 Celery 专用数据库引擎（懒加载）
     
-    每个 Worker 进程首次调用时创建独立的引擎实例。
+    - 启用 CELERY_DB_POOL_ENABLED 且当前运行在 Worker 持久事件循环上：返回子进程连接池引擎
+    - 否则：返回 NullPool 引擎
     
     Returns:
         AsyncEngine: Celery 专用数据库引擎
     """
     global _celery_engine
     
+    if settings.CELERY_DB_POOL_ENABLED:
+        from app.tasks.content_utils import is_worker_loop
+        
+        loop = _get_running_loop()
+        if is_worker_loop(loop):
+            return _get_pooled_engine(loop)
+    
     if _celery_engine is None:
         _celery_engine = create_celery_engine()
         logger.info(
@@ -202,15 +319,23 @@ async def cleanup_celery_engine() -> None:
     """
     清理 Celery 专用数据库引擎
     
-    在 Worker 进程退出时调用。
-    由于使用 NullPool，没有连接需要清理，但保留此方法以备将来扩展。
+    在 Worker 进程退出时调用（需在 Worker 持久事件循环上执行）。
+    NullPool 引擎没有连接需要清理；持久连接池引擎会关闭所有空闲连接。
     """
-    global _celery_engine
+    global _celery_engine, _pooled_engine, _pooled_engine_pid, _pooled_engine_loop_id
     
     if _celery_engine is not None:
         await _celery_engine.dispose()
         _celery_engine = None
         logger.info("celery_engine_disposed")
+    
+    if _pooled_engine is not None:
+        if _pooled_engine_pid == os.getpid():
+            await _pooled_engine.dispose()
+            logger.info("celery_pooled_engine_disposed", pid=_pooled_engine_pid)
+        _pooled_engine = None
+        _pooled_engine_pid = None
+        _pooled_engine_loop_id = None
 
 
 # ============================================================
@@ -338,7 +463,7 @@ async def celery_safe_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Celery 专用的安全数据库会话上下文管理器（无重试）
     
-    使用 Celery 专用的 NullPool 引擎，避免 Fork 进程继承问题。
+    使用 Celery 专用引擎（NullPool 或子进程连接池），避免 Fork 进程继承问题。
     
     Yields:
         AsyncSession: 数据库会话
@@ -368,7 +493,7 @@ async def celery_safe_session_with_retry(
     Celery 专用的带重试机制的安全会话上下文管理器
     
     与 session.py 中的 safe_session_with_retry 功能相同，
-    但使用 Celery 专用的 NullPool 引擎，避免 Fork 进程继承问题。
+    但使用 Celery 专用引擎（NullPool 或子进程连接池），避免 Fork 进程继承问题。
     
     Args:
         max_retries: 最大重试次数（默认 3 次）
@@ -0,0 +1,164 @@
+"""
+执行日志月度分区维护
+
+execution_logs 按 created_at 范围分区，每月一个分区（execution_logs_pYYYYMM）：
+- 写入只维护当月分区的两个索引，历史数据量不再影响写入成本
+- 保留期外的分区整体 DROP，没有逐行 DELETE 产生的膨胀和 VACUUM 压力
+
+维护入口：
+- API 启动后台任务（分布式锁保证单副本执行）
+- 日志写入 Worker 按 EXECUTION_LOG_PARTITION_CHECK_INTERVAL_SECONDS 节流检查；
+  写入遇到缺失分区时现场创建并重试
+
+所有操作幂等，多个进程同时执行时最多产生可忽略的并发创建错误。
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.settings import settings
+from app.models.database import ExecutionLog, beijing_now
+
+logger = structlog.get_logger()
+
+PARENT_TABLE = ExecutionLog.__tablename__
+
+_PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# DROP 分区需要父表的排他锁，等待过久时放弃（下次维护再删）
+_LOCK_TIMEOUT = "5s"
+
+
+def month_start(value: date | datetime) -> date:
+    """所在月份的第一天"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """月份偏移（month 为某月第一天）"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """分区表名"""
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def is_missing_partition_error(error: BaseException) -> bool:
+    """写入的 created_at 没有对应分区（no partition of relation ... found for row）"""
+    return "no partition of relation" in str(error)
+
+
+async def list_partitions(conn: AsyncConnection) -> list[date]:
+    """
+    列出已存在的月度分区
+
+    Returns:
+        分区月份（每月第一天），升序
+    """
+    result = await conn.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    months = []
+    for (name,) in result:
+        match = _PARTITION_NAME_RE.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+async def ensure_partitions(conn: AsyncConnection, months: Iterable[date | datetime]) -> list[str]:
+    """
+    确保指定月份的分区存在
+
+    Args:
+        conn: 数据库连接（调用方负责提交）
+        months: 需要分区的时间点（按所在月份去重）
+
+    Returns:
+        新创建的分区名
+    """
+    existing = set(await list_partitions(conn))
+    created = []
+    for month in sorted({month_start(m) for m in months} - existing):
+        name = partition_name(month)
+        # 分区边界必须是字面量（DDL 不支持绑定参数）；date.isoformat() 只包含数字和连字符
+        await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+        created.append(name)
+    if created:
+        logger.info("execution_log_partitions_created", partitions=created)
+    return created
+
+
+async def drop_expired_partitions(
+    conn: AsyncConnection,
+    retention_days: int,
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    删除整体早于保留期的分区
+
+    Args:
+        conn: 数据库连接（调用方负责提交）
+        retention_days: 保留天数
+        now: 当前时间（北京时间，默认 beijing_now()）
+
+    Returns:
+        删除的分区名
+    """
+    cutoff = ((now or beijing_now()) - timedelta(days=retention_days)).date()
+    dropped = []
+    for month in await list_partitions(conn):
+        # 分区上界不晚于截止日期，说明分区内所有日志都已过期
+        if add_months(month, 1) <= cutoff:
+            name = partition_name(month)
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    if dropped:
+        logger.info(
+            "execution_log_partitions_dropped",
+            partitions=dropped,
+            retention_days=retention_days,
+        )
+    return dropped
+
+
+async def maintain_partitions(conn: AsyncConnection, now: datetime | None = None) -> dict:
+    """
+    分区维护：创建当月及未来 EXECUTION_LOG_PARTITIONS_AHEAD 个月的分区，删除过期分区
+
+    Args:
+        conn: 数据库连接（调用方负责提交）
+        now: 当前时间（北京时间，默认 beijing_now()）
+
+    Returns:
+        {"created": [...], "dropped": [...]}
+    """
+    now = now or beijing_now()
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+
+    current = month_start(now)
+    created = await ensure_partitions(
+        conn,
+        [add_months(current, i) for i in range(settings.EXECUTION_LOG_PARTITIONS_AHEAD + 1)],
+    )
+    dropped = await drop_expired_partitions(conn, settings.EXECUTION_LOG_RETENTION_DAYS, now)
+    return {"created": created, "dropped": dropped}
@@ -274,29 +274,24 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog]):
         """
         删除指定天数之前的日志（归档清理）
         
+        execution_logs 按月分区，整体早于保留期的分区直接 DROP，
+        不做逐行 DELETE（保留期边界所在月份的日志随整个分区过期后删除）。
+        
         Args:
             days: 保留天数（默认 90 天）
             
         Returns:
-            删除的记录数
+            删除的分区数
         """
-        from sqlalchemy import delete
-        from datetime import timedelta
-        from app.models.database import beijing_now
-        
-        cutoff_date = beijing_now() - timedelta(days=days)
-        
-        result = await self.session.execute(
-            delete(ExecutionLog).where(ExecutionLog.created_at < cutoff_date)
-        )
+        from app.db.execution_log_partitions import drop_expired_partitions
         
-        deleted_count = result.rowcount
+        connection = await self.session.connection()
+        dropped = await drop_expired_partitions(connection, days)
         
         logger.info(
             "old_execution_logs_deleted",
             days=days,
-            cutoff_date=cutoff_date.isoformat(),
-            deleted_count=deleted_count,
+            dropped_partitions=dropped,
         )
         
-        return deleted_count
+        return len(dropped)
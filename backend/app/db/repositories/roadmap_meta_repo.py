@@ -13,10 +13,13 @@
 - 任务状态管理（在 TaskRepository）
 - 需求分析数据（在 IntentAnalysisRepository）
 """
+import json
+from datetime import datetime
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.database import RoadmapMetadata
+from sqlalchemy import select, func, text
+from sqlalchemy.orm import defer
+from app.models.database import RoadmapMetadata, beijing_now
 from app.models.domain import RoadmapFramework
 from .base import BaseRepository
 import structlog
@@ -50,6 +53,46 @@ class RoadmapMetadataRepository(BaseRepository[RoadmapMetadata]):
         """
         return await self.get_by_id(roadmap_id)
     
+    async def get_summary_by_roadmap_id(self, roadmap_id: str) -> Optional[RoadmapMetadata]:
+        """
+        根据 roadmap_id 查询路线图元数据（不加载 framework_data）
+        
+        只需要标题、时长、摘要列（total_concepts、stages_count 等）时使用，
+        访问 framework_data 会抛出异常。
+        
+        Args:
+            roadmap_id: 路线图 ID
+            
+        Returns:
+            元数据记录，如果不存在则返回 None
+        """
+        result = await self.session.execute(
+            select(RoadmapMetadata)
+            .options(defer(RoadmapMetadata.framework_data, raiseload=True))
+            .where(RoadmapMetadata.roadmap_id == roadmap_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_framework_version(self, roadmap_id: str) -> Optional[datetime]:
+        """
+        查询 framework_data 的版本（updated_at），不加载 framework_data
+        
+        Args:
+            roadmap_id: 路线图 ID
+            
+        Returns:
+            updated_at；路线图不存在时返回 None
+        """
+        result = await self.session.execute(
+            select(RoadmapMetadata.roadmap_id, RoadmapMetadata.updated_at)
+            .where(RoadmapMetadata.roadmap_id == roadmap_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        # 历史数据 updated_at 可能为空，用 datetime.min 作为版本号
+        return row.updated_at or datetime.min
+    
     async def roadmap_id_exists(self, roadmap_id: str) -> bool:
         """
         检查 roadmap_id 是否已存在于数据库中
@@ -170,6 +213,7 @@ class RoadmapMetadataRepository(BaseRepository[RoadmapMetadata]):
             existing.total_estimated_hours = framework.total_estimated_hours
             existing.recommended_completion_weeks = framework.recommended_completion_weeks
             existing.framework_data = framework.model_dump()
+            existing.refresh_summary()
             
             # 关键修复：显式标记 JSON 字段已修改
             # SQLAlchemy 默认无法检测 JSON 列的变更，需要手动标记
@@ -195,6 +239,7 @@ class RoadmapMetadataRepository(BaseRepository[RoadmapMetadata]):
                 recommended_completion_weeks=framework.recommended_completion_weeks,
                 framework_data=framework.model_dump(),
             )
+            metadata.refresh_summary()
             
             await self.create(metadata, flush=True)
             
@@ -234,6 +279,7 @@ class RoadmapMetadataRepository(BaseRepository[RoadmapMetadata]):
         existing.total_estimated_hours = framework.total_estimated_hours
         existing.recommended_completion_weeks = framework.recommended_completion_weeks
         existing.framework_data = framework.model_dump()
+        existing.refresh_summary()
         
         # 关键修复：显式标记 JSON 字段已修改
         # SQLAlchemy 默认无法检测 JSON 列的变更，需要手动标记
@@ -248,6 +294,81 @@ class RoadmapMetadataRepository(BaseRepository[RoadmapMetadata]):
         
         return True
     
+    async def patch_concept_fields(
+        self,
+        roadmap_id: str,
+        concept_id: str,
+        fields: dict,
+    ) -> bool:
+        """
+        原地更新 framework_data 中单个概念的字段（按 concept_index 定位）
+        
+        在数据库中用 jsonb_set 合并字段，不在 Python 中反序列化整个框架；
+        同时更新 updated_at，使进程内框架缓存失效。
+        只用于不影响摘要列的字段（状态、内容引用等）。
+        
+        Args:
+            roadmap_id: 路线图 ID
+            concept_id: 概念 ID
+            fields: 要合并到概念上的字段
+            
+        Returns:
+            True 如果更新成功，False 如果路线图或概念不存在
+        """
+        result = await self.session.execute(
+            select(RoadmapMetadata.concept_index)
+            .where(RoadmapMetadata.roadmap_id == roadmap_id)
+        )
+        concept_index = result.scalar_one_or_none()
+        position = (concept_index or {}).get(concept_id)
+        if position is None:
+            return False
+        
+        stage_idx, module_idx, concept_idx = position
+        path = ["stages", str(stage_idx), "modules", str(module_idx), "concepts", str(concept_idx)]
+        
+        # 校验路径上的 concept_id，防止索引与框架不一致时写错位置
+        result = await self.session.execute(
+            text(
+                """
+                UPDATE roadmap_metadata
+                SET framework_data = jsonb_set(
+                        framework_data::jsonb,
+                        CAST(:path AS text[]),
+                        (framework_data::jsonb #> CAST(:path AS text[])) || CAST(:fields AS jsonb)
+                    )::json,
+                    updated_at = :updated_at
+                WHERE roadmap_id = :roadmap_id
+                  AND framework_data::jsonb #>> CAST(:id_path AS text[]) = :concept_id
+                """
+            ),
+            {
+                "path": path,
+                "id_path": [*path, "concept_id"],
+                "fields": json.dumps(fields, ensure_ascii=False),
+                "updated_at": beijing_now(),
+                "roadmap_id": roadmap_id,
+                "concept_id": concept_id,
+            },
+        )
+        
+        if result.rowcount != 1:
+            logger.warning(
+                "concept_patch_index_mismatch",
+                roadmap_id=roadmap_id,
+                concept_id=concept_id,
+                path=path,
+            )
+            return False
+        
+        logger.info(
+            "concept_fields_patched",
+            roadmap_id=roadmap_id,
+            concept_id=concept_id,
+            fields=list(fields),
+        )
+        return True
+    
     # ============================================================
     # 删除方法
     # ============================================================
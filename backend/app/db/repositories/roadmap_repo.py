@@ -9,9 +9,11 @@
 - ResourceRecommendationMetadata: A5 资源推荐师产出
 - QuizMetadata: A6 测验生成器产出
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import AsyncIterator, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import and_, or_, select, func, tuple_
+from sqlalchemy.orm import defer
 from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import SQLModel
 import structlog
@@ -457,6 +459,7 @@ class RoadmapRepository:
             existing.total_estimated_hours = framework.total_estimated_hours
             existing.recommended_completion_weeks = framework.recommended_completion_weeks
             existing.framework_data = framework.model_dump()
+            existing.refresh_summary()
             # 关键修复：显式标记 JSON 字段已修改
             # SQLAlchemy 默认无法检测 JSON 列的变更，需要手动标记
             flag_modified(existing, "framework_data")
@@ -474,6 +477,7 @@ class RoadmapRepository:
                 recommended_completion_weeks=framework.recommended_completion_weeks,
                 framework_data=framework.model_dump(),
             )
+            metadata.refresh_summary()
             self.session.add(metadata)
             await self.session.flush()
             await self.session.refresh(metadata)
@@ -519,6 +523,9 @@ class RoadmapRepository:
         """
         获取用户的所有路线图列表（排除已删除的）
         
+        列表场景只需要摘要列（total_concepts、stage_summaries 等），
+        不加载 framework_data，访问该字段会抛出异常。
+        
         Args:
             user_id: 用户 ID
             limit: 返回数量限制
@@ -529,6 +536,7 @@ class RoadmapRepository:
         """
         result = await self.session.execute(
             select(RoadmapMetadata)
+            .options(defer(RoadmapMetadata.framework_data, raiseload=True))
             .where(
                 RoadmapMetadata.user_id == user_id,
                 RoadmapMetadata.deleted_at.is_(None)  # 排除已删除的
@@ -546,7 +554,7 @@ class RoadmapRepository:
         offset: int = 0,
     ) -> List[RoadmapMetadata]:
         """
-        获取用户回收站中的路线图列表
+        获取用户回收站中的路线图列表（不加载 framework_data）
         
         Args:
             user_id: 用户 ID
@@ -558,6 +566,7 @@ class RoadmapRepository:
         """
         result = await self.session.execute(
             select(RoadmapMetadata)
+            .options(defer(RoadmapMetadata.framework_data, raiseload=True))
             .where(
                 RoadmapMetadata.user_id == user_id,
                 RoadmapMetadata.deleted_at.isnot(None)  # 只查询已删除的
@@ -1591,6 +1600,40 @@ class RoadmapRepository:
     # Execution Logs (执行日志)
     # ============================================================
     
+    @staticmethod
+    def _filter_execution_logs(
+        query,
+        task_id: str,
+        level: Optional[str] = None,
+        category: Optional[str] = None,
+    ):
+        """按 task_id / level / category 过滤执行日志查询"""
+        query = query.where(ExecutionLog.task_id == task_id)
+        if level:
+            query = query.where(ExecutionLog.level == level)
+        if category:
+            query = query.where(ExecutionLog.category == category)
+        return query
+    
+    @staticmethod
+    def _after_cursor(query, after: Optional[tuple[datetime, str]]):
+        """
+        keyset 条件：(created_at, id) > after
+        
+        展开为 created_at >= :c AND (created_at > :c OR id > :id)，
+        使 created_at 下界能作为 (task_id, created_at) 索引条件。
+        """
+        if after is None:
+            return query
+        created_at, log_id = after
+        return query.where(
+            ExecutionLog.created_at >= created_at,
+            or_(
+                ExecutionLog.created_at > created_at,
+                and_(ExecutionLog.created_at == created_at, ExecutionLog.id > log_id),
+            ),
+        )
+    
     async def count_execution_logs_by_trace(
         self,
         task_id: str,
@@ -1608,12 +1651,9 @@ class RoadmapRepository:
         Returns:
             满足条件的日志总数
         """
-        query = select(func.count(ExecutionLog.id)).where(ExecutionLog.task_id == task_id)
-        
-        if level:
-            query = query.where(ExecutionLog.level == level)
-        if category:
-            query = query.where(ExecutionLog.category == category)
+        query = self._filter_execution_logs(
+            select(func.count()).select_from(ExecutionLog), task_id, level, category
+        )
         
         result = await self.session.execute(query)
         return result.scalar_one()
@@ -1627,7 +1667,10 @@ class RoadmapRepository:
         offset: int = 0,
     ) -> List[ExecutionLog]:
         """
-        获取指定 task_id 的执行日志
+        获取指定 task_id 的执行日志（OFFSET 分页）
+        
+        ⚠️ 兼容旧客户端保留；OFFSET 需要扫描并丢弃前面的所有行，
+        大 trace 请使用 get_execution_logs_page（keyset 分页）。
         
         Args:
             task_id: 追踪 ID（对应 task_id）
@@ -1639,19 +1682,90 @@ class RoadmapRepository:
         Returns:
             执行日志列表（按时间升序，确保早期步骤不会被截断）
         """
-        query = select(ExecutionLog).where(ExecutionLog.task_id == task_id)
-        
-        if level:
-            query = query.where(ExecutionLog.level == level)
-        if category:
-            query = query.where(ExecutionLog.category == category)
+        query = self._filter_execution_logs(select(ExecutionLog), task_id, level, category)
         
         # 修改：改为升序排序，确保早期步骤（如 structure_validation）的日志不会被截断
-        query = query.order_by(ExecutionLog.created_at.asc()).offset(offset).limit(limit)
+        query = (
+            query.order_by(ExecutionLog.created_at.asc(), ExecutionLog.id.asc())
+            .offset(offset)
+            .limit(limit)
+        )
         
         result = await self.session.execute(query)
         return list(result.scalars().all())
     
+    async def get_execution_logs_page(
+        self,
+        task_id: str,
+        level: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[tuple[datetime, str]] = None,
+    ) -> List[ExecutionLog]:
+        """
+        获取指定 task_id 的执行日志（keyset 分页）
+        
+        按 (created_at, id) 升序，每页只读取 limit 行，与页码无关。
+        
+        Args:
+            task_id: 追踪 ID（对应 task_id）
+            level: 过滤日志级别（可选）
+            category: 过滤日志分类（可选）
+            limit: 返回数量限制
+            after: 上一页最后一条日志的 (created_at, id)，首页为 None
+            
+        Returns:
+            执行日志列表
+        """
+        query = self._filter_execution_logs(select(ExecutionLog), task_id, level, category)
+        query = (
+            self._after_cursor(query, after)
+            .order_by(ExecutionLog.created_at.asc(), ExecutionLog.id.asc())
+            .limit(limit)
+        )
+        
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+    
+    async def iter_execution_logs(
+        self,
+        task_id: str,
+        level: Optional[str] = None,
+        category: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        按 keyset 分批遍历执行日志（用于导出）
+        
+        读取列而非 ORM 对象，导出大 trace 时不会在 Session 身份映射中累积对象。
+        
+        Args:
+            task_id: 追踪 ID（对应 task_id）
+            level: 过滤日志级别（可选）
+            category: 过滤日志分类（可选）
+            batch_size: 每批行数
+            
+        Yields:
+            日志字典列表（按 (created_at, id) 升序）
+        """
+        table = ExecutionLog.__table__
+        after = None
+        while True:
+            query = self._filter_execution_logs(select(*table.c), task_id, level, category)
+            query = (
+                self._after_cursor(query, after)
+                .order_by(ExecutionLog.created_at.asc(), ExecutionLog.id.asc())
+                .limit(batch_size)
+            )
+            result = await self.session.execute(query)
+            batch = [dict(row) for row in result.mappings()]
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["created_at"], batch[-1]["id"])
+    
     async def get_execution_logs_summary(
         self,
         task_id: str,
@@ -1659,60 +1773,67 @@ class RoadmapRepository:
         """
         获取执行日志摘要统计
         
+        单次查询：GROUPING SETS ((level), (category), ()) 同时得到级别分布、
+        分类分布和总计（数量、耗时、时间范围），只扫描一遍该任务的日志。
+        
         Args:
             task_id: 追踪 ID
             
         Returns:
             包含统计信息的字典
         """
-        # 统计各级别日志数量
-        level_counts = await self.session.execute(
+        result = await self.session.execute(
             select(
+                func.grouping(ExecutionLog.level, ExecutionLog.category).label("grouping"),
                 ExecutionLog.level,
-                func.count(ExecutionLog.id).label('count')
-            )
-            .where(ExecutionLog.task_id == task_id)
-            .group_by(ExecutionLog.level)
-        )
-        level_stats = {row[0]: row[1] for row in level_counts.fetchall()}
-        
-        # 统计各分类日志数量
-        category_counts = await self.session.execute(
-            select(
                 ExecutionLog.category,
-                func.count(ExecutionLog.id).label('count')
+                func.count().label("count"),
+                func.sum(ExecutionLog.duration_ms).label("duration_ms"),
+                func.min(ExecutionLog.created_at).label("first"),
+                func.max(ExecutionLog.created_at).label("last"),
             )
             .where(ExecutionLog.task_id == task_id)
-            .group_by(ExecutionLog.category)
+            .group_by(
+                func.grouping_sets(
+                    tuple_(ExecutionLog.level),
+                    tuple_(ExecutionLog.category),
+                    tuple_(),
+                )
+            )
         )
-        category_stats = {row[0]: row[1] for row in category_counts.fetchall()}
+        return self._summarize_grouping_rows(task_id, result.all())
+    
+    @staticmethod
+    def _summarize_grouping_rows(task_id: str, rows) -> dict:
+        """
+        解析 GROUPING SETS 结果
         
-        # 计算总耗时
-        duration_result = await self.session.execute(
-            select(func.sum(ExecutionLog.duration_ms))
-            .where(ExecutionLog.task_id == task_id)
-            .where(ExecutionLog.duration_ms.isnot(None))
-        )
-        total_duration_ms = duration_result.scalar_one_or_none() or 0
+        grouping(level, category) 位掩码：1 = 按 level 分组，2 = 按 category 分组，3 = 总计
+        """
+        level_stats: dict[str, int] = {}
+        category_stats: dict[str, int] = {}
+        total_logs = 0
+        total_duration_ms = 0
+        first_log_at = last_log_at = None
         
-        # 获取时间范围
-        time_range_result = await self.session.execute(
-            select(
-                func.min(ExecutionLog.created_at).label('first'),
-                func.max(ExecutionLog.created_at).label('last'),
-            )
-            .where(ExecutionLog.task_id == task_id)
-        )
-        time_range = time_range_result.fetchone()
+        for row in rows:
+            if row.grouping == 1:
+                level_stats[row.level] = row.count
+            elif row.grouping == 2:
+                category_stats[row.category] = row.count
+            elif row.grouping == 3:
+                total_logs = row.count
+                total_duration_ms = row.duration_ms or 0
+                first_log_at, last_log_at = row.first, row.last
         
         return {
             "task_id": task_id,
             "level_stats": level_stats,
             "category_stats": category_stats,
             "total_duration_ms": total_duration_ms,
-            "first_log_at": time_range[0].isoformat() if time_range and time_range[0] else None,
-            "last_log_at": time_range[1].isoformat() if time_range and time_range[1] else None,
-            "total_logs": sum(level_stats.values()),
+            "first_log_at": first_log_at.isoformat() if first_log_at else None,
+            "last_log_at": last_log_at.isoformat() if last_log_at else None,
+            "total_logs": total_logs,
         }
     
     async def get_error_logs_by_trace(
@@ -489,6 +489,9 @@ async def init_db():
         # 生产环境应使用 Alembic 迁移
         if settings.ENVIRONMENT == "development":
             await conn.run_sync(SQLModel.metadata.create_all)
+            # execution_logs 是分区表，create_all 只创建父表
+            from app.db.execution_log_partitions import maintain_partitions
+            await maintain_partitions(conn)
             logger.info("database_tables_created")
 
 
@@ -30,76 +30,147 @@ def get_recover_interrupted_tasks_on_startup():
 logger = structlog.get_logger()
 
 
+async def _recover_interrupted_tasks() -> dict:
+    """
+    后台启动任务：恢复被中断的任务
+
+    恢复的工作流在后台任务中继续执行。等待它们全部结束后才返回（即释放分布式锁），
+    否则滚动发布中后启动的副本会看到仍为 processing 的任务并再次恢复。
+    """
+    from app.services.task_recovery_service import task_recovery_service
+
+    recover_interrupted_tasks_on_startup = get_recover_interrupted_tasks_on_startup()
+    recovery_result = await recover_interrupted_tasks_on_startup()
+    if recovery_result.get("total_found", 0) > 0:
+        logger.info(
+            "task_recovery_on_startup_completed",
+            total_found=recovery_result.get("total_found"),
+            recovered=recovery_result.get("recovered"),
+            failed=recovery_result.get("failed"),
+            no_checkpoint=recovery_result.get("no_checkpoint"),
+        )
+    await task_recovery_service.wait_for_all_recoveries(timeout=None)
+    return recovery_result
+
+
+async def _initialize_tech_assessments() -> dict:
+    """后台启动任务：初始化技术栈测验数据"""
+    from app.services.tech_assessment_initializer import initialize_tech_assessments
+    init_result = await initialize_tech_assessments()
+    if init_result.get("generated", 0) > 0:
+        logger.info(
+            "tech_assessments_initialized",
+            total_expected=init_result.get("total_expected"),
+            existing=init_result.get("existing"),
+            generated=init_result.get("generated"),
+            failed=init_result.get("failed"),
+        )
+    return init_result
+
+
+async def _maintain_execution_log_partitions() -> dict:
+    """后台启动任务：创建未来月份的执行日志分区、删除过期分区"""
+    from app.db.execution_log_partitions import maintain_partitions
+    from app.db.session import get_engine
+    engine = await get_engine()
+    async with engine.begin() as conn:
+        return await maintain_partitions(conn)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     logger.info("application_startup")
     
-    # 初始化全局 orchestrator 和 Redis 连接
-    await init_orchestrator()
+    from app.core.startup import startup_coordinator
     
-    # 初始化 S3 兼容存储 bucket（如果不存在则创建）
-    await ensure_bucket_exists()
+    # 预编译 Prompt 模板（所有 Agent 共享）
+    from app.utils.prompt_loader import get_prompt_loader
+    get_prompt_loader()
     
-    # 恢复被中断的任务（服务器重启后自动恢复）
-    try:
-        recover_interrupted_tasks_on_startup = get_recover_interrupted_tasks_on_startup()
-        recovery_result = await recover_interrupted_tasks_on_startup()
-        if recovery_result.get("total_found", 0) > 0:
-            logger.info(
-                "task_recovery_on_startup_completed",
-                total_found=recovery_result.get("total_found"),
-                recovered=recovery_result.get("recovered"),
-                failed=recovery_result.get("failed"),
-                no_checkpoint=recovery_result.get("no_checkpoint"),
-            )
-    except Exception as e:
-        # 恢复失败不应阻止服务启动
-        logger.error(
-            "task_recovery_on_startup_error",
-            error=str(e),
-            error_type=type(e).__name__,
-        )
+    # 关键依赖并发初始化（阻塞启动）：
+    # - 全局 orchestrator 和 Redis 连接
+    # - S3 兼容存储 bucket（如果不存在则创建）
+    await startup_coordinator.run_critical({
+        "orchestrator": init_orchestrator,
+        "s3_bucket": ensure_bucket_exists,
+    })
     
-    # 初始化技术栈测验数据（如果缺失则生成）
-    try:
-        from app.services.tech_assessment_initializer import initialize_tech_assessments
-        init_result = await initialize_tech_assessments()
-        if init_result.get("generated", 0) > 0:
-            logger.info(
-                "tech_assessments_initialized",
-                total_expected=init_result.get("total_expected"),
-                existing=init_result.get("existing"),
-                generated=init_result.get("generated"),
-                failed=init_result.get("failed"),
-            )
-    except Exception as e:
-        # 初始化失败不应阻止服务启动
-        logger.error(
-            "tech_assessments_init_failed",
-            error=str(e),
-            error_type=type(e).__name__,
-        )
+    # 启动 Celery 事件监控（管理后台读取集群状态，不再广播 inspect）
+    from app.core.celery_cluster_state import celery_event_monitor
+    celery_event_monitor.start()
+    
+    # 注册精选路线图 Feed 失效钩子（路线图变更提交后标记 Feed 过期）
+    from app.services.featured_feed_service import register_featured_feed_invalidation
+    register_featured_feed_invalidation()
+    
+    # 非关键初始化转为后台任务（不阻塞启动，分布式锁保证只有一个副本执行）：
+    # - 恢复被中断的任务（服务器重启后自动恢复）
+    # - 初始化技术栈测验数据（如果缺失则生成）
+    # - 执行日志分区维护（创建未来分区、删除过期分区）
+    startup_coordinator.start_background("task_recovery", _recover_interrupted_tasks)
+    startup_coordinator.start_background(
+        "tech_assessments",
+        _initialize_tech_assessments,
+        cooldown_seconds=settings.STARTUP_JOB_COOLDOWN_SECONDS,
+    )
+    startup_coordinator.start_background(
+        "execution_log_partitions", _maintain_execution_log_partitions
+    )
     
     yield
     
     logger.info("application_shutdown")
     
-    # 刷新所有待发送的日志
+    # 取消仍在运行的后台启动任务
+    await startup_coordinator.shutdown()
+    
+    # 停止执行日志后台刷新并发送所有待发送的日志（发送完成后才返回）
     try:
         from app.services.execution_logger import execution_logger
-        await execution_logger.flush()
+        await execution_logger.stop()
         logger.info("execution_logger_flushed")
-        
-        # 等待一小段时间，确保 Celery 任务被发送
-        import asyncio
-        await asyncio.sleep(1)
     except Exception as e:
         logger.error(
             "execution_logger_flush_failed",
             error=str(e),
         )
     
+    # 停止 WebSocket 事件分发协程（释放 Redis 模式订阅连接）
+    try:
+        from app.api.v1.websocket import manager as websocket_manager
+        await websocket_manager.shutdown()
+    except Exception as e:
+        logger.warning("websocket_dispatcher_shutdown_failed", error=str(e))
+    
+    # 停止 Celery 事件监控（释放 leader 锁）
+    try:
+        from app.core.celery_cluster_state import celery_event_monitor
+        await celery_event_monitor.stop()
+    except Exception as e:
+        logger.warning("celery_event_monitor_stop_failed", error=str(e))
+    
+    # 关闭共享 S3 客户端
+    try:
+        from app.tools.storage.s3_client_pool import s3_client_pool
+        await s3_client_pool.close()
+    except Exception as e:
+        logger.warning("s3_client_pool_close_failed", error=str(e))
+    
+    # 关闭共享 Tavily HTTP 客户端
+    try:
+        from app.tools.search.tavily_http_client import tavily_client_pool
+        await tavily_client_pool.close()
+    except Exception as e:
+        logger.warning("tavily_client_pool_close_failed", error=str(e))
+    
+    # 关闭共享 URL 验证客户端
+    try:
+        from app.tools.search.url_verifier import url_verifier
+        await url_verifier.close()
+    except Exception as e:
+        logger.warning("url_verifier_close_failed", error=str(e))
+    
     # 清理 orchestrator 和关闭 Redis 连接
     await cleanup_orchestrator()
 
@@ -142,6 +213,21 @@ async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    就绪检查端点
+    
+    关键依赖（orchestrator、S3 bucket）在 lifespan 启动阶段完成初始化，失败时进程退出，
+    因此能响应即表示关键依赖已就绪（始终返回 200）。
+    响应中报告各关键依赖的初始化耗时和后台启动任务（任务恢复、测验初始化、分区维护）的进度，
+    后台任务不影响就绪状态。
+    """
+    from app.core.startup import startup_coordinator
+    
+    return startup_coordinator.readiness()
+
+
 @app.get("/health/db")
 async def db_health_check():
     """
@@ -162,6 +248,7 @@ async def detailed_health_check():
     返回所有子系统的健康状态，包括：
     - 数据库连接池
     - Checkpointer 连接池
+    - S3 客户端池（连接复用统计）
     - Redis 连接（如果有）
     """
     from app.db.session import check_db_health, get_pool_status
@@ -188,6 +275,66 @@ async def detailed_health_check():
             "error": str(e),
         }
     
+    # S3 客户端池复用统计
+    from app.tools.storage.s3_client_pool import s3_client_pool
+    s3_pool_status = s3_client_pool.get_stats()
+    
+    # Tavily HTTP 客户端池统计
+    from app.tools.search.tavily_http_client import tavily_client_pool
+    tavily_pool_status = tavily_client_pool.get_stats()
+    
+    # 搜索结果缓存命中率
+    from app.tools.search.search_cache import search_result_cache
+    search_cache_status = search_result_cache.get_stats()
+    
+    # URL 验证连接复用与缓存统计
+    from app.tools.search.url_verifier import url_verifier
+    url_verifier_status = url_verifier.get_stats()
+    
+    # LLM 缓存与并发调控统计
+    from app.utils.llm_cache import llm_response_cache
+    from app.utils.llm_governor import llm_governor
+    llm_status = {
+        "response_cache": llm_response_cache.get_stats(),
+        "governor": llm_governor.get_stats(),
+    }
+    
+    # WebSocket 事件分发统计
+    from app.api.v1.websocket import manager as websocket_manager
+    websocket_status = websocket_manager.get_stats()
+    
+    # Prompt 模板缓存与渲染耗时
+    from app.utils.prompt_loader import get_prompt_loader
+    prompt_status = get_prompt_loader().get_stats()
+    
+    # Celery 事件监控
+    from app.core.celery_cluster_state import celery_event_monitor
+    celery_monitor_status = celery_event_monitor.get_stats()
+    
+    # 精选路线图 Feed 缓存
+    from app.services.featured_feed_service import featured_feed_service
+    featured_feed_status = featured_feed_service.get_stats()
+    
+    # 路线图框架进程内缓存
+    from app.services.framework_cache import framework_cache
+    framework_cache_status = framework_cache.get_stats()
+    
+    # 执行日志缓冲与发送统计
+    from app.services.execution_logger import execution_logger
+    execution_logger_status = execution_logger.get_stats()
+    
+    # 执行日志摘要缓存
+    from app.services.trace_summary_cache import trace_summary_cache
+    trace_summary_cache_status = trace_summary_cache.get_stats()
+    
+    # 伴学意图规则预分类
+    from app.agents.intent_pre_classifier import intent_pre_classifier
+    intent_pre_classifier_status = intent_pre_classifier.get_stats()
+    
+    # 伴学上下文缓存
+    from app.services.learning_context_service import learning_context_service
+    learning_context_status = learning_context_service.get_stats()
+    
     overall_status = "healthy"
     if db_health.get("status") != "healthy":
         overall_status = "unhealthy"
@@ -200,6 +347,20 @@ async def detailed_health_check():
         "components": {
             "database": db_health,
             "checkpointer": checkpointer_status,
+            "s3_client_pool": s3_pool_status,
+            "tavily_client_pool": tavily_pool_status,
+            "search_cache": search_cache_status,
+            "url_verifier": url_verifier_status,
+            "llm": llm_status,
+            "websocket": websocket_status,
+            "prompt_loader": prompt_status,
+            "celery_event_monitor": celery_monitor_status,
+            "featured_feed": featured_feed_status,
+            "framework_cache": framework_cache_status,
+            "execution_logger": execution_logger_status,
+            "trace_summary_cache": trace_summary_cache_status,
+            "intent_pre_classifier": intent_pre_classifier_status,
+            "learning_context": learning_context_status,
         },
     }
 
@@ -9,7 +9,7 @@
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from sqlmodel import SQLModel, Field, Column, JSON
-from sqlalchemy import Text, DateTime, UniqueConstraint, String, Boolean, text
+from sqlalchemy import Text, DateTime, UniqueConstraint, String, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 from fastapi_users.db import SQLAlchemyBaseUserTable
 import uuid
@@ -138,8 +138,63 @@ class RoadmapTask(SQLModel, table=True):
     )
 
 
+def summarize_framework(framework_data: dict) -> dict:
+    """
+    计算框架摘要（概念总数、阶段数、阶段摘要）
+    
+    Args:
+        framework_data: RoadmapFramework.model_dump() 结果
+        
+    Returns:
+        {"total_concepts", "stages_count", "stage_summaries"}
+    """
+    stages = framework_data.get("stages", [])
+    return {
+        "total_concepts": sum(
+            len(module.get("concepts", []))
+            for stage in stages
+            for module in stage.get("modules", [])
+        ),
+        "stages_count": len(stages),
+        "stage_summaries": [
+            {
+                "name": stage.get("name", ""),
+                "description": stage.get("description"),
+                "order": stage.get("order", index + 1),
+            }
+            for index, stage in enumerate(stages)
+        ],
+    }
+
+
+def build_concept_index(framework_data: dict) -> dict:
+    """
+    构建概念索引：concept_id → [stage 下标, module 下标, concept 下标]
+    
+    Args:
+        framework_data: RoadmapFramework.model_dump() 结果
+        
+    Returns:
+        概念索引（重复的 concept_id 以第一次出现为准）
+    """
+    index: dict = {}
+    for s, stage in enumerate(framework_data.get("stages", [])):
+        for m, module in enumerate(stage.get("modules", [])):
+            for c, concept in enumerate(module.get("concepts", [])):
+                concept_id = concept.get("concept_id")
+                if concept_id and concept_id not in index:
+                    index[concept_id] = [s, m, c]
+    return index
+
+
 class RoadmapMetadata(SQLModel, table=True):
-    """路线图元数据表（存储轻量级框架，不包含详细内容）"""
+    """
+    路线图元数据表（存储轻量级框架，不包含详细内容）
+    
+    total_concepts / stages_count / stage_summaries 是 framework_data 的冗余摘要，
+    concept_index 是概念定位索引；写入 framework_data 时通过 refresh_summary() 同步
+    （同时更新 updated_at，作为进程内框架缓存的版本号）。
+    """
     __tablename__ = "roadmap_metadata"
     
     roadmap_id: str = Field(primary_key=True)
@@ -153,10 +208,29 @@ class RoadmapMetadata(SQLModel, table=True):
     # 完整框架数据（JSON 格式）
     framework_data: dict = Field(sa_column=Column(JSON))
     
+    # 框架摘要（冗余字段，避免列表查询加载 framework_data）
+    total_concepts: int = Field(default=0, description="概念总数")
+    stages_count: int = Field(default=0, description="阶段数量")
+    stage_summaries: Optional[list] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+        description="阶段摘要：[{name, description, order}]"
+    )
+    concept_index: Optional[dict] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+        description="概念索引：{concept_id: [stage 下标, module 下标, concept 下标]}"
+    )
+    
     created_at: datetime = Field(
         default_factory=beijing_now,
         sa_column=Column(DateTime(timezone=False))  # 无时区，直接存储北京时间
     )
+    updated_at: Optional[datetime] = Field(
+        default_factory=beijing_now,
+        sa_column=Column(DateTime(timezone=False), nullable=True),
+        description="framework_data 最后修改时间"
+    )
     
     # 软删除字段
     deleted_at: Optional[datetime] = Field(
@@ -168,6 +242,14 @@ class RoadmapMetadata(SQLModel, table=True):
         default=None,
         description="删除操作的用户 ID"
     )
+    
+    def refresh_summary(self) -> None:
+        """根据 framework_data 重新计算摘要字段和概念索引，并更新 updated_at"""
+        framework_data = self.framework_data or {}
+        for key, value in summarize_framework(framework_data).items():
+            setattr(self, key, value)
+        self.concept_index = build_concept_index(framework_data)
+        self.updated_at = beijing_now()
 
 
 class ConceptMetadata(SQLModel, table=True):
@@ -469,8 +551,24 @@ class ExecutionLog(SQLModel, table=True):
     - info: 正常执行信息
     - warning: 警告（可恢复的问题）
     - error: 错误（导致失败的问题）
+    
+    存储：
+    - 按 created_at 月度范围分区（execution_logs_pYYYYMM），保留期外的分区整体删除
+      （见 app.db.execution_log_partitions），主键为 (id, created_at)
+    - 只保留两个索引：(task_id, created_at) 支撑按任务查询和时间排序，
+      level = 'error' 的部分索引支撑错误查询；其余列不建索引，降低写入成本
     """
     __tablename__ = "execution_logs"
+    __table_args__ = (
+        Index("ix_execution_logs_task_created", "task_id", "created_at"),
+        Index(
+            "ix_execution_logs_task_errors",
+            "task_id",
+            "created_at",
+            postgresql_where=text("level = 'error'"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()),
@@ -478,15 +576,15 @@ class ExecutionLog(SQLModel, table=True):
     )
     
     # 关联字段
-    task_id: str = Field(index=True, description="任务 ID")
-    roadmap_id: Optional[str] = Field(default=None, index=True, description="路线图 ID")
-    concept_id: Optional[str] = Field(default=None, index=True, description="概念 ID")
+    task_id: str = Field(description="任务 ID")
+    roadmap_id: Optional[str] = Field(default=None, description="路线图 ID")
+    concept_id: Optional[str] = Field(default=None, description="概念 ID")
     
     # 日志分类
-    level: str = Field(default="info", index=True, description="日志级别: debug, info, warning, error")
-    category: str = Field(index=True, description="日志分类: workflow, agent, tool, database")
-    step: Optional[str] = Field(default=None, index=True, description="当前步骤")
-    agent_name: Optional[str] = Field(default=None, index=True, description="Agent 名称")
+    level: str = Field(default="info", description="日志级别: debug, info, warning, error")
+    category: str = Field(description="日志分类: workflow, agent, tool, database")
+    step: Optional[str] = Field(default=None, description="当前步骤")
+    agent_name: Optional[str] = Field(default=None, description="Agent 名称")
     
     # 日志内容
     message: str = Field(sa_column=Column(Text), description="日志消息")
@@ -499,10 +597,10 @@ class ExecutionLog(SQLModel, table=True):
     # 性能指标
     duration_ms: Optional[int] = Field(default=None, description="执行耗时（毫秒）")
     
-    # 时间戳
+    # 时间戳（分区键，属于主键）
     created_at: datetime = Field(
         default_factory=beijing_now,
-        sa_column=Column(DateTime(timezone=False))
+        sa_column=Column(DateTime(timezone=False), primary_key=True, nullable=False)
     )
 
 
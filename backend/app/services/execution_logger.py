@@ -12,6 +12,12 @@
 - 本地缓冲区减少 Celery 任务数量
 - API 兼容性：所有方法签名保持不变
 
+吞吐优化：
+- log() 只追加到本地环形缓冲区（有上限，满时丢弃最旧日志并计数），不做任何 I/O
+- 后台刷新协程按数量（EXECUTION_LOG_BATCH_SIZE）或时间（EXECUTION_LOG_FLUSH_INTERVAL_SECONDS）
+  触发发送；apply_async 是同步的 Broker 往返，放到线程中执行，不阻塞事件循环
+- 发送失败的批次放回缓冲区头部，下一个周期重试
+
 使用示例：
     ```python
     from app.services.execution_logger import execution_logger
@@ -41,16 +47,31 @@
     )
     ```
 """
-from typing import Optional
+from collections import deque
+from typing import Any, Optional
 import time
 import asyncio
 from contextlib import asynccontextmanager
 import structlog
 
+from app.config.settings import settings
 from app.models.database import ExecutionLog, beijing_now
+from app.utils.metrics import counter, gauge
 
 logger = structlog.get_logger()
 
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+execution_logs_dropped = counter(
+    "execution_logs_dropped_total",
+    "Number of execution logs dropped because the local buffer was full",
+)
+execution_log_buffer_size = gauge(
+    "execution_log_buffer_size",
+    "Number of execution logs waiting in the local buffer",
+)
+
 
 class LogLevel:
     """日志级别常量"""
@@ -78,19 +99,32 @@ class ExecutionLogger:
     支持所有工作流节点和重试场景。
     
     架构：
-    - 本地缓冲区：减少 Celery 任务数量
-    - 批量发送：达到阈值或超时时发送
-    - 异步处理：不阻塞主流程
+    - 本地环形缓冲区：有上限，满时丢弃最旧日志（dropped 计数）
+    - 后台刷新协程：达到批量大小或刷新间隔时发送
+    - 线程中发送：Broker 往返不阻塞事件循环
     - 降级保护：发送失败时重新入队
+    
+    后台刷新协程绑定到首次写日志的事件循环；Celery Worker 中运行在 Worker 持久循环上，
+    检测到事件循环变化时重建。
     """
     
     def __init__(self):
-        # 本地缓冲区：减少 Celery 任务数量
-        self._log_buffer: list[dict] = []
-        self._buffer_size = 50  # 本地缓冲区大小
-        self._flush_interval = 2.0  # 2 秒刷新一次
-        self._last_flush_time = time.time()
-        self._flush_lock = asyncio.Lock()  # 防止并发刷新
+        self._batch_size = settings.EXECUTION_LOG_BATCH_SIZE
+        self._flush_interval = settings.EXECUTION_LOG_FLUSH_INTERVAL_SECONDS
+        self._log_buffer: deque[dict] = deque(maxlen=settings.EXECUTION_LOG_BUFFER_MAX_SIZE)
+        
+        # 事件循环绑定的状态（首次写日志时创建）
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._flusher: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._flush_lock: asyncio.Lock | None = None  # 同一时刻只有一个发送者
+        
+        # 统计
+        self.enqueued = 0
+        self.sent = 0
+        self.batches_sent = 0
+        self.send_failures = 0
+        self.dropped = 0
     
     async def log(
         self,
@@ -108,8 +142,8 @@ class ExecutionLogger:
         """
         写入执行日志（异步，非阻塞）
         
-        将日志数据放入本地缓冲区，达到批量大小或超时时，
-        发送到 Celery 任务队列。
+        将日志数据放入本地缓冲区，由后台刷新协程在达到批量大小或超时时
+        发送到 Celery 任务队列。本方法不做任何 I/O。
         
         支持所有场景：
         - 工作流节点日志（IntentAnalysis, CurriculumDesign, Validation 等）
@@ -148,63 +182,167 @@ class ExecutionLogger:
             "created_at": beijing_now(),
         }
         
-        # 添加到本地缓冲区
-        async with self._flush_lock:
-            self._log_buffer.append(log_data)
-            
-            # 检查是否需要刷新
-            current_time = time.time()
-            should_flush = (
-                len(self._log_buffer) >= self._buffer_size or
-                (current_time - self._last_flush_time) >= self._flush_interval
-            )
-            
-            if should_flush:
-                await self._flush_to_celery()
+        self._enqueue(log_data)
         
         # 返回模拟的 ExecutionLog 对象（保持 API 兼容性）
         # 注意：实际写入是异步的，这个对象可能还没有数据库 ID
         return ExecutionLog(**log_data)
     
-    async def _flush_to_celery(self):
-        """将缓冲区中的日志发送到 Celery"""
-        if not self._log_buffer:
-            return
+    def _enqueue(self, log_data: dict) -> None:
+        """追加到环形缓冲区并按需唤醒刷新协程"""
+        if len(self._log_buffer) == self._log_buffer.maxlen:
+            # deque 满时 append 会挤掉最旧的一条
+            self._count_dropped(1)
+        self._log_buffer.append(log_data)
+        self.enqueued += 1
         
-        batch = self._log_buffer.copy()
-        self._log_buffer.clear()
-        self._last_flush_time = time.time()
+        self._ensure_flusher()
+        if len(self._log_buffer) >= self._batch_size:
+            self._wakeup.set()
+    
+    def _count_dropped(self, count: int) -> None:
+        self.dropped += count
+        execution_logs_dropped.inc(count)
+    
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        """绑定到当前事件循环（循环变化时重建循环相关状态）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._flusher = None
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        return loop
+    
+    def _ensure_flusher(self) -> None:
+        """确保当前事件循环上有后台刷新协程"""
+        loop = self._bind_loop()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._run_flusher())
+    
+    async def _run_flusher(self) -> None:
+        """后台刷新协程：数量触发（被唤醒）或时间触发（等待超时）"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            try:
+                await self._drain()
+            except Exception as e:
+                logger.warning(
+                    "execution_logger_flush_loop_error",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+    
+    async def _drain(self) -> None:
+        """按批发送缓冲区中的全部日志（发送失败时停止，等待下一个周期）"""
+        async with self._flush_lock:
+            while self._log_buffer:
+                if not await self._flush_to_celery():
+                    break
+            execution_log_buffer_size.set(len(self._log_buffer))
+    
+    async def _flush_to_celery(self) -> bool:
+        """
+        将缓冲区头部的一批日志发送到 Celery
+        
+        Returns:
+            是否发送成功
+        """
+        batch_len = min(self._batch_size, len(self._log_buffer))
+        batch = [self._log_buffer.popleft() for _ in range(batch_len)]
+        if not batch:
+            return True
         
-        # 发送到 Celery（非阻塞）
         try:
-            # 延迟导入避免循环依赖
-            from app.tasks.log_tasks import batch_write_logs
-            
-            # 使用 apply_async 异步发送，不等待结果
-            batch_write_logs.apply_async(
-                args=[batch],
-                queue="logs",
-            )
+            # apply_async 是同步的 Broker 往返，放到线程中执行
+            await asyncio.to_thread(self._publish, batch)
         except Exception as e:
+            self.send_failures += 1
             logger.warning(
                 "execution_logger_celery_send_failed",
                 error=str(e),
                 batch_size=len(batch),
                 error_type=type(e).__name__,
             )
-            # 发送失败时的降级方案：重新放入缓冲区
-            # 这样不会丢失日志，但可能导致内存增长
-            self._log_buffer.extend(batch)
+            # 发送失败的降级方案：放回缓冲区头部（缓冲区放不下的部分丢弃最旧日志）
+            self._requeue(batch)
+            return False
+        
+        self.sent += len(batch)
+        self.batches_sent += 1
+        return True
+    
+    @staticmethod
+    def _publish(batch: list[dict]) -> None:
+        """发送一批日志到 Celery logs 队列（在线程中执行）"""
+        # 延迟导入避免循环依赖
+        from app.tasks.log_tasks import batch_write_logs
+        
+        batch_write_logs.apply_async(
+            args=[batch],
+            queue="logs",
+        )
+    
+    def _requeue(self, batch: list[dict]) -> None:
+        """发送失败的批次放回缓冲区头部，保持原有顺序"""
+        room = self._log_buffer.maxlen - len(self._log_buffer)
+        if room < len(batch):
+            self._count_dropped(len(batch) - room)
+            batch = batch[len(batch) - room:]
+        self._log_buffer.extendleft(reversed(batch))
     
     async def flush(self):
         """
         立即刷新所有待发送的日志
         
-        用于应用关闭时确保所有日志都被发送。
+        用于工作流阶段结束和应用关闭时确保日志都被发送。
         """
-        async with self._flush_lock:
-            if self._log_buffer:
-                await self._flush_to_celery()
+        if not self._log_buffer:
+            return
+        self._bind_loop()
+        await self._drain()
+    
+    async def stop(self):
+        """停止后台刷新协程并发送剩余日志（应用关闭时调用）"""
+        if self._flusher is not None and self._loop is asyncio.get_running_loop():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        await self.flush()
+    
+    def reset(self) -> None:
+        """
+        重置缓冲区和事件循环绑定状态
+        
+        ⚠️ Celery Worker 子进程初始化时调用：丢弃继承自父进程的缓冲区（由父进程负责发送）
+        和绑定到父进程事件循环的刷新协程引用。
+        """
+        self._log_buffer.clear()
+        self._loop = None
+        self._flusher = None
+        self._wakeup = None
+        self._flush_lock = None
+    
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓冲与发送统计"""
+        return {
+            "buffered": len(self._log_buffer),
+            "buffer_max_size": self._log_buffer.maxlen,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "batches_sent": self.batches_sent,
+            "send_failures": self.send_failures,
+            "dropped": self.dropped,
+            "flusher_running": self._flusher is not None and not self._flusher.done(),
+        }
     
     # ============================================================
     # 便捷方法：按日志级别（保持不变，内部调用 log()）
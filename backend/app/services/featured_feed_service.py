@@ -0,0 +1,328 @@
+"""
+精选路线图 Feed 物化缓存
+
+问题背景：
+- /featured/roadmaps 是首页公开接口，每次请求都按邮箱查找 Featured 用户并查询其路线图列表
+
+设计说明：
+- Feed（路线图摘要列表 + ETag）物化到 Redis，首页请求只读取一个 Redis 键
+- 失效：SQLAlchemy Session 钩子在事务提交后检测 RoadmapMetadata 的新增/修改/删除
+  （保存、软删除、恢复、永久删除都会触发），写入失效标记；覆盖 API 进程和 Celery Worker
+- stale-while-revalidate：Feed 过期（失效标记晚于构建开始时间，或超过
+  FEATURED_FEED_FRESH_SECONDS）时仍返回旧 Feed，同时后台重建（Redis 锁保证只有一个进程重建）
+- 冷启动（Redis 中没有 Feed）时同步构建
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any
+
+import structlog
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.models.database import RoadmapMetadata, User
+from app.utils.metrics import counter
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+featured_feed_lookups = counter(
+    "featured_feed_lookups_total",
+    "Number of featured roadmaps feed lookups",
+    labelnames=["result"],  # hit / stale / miss / error
+)
+
+# Redis 键
+FEED_KEY = "featured_feed:v1"
+STALE_MARKER_KEY = "featured_feed:stale_at"
+REBUILD_LOCK_KEY = "featured_feed:rebuild_lock"
+
+# 后台重建锁过期时间（秒），防止重建进程崩溃后锁无法释放
+_REBUILD_LOCK_TTL_SECONDS = 60
+
+# Session.info 中记录待失效用户 ID 的键
+_PENDING_USERS_INFO_KEY = "featured_feed_pending_user_ids"
+
+
+class FeaturedFeedService:
+    """
+    精选路线图 Feed 服务（Redis 物化，跨进程共享）
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.rebuilds = 0
+        self.invalidations = 0
+        # 最近一次构建/读取到的 Featured 用户 ID（用于过滤无关用户的失效通知）
+        self._featured_user_id: str | None = None
+        self._rebuild_task: asyncio.Task | None = None
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.FEATURED_FEED_CACHE_ENABLED
+
+    def _record(self, result: str) -> None:
+        featured_feed_lookups.labels(result=result).inc()
+
+    # ============================================================
+    # 读取
+    # ============================================================
+
+    async def get_feed(self, db: AsyncSession) -> tuple[dict | None, str]:
+        """
+        获取 Feed
+
+        Args:
+            db: 数据库会话（仅在未命中或禁用缓存时使用）
+
+        Returns:
+            (Feed, 缓存状态)；缓存状态为 hit / stale / miss / bypass。
+            Featured 用户不存在时 Feed 为 None。
+        """
+        if not self.enabled:
+            return await self.build_feed(db), "bypass"
+
+        try:
+            await redis_client.connect()
+            raw_feed, stale_marker = await redis_client._client.mget(FEED_KEY, STALE_MARKER_KEY)
+        except Exception as e:
+            self.errors += 1
+            self._record("error")
+            logger.warning("featured_feed_get_failed", error=str(e))
+            return await self.build_feed(db), "miss"
+
+        if raw_feed:
+            feed = json.loads(raw_feed)
+            self._featured_user_id = feed["featured_user_id"]
+            if self._is_fresh(feed, stale_marker):
+                self.hits += 1
+                self._record("hit")
+                return feed, "hit"
+
+            self.stale_hits += 1
+            self._record("stale")
+            self._schedule_rebuild()
+            return feed, "stale"
+
+        self.misses += 1
+        self._record("miss")
+        feed = await self.build_feed(db)
+        if feed is not None:
+            await self._store(feed)
+        return feed, "miss"
+
+    @staticmethod
+    def _is_fresh(feed: dict, stale_marker: str | None) -> bool:
+        """构建开始时间晚于最近一次失效，且未超过 FEATURED_FEED_FRESH_SECONDS"""
+        if stale_marker is not None and float(stale_marker) >= feed["built_from"]:
+            return False
+        return time.time() - feed["built_at"] < settings.FEATURED_FEED_FRESH_SECONDS
+
+    # ============================================================
+    # 构建
+    # ============================================================
+
+    async def build_feed(self, db: AsyncSession) -> dict | None:
+        """
+        从数据库构建 Feed（概念数和阶段摘要来自 RoadmapMetadata 摘要列）
+
+        Returns:
+            Feed 字典；Featured 用户不存在时返回 None
+        """
+        # 记录构建开始时间：开始之后提交的修改会使本次构建结果过期
+        built_from = time.time()
+
+        result = await db.execute(
+            select(User).where(User.email == settings.FEATURED_USER_EMAIL)
+        )
+        featured_user = result.scalar_one_or_none()
+        if not featured_user:
+            logger.warning("featured_user_not_found", email=settings.FEATURED_USER_EMAIL)
+            return None
+
+        from app.db.repositories.roadmap_repo import RoadmapRepository
+
+        repo = RoadmapRepository(db)
+        roadmaps = await repo.get_roadmaps_by_user(
+            featured_user.id,
+            limit=settings.FEATURED_FEED_MAX_ITEMS,
+            offset=0,
+        )
+
+        # 批量获取所有路线图的 Task（解决 N+1 查询问题）
+        tasks_by_roadmap = await repo.get_tasks_by_roadmap_ids_batch(
+            [r.roadmap_id for r in roadmaps]
+        )
+
+        items = []
+        for roadmap in roadmaps:
+            task = tasks_by_roadmap.get(roadmap.roadmap_id)
+            topic = None
+            if task and task.user_request:
+                learning_goal = task.user_request.get("preferences", {}).get("learning_goal", "")
+                topic = learning_goal.lower()[:50] if learning_goal else None
+
+            # Featured 路线图默认为 completed 状态，不显示完成进度
+            items.append({
+                "roadmap_id": roadmap.roadmap_id,
+                "title": roadmap.title,
+                "created_at": roadmap.created_at.isoformat() if roadmap.created_at else "",
+                "total_concepts": roadmap.total_concepts,
+                "completed_concepts": 0,
+                "topic": topic,
+                "status": "completed",
+                "stages": roadmap.stage_summaries or None,
+            })
+
+        payload = json.dumps(
+            {"user_id": featured_user.id, "email": featured_user.email, "roadmaps": items},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        self._featured_user_id = featured_user.id
+
+        logger.info(
+            "featured_feed_built",
+            user_id=featured_user.id,
+            count=len(items),
+            duration_ms=int((time.time() - built_from) * 1000),
+        )
+        return {
+            "etag": hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32],
+            "built_from": built_from,
+            "built_at": time.time(),
+            "featured_user_id": featured_user.id,
+            "featured_user_email": featured_user.email,
+            "roadmaps": items,
+        }
+
+    async def _store(self, feed: dict) -> None:
+        try:
+            await redis_client.set_json(
+                FEED_KEY, feed, ex=settings.FEATURED_FEED_MAX_STALE_SECONDS
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning("featured_feed_store_failed", error=str(e))
+
+    def _schedule_rebuild(self) -> None:
+        """后台重建（进程内去重）"""
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            return
+        self._rebuild_task = asyncio.create_task(self._rebuild_in_background())
+
+    async def _rebuild_in_background(self) -> None:
+        """持有 Redis 锁时重建 Feed（跨进程去重）"""
+        from app.db.session import safe_session
+
+        try:
+            await redis_client.connect()
+            acquired = await redis_client._client.set(
+                REBUILD_LOCK_KEY, "1", nx=True, ex=_REBUILD_LOCK_TTL_SECONDS
+            )
+            if not acquired:
+                return
+            try:
+                async with safe_session() as session:
+                    feed = await self.build_feed(session)
+                if feed is not None:
+                    await self._store(feed)
+                    self.rebuilds += 1
+            finally:
+                await redis_client._client.delete(REBUILD_LOCK_KEY)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("featured_feed_rebuild_failed", error=str(e), error_type=type(e).__name__)
+
+    # ============================================================
+    # 失效
+    # ============================================================
+
+    async def invalidate(self) -> None:
+        """写入失效标记（下一次请求返回旧 Feed 并触发后台重建）"""
+        try:
+            await redis_client.connect()
+            await redis_client._client.set(
+                STALE_MARKER_KEY, time.time(), ex=settings.FEATURED_FEED_MAX_STALE_SECONDS
+            )
+            self.invalidations += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("featured_feed_invalidate_failed", error=str(e))
+
+    def notify_roadmaps_changed(self, user_ids: set[str]) -> None:
+        """
+        路线图变更通知（事务提交后调用，同步上下文）
+
+        已知 Featured 用户 ID 且变更与其无关时忽略；未知时（如 Celery Worker）一律失效。
+        """
+        if self._featured_user_id is not None and self._featured_user_id not in user_ids:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.invalidate())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "rebuilds": self.rebuilds,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+# 全局单例
+featured_feed_service = FeaturedFeedService()
+
+
+# ============================================================
+# Session 钩子（事务提交后失效 Feed）
+# ============================================================
+
+def _track_roadmap_changes(session: Session, flush_context) -> None:
+    """flush 后记录本事务中变更的路线图所属用户"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, RoadmapMetadata):
+            session.info.setdefault(_PENDING_USERS_INFO_KEY, set()).add(obj.user_id)
+
+
+def _on_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_USERS_INFO_KEY, None)
+    if user_ids:
+        featured_feed_service.notify_roadmaps_changed(user_ids)
+
+
+def _on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_USERS_INFO_KEY, None)
+
+
+def register_featured_feed_invalidation() -> None:
+    """注册 Session 钩子（幂等，API 启动和 Worker 进程初始化时调用）"""
+    for name, fn in (
+        ("after_flush", _track_roadmap_changes),
+        ("after_commit", _on_commit),
+        ("after_rollback", _on_rollback),
+    ):
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
@@ -0,0 +1,149 @@
+"""
+路线图框架进程内缓存
+
+问题背景：
+- 概念级读取（重试单个概念、Mentor 查询概念信息、获取路线图详情）每次都重新加载
+  framework_data JSON，并按 stages → modules → concepts 嵌套遍历查找概念
+
+设计说明：
+- 以 roadmap_id 为键缓存解析后的框架快照，命中前先查询 updated_at（只读一列），
+  版本一致才使用缓存；framework_data 的所有写入都会更新 updated_at
+- 快照携带 concept_index（concept_id → 路径），概念查找为 O(1)
+- 快照只读：需要修改框架时用 copy_with_concept_overrides 按路径浅拷贝
+"""
+import copy
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.repositories.roadmap_meta_repo import RoadmapMetadataRepository
+from app.models.database import build_concept_index
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class FrameworkSnapshot:
+    """路线图框架快照（只读）"""
+    roadmap_id: str
+    user_id: str
+    updated_at: datetime
+    framework_data: dict
+    concept_index: dict
+
+    def find_concept(self, concept_id: str) -> tuple[dict, dict, dict] | None:
+        """
+        按索引定位概念
+
+        Returns:
+            (stage, module, concept) 字典；概念不存在时返回 None
+        """
+        position = self.concept_index.get(concept_id)
+        if position is None:
+            return None
+        stage_idx, module_idx, concept_idx = position
+        stage = self.framework_data["stages"][stage_idx]
+        module = stage["modules"][module_idx]
+        return stage, module, module["concepts"][concept_idx]
+
+    def copy_with_concept_overrides(self, overrides: dict[str, dict]) -> dict:
+        """
+        返回合并了概念字段覆盖的框架副本
+
+        只拷贝被覆盖概念所在路径上的容器，其余部分与快照共享（调用方不得修改）。
+
+        Args:
+            overrides: concept_id → 要覆盖的字段
+
+        Returns:
+            新的 framework_data 字典
+        """
+        framework = dict(self.framework_data)
+        stages = framework["stages"] = list(framework.get("stages", []))
+        copied_stages: set[int] = set()
+        copied_modules: set[tuple[int, int]] = set()
+
+        for concept_id, fields in overrides.items():
+            position = self.concept_index.get(concept_id)
+            if position is None:
+                continue
+            stage_idx, module_idx, concept_idx = position
+
+            if stage_idx not in copied_stages:
+                stage = stages[stage_idx] = dict(stages[stage_idx])
+                stage["modules"] = list(stage["modules"])
+                copied_stages.add(stage_idx)
+            modules = stages[stage_idx]["modules"]
+
+            if (stage_idx, module_idx) not in copied_modules:
+                module = modules[module_idx] = dict(modules[module_idx])
+                module["concepts"] = list(module["concepts"])
+                copied_modules.add((stage_idx, module_idx))
+            concepts = modules[module_idx]["concepts"]
+
+            concepts[concept_idx] = {**concepts[concept_idx], **fields}
+
+        return framework
+
+
+class FrameworkCache:
+    """
+    路线图框架 LRU 缓存（进程内，按 updated_at 校验版本）
+    """
+
+    def __init__(self):
+        self._cache: TTLCache[FrameworkSnapshot] = TTLCache(
+            max_entries=settings.FRAMEWORK_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.FRAMEWORK_CACHE_TTL_SECONDS,
+        )
+        self.stale = 0
+
+    async def get(self, session: AsyncSession, roadmap_id: str) -> FrameworkSnapshot | None:
+        """
+        获取框架快照
+
+        Args:
+            session: 数据库会话
+            roadmap_id: 路线图 ID
+
+        Returns:
+            框架快照；路线图不存在时返回 None
+        """
+        repo = RoadmapMetadataRepository(session)
+        version = await repo.get_framework_version(roadmap_id)
+        if version is None:
+            self._cache.delete(roadmap_id)
+            return None
+
+        snapshot = self._cache.get(roadmap_id)
+        if snapshot is not None and snapshot.updated_at == version:
+            return snapshot
+        if snapshot is not None:
+            self.stale += 1
+
+        metadata = await repo.get_by_roadmap_id(roadmap_id)
+        if metadata is None:
+            return None
+
+        # 与 ORM 对象解耦，避免同一会话中对 framework_data 的修改污染缓存
+        framework_data = copy.deepcopy(metadata.framework_data or {})
+        snapshot = FrameworkSnapshot(
+            roadmap_id=roadmap_id,
+            user_id=metadata.user_id,
+            updated_at=metadata.updated_at or datetime.min,
+            framework_data=framework_data,
+            # 历史数据没有索引时现场构建
+            concept_index=metadata.concept_index or build_concept_index(framework_data),
+        )
+        self._cache.set(roadmap_id, snapshot)
+        return snapshot
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        return {**self._cache.get_stats(), "stale": self.stale}
+
+
+# 全局单例
+framework_cache = FrameworkCache()
@@ -0,0 +1,230 @@
+"""
+伴学对话上下文组装
+
+问题背景：
+- 每轮 /mentor/chat/stream 在调用 LLM 前依次打开多个数据库会话：创建会话、保存用户消息、
+  读取历史消息，再通过 GetRoadmapMetadataTool（调用两次）、GetConceptTutorialTool、
+  GetUserProfileTool 各自打开会话查询学习上下文
+
+设计说明：
+- 每轮对话只使用一个数据库会话：会话查询/创建、保存用户消息、读取历史消息后一次提交，
+  再读取学习上下文
+- 教程摘要和用户画像每轮都可能变化，合并为一条 SELECT（标量子查询）读取
+- 路线图标题和概念名称/描述几乎不变，按 roadmap_id 缓存在进程内（短 TTL），
+  命中时不查询路线图
+"""
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import structlog
+from sqlalchemy import Text, cast, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.repositories.chat_repo import ChatRepository
+from app.db.repositories.roadmap_meta_repo import RoadmapMetadataRepository
+from app.models.database import TutorialMetadata, UserProfile
+from app.models.domain import ChatMessage
+from app.utils.ttl_cache import TTLCache
+
+logger = structlog.get_logger()
+
+# 作为对话上下文的历史消息条数（包含本轮用户消息）
+HISTORY_LIMIT = 10
+
+
+@dataclass(frozen=True)
+class RoadmapContext:
+    """路线图的不变上下文（标题与概念信息）"""
+    title: Optional[str]
+    # concept_id → (name, description)
+    concepts: dict[str, tuple[str, str]]
+
+
+@dataclass
+class LearningTurnContext:
+    """一轮伴学对话的上下文"""
+    session_id: str
+    history: list[ChatMessage]
+    # MentorAgentInput 的上下文字段（roadmap_title、concept_name 等）
+    context: dict[str, Any] = field(default_factory=dict)
+
+
+class LearningContextService:
+    """伴学对话上下文组装服务"""
+
+    def __init__(self):
+        self._roadmaps: TTLCache[RoadmapContext] = TTLCache(
+            max_entries=settings.MENTOR_CONTEXT_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.MENTOR_CONTEXT_CACHE_TTL_SECONDS,
+        )
+
+    async def prepare_turn(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        roadmap_id: str,
+        concept_id: Optional[str],
+        message: str,
+        session_id: Optional[str] = None,
+    ) -> Optional[LearningTurnContext]:
+        """
+        准备一轮对话：获取或创建会话、保存用户消息、读取历史消息和学习上下文
+
+        Args:
+            session: 数据库会话（本方法负责提交）
+            user_id: 用户 ID
+            roadmap_id: 路线图 ID
+            concept_id: 当前概念 ID
+            message: 用户消息
+            session_id: 已有会话 ID（为空时创建新会话）
+
+        Returns:
+            对话上下文；session_id 对应的会话不存在时返回 None
+        """
+        chat_repo = ChatRepository(session)
+
+        if session_id:
+            chat_session = await chat_repo.get_session(session_id)
+            if not chat_session:
+                return None
+        else:
+            chat_session = await chat_repo.create_session(
+                user_id=user_id,
+                roadmap_id=roadmap_id,
+                concept_id=concept_id,
+            )
+
+        await chat_repo.create_message(
+            session_id=chat_session.session_id,
+            role="user",
+            content=message,
+        )
+
+        # 查询前自动 flush，历史消息包含本轮用户消息
+        history = [
+            ChatMessage(
+                message_id=msg.message_id,
+                session_id=msg.session_id,
+                role=msg.role,
+                content=msg.content,
+                intent_type=msg.intent_type,
+                created_at=msg.created_at,
+            )
+            for msg in await chat_repo.get_recent_messages(chat_session.session_id, limit=HISTORY_LIMIT)
+        ]
+
+        await session.commit()
+
+        # 提交后再读取上下文：上下文查询失败不影响已保存的用户消息
+        context = await self._load_context(session, user_id, roadmap_id, concept_id)
+
+        return LearningTurnContext(
+            session_id=chat_session.session_id,
+            history=history,
+            context=context,
+        )
+
+    async def _load_context(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        roadmap_id: str,
+        concept_id: Optional[str],
+    ) -> dict[str, Any]:
+        """读取学习上下文（失败时返回已获取的部分，不影响对话）"""
+        context: dict[str, Any] = {}
+
+        try:
+            roadmap = await self.get_roadmap_context(session, roadmap_id)
+            if roadmap is not None:
+                context["roadmap_title"] = roadmap.title
+                if concept_id and concept_id in roadmap.concepts:
+                    context["concept_name"], context["concept_description"] = roadmap.concepts[concept_id]
+        except Exception as e:
+            logger.warning("learning_context_roadmap_failed", roadmap_id=roadmap_id, error=str(e))
+            # 失败的查询会使事务进入 aborted 状态，回滚后才能继续读取（本轮写入已提交）
+            try:
+                await session.rollback()
+            except Exception as rollback_error:
+                logger.warning("learning_context_rollback_failed", error=str(rollback_error))
+
+        try:
+            row = (await session.execute(self._per_turn_query(user_id, roadmap_id, concept_id))).one()
+            if row.tutorial_summary:
+                context["tutorial_summary"] = row.tutorial_summary
+            context["user_background"] = f"{row.industry or ''} {row.current_role or ''}".strip() or None
+            context["user_level"] = "intermediate" if row.has_tech_stack else "beginner"
+        except Exception as e:
+            logger.warning("learning_context_profile_failed", user_id=user_id, error=str(e))
+
+        return context
+
+    @staticmethod
+    def _per_turn_query(user_id: str, roadmap_id: str, concept_id: Optional[str]):
+        """教程摘要与用户画像（一条 SELECT，每个字段一个标量子查询）"""
+        tutorial_summary = (
+            select(TutorialMetadata.summary)
+            .where(
+                TutorialMetadata.roadmap_id == roadmap_id,
+                TutorialMetadata.concept_id == concept_id,
+                TutorialMetadata.is_latest == True,
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        def profile_column(column):
+            return select(column).where(UserProfile.user_id == user_id).scalar_subquery()
+
+        return select(
+            tutorial_summary.label("tutorial_summary"),
+            profile_column(UserProfile.industry).label("industry"),
+            profile_column(UserProfile.current_role).label("current_role"),
+            # 只需要判断技术栈是否为空，不读取完整 JSON
+            profile_column(
+                cast(UserProfile.tech_stack, Text).notin_(["[]", "null"])
+            ).label("has_tech_stack"),
+        )
+
+    async def get_roadmap_context(
+        self,
+        session: AsyncSession,
+        roadmap_id: str,
+    ) -> Optional[RoadmapContext]:
+        """
+        获取路线图标题与概念信息（进程内短 TTL 缓存）
+
+        Returns:
+            路线图上下文；路线图不存在时返回 None
+        """
+        cached = self._roadmaps.get(roadmap_id)
+        if cached is not None:
+            return cached
+
+        from app.services.framework_cache import framework_cache
+
+        roadmap = await RoadmapMetadataRepository(session).get_summary_by_roadmap_id(roadmap_id)
+        if roadmap is None:
+            return None
+
+        concepts: dict[str, tuple[str, str]] = {}
+        snapshot = await framework_cache.get(session, roadmap_id)
+        if snapshot is not None:
+            for concept_id in snapshot.concept_index:
+                located = snapshot.find_concept(concept_id)
+                if located:
+                    concept = located[2]
+                    concepts[concept_id] = (concept.get("name", ""), concept.get("description", ""))
+
+        context = RoadmapContext(title=roadmap.title, concepts=concepts)
+        self._roadmaps.set(roadmap_id, context)
+        return context
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        return self._roadmaps.get_stats()
+
+
+# 全局单例
+learning_context_service = LearningContextService()
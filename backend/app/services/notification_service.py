@@ -15,6 +15,12 @@ Concept 级别事件：
 - concept_failed: 概念内容生成失败
 - batch_start: 批次处理开始
 - batch_complete: 批次处理完成
+
+可回放模式（NOTIFICATION_STREAM_ENABLED）：
+- 每个事件先 XADD 到任务的 Redis Stream（按 MAXLEN 截断，带 TTL），
+  Stream 消息 ID 作为 event_id 随 Pub/Sub 事件一起推送
+- 客户端重连时携带 last_event_id，通过 read_events_since() 增量补齐错过的事件，
+  无需从数据库重建状态
 """
 from typing import AsyncIterator, Optional
 from datetime import datetime
@@ -23,11 +29,15 @@ import asyncio
 import traceback
 import structlog
 
+from app.config.settings import settings
 from app.db.redis_client import redis_client
 from app.models.database import beijing_now
 
 logger = structlog.get_logger()
 
+# 事件日志写入超时（秒），小于发布整体超时，写入卡住时仍能发布
+STREAM_WRITE_TIMEOUT_SECONDS = 2.0
+
 
 def format_error_for_notification(
     error: Exception | str,
@@ -85,6 +95,28 @@ def format_error_for_notification(
 # Redis 频道前缀
 CHANNEL_PREFIX = "roadmap:task:"
 
+# Redis Stream 键前缀（可回放事件日志，NOTIFICATION_STREAM_ENABLED 时启用）
+STREAM_PREFIX = "roadmap:events:"
+
+
+def parse_stream_id(event_id: str | None) -> tuple[int, int] | None:
+    """
+    解析 Redis Stream 消息 ID（"<毫秒时间戳>-<序号>"）为可比较的元组
+    
+    Args:
+        event_id: Stream 消息 ID
+        
+    Returns:
+        (毫秒时间戳, 序号)，格式无效时返回 None
+    """
+    if not event_id:
+        return None
+    try:
+        ms, _, seq = event_id.partition("-")
+        return int(ms), int(seq or 0)
+    except ValueError:
+        return None
+
 
 class TaskEvent:
     """任务事件类型常量"""
@@ -147,6 +179,10 @@ class NotificationService:
         """获取任务对应的 Redis 频道名"""
         return f"{CHANNEL_PREFIX}{task_id}"
     
+    def _get_stream_key(self, task_id: str) -> str:
+        """获取任务对应的 Redis Stream 键名"""
+        return f"{STREAM_PREFIX}{task_id}"
+    
     async def _ensure_connected(self):
         """确保 Redis 连接"""
         await redis_client.connect()
@@ -580,13 +616,11 @@ class NotificationService:
             await self._ensure_connected()
             channel = self._get_channel(task_id)
             
-            message = json.dumps(event, ensure_ascii=False)
-            
             # 添加超时保护：5秒超时
             # 注意：在异常处理上下文中，asyncio.wait_for 可能触发事件循环冲突
             # 因此需要捕获 RuntimeError
             await asyncio.wait_for(
-                redis_client._client.publish(channel, message),
+                self._append_and_publish(task_id, channel, event),
                 timeout=5.0
             )
             
@@ -620,6 +654,112 @@ class NotificationService:
                 error=str(e),
             )
     
+    async def _append_and_publish(self, task_id: str, channel: str, event: dict):
+        """
+        写入事件日志（可选）并发布到 Pub/Sub 频道
+        
+        启用 Stream 模式时，先 XADD 获取消息 ID 作为 event_id，
+        保证实时推送的事件与回放的事件使用同一 ID，客户端可据此去重和续传。
+        事件日志写入是尽力而为：失败或超时时仍发布（不带 event_id），
+        实时推送不依赖事件日志。
+        """
+        if settings.NOTIFICATION_STREAM_ENABLED:
+            event_id = await self._append_to_stream(task_id, event)
+            if event_id is not None:
+                # 复制后再添加 event_id，不修改调用方的事件
+                event = {**event, "event_id": event_id}
+        
+        await redis_client._client.publish(channel, json.dumps(event, ensure_ascii=False))
+    
+    async def _append_to_stream(self, task_id: str, event: dict) -> str | None:
+        """
+        写入任务事件日志
+        
+        Returns:
+            Stream 消息 ID；写入失败或超时返回 None
+        """
+        client = redis_client._client
+        stream_key = self._get_stream_key(task_id)
+        
+        async def append() -> str:
+            event_id = await client.xadd(
+                stream_key,
+                {"data": json.dumps(event, ensure_ascii=False)},
+                maxlen=settings.NOTIFICATION_STREAM_MAXLEN,
+                approximate=True,
+            )
+            await client.expire(stream_key, settings.NOTIFICATION_STREAM_TTL_SECONDS)
+            if isinstance(event_id, bytes):
+                event_id = event_id.decode("utf-8")
+            return event_id
+        
+        try:
+            # 独立超时，为发布保留时间（外层整体超时 5 秒）
+            return await asyncio.wait_for(append(), timeout=STREAM_WRITE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(
+                "notification_stream_append_failed",
+                task_id=task_id,
+                event_type=event.get("type"),
+                error=str(e) or type(e).__name__,
+            )
+            return None
+    
+    async def read_events_since(
+        self,
+        task_id: str,
+        last_event_id: str | None = None,
+        count: int | None = None,
+    ) -> list[dict]:
+        """
+        从事件日志读取指定 ID 之后的事件（用于断线重连补齐）
+        
+        Args:
+            task_id: 任务 ID
+            last_event_id: 客户端最后收到的 event_id（None 表示从头读取）
+            count: 最多返回的事件数（默认不限制，受 MAXLEN 约束）
+            
+        Returns:
+            事件列表（按发布顺序，每个事件包含 event_id）；未启用 Stream 模式时返回空列表
+        """
+        if not settings.NOTIFICATION_STREAM_ENABLED:
+            return []
+        
+        await self._ensure_connected()
+        stream_key = self._get_stream_key(task_id)
+        
+        # XRANGE 起点包含 last_event_id 本身，读取后跳过（兼容不支持 "(" 排他区间的 Redis）
+        start = last_event_id if parse_stream_id(last_event_id) else "-"
+        entries = await redis_client._client.xrange(stream_key, min=start, max="+", count=count)
+        
+        events = []
+        for entry_id, fields in entries:
+            if isinstance(entry_id, bytes):
+                entry_id = entry_id.decode("utf-8")
+            if entry_id == last_event_id:
+                continue
+            
+            data = fields.get("data") if isinstance(fields, dict) else None
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            try:
+                event = json.loads(data) if data else None
+            except json.JSONDecodeError:
+                event = None
+            if not event:
+                continue
+            
+            event["event_id"] = entry_id
+            events.append(event)
+        
+        logger.debug(
+            "notification_events_replayed",
+            task_id=task_id,
+            last_event_id=last_event_id,
+            count=len(events),
+        )
+        return events
+    
     async def subscribe(self, task_id: str) -> AsyncIterator[dict]:
         """
         订阅任务事件流
@@ -707,6 +847,62 @@ class NotificationService:
                 task_id=task_id,
             )
     
+    async def listen_all_tasks(self) -> AsyncIterator[tuple[str, dict]]:
+        """
+        模式订阅所有任务频道（roadmap:task:*）
+        
+        每个 API 进程只需一个该订阅（一个 Redis 连接），由调用方按 task_id
+        分发到内存队列，避免每个 WebSocket 各自占用一个 Pub/Sub 连接。
+        
+        使用带超时的 get_message 轮询而非 listen()，空闲期间不会触发 socket 超时。
+        
+        Yields:
+            (task_id, 事件字典)
+        """
+        await self._ensure_connected()
+        pattern = f"{CHANNEL_PREFIX}*"
+        pubsub = redis_client._client.pubsub()
+        
+        try:
+            await pubsub.psubscribe(pattern)
+            logger.info("notification_pattern_subscribed", pattern=pattern)
+            
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=1.0,
+                )
+                if message is None or message.get("type") != "pmessage":
+                    continue
+                
+                channel = message["channel"]
+                data = message["data"]
+                # Redis 返回的可能是 bytes 或 str
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError as e:
+                    logger.warning(
+                        "notification_message_decode_error",
+                        channel=channel,
+                        error=str(e),
+                    )
+                    continue
+                
+                yield channel[len(CHANNEL_PREFIX):], event
+        
+        finally:
+            try:
+                await pubsub.punsubscribe(pattern)
+                await pubsub.close()
+            except Exception as e:
+                logger.debug("notification_pattern_unsubscribe_failed", error=str(e))
+            logger.info("notification_pattern_unsubscribed", pattern=pattern)
+    
     async def subscribe_with_timeout(
         self,
         task_id: str,
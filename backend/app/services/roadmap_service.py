@@ -401,11 +401,13 @@ class RoadmapService:
         Returns:
             路线图框架字典（包含 concept_metadata 状态），如果不存在则返回 None
         """
+        from app.services.framework_cache import framework_cache
+        
         async with self.repo_factory.create_session() as session:
-            roadmap_repo = self.repo_factory.create_roadmap_meta_repo(session)
-            metadata = await roadmap_repo.get_by_roadmap_id(roadmap_id)
+            # 框架快照（进程内缓存，updated_at 未变时不重新加载 framework_data）
+            snapshot = await framework_cache.get(session, roadmap_id)
             
-            if not metadata:
+            if not snapshot:
                 return None
             
             # 获取所有 concept_metadata
@@ -413,37 +415,31 @@ class RoadmapService:
             concept_meta_repo = ConceptMetadataRepository(session)
             concept_metas = await concept_meta_repo.get_by_roadmap_id(roadmap_id)
         
-        # 构建 concept_id -> ConceptMetadata 映射
-        concept_meta_map = {cm.concept_id: cm for cm in concept_metas}
-        
-        # 从 JSON 数据重建 RoadmapFramework
-        framework_data = metadata.framework_data.copy()
+        # 使用 concept_metadata 中的真实状态覆盖 framework_data 中的状态
+        overrides = {}
+        for concept_meta in concept_metas:
+            fields = {
+                "content_status": concept_meta.tutorial_status,
+                "resources_status": concept_meta.resources_status,
+                "quiz_status": concept_meta.quiz_status,
+                "overall_status": concept_meta.overall_status,
+            }
+            # 同时更新 ID 引用（确保一致性）
+            if concept_meta.tutorial_id:
+                fields["tutorial_id"] = concept_meta.tutorial_id
+            if concept_meta.resources_id:
+                fields["resources_id"] = concept_meta.resources_id
+            if concept_meta.quiz_id:
+                fields["quiz_id"] = concept_meta.quiz_id
+            overrides[concept_meta.concept_id] = fields
         
-        # 合并 concept_metadata 的 overall_status 到 framework_data
-        for stage in framework_data.get("stages", []):
-            for module in stage.get("modules", []):
-                for concept in module.get("concepts", []):
-                    concept_id = concept.get("concept_id")
-                    if concept_id and concept_id in concept_meta_map:
-                        concept_meta = concept_meta_map[concept_id]
-                        # 使用 concept_metadata 中的真实状态覆盖 framework_data 中的状态
-                        concept["content_status"] = concept_meta.tutorial_status
-                        concept["resources_status"] = concept_meta.resources_status
-                        concept["quiz_status"] = concept_meta.quiz_status
-                        concept["overall_status"] = concept_meta.overall_status
-                        
-                        # 同时更新 ID 引用（确保一致性）
-                        if concept_meta.tutorial_id:
-                            concept["tutorial_id"] = concept_meta.tutorial_id
-                        if concept_meta.resources_id:
-                            concept["resources_id"] = concept_meta.resources_id
-                        if concept_meta.quiz_id:
-                            concept["quiz_id"] = concept_meta.quiz_id
+        # 按概念索引合并（只拷贝被覆盖概念所在路径，缓存中的快照保持不变）
+        framework_data = snapshot.copy_with_concept_overrides(overrides)
         
         logger.info(
             "roadmap_enriched_with_concept_metadata",
             roadmap_id=roadmap_id,
-            concept_count=len(concept_meta_map),
+            concept_count=len(overrides),
         )
         
         return framework_data
@@ -448,14 +448,14 @@ class TaskRecoveryService:
                 error=str(e),
             )
     
-    async def wait_for_all_recoveries(self, timeout: float = 300.0) -> None:
+    async def wait_for_all_recoveries(self, timeout: float | None = 300.0) -> None:
         """
         等待所有恢复任务完成
         
-        主要用于测试和优雅关闭。
+        用于测试、优雅关闭，以及启动恢复任务在持有分布式锁期间等待恢复结束。
         
         Args:
-            timeout: 超时时间（秒）
+            timeout: 超时时间（秒），None 表示一直等待
         """
         if not self._recovery_tasks:
             return
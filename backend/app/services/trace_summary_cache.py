@@ -0,0 +1,119 @@
+"""
+执行日志摘要缓存
+
+问题背景：
+- 管理后台查看 trace 时反复请求 /trace/{task_id}/summary，日志分页也需要总数；
+  已结束任务的日志不再变化，每次都聚合全部日志没有必要
+
+设计说明：
+- 只缓存已结束（completed / failed / partial_failure / cancelled）且结束超过
+  TRACE_SUMMARY_SETTLE_SECONDS 的任务（日志经缓冲区和 Celery 异步写入，结束后仍可能到达）
+- 缓存键包含任务 updated_at：任务被重试时状态更新会改变 updated_at，旧缓存自然失效
+- Redis 存储（多副本共享），不可用时直接查询数据库
+"""
+from datetime import timedelta
+from typing import Any
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.db.repositories.roadmap_repo import RoadmapRepository
+from app.models.database import RoadmapTask, beijing_now
+
+logger = structlog.get_logger()
+
+SUMMARY_KEY_PREFIX = "trace_summary:v1:"
+
+FINISHED_STATUSES = frozenset({"completed", "failed", "partial_failure", "cancelled"})
+
+
+class TraceSummaryCache:
+    """执行日志摘要缓存（仅缓存已结束的任务）"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.errors = 0
+
+    async def _cache_key(self, db: AsyncSession, task_id: str) -> str | None:
+        """已结束且日志已稳定的任务返回缓存键，否则返回 None"""
+        result = await db.execute(
+            select(RoadmapTask.status, RoadmapTask.updated_at).where(RoadmapTask.task_id == task_id)
+        )
+        row = result.one_or_none()
+        if row is None or row.status not in FINISHED_STATUSES or row.updated_at is None:
+            return None
+        if beijing_now() - row.updated_at < timedelta(seconds=settings.TRACE_SUMMARY_SETTLE_SECONDS):
+            return None
+        return f"{SUMMARY_KEY_PREFIX}{task_id}:{row.updated_at.isoformat()}"
+
+    async def _read(self, key: str, task_id: str) -> dict | None:
+        try:
+            cached = await redis_client.get_json(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("trace_summary_cache_get_failed", task_id=task_id, error=str(e))
+            return None
+        if cached is not None:
+            self.hits += 1
+        return cached
+
+    async def get_cached(self, db: AsyncSession, task_id: str) -> dict | None:
+        """
+        只读取已缓存的摘要，不触发聚合查询
+
+        Returns:
+            缓存的摘要；任务不可缓存或缓存未命中时返回 None
+        """
+        key = await self._cache_key(db, task_id)
+        if key is None:
+            return None
+        return await self._read(key, task_id)
+
+    async def get_summary(self, db: AsyncSession, task_id: str) -> dict:
+        """
+        获取执行日志摘要
+
+        Args:
+            db: 数据库会话
+            task_id: 任务 ID
+
+        Returns:
+            摘要字典（结构同 RoadmapRepository.get_execution_logs_summary）
+        """
+        key = await self._cache_key(db, task_id)
+        if key is None:
+            self.uncacheable += 1
+            return await RoadmapRepository(db).get_execution_logs_summary(task_id)
+
+        cached = await self._read(key, task_id)
+        if cached is not None:
+            return cached
+
+        self.misses += 1
+        summary = await RoadmapRepository(db).get_execution_logs_summary(task_id)
+        try:
+            await redis_client.set_json(key, summary, ex=settings.TRACE_SUMMARY_CACHE_TTL_SECONDS)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("trace_summary_cache_set_failed", task_id=task_id, error=str(e))
+        return summary
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+# 全局单例
+trace_summary_cache = TraceSummaryCache()
@@ -1,12 +1,19 @@
 """
 单概念内容生成器
 
-为单个 Concept 串行生成 Tutorial、Resource、Quiz，
-完成后立即写入数据库。
+为单个 Concept 生成 Tutorial、Resource、Quiz，完成后立即写入数据库。
+
+三项内容通过声明式的阶段 DAG 调度：
+- Resource、Quiz 的输入只依赖 Concept、用户偏好和 roadmap_id，不依赖教程输出，
+  因此与 Tutorial 并发执行，单概念耗时约等于最慢的单个 Agent
+- 每个阶段独立失败，失败项按 "concept_id:content_type" 记录（parse_failed_concept 支持）
+- 依赖的上游阶段失败时，下游阶段直接跳过并记为失败
 """
 import asyncio
+import time
 import structlog
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
 
 from app.models.domain import (
     Concept,
@@ -21,6 +28,93 @@ from app.services.execution_logger import execution_logger, LogCategory
 logger = structlog.get_logger()
 
 
+@dataclass
+class ConceptStage:
+    """
+    概念内容生成阶段
+    
+    Attributes:
+        content_type: 内容类型（tutorial / resources / quiz），同时作为阶段名称
+        run: 阶段执行函数，参数为已完成的上游阶段输出 {content_type: output}
+        depends_on: 依赖的上游阶段
+    """
+    content_type: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+
+
+class UpstreamStageFailed(Exception):
+    """上游阶段失败，当前阶段被跳过"""
+
+
+def concept_completion_message(
+    concept_name: str,
+    completed: list[str],
+    failed: list[str],
+) -> tuple[str, str]:
+    """
+    概念完成日志的消息和 log_type
+    
+    Returns:
+        (message, log_type)：全部成功为 concept_completed，部分失败为 concept_partially_completed
+    """
+    if not failed:
+        return f"🎉 All content generated for concept: {concept_name}", "concept_completed"
+    return (
+        f"⚠️ Partial content generated for concept: {concept_name} "
+        f"(completed: {', '.join(completed)}; failed: {', '.join(failed)})",
+        "concept_partially_completed",
+    )
+
+
+async def run_concept_stages(
+    stages: list[ConceptStage],
+) -> tuple[dict[str, Any], dict[str, Exception]]:
+    """
+    按依赖关系并发执行阶段 DAG
+    
+    无依赖关系的阶段同时启动；每个阶段等待其上游阶段完成后再执行。
+    单个阶段的异常不会影响其他无依赖关系的阶段。
+    
+    Args:
+        stages: 阶段列表（依赖必须指向列表中的阶段）
+        
+    Returns:
+        (results, errors)：成功阶段的输出、失败阶段的异常（均按 content_type 索引）
+    """
+    stage_map = {stage.content_type: stage for stage in stages}
+    for stage in stages:
+        unknown = set(stage.depends_on) - stage_map.keys()
+        if unknown:
+            raise ValueError(f"阶段 {stage.content_type} 依赖未知阶段: {sorted(unknown)}")
+    
+    results: dict[str, Any] = {}
+    errors: dict[str, Exception] = {}
+    tasks: dict[str, asyncio.Task] = {}
+    
+    async def run_stage(stage: ConceptStage) -> None:
+        upstream: dict[str, Any] = {}
+        for dep in stage.depends_on:
+            await asyncio.gather(tasks[dep], return_exceptions=True)
+            if dep in errors:
+                errors[stage.content_type] = UpstreamStageFailed(
+                    f"上游阶段 {dep} 失败: {errors[dep]}"
+                )
+                return
+            upstream[dep] = results[dep]
+        
+        try:
+            results[stage.content_type] = await stage.run(upstream)
+        except Exception as e:
+            errors[stage.content_type] = e
+    
+    for stage in stages:
+        tasks[stage.content_type] = asyncio.create_task(run_stage(stage))
+    
+    await asyncio.gather(*tasks.values())
+    return results, errors
+
+
 async def generate_single_concept(
     task_id: str,
     roadmap_id: str,
@@ -38,15 +132,17 @@ async def generate_single_concept(
     results_lock: asyncio.Lock,
     db_semaphore: asyncio.Semaphore,
     allocated_tavily_key: str | None = None,
+    on_tutorial_saved: Callable[[str], Awaitable[Any]] | None = None,
 ) -> None:
     """
-    为单个概念串行生成教程、资源、测验，完成后立即写入数据库
+    为单个概念并发生成教程、资源、测验，完成后立即写入数据库
     
     执行顺序：
-    1. Tutorial Generation（教程生成）
-    2. Resource Recommendation（资源推荐）
-    3. Quiz Generation（测验生成）
-    4. 立即写入数据库（受信号量限制，防止连接池耗尽）
+    1. Tutorial / Resource / Quiz 三个阶段并发执行（阶段 DAG，互不依赖）
+    2. 立即写入成功的内容（受信号量限制，防止连接池耗尽）
+    3. 失败的阶段按 "concept_id:content_type" 记录到 failed_concepts
+    
+    三个阶段全部失败时按整个 Concept 失败处理。
     
     Args:
         task_id: 任务 ID
@@ -65,6 +161,7 @@ async def generate_single_concept(
         results_lock: 结果累积保护锁
         db_semaphore: 数据库操作信号量（限制并发数据库连接数）
         allocated_tavily_key: 预分配的 Tavily API Key（可选，用于优化性能）
+        on_tutorial_saved: 教程写入数据库并提交后的回调（参数为 concept_id，用于首个教程耗时监控）
     """
     concept_id = concept.concept_id
     concept_name = concept.name
@@ -117,102 +214,131 @@ async def generate_single_concept(
     )
     
     try:
-        # ==================== 串行执行：Tutorial → Resource → Quiz ====================
+        # ==================== 阶段 DAG：Tutorial ∥ Resource ∥ Quiz ====================
         
-        # 1️⃣ 生成教程
-        tutorial_agent = agent_factory.create_tutorial_generator()
-        tutorial_input = TutorialGenerationInput(
-            concept=concept,
-            user_preferences=preferences,
-            context={
-                "roadmap_id": roadmap_id,
-                "prerequisite_details": prerequisite_details,
-            },
-        )
-        
-        logger.info(
-            "generating_tutorial",
-            task_id=task_id,
-            concept_id=concept_id,
-            concept_name=concept_name,
-        )
-        
-        tutorial = await tutorial_agent.execute(tutorial_input)
-        
-        logger.info(
-            "tutorial_generated",
-            task_id=task_id,
-            concept_id=concept_id,
-            tutorial_id=tutorial.tutorial_id if tutorial and hasattr(tutorial, 'tutorial_id') else None,
-        )
-        
-        # 2️⃣ 生成资源推荐
-        resource_agent = agent_factory.create_resource_recommender(
-            tavily_key=allocated_tavily_key
-        )
-        resource_input = ResourceRecommendationInput(
-            concept=concept,
-            user_preferences=preferences,
-            context={"roadmap_id": roadmap_id},
-        )
+        async def run_tutorial(upstream: dict[str, Any]) -> Any:
+            tutorial_agent = agent_factory.create_tutorial_generator()
+            tutorial_input = TutorialGenerationInput(
+                concept=concept,
+                user_preferences=preferences,
+                context={
+                    "roadmap_id": roadmap_id,
+                    "prerequisite_details": prerequisite_details,
+                },
+            )
+            
+            logger.info(
+                "generating_tutorial",
+                task_id=task_id,
+                concept_id=concept_id,
+                concept_name=concept_name,
+            )
+            
+            tutorial = await tutorial_agent.execute(tutorial_input)
+            
+            logger.info(
+                "tutorial_generated",
+                task_id=task_id,
+                concept_id=concept_id,
+                tutorial_id=tutorial.tutorial_id if tutorial and hasattr(tutorial, 'tutorial_id') else None,
+            )
+            return tutorial
         
-        logger.info(
-            "generating_resources",
-            task_id=task_id,
-            concept_id=concept_id,
-            concept_name=concept_name,
-        )
+        async def run_resources(upstream: dict[str, Any]) -> Any:
+            resource_agent = agent_factory.create_resource_recommender(
+                tavily_key=allocated_tavily_key
+            )
+            resource_input = ResourceRecommendationInput(
+                concept=concept,
+                user_preferences=preferences,
+                context={"roadmap_id": roadmap_id},
+            )
+            
+            logger.info(
+                "generating_resources",
+                task_id=task_id,
+                concept_id=concept_id,
+                concept_name=concept_name,
+            )
+            
+            resource = await resource_agent.execute(resource_input)
+            
+            logger.info(
+                "resources_generated",
+                task_id=task_id,
+                concept_id=concept_id,
+                resources_count=len(resource.resources) if resource and hasattr(resource, 'resources') else 0,
+            )
+            return resource
         
-        resource = await resource_agent.execute(resource_input)
+        async def run_quiz(upstream: dict[str, Any]) -> Any:
+            quiz_agent = agent_factory.create_quiz_generator()
+            quiz_input = QuizGenerationInput(
+                concept=concept,
+                user_preferences=preferences,
+                context={"roadmap_id": roadmap_id},
+            )
+            
+            logger.info(
+                "generating_quiz",
+                task_id=task_id,
+                concept_id=concept_id,
+                concept_name=concept_name,
+            )
+            
+            quiz = await quiz_agent.execute(quiz_input)
+            
+            logger.info(
+                "quiz_generated",
+                task_id=task_id,
+                concept_id=concept_id,
+                questions_count=len(quiz.questions) if quiz and hasattr(quiz, 'questions') else 0,
+            )
+            return quiz
         
-        logger.info(
-            "resources_generated",
-            task_id=task_id,
-            concept_id=concept_id,
-            resources_count=len(resource.resources) if resource and hasattr(resource, 'resources') else 0,
-        )
+        # Resource / Quiz 的输入不依赖教程输出，三个阶段互不依赖
+        stages = [
+            ConceptStage(content_type="tutorial", run=run_tutorial),
+            ConceptStage(content_type="resources", run=run_resources),
+            ConceptStage(content_type="quiz", run=run_quiz),
+        ]
         
-        # 3️⃣ 生成测验
-        quiz_agent = agent_factory.create_quiz_generator()
-        quiz_input = QuizGenerationInput(
-            concept=concept,
-            user_preferences=preferences,
-            context={"roadmap_id": roadmap_id},
-        )
+        stages_start = time.perf_counter()
+        stage_results, stage_errors = await run_concept_stages(stages)
         
         logger.info(
-            "generating_quiz",
+            "concept_stages_completed",
             task_id=task_id,
             concept_id=concept_id,
-            concept_name=concept_name,
+            succeeded=sorted(stage_results),
+            failed=sorted(stage_errors),
+            duration_seconds=round(time.perf_counter() - stages_start, 2),
         )
         
-        quiz = await quiz_agent.execute(quiz_input)
+        # 全部阶段失败：按整个 Concept 失败处理
+        if not stage_results:
+            raise stage_errors["tutorial"]
         
-        logger.info(
-            "quiz_generated",
-            task_id=task_id,
-            concept_id=concept_id,
-            questions_count=len(quiz.questions) if quiz and hasattr(quiz, 'questions') else 0,
-        )
+        tutorial = stage_results.get("tutorial")
+        resource = stage_results.get("resources")
+        quiz = stage_results.get("quiz")
         
-        # 记录概念完成日志
+        # 记录概念完成日志（部分阶段失败时记为部分完成）
+        completed_content = [stage.content_type for stage in stages if stage.content_type in stage_results]
+        message, log_type = concept_completion_message(concept_name, completed_content, sorted(stage_errors))
         await execution_logger.info(
             task_id=task_id,
             category=LogCategory.WORKFLOW,
             step="content_generation",
             roadmap_id=roadmap_id,
             concept_id=concept_id,
-            message=f"🎉 All content generated for concept: {concept_name}",
+            message=message,
             details={
-                "log_type": "concept_completed",
+                "log_type": log_type,
                 "concept_id": concept_id,
                 "concept_name": concept_name,
-                "completed_content": [
-                    "tutorial" if tutorial else None,
-                    "resources" if resource else None,
-                    "quiz" if quiz else None,
-                ],
+                "completed_content": completed_content,
+                "failed_content": sorted(stage_errors),
             },
         )
         
@@ -226,6 +352,8 @@ async def generate_single_concept(
         
         from app.db.celery_session import celery_safe_session_with_retry as safe_session_with_retry
         
+        tutorial_saved = False
+        
         # 🔧 使用信号量限制并发数据库连接数
         # 防止 30+ 个 Concept 同时打开数据库会话导致连接池耗尽
         async with db_semaphore:
@@ -245,6 +373,7 @@ async def generate_single_concept(
                             tutorial_output=tutorial,
                             roadmap_id=roadmap_id,
                         )
+                        tutorial_saved = True
                         logger.debug(
                             "tutorial_saved",
                             concept_id=concept_id,
@@ -330,18 +459,26 @@ async def generate_single_concept(
             concept_id=concept_id,
         )
         
-        # 发送 WebSocket 事件：概念生成完成
-        await notification_service.publish_concept_complete(
-            task_id=task_id,
-            concept_id=concept_id,
-            concept_name=concept_name,
-            data={
-                "tutorial_id": tutorial.tutorial_id if tutorial and hasattr(tutorial, 'tutorial_id') else None,
-                "resources_count": len(resource.resources) if resource and hasattr(resource, 'resources') else 0,
-                "quiz_questions": len(quiz.questions) if quiz and hasattr(quiz, 'questions') else 0,
-            },
-            content_type="tutorial",
-        )
+        if tutorial_saved and on_tutorial_saved is not None:
+            try:
+                await on_tutorial_saved(concept_id)
+            except Exception as e:
+                logger.warning("tutorial_saved_callback_failed", concept_id=concept_id, error=str(e))
+        
+        # 发送 WebSocket 事件：只为成功的阶段发送完成事件（失败的阶段在下方发送失败事件）
+        completion_data = {
+            "tutorial_id": tutorial.tutorial_id if tutorial and hasattr(tutorial, 'tutorial_id') else None,
+            "resources_count": len(resource.resources) if resource and hasattr(resource, 'resources') else 0,
+            "quiz_questions": len(quiz.questions) if quiz and hasattr(quiz, 'questions') else 0,
+        }
+        for content_type in completed_content:
+            await notification_service.publish_concept_complete(
+                task_id=task_id,
+                concept_id=concept_id,
+                concept_name=concept_name,
+                data=completion_data,
+                content_type=content_type,
+            )
         
         # 🆕 如果三项内容全部完成，发送新的完整完成事件
         if is_all_complete:
@@ -364,6 +501,43 @@ async def generate_single_concept(
                 resource_refs[concept_id] = resource
             if quiz:
                 quiz_refs[concept_id] = quiz
+            # 部分阶段失败：只记录失败的内容类型
+            for content_type in stage_errors:
+                failed_concepts.append(f"{concept_id}:{content_type}")
+        
+        # 记录并通知失败的阶段（其他阶段的内容已保存）
+        for content_type, stage_error in stage_errors.items():
+            logger.error(
+                "concept_stage_failed",
+                task_id=task_id,
+                concept_id=concept_id,
+                content_type=content_type,
+                error=str(stage_error),
+                error_type=type(stage_error).__name__,
+            )
+            await execution_logger.error(
+                task_id=task_id,
+                category=LogCategory.AGENT,
+                step="content_generation",
+                roadmap_id=roadmap_id,
+                concept_id=concept_id,
+                message=f"❌ {content_type} generation failed for concept: {concept_name}",
+                details={
+                    "log_type": "content_generation_failed",
+                    "concept_id": concept_id,
+                    "concept_name": concept_name,
+                    "content_type": content_type,
+                    "error": str(stage_error)[:500],
+                    "error_type": type(stage_error).__name__,
+                },
+            )
+            await notification_service.publish_concept_failed(
+                task_id=task_id,
+                concept_id=concept_id,
+                concept_name=concept_name,
+                error=str(stage_error)[:200],
+                content_type=content_type,
+            )
     
     except Exception as e:
         logger.error(
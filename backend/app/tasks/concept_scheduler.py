@@ -0,0 +1,342 @@
+"""
+概念内容生成优先级调度器
+
+问题背景：
+- 用户从第 1 阶段开始学习，但原实现同时启动所有概念，第一个模块可能最后完成
+- 同一 Worker 事件循环内多个路线图同时生成时，大型路线图会占满并发
+
+调度策略：
+- 优先级（越小越先）：当前查看的概念 → stage.order → 模块顺序 → 前置依赖深度 → 概念顺序
+- 并发上限：每个事件循环最多 CONTENT_GENERATION_MAX_CONCURRENT_CONCEPTS 个概念同时生成
+- 跨路线图公平：空出的并发名额优先分配给当前运行数最少的路线图
+- 查看提示：前端推送用户正在查看的概念（Redis，带 TTL），调度器每次选取时读取
+
+监控指标：
+- 首个教程可用耗时（time-to-first-tutorial）：从开始生成到第一个教程写入数据库
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.models.domain import RoadmapFramework
+from app.services.execution_logger import execution_logger, LogCategory
+from app.utils.metrics import histogram
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+content_time_to_first_tutorial_seconds = histogram(
+    "content_time_to_first_tutorial_seconds",
+    "Time from content generation start until the first tutorial is saved",
+    buckets=[5, 10, 20, 30, 60, 90, 120, 180, 300, 600],
+)
+
+# Redis 键前缀：当前查看的概念提示
+VIEWING_HINT_PREFIX = "content_priority:viewing:"
+
+# 查看提示在调度器内的本地缓存时间（秒），避免每次选取都访问 Redis
+_HINT_REFRESH_SECONDS = 2.0
+
+
+# ============================================================
+# 优先级计算
+# ============================================================
+
+def compute_prerequisite_depths(prerequisites: dict[str, list[str]]) -> dict[str, int]:
+    """
+    计算每个概念的前置依赖深度（无前置依赖为 0）
+
+    忽略不存在的前置概念；存在环时环上的概念按已访问处理，不会无限递归。
+    """
+    depths: dict[str, int] = {}
+    visiting: set[str] = set()
+
+    def depth(concept_id: str) -> int:
+        if concept_id in depths:
+            return depths[concept_id]
+        if concept_id in visiting:
+            return 0
+        visiting.add(concept_id)
+        prereqs = [p for p in prerequisites.get(concept_id, []) if p in prerequisites]
+        result = 1 + max((depth(p) for p in prereqs), default=-1)
+        visiting.discard(concept_id)
+        depths[concept_id] = result
+        return result
+
+    for concept_id in prerequisites:
+        depth(concept_id)
+    return depths
+
+
+def compute_concept_priorities(framework: RoadmapFramework) -> dict[str, tuple[int, int, int, int]]:
+    """
+    计算概念的静态优先级
+
+    Returns:
+        {concept_id: (stage.order, 模块顺序, 前置依赖深度, 概念在模块内的顺序)}
+    """
+    prerequisites = {
+        concept.concept_id: list(concept.prerequisites)
+        for stage in framework.stages
+        for module in stage.modules
+        for concept in module.concepts
+    }
+    depths = compute_prerequisite_depths(prerequisites)
+
+    priorities: dict[str, tuple[int, int, int, int]] = {}
+    for stage in framework.stages:
+        for module_index, module in enumerate(stage.modules):
+            for concept_index, concept in enumerate(module.concepts):
+                priorities[concept.concept_id] = (
+                    stage.order,
+                    module_index,
+                    depths.get(concept.concept_id, 0),
+                    concept_index,
+                )
+    return priorities
+
+
+# ============================================================
+# 查看提示
+# ============================================================
+
+async def set_viewing_hint(roadmap_id: str, concept_id: str) -> None:
+    """记录用户当前查看的概念（前端推送）"""
+    await redis_client.connect()
+    await redis_client._client.set(
+        f"{VIEWING_HINT_PREFIX}{roadmap_id}",
+        concept_id,
+        ex=settings.CONTENT_PRIORITY_HINT_TTL_SECONDS,
+    )
+
+
+async def get_viewing_hint(roadmap_id: str) -> str | None:
+    """读取用户当前查看的概念（Redis 异常时返回 None）"""
+    try:
+        await redis_client.connect()
+        value = await redis_client._client.get(f"{VIEWING_HINT_PREFIX}{roadmap_id}")
+    except Exception as e:
+        logger.warning("content_priority_hint_read_failed", roadmap_id=roadmap_id, error=str(e))
+        return None
+    if isinstance(value, bytes):
+        value = value.decode()
+    return value or None
+
+
+# ============================================================
+# 调度器
+# ============================================================
+
+class ConceptScheduler:
+    """
+    事件循环级概念调度器
+
+    同一事件循环中的所有路线图共享并发名额。
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._condition = asyncio.Condition()
+        # roadmap_id -> 正在运行的概念数
+        self._running: dict[str, int] = {}
+        # roadmap_id -> 正在等待名额的调度协程数
+        self._waiting: dict[str, int] = {}
+        # 释放名额后唤醒等待者的任务（保留引用，防止被回收）
+        self._notify_tasks: set[asyncio.Task] = set()
+
+    @property
+    def total_running(self) -> int:
+        return sum(self._running.values())
+
+    def _is_my_turn(self, roadmap_id: str) -> bool:
+        """名额空出时，运行数最少的等待路线图优先"""
+        if self.max_concurrent > 0 and self.total_running >= self.max_concurrent:
+            return False
+        mine = self._running.get(roadmap_id, 0)
+        return all(
+            mine <= self._running.get(other, 0)
+            for other, count in self._waiting.items()
+            if count > 0
+        )
+
+    async def _acquire(self, roadmap_id: str) -> None:
+        async with self._condition:
+            self._waiting[roadmap_id] = self._waiting.get(roadmap_id, 0) + 1
+            try:
+                await self._condition.wait_for(lambda: self._is_my_turn(roadmap_id))
+            finally:
+                self._waiting[roadmap_id] -= 1
+                if not self._waiting[roadmap_id]:
+                    del self._waiting[roadmap_id]
+            self._running[roadmap_id] = self._running.get(roadmap_id, 0) + 1
+
+    def _release(self, roadmap_id: str) -> None:
+        """
+        释放名额（同步，可在任务完成回调中调用）
+
+        计数立即减少，等待者由单独的任务在持有条件锁时唤醒。
+        """
+        self._running[roadmap_id] -= 1
+        if not self._running[roadmap_id]:
+            del self._running[roadmap_id]
+        task = asyncio.get_running_loop().create_task(self._notify_waiters())
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    async def _notify_waiters(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def run(
+        self,
+        roadmap_id: str,
+        jobs: dict[str, tuple[tuple, Callable[[], Awaitable[Any]]]],
+        on_done: Callable[[str], Awaitable[None] | None] | None = None,
+    ) -> None:
+        """
+        按优先级执行一个路线图的所有概念任务
+
+        Args:
+            roadmap_id: 路线图 ID（跨路线图公平调度的单位）
+            jobs: {concept_id: (优先级, 任务工厂)}
+            on_done: 单个概念任务完成后的回调（参数为 concept_id）
+        """
+        pending = dict(jobs)
+        running: set[asyncio.Task] = set()
+        hint: str | None = None
+        hint_fetched_at = 0.0
+
+        async def run_job(concept_id: str, factory: Callable[[], Awaitable[Any]]) -> None:
+            try:
+                await factory()
+            except Exception as e:
+                logger.error(
+                    "concept_scheduler_job_failed",
+                    roadmap_id=roadmap_id,
+                    concept_id=concept_id,
+                    error=str(e),
+                )
+            if on_done is not None:
+                result = on_done(concept_id)
+                if asyncio.iscoroutine(result):
+                    await result
+
+        try:
+            while pending:
+                await self._acquire(roadmap_id)
+
+                # 名额在任务完成回调中释放：任务在首次执行前被取消时协程内的 finally 不会运行
+                try:
+                    # 获得名额后再选取概念，使用最新的查看提示
+                    if time.monotonic() - hint_fetched_at >= _HINT_REFRESH_SECONDS:
+                        hint = await get_viewing_hint(roadmap_id)
+                        hint_fetched_at = time.monotonic()
+
+                    if hint in pending:
+                        concept_id = hint
+                        logger.info(
+                            "concept_scheduler_hint_prioritized",
+                            roadmap_id=roadmap_id,
+                            concept_id=concept_id,
+                        )
+                    else:
+                        concept_id = min(pending, key=lambda cid: pending[cid][0])
+
+                    _, factory = pending.pop(concept_id)
+                    task = asyncio.create_task(run_job(concept_id, factory))
+                except BaseException:
+                    self._release(roadmap_id)
+                    raise
+                running.add(task)
+                task.add_done_callback(running.discard)
+                task.add_done_callback(lambda _, roadmap_id=roadmap_id: self._release(roadmap_id))
+
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        except BaseException:
+            for task in running:
+                task.cancel()
+            # 等待已取消的任务结束（释放调度名额），不把概念任务留在事件循环上
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            raise
+
+    def get_stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": dict(self._running),
+            "waiting_roadmaps": len(self._waiting),
+        }
+
+
+_schedulers: dict[tuple[int, int], ConceptScheduler] = {}
+
+
+def get_concept_scheduler() -> ConceptScheduler:
+    """
+    获取当前进程、当前事件循环的共享调度器
+
+    Celery Worker 使用持久事件循环，同一进程内的所有内容生成任务共享一个调度器。
+    """
+    key = (os.getpid(), id(asyncio.get_running_loop()))
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        # 丢弃其他进程/事件循环遗留的调度器
+        _schedulers.clear()
+        scheduler = ConceptScheduler(settings.CONTENT_GENERATION_MAX_CONCURRENT_CONCEPTS)
+        _schedulers[key] = scheduler
+    return scheduler
+
+
+class FirstTutorialTracker:
+    """
+    追踪首个教程可用耗时（time-to-first-tutorial）
+    """
+
+    def __init__(self, task_id: str, roadmap_id: str):
+        self.task_id = task_id
+        self.roadmap_id = roadmap_id
+        self.started_at = time.monotonic()
+        self.recorded = False
+
+    async def record(self, concept_id: str) -> float | None:
+        """
+        记录首个教程完成（只记录第一次）
+
+        Returns:
+            首个教程可用耗时（秒）；已记录过时返回 None
+        """
+        if self.recorded:
+            return None
+        self.recorded = True
+        elapsed = time.monotonic() - self.started_at
+
+        content_time_to_first_tutorial_seconds.observe(elapsed)
+        logger.info(
+            "content_first_tutorial_ready",
+            task_id=self.task_id,
+            roadmap_id=self.roadmap_id,
+            concept_id=concept_id,
+            time_to_first_tutorial_seconds=round(elapsed, 2),
+        )
+        await execution_logger.info(
+            task_id=self.task_id,
+            category=LogCategory.WORKFLOW,
+            step="content_generation",
+            roadmap_id=self.roadmap_id,
+            concept_id=concept_id,
+            message=f"First tutorial ready after {elapsed:.1f}s",
+            details={
+                "log_type": "first_tutorial_ready",
+                "time_to_first_tutorial_seconds": round(elapsed, 2),
+            },
+            duration_ms=int(elapsed * 1000),
+        )
+        return elapsed
@@ -9,9 +9,16 @@
 - Celery Worker：独立进程执行内容生成（30+ 概念并发，90+ LLM 调用）
 - Redis Queue：解耦两个进程，确保可靠性
 
+执行模式：
+- 进程内模式（默认）：一个任务在单个 Worker 事件循环中生成所有概念，
+  由 ConceptScheduler 按阶段顺序调度（当前查看的概念优先），同一事件循环内的路线图公平共享并发
+- 分片模式（CONTENT_GENERATION_SHARDING_ENABLED）：按概念分片为 chord 子任务，
+  由所有 content_generation Worker 并行执行，finalize_content_shards 合并结果
+
 模块拆分：
-- content_generation_tasks.py: 主任务入口和并行生成逻辑
+- content_generation_tasks.py: 主任务入口、并行生成逻辑和分片任务
 - concept_generator.py: 单概念内容生成
+- concept_scheduler.py: 概念优先级调度
 - content_retry_tasks.py: 重试任务
 - content_utils.py: 工具函数
 """
@@ -20,6 +27,7 @@ import structlog
 from typing import Any
 
 from app.core.celery_app import celery_app
+from app.config.settings import settings
 from app.models.domain import RoadmapFramework, LearningPreferences, Concept
 # 使用 Celery 专用的数据库连接管理，避免 Fork 进程继承问题
 from app.db.celery_session import CeleryRepositoryFactory
@@ -27,15 +35,43 @@ from app.services.notification_service import notification_service
 
 # 从工具模块导入
 from app.tasks.content_utils import (
+    parse_failed_concept,
     run_async,
+    run_async_cancel_on_interrupt,
     update_framework_with_content_refs,
 )
 
 # 从概念生成器导入
 from app.tasks.concept_generator import generate_single_concept
+from app.tasks.concept_scheduler import (
+    FirstTutorialTracker,
+    compute_concept_priorities,
+    get_concept_scheduler,
+)
 
 logger = structlog.get_logger()
 
+# 🔧 数据库连接限制：最多 8 个并发数据库操作（全量模式与分片模式共用）
+# 
+# ⚠️ 关键约束：
+# - NullPool 模式（默认）下每个会话新建连接，上限由数据库 max_connections 决定
+# - 持久连接池模式（CELERY_DB_POOL_ENABLED）下每个子进程最多
+#   CELERY_DB_POOL_SIZE + CELERY_DB_MAX_OVERFLOW 个连接（默认 2 + 3 = 5）
+# - 必须为其他操作（任务状态更新、概念失败标记等）预留连接，
+#   否则这些会话排队超过 pool_timeout（60 秒）后写入失败
+#
+# 持久连接池模式下：并发数 = min(8, 连接池容量 - 预留连接数)，至少为 1
+MAX_DB_CONCURRENT = 8
+DB_RESERVED_CONNECTIONS = 2
+
+
+def get_max_db_concurrent() -> int:
+    """获取当前 Worker 允许的并发数据库写入数（持久连接池模式下按连接池容量推导）"""
+    if not settings.CELERY_DB_POOL_ENABLED:
+        return MAX_DB_CONCURRENT
+    pool_capacity = settings.CELERY_DB_POOL_SIZE + settings.CELERY_DB_MAX_OVERFLOW
+    return max(1, min(MAX_DB_CONCURRENT, pool_capacity - DB_RESERVED_CONNECTIONS))
+
 
 @celery_app.task(
     name="app.tasks.content_generation_tasks.generate_roadmap_content",
@@ -96,8 +132,9 @@ def generate_roadmap_content(
             "celery_content_generation_task_completed",
             task_id=task_id,
             roadmap_id=roadmap_id,
-            tutorial_count=result["tutorial_count"],
-            failed_count=result["failed_count"],
+            mode=result.get("mode", "in_process"),
+            tutorial_count=result.get("tutorial_count"),
+            failed_count=result.get("failed_count"),
         )
         
         return result
@@ -112,28 +149,33 @@ def generate_roadmap_content(
         )
         
         # 更新任务状态为 failed
-        try:
-            from app.db.celery_session import celery_safe_session_with_retry as safe_session_with_retry
-            from app.db.repositories.task_repo import TaskRepository
-            
-            async def _update_failed_status():
-                async with safe_session_with_retry() as session:
-                    task_repo = TaskRepository(session)
-                    await task_repo.update_task_status(
-                        task_id=task_id,
-                        status="failed",
-                        current_step="content_generation",
-                        error_message=str(e)[:500],
-                    )
-                    await session.commit()
-            
-            run_async(_update_failed_status())
-        except Exception as update_error:
-            logger.error("failed_to_update_task_status", task_id=task_id, error=str(update_error))
+        _mark_task_failed(task_id, e)
         
         raise
 
 
+def _mark_task_failed(task_id: str, error: Exception) -> None:
+    """将任务状态更新为 failed（失败只记录日志）"""
+    try:
+        from app.db.celery_session import celery_safe_session_with_retry as safe_session_with_retry
+        from app.db.repositories.task_repo import TaskRepository
+        
+        async def _update_failed_status():
+            async with safe_session_with_retry() as session:
+                task_repo = TaskRepository(session)
+                await task_repo.update_task_status(
+                    task_id=task_id,
+                    status="failed",
+                    current_step="content_generation",
+                    error_message=str(error)[:500],
+                )
+                await session.commit()
+        
+        run_async(_update_failed_status())
+    except Exception as update_error:
+        logger.error("failed_to_update_task_status", task_id=task_id, error=str(update_error))
+
+
 async def _async_generate_content(
     task_id: str,
     roadmap_id: str,
@@ -154,7 +196,6 @@ async def _async_generate_content(
     """
     from app.agents.factory import get_agent_factory
     from app.core.orchestrator.base import WorkflowConfig
-    from app.services.execution_logger import execution_logger
     
     logger.info(
         "async_content_generation_started",
@@ -219,12 +260,16 @@ async def _async_generate_content(
             if tutorial.content_status == "completed"
         }
     
-    # 4. 过滤：只生成未完成的 Concept
-    pending_concepts = [
-        concept 
-        for concept in all_concepts 
-        if concept.concept_id not in completed_concept_ids
-    ]
+    # 4. 过滤：只生成未完成的 Concept（按阶段顺序、模块顺序、前置依赖深度排序）
+    priorities = compute_concept_priorities(framework)
+    pending_concepts = sorted(
+        (
+            concept
+            for concept in all_concepts
+            if concept.concept_id not in completed_concept_ids
+        ),
+        key=lambda concept: priorities[concept.concept_id],
+    )
     
     skipped_count = len(all_concepts) - len(pending_concepts)
     logger.info(
@@ -256,6 +301,21 @@ async def _async_generate_content(
             "skipped_count": skipped_count,
         }
     
+    # 4.5. 分片模式：大型路线图拆分为多个 Celery 子任务，由所有 Worker 并行处理
+    if (
+        settings.CONTENT_GENERATION_SHARDING_ENABLED
+        and len(pending_concepts) >= settings.CONTENT_GENERATION_SHARD_MIN_CONCEPTS
+    ):
+        return _dispatch_content_shards(
+            task_id=task_id,
+            roadmap_id=roadmap_id,
+            roadmap_framework_data=roadmap_framework_data,
+            user_preferences_data=user_preferences_data,
+            pending_concept_ids=[c.concept_id for c in pending_concepts],
+            total_concepts=total_concepts,
+            skipped_count=skipped_count,
+        )
+    
     # 5. 创建服务和工具
     repo_factory = CeleryRepositoryFactory()
     agent_factory = get_agent_factory()
@@ -289,11 +349,50 @@ async def _async_generate_content(
         preferences=preferences,
         agent_factory=agent_factory,
         key_allocation=key_allocation,
+        priorities=priorities,
     )
     
+    # 7-9. 检查失败率、保存结果、发布完成通知
+    return await _finalize_content_generation(
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        total_concepts=len(all_concepts),
+        attempted_concepts=len(pending_concepts),
+        skipped_count=skipped_count,
+        tutorial_refs=tutorial_refs,
+        resource_refs=resource_refs,
+        quiz_refs=quiz_refs,
+        failed_concepts=failed_concepts,
+        repo_factory=repo_factory,
+    )
+
+
+async def _finalize_content_generation(
+    task_id: str,
+    roadmap_id: str,
+    total_concepts: int,
+    attempted_concepts: int,
+    skipped_count: int,
+    tutorial_refs: dict[str, Any],
+    resource_refs: dict[str, Any],
+    quiz_refs: dict[str, Any],
+    failed_concepts: list[str],
+    repo_factory: Any,
+) -> dict[str, Any]:
+    """
+    内容生成收尾：检查失败率、保存结果、发布完成通知
+    
+    进程内模式和分片模式（finalize_content_shards）共用。
+    
+    Raises:
+        RuntimeError: 失败率超过阈值
+    """
+    from app.services.execution_logger import execution_logger
+    
     # 7. 检查失败率
-    failed_count = len(failed_concepts)
-    attempted_concepts = len(pending_concepts)
+    # failed_concepts 按 "concept_id:content_type" 记录，同一概念可能有多项；
+    # 失败率按存在失败内容的概念数计算
+    failed_count = len({parse_failed_concept(item)[0] for item in failed_concepts})
     success_count = attempted_concepts - failed_count
     failure_rate = failed_count / attempted_concepts if attempted_concepts > 0 else 0
     
@@ -313,7 +412,7 @@ async def _async_generate_content(
             message=f"❌ Content generation aborted: failure rate too high ({failure_rate:.1%})",
             details={
                 "log_type": "content_generation_aborted",
-                "total_concepts": len(all_concepts),
+                "total_concepts": total_concepts,
                 "attempted_concepts": attempted_concepts,
                 "failed_concepts": failed_count,
                 "failure_rate": failure_rate,
@@ -369,16 +468,22 @@ async def _generate_content_parallel(
     preferences: LearningPreferences,
     agent_factory: Any,
     key_allocation: dict[str, str | None],
+    priorities: dict[str, tuple],
 ) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any], list[str]]:
     """
     并行生成所有概念的内容（带数据库连接限制）
     
-    每个概念独立生成（Tutorial → Resource → Quiz），完成后立即写入数据库。
+    每个概念独立生成（Tutorial ∥ Resource ∥ Quiz 并发），完成后立即写入数据库。
+    
+    📋 优先级调度：
+    - 概念按 priorities 顺序启动（阶段 1 的教程最先可用），用户当前查看的概念优先
+    - 同一事件循环内最多 CONTENT_GENERATION_MAX_CONCURRENT_CONCEPTS 个概念同时生成
     
     🔧 连接池保护：
-    - 使用信号量限制并发数据库操作数量
-    - 默认最多 8 个 Concept 同时写入数据库
-    - 防止连接池耗尽（pool_size=10 + max_overflow=5）
+    - 使用信号量限制并发数据库操作数量（见 get_max_db_concurrent）
+    - NullPool 模式下最多 8 个 Concept 同时写入数据库
+    - 持久连接池模式下按 CELERY_DB_POOL_SIZE + CELERY_DB_MAX_OVERFLOW 扣除预留连接，
+      防止状态更新和失败标记会话等待连接池超时
     
     🚀 性能优化：
     - 使用预分配的 Tavily API Keys，避免内容生成过程中的数据库查询
@@ -392,6 +497,7 @@ async def _generate_content_parallel(
         preferences: 用户偏好
         agent_factory: Agent 工厂
         key_allocation: Tavily API Key 预分配映射（concept_id -> api_key）
+        priorities: 概念优先级（concept_id -> 排序键，越小越先）
         
     Returns:
         (tutorial_refs, resource_refs, quiz_refs, failed_concepts)
@@ -406,50 +512,48 @@ async def _generate_content_parallel(
     failed_concepts: list[str] = []
     results_lock = asyncio.Lock()
     
-    # 🔧 数据库连接限制：最多 8 个并发数据库操作
-    # 
-    # ⚠️ 关键约束：
-    # - 每个进程的连接池现在有 10 个连接（pool_size=5 + max_overflow=5）
-    # - 必须为其他操作（状态更新、日志等）预留连接
-    # - MAX_DB_CONCURRENT 必须 < 每进程连接池大小
-    #
-    # 公式：MAX_DB_CONCURRENT = pool_size × 80% (留 20% 给其他操作)
-    # 优化后: 10 × 80% = 8
-    MAX_DB_CONCURRENT = 8
-    db_semaphore = asyncio.Semaphore(MAX_DB_CONCURRENT)
+    # 数据库连接限制（见 get_max_db_concurrent）
+    max_db_concurrent = get_max_db_concurrent()
+    db_semaphore = asyncio.Semaphore(max_db_concurrent)
     
     logger.info(
         "content_generation_parallel_config",
         task_id=task_id,
         total_concepts=total_concepts,
-        max_db_concurrent=MAX_DB_CONCURRENT,
-        message=f"限制最多 {MAX_DB_CONCURRENT} 个 Concept 同时写入数据库（进程池连接数有限）",
+        max_db_concurrent=max_db_concurrent,
+        message=f"限制最多 {max_db_concurrent} 个 Concept 同时写入数据库（进程池连接数有限）",
     )
     
-    # 并发执行所有概念的内容生成
-    tasks = [
-        generate_single_concept(
-            task_id=task_id,
-            roadmap_id=roadmap_id,
-            concept=concept,
-            concept_map=concept_map,
-            preferences=preferences,
-            agent_factory=agent_factory,
-            total_concepts=total_concepts,
-            progress_counter=progress_counter,
-            progress_lock=progress_lock,
-            tutorial_refs=tutorial_refs,
-            resource_refs=resource_refs,
-            quiz_refs=quiz_refs,
-            failed_concepts=failed_concepts,
-            results_lock=results_lock,
-            db_semaphore=db_semaphore,  # 传递信号量
-            allocated_tavily_key=key_allocation.get(concept.concept_id),  # 传递预分配的 Tavily Key
+    # 按优先级调度所有概念的内容生成，首个教程写入数据库时记录耗时
+    first_tutorial_tracker = FirstTutorialTracker(task_id, roadmap_id)
+    
+    jobs = {
+        concept.concept_id: (
+            priorities.get(concept.concept_id, ()),
+            lambda concept=concept: generate_single_concept(
+                task_id=task_id,
+                roadmap_id=roadmap_id,
+                concept=concept,
+                concept_map=concept_map,
+                preferences=preferences,
+                agent_factory=agent_factory,
+                total_concepts=total_concepts,
+                progress_counter=progress_counter,
+                progress_lock=progress_lock,
+                tutorial_refs=tutorial_refs,
+                resource_refs=resource_refs,
+                quiz_refs=quiz_refs,
+                failed_concepts=failed_concepts,
+                results_lock=results_lock,
+                db_semaphore=db_semaphore,  # 传递信号量
+                allocated_tavily_key=key_allocation.get(concept.concept_id),  # 传递预分配的 Tavily Key
+                on_tutorial_saved=first_tutorial_tracker.record,
+            ),
         )
         for concept in concepts
-    ]
+    }
     
-    await asyncio.gather(*tasks, return_exceptions=True)
+    await get_concept_scheduler().run(roadmap_id, jobs)
     
     logger.info(
         "content_generation_parallel_completed",
@@ -720,6 +824,374 @@ async def _save_content_results(
     )
 
 
+# ============================================================
+# 分片模式：按概念分片的 Celery group + chord
+# ============================================================
+
+def _dispatch_content_shards(
+    task_id: str,
+    roadmap_id: str,
+    roadmap_framework_data: dict,
+    user_preferences_data: dict,
+    pending_concept_ids: list[str],
+    total_concepts: int,
+    skipped_count: int,
+) -> dict[str, Any]:
+    """
+    将待生成概念按 CONTENT_GENERATION_SHARD_SIZE 分片，以 chord 方式分发
+    
+    每个分片是一个 generate_content_shard 子任务，可由任意 content_generation Worker 执行；
+    全部分片完成后由 finalize_content_shards 合并结果并执行失败率检查；
+    分片在 Celery 层面失败（硬超时被杀、结果后端异常）时 chord 回调不会执行，
+    由 fail_content_shards 将任务标记为失败。
+    
+    Returns:
+        分发摘要（父任务立即返回，不等待分片完成）
+    """
+    from celery import chord, group
+    
+    shard_size = max(1, settings.CONTENT_GENERATION_SHARD_SIZE)
+    shards = [
+        pending_concept_ids[i:i + shard_size]
+        for i in range(0, len(pending_concept_ids), shard_size)
+    ]
+    
+    header = group(
+        generate_content_shard.s(
+            task_id=task_id,
+            roadmap_id=roadmap_id,
+            roadmap_framework_data=roadmap_framework_data,
+            user_preferences_data=user_preferences_data,
+            concept_ids=shard_concept_ids,
+            progress_offset=index * shard_size,
+            total_concepts=len(pending_concept_ids),
+        )
+        for index, shard_concept_ids in enumerate(shards)
+    )
+    callback = finalize_content_shards.s(
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        total_concepts=total_concepts,
+        attempted_concepts=len(pending_concept_ids),
+        skipped_count=skipped_count,
+    )
+    callback.link_error(fail_content_shards.s(task_id=task_id, roadmap_id=roadmap_id))
+    chord_result = chord(header)(callback)
+    
+    logger.info(
+        "content_generation_shards_dispatched",
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        pending_concepts=len(pending_concept_ids),
+        shard_count=len(shards),
+        shard_size=shard_size,
+        finalizer_task_id=chord_result.id,
+    )
+    
+    return {
+        "mode": "sharded",
+        "shard_count": len(shards),
+        "shard_size": shard_size,
+        "attempted_count": len(pending_concept_ids),
+        "skipped_count": skipped_count,
+        "finalizer_task_id": chord_result.id,
+    }
+
+
+def _serialize_refs(refs: dict[str, Any]) -> dict[str, dict]:
+    """将内容输出模型序列化为 JSON 兼容字典（chord 结果使用 JSON 序列化）"""
+    return {concept_id: output.model_dump(mode="json") for concept_id, output in refs.items()}
+
+
+@celery_app.task(
+    name="app.tasks.content_generation_tasks.generate_content_shard",
+    queue="content_generation",
+    bind=True,
+    max_retries=0,
+    time_limit=1800,  # 30 分钟硬超时（单个分片只包含少量概念）
+    soft_time_limit=1700,
+    acks_late=True,
+)
+def generate_content_shard(
+    self,
+    task_id: str,
+    roadmap_id: str,
+    roadmap_framework_data: dict,
+    user_preferences_data: dict,
+    concept_ids: list[str],
+    progress_offset: int,
+    total_concepts: int,
+) -> dict[str, Any]:
+    """
+    生成一个分片内概念的内容（chord 子任务）
+    
+    生成过程中的异常（包括软超时）不向外抛出：未完成的概念记为失败项返回，
+    由 chord 回调统一判断失败率。硬超时被杀或结果后端异常时 chord 回调不会执行，
+    由 link_error 回调 fail_content_shards 标记任务失败。
+    
+    Returns:
+        {"tutorial_refs", "resource_refs", "quiz_refs", "failed_concepts"}（JSON 兼容）
+    """
+    tutorial_refs: dict[str, Any] = {}
+    resource_refs: dict[str, Any] = {}
+    quiz_refs: dict[str, Any] = {}
+    failed_concepts: list[str] = []
+    
+    try:
+        # 软超时打断时取消仍在运行的概念任务，避免其在本 Worker 的下一个任务中继续运行
+        run_async_cancel_on_interrupt(
+            _async_generate_shard(
+                task_id=task_id,
+                roadmap_id=roadmap_id,
+                roadmap_framework_data=roadmap_framework_data,
+                user_preferences_data=user_preferences_data,
+                concept_ids=concept_ids,
+                progress_offset=progress_offset,
+                total_concepts=total_concepts,
+                tutorial_refs=tutorial_refs,
+                resource_refs=resource_refs,
+                quiz_refs=quiz_refs,
+                failed_concepts=failed_concepts,
+            )
+        )
+    except Exception as e:
+        # 包括 SoftTimeLimitExceeded：保留已完成的结果，其余内容记为失败
+        logger.error(
+            "content_shard_failed",
+            task_id=task_id,
+            roadmap_id=roadmap_id,
+            celery_task_id=self.request.id,
+            concept_count=len(concept_ids),
+            error=str(e)[:500],
+            error_type=type(e).__name__,
+        )
+        for concept_id in concept_ids:
+            for content_type, refs in (
+                ("tutorial", tutorial_refs),
+                ("resources", resource_refs),
+                ("quiz", quiz_refs),
+            ):
+                failed_item = f"{concept_id}:{content_type}"
+                if concept_id not in refs and failed_item not in failed_concepts:
+                    failed_concepts.append(failed_item)
+    
+    logger.info(
+        "content_shard_completed",
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        celery_task_id=self.request.id,
+        concept_count=len(concept_ids),
+        tutorial_count=len(tutorial_refs),
+        failed_items=len(failed_concepts),
+    )
+    
+    return {
+        "tutorial_refs": _serialize_refs(tutorial_refs),
+        "resource_refs": _serialize_refs(resource_refs),
+        "quiz_refs": _serialize_refs(quiz_refs),
+        "failed_concepts": failed_concepts,
+    }
+
+
+async def _async_generate_shard(
+    task_id: str,
+    roadmap_id: str,
+    roadmap_framework_data: dict,
+    user_preferences_data: dict,
+    concept_ids: list[str],
+    progress_offset: int,
+    total_concepts: int,
+    tutorial_refs: dict[str, Any],
+    resource_refs: dict[str, Any],
+    quiz_refs: dict[str, Any],
+    failed_concepts: list[str],
+) -> None:
+    """
+    分片内容生成核心逻辑（异步）
+    
+    结果直接累积到调用方传入的字典/列表中，超时中断时已完成的部分不会丢失。
+    """
+    from app.agents.factory import get_agent_factory
+    from app.services.tavily_key_allocator import allocate_keys_for_concepts
+    
+    framework = RoadmapFramework.model_validate(roadmap_framework_data)
+    preferences = LearningPreferences.model_validate(user_preferences_data)
+    
+    concept_map: dict[str, Concept] = {
+        concept.concept_id: concept
+        for stage in framework.stages
+        for module in stage.modules
+        for concept in module.concepts
+    }
+    concepts = [concept_map[cid] for cid in concept_ids if cid in concept_map]
+    
+    key_allocation = await allocate_keys_for_concepts(
+        concept_ids=[c.concept_id for c in concepts],
+        min_quota=4,
+    )
+    
+    # 进度编号从分片偏移量开始，各分片的编号互不重叠
+    progress_counter = {"current": progress_offset}
+    progress_lock = asyncio.Lock()
+    results_lock = asyncio.Lock()
+    db_semaphore = asyncio.Semaphore(get_max_db_concurrent())
+    agent_factory = get_agent_factory()
+    
+    # 待生成概念已按优先级排序后分片，首个分片包含最先需要的概念，只在首个分片中记录首个教程耗时
+    on_tutorial_saved = None
+    if progress_offset == 0:
+        on_tutorial_saved = FirstTutorialTracker(task_id, roadmap_id).record
+    
+    priorities = compute_concept_priorities(framework)
+    jobs = {
+        concept.concept_id: (
+            priorities.get(concept.concept_id, ()),
+            lambda concept=concept: generate_single_concept(
+                task_id=task_id,
+                roadmap_id=roadmap_id,
+                concept=concept,
+                concept_map=concept_map,
+                preferences=preferences,
+                agent_factory=agent_factory,
+                total_concepts=total_concepts,
+                progress_counter=progress_counter,
+                progress_lock=progress_lock,
+                tutorial_refs=tutorial_refs,
+                resource_refs=resource_refs,
+                quiz_refs=quiz_refs,
+                failed_concepts=failed_concepts,
+                results_lock=results_lock,
+                db_semaphore=db_semaphore,
+                allocated_tavily_key=key_allocation.get(concept.concept_id),
+                on_tutorial_saved=on_tutorial_saved,
+            ),
+        )
+        for concept in concepts
+    }
+    
+    await get_concept_scheduler().run(roadmap_id, jobs)
+
+
+@celery_app.task(
+    name="app.tasks.content_generation_tasks.finalize_content_shards",
+    queue="content_generation",
+    bind=True,
+    max_retries=0,
+    acks_late=True,
+)
+def finalize_content_shards(
+    self,
+    shard_results: list[dict[str, Any]],
+    task_id: str,
+    roadmap_id: str,
+    total_concepts: int,
+    attempted_concepts: int,
+    skipped_count: int,
+) -> dict[str, Any]:
+    """
+    合并所有分片结果并收尾（chord 回调）
+    
+    合并后的引用通过 update_framework_with_content_refs 写回 framework，
+    并执行与进程内模式相同的失败率阈值检查。
+    """
+    from app.models.domain import (
+        TutorialGenerationOutput,
+        ResourceRecommendationOutput,
+        QuizGenerationOutput,
+    )
+    
+    tutorial_refs: dict[str, Any] = {}
+    resource_refs: dict[str, Any] = {}
+    quiz_refs: dict[str, Any] = {}
+    failed_concepts: list[str] = []
+    
+    for shard in shard_results:
+        for concept_id, data in shard["tutorial_refs"].items():
+            tutorial_refs[concept_id] = TutorialGenerationOutput.model_validate(data)
+        for concept_id, data in shard["resource_refs"].items():
+            resource_refs[concept_id] = ResourceRecommendationOutput.model_validate(data)
+        for concept_id, data in shard["quiz_refs"].items():
+            quiz_refs[concept_id] = QuizGenerationOutput.model_validate(data)
+        failed_concepts.extend(shard["failed_concepts"])
+    
+    logger.info(
+        "content_shards_merging",
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        shard_count=len(shard_results),
+        tutorial_count=len(tutorial_refs),
+        failed_items=len(failed_concepts),
+    )
+    
+    try:
+        return run_async(
+            _finalize_content_generation(
+                task_id=task_id,
+                roadmap_id=roadmap_id,
+                total_concepts=total_concepts,
+                attempted_concepts=attempted_concepts,
+                skipped_count=skipped_count,
+                tutorial_refs=tutorial_refs,
+                resource_refs=resource_refs,
+                quiz_refs=quiz_refs,
+                failed_concepts=failed_concepts,
+                repo_factory=CeleryRepositoryFactory(),
+            )
+        )
+    except Exception as e:
+        logger.error(
+            "content_shards_finalize_failed",
+            task_id=task_id,
+            roadmap_id=roadmap_id,
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+        _mark_task_failed(task_id, e)
+        raise
+
+
+@celery_app.task(
+    name="app.tasks.content_generation_tasks.fail_content_shards",
+    queue="content_generation",
+    max_retries=0,
+)
+def fail_content_shards(
+    request: Any,
+    exc: Exception,
+    traceback: str | None,
+    task_id: str,
+    roadmap_id: str,
+) -> None:
+    """
+    chord 失败回调（link_error）
+    
+    分片在 Celery 层面失败或收尾任务异常时执行：将任务标记为失败并发布失败通知，
+    避免任务永久停留在 processing 状态。
+    """
+    logger.error(
+        "content_shards_chord_failed",
+        task_id=task_id,
+        roadmap_id=roadmap_id,
+        failed_celery_task_id=getattr(request, "id", None),
+        error=str(exc)[:500],
+        error_type=type(exc).__name__,
+    )
+    
+    _mark_task_failed(task_id, exc)
+    
+    try:
+        run_async(
+            notification_service.publish_failed(
+                task_id=task_id,
+                error=str(exc),
+                step="content_generation",
+                exception=exc,
+            )
+        )
+    except Exception as e:
+        logger.error("content_shards_failure_notification_failed", task_id=task_id, error=str(e))
+
+
 @celery_app.task(
     name="app.tasks.content_generation_tasks.retry_failed_content_task",
     queue="content_generation",
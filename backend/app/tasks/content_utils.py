@@ -32,6 +32,21 @@ def get_worker_loop():
     return _worker_loop
 
 
+def is_worker_loop(loop: asyncio.AbstractEventLoop | None) -> bool:
+    """
+    判断给定事件循环是否为当前 Worker 进程的持久事件循环
+    
+    只有持久事件循环上才能安全复用绑定到循环的连接池（如 Celery 数据库连接池）。
+    
+    Args:
+        loop: 待检查的事件循环
+        
+    Returns:
+        是否为 Worker 持久事件循环
+    """
+    return loop is not None and loop is _worker_loop and not loop.is_closed()
+
+
 def run_async(coro):
     """
     在同步上下文中运行异步协程
@@ -45,7 +60,73 @@ def run_async(coro):
         协程的返回值
     """
     loop = get_worker_loop()
-    return loop.run_until_complete(coro)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        _flush_execution_logs(loop)
+
+
+def _flush_execution_logs(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    发送本次运行写入的执行日志
+    
+    Worker 持久事件循环只在 run_until_complete 期间运行，任务之间处于空闲状态，
+    执行日志后台刷新协程的定时发送不会执行。任务末尾写入的日志需要在返回前发送，
+    否则要等到该子进程执行下一个任务或退出时才会发送。
+    """
+    from app.services.execution_logger import execution_logger
+    
+    try:
+        loop.run_until_complete(execution_logger.flush())
+    except Exception as e:
+        logger.warning(
+            "worker_loop_execution_log_flush_failed",
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+
+
+def run_async_cancel_on_interrupt(coro):
+    """
+    在 Worker 事件循环中运行协程；运行被同步异常打断时取消并等待其派生任务
+    
+    Celery 软超时（SoftTimeLimitExceeded）等异常可能直接从 run_until_complete 中抛出，
+    此时协程及其派生任务仍挂在持久事件循环上，会在同一 Worker 的下一个任务中继续运行。
+    
+    Args:
+        coro: 异步协程对象
+        
+    Returns:
+        协程的返回值
+    """
+    loop = get_worker_loop()
+    main = loop.create_task(coro)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        if not main.done():
+            main.cancel()
+            try:
+                loop.run_until_complete(main)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # 正在传播打断异常，清理阶段的其他异常只记录，不覆盖原异常
+                logger.error(
+                    "worker_loop_interrupted_task_cleanup_failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    exc_info=True,
+                )
+            # 取消传播到的派生任务还需要再运行一轮才能结束
+            cancelled = [t for t in asyncio.all_tasks(loop) if not t.done() and t.cancelling()]
+            if cancelled:
+                loop.run_until_complete(asyncio.gather(*cancelled, return_exceptions=True))
+            logger.warning(
+                "worker_loop_interrupted_tasks_cancelled",
+                cancelled_count=len(cancelled) + 1,
+            )
+        _flush_execution_logs(loop)
 
 
 def parse_failed_concept(failed_item: str) -> tuple[str, str | None]:
@@ -14,46 +14,38 @@ Celery 任务：批量写入执行日志到数据库。
 - FastAPI 应用：将日志放入本地缓冲区,批量发送到 Celery
 - Celery Worker：独立进程，批量写入数据库
 - 独立数据库连接池：不影响主应用连接池
+- 写入方式：asyncpg COPY（单次往返写入整批，连接占用时间最短）；
+  非 asyncpg 驱动回退到单条多行 INSERT VALUES
+- 月度分区：按间隔节流维护分区；写入遇到缺失分区时现场创建并重试
 
 事件循环策略：
 - 每个 Worker 进程维护一个事件循环（不关闭）
 - 通过 max_tasks_per_child 定期重启进程来清理资源
 - 避免在任务结束时关闭循环导致的清理问题
 """
+import json
+import time
+import uuid
+from datetime import datetime
+
 import structlog
-import asyncio
+from sqlalchemy import insert
+
+from app.config.settings import settings
 from app.core.celery_app import celery_app
 # 使用 Celery 专用的数据库连接管理，避免 Fork 进程继承问题
-from app.db.celery_session import celery_safe_session as safe_session
-from app.models.database import ExecutionLog
+from app.db.celery_session import get_celery_engine
+from app.db.execution_log_partitions import (
+    ensure_partitions,
+    is_missing_partition_error,
+    maintain_partitions,
+)
+from app.models.database import ExecutionLog, beijing_now
+# 与内容生成任务共享 Worker 进程的持久事件循环（Celery 子进程连接池绑定到该循环）
+from app.tasks.content_utils import get_worker_loop
 
 logger = structlog.get_logger()
 
-# 每个 Worker 进程的事件循环（懒加载）
-_worker_loop = None
-
-
-def get_worker_loop():
-    """
-    获取或创建 Worker 进程的事件循环
-    
-    每个 Worker 进程维护一个独立的事件循环，
-    不在任务结束时关闭，避免连接清理问题。
-    
-    Returns:
-        asyncio.AbstractEventLoop: Worker 进程的事件循环
-    """
-    global _worker_loop
-    
-    if _worker_loop is None or _worker_loop.is_closed():
-        # 创建新的事件循环
-        _worker_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_worker_loop)
-        logger.debug("celery_worker_loop_created", loop_id=id(_worker_loop))
-    
-    return _worker_loop
-
-
 @celery_app.task(
     name="app.tasks.log_tasks.batch_write_logs",
     queue="logs",
@@ -112,6 +104,102 @@ def batch_write_logs(self, logs: list[dict]):
         raise self.retry(exc=e, countdown=60)
 
 
+# COPY 写入的列（顺序与 _to_row 一致）
+_COPY_COLUMNS = [
+    "id",
+    "task_id",
+    "roadmap_id",
+    "concept_id",
+    "level",
+    "category",
+    "step",
+    "agent_name",
+    "message",
+    "details",
+    "duration_ms",
+    "created_at",
+]
+
+
+def _to_row(log_data: dict) -> dict:
+    """
+    日志字典 → 行数据（补齐 ORM 默认值）
+
+    created_at 经 Celery JSON 序列化后可能是 ISO 字符串，这里还原为 datetime。
+    """
+    created_at = log_data.get("created_at")
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return {
+        "id": log_data.get("id") or str(uuid.uuid4()),
+        "task_id": log_data["task_id"],
+        "roadmap_id": log_data.get("roadmap_id"),
+        "concept_id": log_data.get("concept_id"),
+        "level": log_data.get("level") or "info",
+        "category": log_data["category"],
+        "step": log_data.get("step"),
+        "agent_name": log_data.get("agent_name"),
+        "message": log_data["message"],
+        "details": log_data.get("details"),
+        "duration_ms": log_data.get("duration_ms"),
+        "created_at": created_at or beijing_now(),
+    }
+
+
+def _to_copy_record(row: dict) -> tuple:
+    """行数据 → COPY 记录（JSON 列以文本传给 asyncpg）"""
+    details = row["details"]
+    return tuple(
+        json.dumps(details, ensure_ascii=False, default=str) if column == "details" and details is not None
+        else row[column]
+        for column in _COPY_COLUMNS
+    )
+
+
+# 本进程上次检查分区的时间（time.monotonic()）
+_last_partition_check: float | None = None
+
+
+async def _maybe_maintain_partitions(conn) -> None:
+    """按 EXECUTION_LOG_PARTITION_CHECK_INTERVAL_SECONDS 节流执行分区维护（失败不影响写入）"""
+    global _last_partition_check
+    
+    now = time.monotonic()
+    if (
+        _last_partition_check is not None
+        and now - _last_partition_check < settings.EXECUTION_LOG_PARTITION_CHECK_INTERVAL_SECONDS
+    ):
+        return
+    _last_partition_check = now
+    
+    try:
+        await maintain_partitions(conn)
+        await conn.commit()
+    except Exception as e:
+        await conn.rollback()
+        logger.warning(
+            "execution_log_partition_maintenance_failed",
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+
+
+async def _write_rows(conn, rows: list[dict]) -> None:
+    """写入一批日志（asyncpg 使用 COPY，其他驱动使用多行 INSERT）"""
+    raw_connection = await conn.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    
+    if hasattr(driver_connection, "copy_records_to_table"):
+        await driver_connection.copy_records_to_table(
+            ExecutionLog.__tablename__,
+            records=[_to_copy_record(row) for row in rows],
+            columns=_COPY_COLUMNS,
+        )
+    else:
+        await conn.execute(insert(ExecutionLog.__table__).values(rows))
+    await conn.commit()
+
+
 async def _async_batch_write_logs(logs: list[dict]):
     """
     异步批量写入日志（内部辅助函数）
@@ -120,16 +208,22 @@ async def _async_batch_write_logs(logs: list[dict]):
         logs: 日志数据列表
     
     注意：
-    - 每次调用都会创建新的数据库会话
-    - 会话在 safe_session 上下文管理器中自动管理
-    - 不需要手动清理连接，safe_session 会处理
+    - 不经过 ORM Session，直接使用引擎连接（每批只占用连接一次往返）
+    - asyncpg 驱动使用 COPY 写入整批；其他驱动回退到单条多行 INSERT
+    - COPY 是单条语句，整批原子写入，失败时由 Celery 重试整个批次
     """
-    async with safe_session() as session:
-        log_entries = [
-            ExecutionLog(**log_data)
-            for log_data in logs
-        ]
-        session.add_all(log_entries)
-        await session.commit()
-
-
+    rows = [_to_row(log_data) for log_data in logs]
+    
+    async with get_celery_engine().connect() as conn:
+        await _maybe_maintain_partitions(conn)
+        
+        try:
+            await _write_rows(conn, rows)
+        except Exception as e:
+            if not is_missing_partition_error(e):
+                raise
+            # 日志时间超出已有分区（如跨月且尚未维护）：现场创建分区后重试一次
+            await conn.rollback()
+            await ensure_partitions(conn, [row["created_at"] for row in rows])
+            await conn.commit()
+            await _write_rows(conn, rows)
@@ -27,33 +27,11 @@ from app.db.celery_session import CeleryRepositoryFactory
 from app.services.notification_service import notification_service
 from app.models.constants import TaskStatus
 from app.models.domain import UserRequest, LearningPreferences
+# 使用 Worker 进程的持久事件循环：进程级共享的 Orchestrator 连接池绑定到该循环
+from app.tasks.content_utils import run_async
 
 logger = structlog.get_logger()
 
-def run_async(coro):
-    """
-    在同步上下文中运行异步协程
-    
-    使用 asyncio.run() 确保每次执行都在干净的事件循环中进行，
-    避免事件循环冲突和资源泄漏。
-    
-    asyncio.run() 会自动：
-    1. 创建新的事件循环
-    2. 设置为当前事件循环
-    3. 运行协程
-    4. 清理所有未完成的任务
-    5. 关闭事件循环
-    
-    这是 Python 3.7+ 推荐的标准做法，避免手动管理事件循环。
-    
-    Args:
-        coro: 异步协程对象
-        
-    Returns:
-        协程的返回值
-    """
-    return asyncio.run(coro)
-
 
 @celery_app.task(
     name="roadmap_generation.generate_roadmap",
@@ -160,8 +138,6 @@ async def _execute_roadmap_workflow(
     Returns:
         dict: 执行结果
     """
-    factory = None
-    
     try:
         # ============================================================
         # 验证任务记录是否存在（增强版重试机制）
@@ -293,12 +269,9 @@ async def _execute_roadmap_workflow(
             status=TaskStatus.PROCESSING.value,
         )
         
-        # 创建 Orchestrator Factory
-        factory = OrchestratorFactory()
-        await factory.initialize()
-        
-        # 创建工作流执行器
-        executor = factory.create_workflow_executor()
+        # 获取 Worker 进程级共享的工作流执行器
+        # （连接池和工作流图在子进程内只初始化一次，任务结束后不清理）
+        executor = await OrchestratorFactory.get_worker_executor()
         
         # 构造 UserRequest 对象
         user_request_obj = UserRequest(
@@ -368,11 +341,6 @@ async def _execute_roadmap_workflow(
             exc_info=True,
         )
         raise
-        
-    finally:
-        # 清理 Orchestrator Factory
-        if factory:
-            await factory.cleanup()
 
 
 async def _mark_task_failed(
@@ -9,7 +9,6 @@
 - resume_after_review: 用户完成人工审核后，恢复工作流继续执行
 - resume_from_checkpoint: 任务失败后，从最后一个 checkpoint 恢复执行
 """
-import asyncio
 import structlog
 from typing import Optional
 from datetime import datetime
@@ -20,49 +19,12 @@ from app.core.orchestrator_factory import OrchestratorFactory
 from app.db.celery_session import CeleryRepositoryFactory
 from app.services.notification_service import notification_service
 from app.models.constants import TaskStatus
+# 与内容生成任务共享 Worker 进程的持久事件循环（Celery 子进程连接池绑定到该循环），
+# 运行结束时发送缓冲中的执行日志
+from app.tasks.content_utils import run_async
 
 logger = structlog.get_logger()
 
-# 每个 Worker 进程的事件循环（懒加载）
-_worker_loop = None
-
-
-def get_worker_loop():
-    """
-    获取或创建 Worker 进程的事件循环
-    
-    每个 Worker 进程维护一个独立的事件循环，
-    不在任务结束时关闭，避免连接清理问题。
-    
-    Returns:
-        asyncio.AbstractEventLoop: Worker 进程的事件循环
-    """
-    global _worker_loop
-    
-    if _worker_loop is None or _worker_loop.is_closed():
-        # 创建新的事件循环
-        _worker_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_worker_loop)
-        logger.debug("celery_worker_loop_created", loop_id=id(_worker_loop))
-    
-    return _worker_loop
-
-
-def run_async(coro):
-    """
-    在同步上下文中运行异步协程
-    
-    使用 Worker 进程级别的事件循环，避免频繁创建/销毁循环。
-    
-    Args:
-        coro: 异步协程对象
-        
-    Returns:
-        协程的返回值
-    """
-    loop = get_worker_loop()
-    return loop.run_until_complete(coro)
-
 
 @celery_app.task(
     name="workflow_resume.resume_after_review",
@@ -244,8 +206,6 @@ async def _resume_workflow_after_review(
     Returns:
         dict: 执行结果
     """
-    factory = None
-    
     try:
         # 更新任务状态为 processing
         repo_factory = CeleryRepositoryFactory()
@@ -265,12 +225,8 @@ async def _resume_workflow_after_review(
             message="Resuming workflow after review...",
         )
         
-        # 创建 Orchestrator Factory
-        factory = OrchestratorFactory()
-        await factory.initialize()
-        
-        # 创建工作流执行器
-        executor = factory.create_workflow_executor()
+        # 获取 Worker 进程级共享的工作流执行器
+        executor = await OrchestratorFactory.get_worker_executor()
         
         # 从 checkpoint 恢复工作流（人工审核后）
         final_state = await executor.resume_after_human_review(
@@ -327,11 +283,6 @@ async def _resume_workflow_after_review(
             exc_info=True,
         )
         raise
-        
-    finally:
-        # 清理 Orchestrator Factory
-        if factory:
-            await factory.cleanup()
 
 
 async def _resume_workflow_from_checkpoint(
@@ -348,8 +299,6 @@ async def _resume_workflow_from_checkpoint(
     Returns:
         dict: 执行结果
     """
-    factory = None
-    
     try:
         # 更新任务状态为 processing
         repo_factory = CeleryRepositoryFactory()
@@ -369,12 +318,8 @@ async def _resume_workflow_from_checkpoint(
             message="Resuming workflow from checkpoint...",
         )
         
-        # 创建 Orchestrator Factory
-        factory = OrchestratorFactory()
-        await factory.initialize()
-        
-        # 创建工作流执行器
-        executor = factory.create_workflow_executor()
+        # 获取 Worker 进程级共享的工作流执行器
+        executor = await OrchestratorFactory.get_worker_executor()
         
         # 从 checkpoint 恢复工作流
         # LangGraph 配置（使用相同的 thread_id 会自动从 checkpoint 恢复）
@@ -431,11 +376,6 @@ async def _resume_workflow_from_checkpoint(
             exc_info=True,
         )
         raise
-        
-    finally:
-        # 清理 Orchestrator Factory
-        if factory:
-            await factory.cleanup()
 
 
 async def _mark_task_failed(
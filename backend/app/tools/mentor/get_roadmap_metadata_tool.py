@@ -68,7 +68,7 @@ class GetRoadmapMetadataTool(BaseTool[GetRoadmapMetadataInput, GetRoadmapMetadat
             async with self.repo_factory.create_session() as session:
                 roadmap_repo = self.repo_factory.create_roadmap_meta_repo(session)
                 
-                roadmap = await roadmap_repo.get_by_roadmap_id(input_data.roadmap_id)
+                roadmap = await roadmap_repo.get_summary_by_roadmap_id(input_data.roadmap_id)
                 
                 if not roadmap:
                     logger.info(
@@ -81,15 +81,9 @@ class GetRoadmapMetadataTool(BaseTool[GetRoadmapMetadataInput, GetRoadmapMetadat
                         message="路线图不存在",
                     )
                 
-                # 统计阶段和概念数量
-                framework = roadmap.framework_data
-                stages = framework.get("stages", [])
-                stages_count = len(stages)
-                concepts_count = sum(
-                    len(module.get("concepts", []))
-                    for stage in stages
-                    for module in stage.get("modules", [])
-                )
+                # 阶段和概念数量来自摘要列（不加载 framework_data）
+                stages_count = roadmap.stages_count
+                concepts_count = roadmap.total_concepts
                 
                 logger.info(
                     "roadmap_metadata_found",
@@ -138,28 +132,26 @@ class GetRoadmapMetadataTool(BaseTool[GetRoadmapMetadataInput, GetRoadmapMetadat
             概念信息，不存在则返回 None
         """
         try:
+            from app.services.framework_cache import framework_cache
+            
             async with self.repo_factory.create_session() as session:
-                roadmap_repo = self.repo_factory.create_roadmap_meta_repo(session)
-                
-                roadmap = await roadmap_repo.get_by_roadmap_id(roadmap_id)
-                
-                if not roadmap:
-                    return None
-                
-                # 在框架中查找概念
-                framework = roadmap.framework_data
-                for stage in framework.get("stages", []):
-                    for module in stage.get("modules", []):
-                        for concept in module.get("concepts", []):
-                            if concept.get("concept_id") == concept_id:
-                                return ConceptInfo(
-                                    concept_id=concept.get("concept_id"),
-                                    name=concept.get("name", ""),
-                                    description=concept.get("description", ""),
-                                    difficulty=concept.get("difficulty", "medium"),
-                                )
-                
+                snapshot = await framework_cache.get(session, roadmap_id)
+            
+            if not snapshot:
+                return None
+            
+            # 按概念索引定位
+            located = snapshot.find_concept(concept_id)
+            if not located:
                 return None
+            
+            _, _, concept = located
+            return ConceptInfo(
+                concept_id=concept.get("concept_id"),
+                name=concept.get("name", ""),
+                description=concept.get("description", ""),
+                difficulty=concept.get("difficulty", "medium"),
+            )
         
         except Exception as e:
             logger.error(
@@ -0,0 +1,189 @@
+"""
+搜索结果缓存（Redis）
+
+使用场景：
+- 同一路线图中的多个概念、热门主题的多个路线图发送近似相同的搜索查询
+- 每次 Tavily 调用都消耗 Key 配额（remaining_quota）并等待全局 100 次/分钟限流
+
+设计原则：
+- 查询规范化：大小写、空白、首尾标点、冠词（保留词序和重复词：
+  "python to javascript" 与 "javascript to python" 是不同的查询）
+- 缓存键 = 规范化查询 + 影响结果的参数（search_depth、time_range、域名过滤、
+  max_results、language）
+- TTL 随 time_range 变化：时间窗口越短，结果越易过期
+- 只缓存非空结果；Redis 异常只记录日志，不影响搜索
+"""
+import hashlib
+import json
+import re
+from typing import Any
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.models.domain import SearchQuery, SearchResult
+from app.utils.metrics import counter
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+search_cache_lookups = counter(
+    "search_cache_lookups_total",
+    "Number of search result cache lookups",
+    labelnames=["result"],  # hit / miss / error
+)
+
+# Redis 键前缀
+CACHE_KEY_PREFIX = "search_cache:"
+
+# 各 time_range 对应的缓存过期时间（秒）；None 表示不限时间
+TIME_RANGE_TTL_SECONDS: dict[str | None, int] = {
+    "day": 3600,
+    "week": 6 * 3600,
+    "month": 24 * 3600,
+    "year": 3 * 24 * 3600,
+    None: 7 * 24 * 3600,
+}
+
+# 只去除不改变查询含义的冠词；介词、疑问词、"best" 等会改变搜索意图，必须保留
+STOPWORDS = frozenset({"a", "an", "the"})
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# 只去除句读类标点，保留 C++ / C# / .NET 等有语义的符号
+_EDGE_PUNCT_RE = re.compile(r"^[\"'“”‘’()\[\]（）【】,，:：;；?？!！]+|[\"'“”‘’()\[\]（）【】,，.。:：;；?？!！]+$")
+
+
+def normalize_query(query: str) -> str:
+    """
+    规范化搜索查询
+
+    例如 "  Python  Tutorial for the Beginners? " 与 "python tutorial for beginners"
+    规范化后相同；词序和重复词保留。
+
+    Args:
+        query: 原始查询
+
+    Returns:
+        规范化后的查询（小写、去冠词、去首尾标点，词序不变）
+    """
+    tokens = []
+    for raw in _WHITESPACE_RE.split(query.strip().lower()):
+        token = _EDGE_PUNCT_RE.sub("", raw)
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+
+    # 全部是停用词时保留原始词项，避免不同查询规范化为空字符串
+    if not tokens:
+        tokens = [t for t in _WHITESPACE_RE.split(query.strip().lower()) if t]
+
+    return " ".join(tokens)
+
+
+class SearchResultCache:
+    """
+    搜索结果缓存（Redis 存储，跨进程共享）
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SEARCH_CACHE_ENABLED
+
+    @staticmethod
+    def make_key(query: SearchQuery) -> str:
+        """计算缓存键"""
+        payload = json.dumps(
+            {
+                "query": normalize_query(query.query),
+                "search_type": query.search_type,
+                "max_results": query.max_results,
+                "language": (query.language or "").lower(),
+                "search_depth": query.search_depth,
+                "time_range": query.time_range,
+                "include_domains": sorted(d.lower() for d in query.include_domains or []),
+                "exclude_domains": sorted(d.lower() for d in query.exclude_domains or []),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{CACHE_KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def get_ttl(query: SearchQuery) -> int:
+        """按 time_range 计算缓存过期时间（受 SEARCH_CACHE_MAX_TTL_SECONDS 限制）"""
+        ttl = TIME_RANGE_TTL_SECONDS.get(query.time_range, TIME_RANGE_TTL_SECONDS[None])
+        return min(ttl, settings.SEARCH_CACHE_MAX_TTL_SECONDS)
+
+    def _record(self, result: str) -> None:
+        search_cache_lookups.labels(result=result).inc()
+
+    async def get(self, query: SearchQuery) -> SearchResult | None:
+        """
+        读取缓存
+
+        Returns:
+            缓存的搜索结果，未命中或异常时返回 None
+        """
+        key = self.make_key(query)
+        try:
+            data = await redis_client.get_json(key)
+        except Exception as e:
+            self.errors += 1
+            self._record("error")
+            logger.warning("search_cache_get_failed", error=str(e))
+            return None
+
+        if data is None:
+            self.misses += 1
+            self._record("miss")
+            return None
+
+        self.hits += 1
+        self._record("hit")
+        logger.info(
+            "search_cache_hit",
+            query=query.query,
+            normalized_query=normalize_query(query.query),
+        )
+        return SearchResult(**data)
+
+    async def set(self, query: SearchQuery, result: SearchResult) -> None:
+        """写入缓存（空结果不缓存）"""
+        if not result.results:
+            return
+
+        try:
+            await redis_client.set_json(
+                self.make_key(query),
+                result.model_dump(),
+                ex=self.get_ttl(query),
+            )
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("search_cache_set_failed", error=str(e))
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "stores": self.stores,
+            "hit_ratio": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+        }
+
+
+# 全局单例
+search_result_cache = SearchResultCache()
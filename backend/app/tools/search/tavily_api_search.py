@@ -2,7 +2,7 @@
 Tavily API Search Tool（使用全局速率限制器）
 
 职责：
-- 使用官方 TavilyClient（同步客户端）
+- 通过共享的 httpx.AsyncClient 直接调用 Tavily REST API（原生异步，keep-alive 复用连接）
 - 从数据库读取配额信息，选择最优 Key
 - 支持完整的 API 参数（search_depth, time_range, include_domains 等）
 - 全局速率控制（每分钟 100 次，基于 Redis）
@@ -12,20 +12,19 @@ Tavily API Search Tool（使用全局速率限制器）
 - 回退逻辑（由 Router 处理）
 - 配额追踪和健康检查（由外部项目维护）
 
-官方文档：https://github.com/tavily-ai/tavily-python
+官方文档：https://docs.tavily.com/documentation/api-reference/endpoint/search
 """
 import asyncio
-import time
 import structlog
-from typing import Dict, Optional
+from typing import Optional
 
-from tavily import TavilyClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.tools.base import BaseTool
 from app.models.domain import SearchQuery, SearchResult
 from app.db.repositories.tavily_key_repo import TavilyKeyRepository
 from app.utils.rate_limiter import get_tavily_rate_limiter
+from app.tools.search.tavily_http_client import tavily_client_pool
 
 logger = structlog.get_logger()
 
@@ -35,7 +34,7 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
     Tavily API 搜索工具（使用全局速率限制器）
     
     特性：
-    - 使用官方 TavilyClient（按照官方示例调用）
+    - 原生异步 HTTP 调用（进程级共享 httpx.AsyncClient，按 API Key 复用连接）
     - 支持两种模式：从数据库读取 Key 或使用预分配 Key
     - 全局速率控制（每分钟 100 次，基于 Redis，多进程共享）
     - 支持高级搜索参数（search_depth, time_range, include_domains 等）
@@ -72,9 +71,6 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
         # 数据库仓储（仅在未提供预分配 Key 时使用）
         self.repo = TavilyKeyRepository(db_session) if db_session else None
         
-        # TavilyClient 缓存（按 API Key 索引）
-        self._clients: Dict[str, TavilyClient] = {}
-        
         # 局部并发控制（防止单个实例过度并发）
         self._search_semaphore = asyncio.Semaphore(3)  # 最多3个并发请求
         
@@ -86,24 +82,6 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
         else:
             logger.debug("tavily_tool_initialized_with_db_session")
     
-    def _get_client(self, api_key: str) -> TavilyClient:
-        """
-        获取或创建指定 Key 的 TavilyClient 实例
-        
-        Args:
-            api_key: API Key
-            
-        Returns:
-            TavilyClient 实例
-        """
-        if api_key not in self._clients:
-            self._clients[api_key] = TavilyClient(api_key=api_key)
-            logger.debug(
-                "tavily_client_created",
-                key_prefix=api_key[:10] + "..."
-            )
-        return self._clients[api_key]
-    
     async def _rate_limited_request(self, func, *args, **kwargs):
         """
         带全局速率限制的请求包装器
@@ -112,7 +90,6 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
         - 局部并发控制（最多3个并发，防止单实例过载）
         - 全局速率限制（每分钟100次，基于 Redis，多进程共享）
         - 避免触发 API 限流
-        - 使用 asyncio.to_thread 包装同步调用
         """
         # 获取全局速率限制器
         rate_limiter = await get_tavily_rate_limiter()
@@ -129,8 +106,7 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
                 )
                 raise ValueError("Tavily API rate limit exceeded, please try again later")
             
-            # 使用 asyncio.to_thread 在线程中执行同步调用
-            result = await asyncio.to_thread(func, *args, **kwargs)
+            result = await func(*args, **kwargs)
             
             # 记录请求执行（用于监控）
             current_count = await rate_limiter.get_current_count()
@@ -220,41 +196,34 @@ class TavilyAPISearchTool(BaseTool[SearchQuery, SearchResult]):
         )
         
         try:
-            # 执行搜索
-            def do_search():
-                """执行搜索（同步调用，按照官方示例）"""
-                client = self._get_client(api_key)
-                
-                # 构建搜索参数（按照官方示例）
-                search_kwargs = {
-                    "query": input_data.query,
-                    "search_depth": search_depth,
-                    "max_results": max_results,
-                }
-                
-                # 添加可选的高级参数
-                if time_range:
-                    search_kwargs["time_range"] = time_range
-                if include_domains:
-                    search_kwargs["include_domains"] = include_domains
-                if exclude_domains:
-                    search_kwargs["exclude_domains"] = exclude_domains
-                
-                # 调用官方 SDK（按照官方示例）
-                response = client.search(**search_kwargs)
-                return response
+            # 构建请求体
+            payload = {
+                "query": input_data.query,
+                "search_depth": search_depth,
+                "max_results": max_results,
+            }
+            
+            # 添加可选的高级参数
+            if time_range:
+                payload["time_range"] = time_range
+            if include_domains:
+                payload["include_domains"] = include_domains
+            if exclude_domains:
+                payload["exclude_domains"] = exclude_domains
             
             # 执行搜索（带速率限制）
-            data = await self._rate_limited_request(do_search)
+            data = await self._rate_limited_request(
+                tavily_client_pool.search, api_key, payload
+            )
             
-            # Tavily SDK 返回格式：{"results": [{"title", "url", "content", "score", "published_date"}], ...}
+            # Tavily API 返回格式：{"results": [{"title", "url", "content", "score", "published_date"}], ...}
             tavily_results = data.get("results", [])
             
             results = [
                 {
                     "title": item.get("title", ""),
                     "url": item.get("url", ""),
-                    "snippet": item.get("content", "")[:200],  # 截取前200字符作为摘要
+                    "snippet": (item.get("content") or "")[:200],  # 截取前200字符作为摘要
                     "published_date": item.get("published_date", ""),
                 }
                 for item in tavily_results[:max_results]
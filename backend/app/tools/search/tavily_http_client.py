@@ -0,0 +1,218 @@
+"""
+Tavily HTTP 客户端池（进程级单例，原生异步）
+
+设计说明：
+- 直接调用 Tavily REST API（POST /search），替代同步 TavilyClient + asyncio.to_thread
+- 每个 API Key 一个长生命周期的 httpx.AsyncClient，keep-alive 复用 TCP/TLS 连接
+- 安装了 h2 时启用 HTTP/2（单连接多路复用），否则回退到 HTTP/1.1
+- Fork 安全：检测进程 ID 变化（Celery prefork），丢弃继承的客户端引用
+- 事件循环感知：httpx 连接绑定到创建时的事件循环，按 (loop_id, api_key) 缓存，
+  通过循环弱引用校验归属，已关闭循环的客户端被丢弃
+
+问题背景：
+- 原实现每次搜索占用默认线程池中的一个线程，并由 requests 新建连接
+- 内容生成并发扇出时，几十个搜索同时争抢线程池
+"""
+import asyncio
+import os
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import structlog
+
+from app.config.settings import settings
+
+logger = structlog.get_logger()
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class _LoopClient:
+    """事件循环的共享客户端"""
+    loop_ref: weakref.ReferenceType
+    client: httpx.AsyncClient
+
+    def belongs_to(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self.loop_ref() is loop and not loop.is_closed()
+
+    def is_stale(self) -> bool:
+        loop = self.loop_ref()
+        return loop is None or loop.is_closed()
+
+
+class TavilyHTTPClientPool:
+    """
+    进程级 Tavily HTTP 客户端池
+
+    按 (事件循环, API Key) 缓存 httpx.AsyncClient，Key 通过 Authorization 头传递。
+    """
+
+    def __init__(self):
+        self._pid: int = os.getpid()
+        # (loop_id, api_key) -> 共享客户端（通过 loop 弱引用校验，防止 id 复用）
+        self._clients: dict[tuple[int, str], _LoopClient] = {}
+
+        # 统计信息
+        self._created_count: int = 0
+        self._request_count: int = 0
+
+    def _check_fork(self) -> None:
+        """
+        检测进程 fork
+
+        子进程继承的客户端持有父进程的 socket，不能关闭也不能复用，直接丢弃引用。
+        """
+        current_pid = os.getpid()
+        if current_pid != self._pid:
+            logger.info(
+                "tavily_client_pool_fork_detected",
+                parent_pid=self._pid,
+                child_pid=current_pid,
+                dropped_clients=len(self._clients),
+            )
+            self._pid = current_pid
+            self._clients = {}
+
+    def _create_client(self, api_key: str) -> httpx.AsyncClient:
+        """创建指定 Key 的 AsyncClient"""
+        http2 = settings.TAVILY_HTTP2_ENABLED and HTTP2_AVAILABLE
+        return httpx.AsyncClient(
+            base_url=settings.TAVILY_API_BASE_URL,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(settings.TAVILY_HTTP_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.TAVILY_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TAVILY_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+            http2=http2,
+        )
+
+    def _prune_stale(self) -> None:
+        """
+        丢弃已关闭或已回收事件循环的客户端
+
+        这些客户端的连接绑定在不可用的循环上，无法在当前循环中关闭，只丢弃引用；
+        同时避免循环 id 被新循环复用时拿到绑定旧循环的客户端。
+        """
+        stale = [key for key, entry in self._clients.items() if entry.is_stale()]
+        for key in stale:
+            del self._clients[key]
+        if stale:
+            logger.info("tavily_http_clients_dropped_for_dead_loops", count=len(stale))
+
+    def get_client(self, api_key: str) -> httpx.AsyncClient:
+        """
+        获取当前事件循环中指定 Key 的共享客户端
+
+        Returns:
+            httpx.AsyncClient（调用方不应关闭）
+        """
+        self._check_fork()
+
+        loop = asyncio.get_running_loop()
+        cache_key = (id(loop), api_key)
+        entry = self._clients.get(cache_key)
+        if entry is not None and entry.belongs_to(loop) and not entry.client.is_closed:
+            return entry.client
+
+        self._prune_stale()
+        client = self._create_client(api_key)
+        self._clients[cache_key] = _LoopClient(weakref.ref(loop), client)
+        self._created_count += 1
+        logger.debug(
+            "tavily_http_client_created",
+            key_prefix=api_key[:10] + "...",
+            http2=settings.TAVILY_HTTP2_ENABLED and HTTP2_AVAILABLE,
+        )
+        return client
+
+    async def search(self, api_key: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """
+        调用 Tavily Search API
+
+        Args:
+            api_key: API Key
+            payload: 请求体（query, search_depth, max_results 等）
+
+        Returns:
+            响应 JSON（{"results": [...], ...}）
+
+        Raises:
+            httpx.HTTPStatusError: API 返回错误状态码（如 401 Key 无效、429/432 超出配额）
+            httpx.TransportError: 网络错误
+        """
+        client = self.get_client(api_key)
+        self._request_count += 1
+        response = await client.post("/search", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self) -> None:
+        """
+        关闭当前事件循环的客户端（在应用/Worker 关闭时调用）
+
+        其他事件循环的客户端无法在当前循环中安全关闭，仅丢弃引用。
+        """
+        self._check_fork()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        for entry in list(self._clients.values()):
+            if loop is None or not entry.belongs_to(loop):
+                continue
+            try:
+                await entry.client.aclose()
+            except Exception as e:
+                logger.warning("tavily_http_client_close_failed", error=str(e))
+
+        self._clients = {}
+        logger.info("tavily_client_pool_closed")
+
+    def reset(self) -> None:
+        """
+        重置客户端池（Celery worker_process_init 中调用）
+
+        不关闭继承的客户端，仅丢弃引用。
+        """
+        self._pid = os.getpid()
+        self._clients = {}
+        self._created_count = 0
+        self._request_count = 0
+
+    def get_stats(self) -> dict:
+        """获取客户端复用统计（用于健康检查和监控）"""
+        return {
+            "pid": self._pid,
+            "active_clients": len(self._clients),
+            "http2": settings.TAVILY_HTTP2_ENABLED and HTTP2_AVAILABLE,
+            "created": self._created_count,
+            "requests": self._request_count,
+        }
+
+
+# 全局单例
+tavily_client_pool = TavilyHTTPClientPool()
+
+
+def reset_tavily_client_pool() -> None:
+    """
+    重置 Tavily 客户端池
+
+    ⚠️ 用于 Celery Worker 进程初始化时调用
+    """
+    tavily_client_pool.reset()
+    logger.info("tavily_client_pool_reset", pid=os.getpid())
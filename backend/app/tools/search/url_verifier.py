@@ -0,0 +1,280 @@
+"""
+资源 URL 验证器（进程级单例）
+
+设计说明：
+- 进程内共享一个 httpx.AsyncClient（按事件循环缓存），复用连接、DNS 和 TLS 会话
+- 全局并发上限 + 每个域名并发上限，避免同一站点（docs.python.org、MDN、YouTube）被并发请求打满；
+  域名信号量按引用计数，无请求持有或等待时移除，长期运行的 Worker 不会按域名无限增长
+- Redis 缓存近期验证结果（状态码、最终 URL），同一链接在 TTL 内不再重复 HEAD
+- Fork 安全：检测进程 ID 变化（Celery prefork），丢弃继承的客户端引用
+- 事件循环感知：客户端和信号量通过循环弱引用校验归属，已关闭循环的状态被丢弃
+
+问题背景：
+- 原实现为每个资源 URL 新建 AsyncClient，每个链接都要新建连接池、DNS 查询和 TLS 握手
+- 对同一域名的并发请求没有上限
+"""
+import asyncio
+import hashlib
+import os
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+
+logger = structlog.get_logger()
+
+# Redis 键前缀
+CACHE_KEY_PREFIX = "url_verdict:"
+
+# 模拟浏览器 User-Agent（避免 403）
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36"
+}
+
+
+@dataclass
+class URLVerdict:
+    """URL 验证结果"""
+    url: str
+    final_url: str
+    status_code: int | None = None  # None 表示请求失败（超时或网络错误）
+    timed_out: bool = False
+    error: str | None = None
+    from_cache: bool = False
+
+
+@dataclass
+class _HostLimiter:
+    """域名并发信号量及当前使用数（持有或等待中的请求）"""
+    semaphore: asyncio.Semaphore
+    users: int = 0
+
+
+@dataclass
+class _LoopState:
+    """事件循环的共享客户端与并发信号量"""
+    loop_ref: weakref.ReferenceType
+    global_semaphore: asyncio.Semaphore
+    client: httpx.AsyncClient | None = None
+    # 域名 -> 并发信号量（只保留正在使用的域名）
+    host_limiters: dict[str, _HostLimiter] = field(default_factory=dict)
+
+    def belongs_to(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self.loop_ref() is loop and not loop.is_closed()
+
+    def is_stale(self) -> bool:
+        loop = self.loop_ref()
+        return loop is None or loop.is_closed()
+
+
+class URLVerifier:
+    """
+    进程级 URL 验证器
+
+    按事件循环缓存 httpx.AsyncClient 和并发信号量。
+    """
+
+    def __init__(self):
+        self._pid: int = os.getpid()
+        # loop_id -> 客户端与信号量（通过 loop 弱引用校验，防止 id 复用）
+        self._loops: dict[int, _LoopState] = {}
+
+        # 统计信息
+        self._requests: int = 0
+        self._cache_hits: int = 0
+
+    def _check_fork(self) -> None:
+        """检测进程 fork，丢弃继承自父进程的客户端和信号量"""
+        current_pid = os.getpid()
+        if current_pid != self._pid:
+            self._pid = current_pid
+            self._loops = {}
+
+    def _prune_stale(self) -> None:
+        """
+        丢弃已关闭或已回收事件循环的客户端和信号量
+
+        这些客户端的连接绑定在不可用的循环上，无法在当前循环中关闭，只丢弃引用；
+        同时避免循环 id 被新循环复用时拿到绑定旧循环的客户端和信号量。
+        """
+        stale = [loop_id for loop_id, state in self._loops.items() if state.is_stale()]
+        for loop_id in stale:
+            del self._loops[loop_id]
+        if stale:
+            logger.info("url_verifier_dropped_dead_loops", count=len(stale))
+
+    def _get_loop_state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        """获取事件循环的客户端与信号量，不存在或 id 已被其他循环复用时新建"""
+        state = self._loops.get(id(loop))
+        if state is None or not state.belongs_to(loop):
+            self._prune_stale()
+            state = _LoopState(
+                loop_ref=weakref.ref(loop),
+                global_semaphore=asyncio.Semaphore(settings.URL_VERIFY_MAX_CONCURRENCY),
+            )
+            self._loops[id(loop)] = state
+        return state
+
+    def _get_client(self, loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+        """获取事件循环的共享客户端"""
+        state = self._get_loop_state(loop)
+        if state.client is None or state.client.is_closed:
+            state.client = httpx.AsyncClient(
+                timeout=settings.URL_VERIFY_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers=BROWSER_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=settings.URL_VERIFY_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.URL_VERIFY_MAX_CONCURRENCY,
+                    keepalive_expiry=30.0,
+                ),
+            )
+        return state.client
+
+    @asynccontextmanager
+    async def _host_slot(self, state: _LoopState, host: str) -> AsyncIterator[None]:
+        """占用一个域名并发名额，最后一个使用者结束时移除该域名的信号量"""
+        limiter = state.host_limiters.get(host)
+        if limiter is None:
+            limiter = _HostLimiter(asyncio.Semaphore(settings.URL_VERIFY_PER_HOST_LIMIT))
+            state.host_limiters[host] = limiter
+        limiter.users += 1
+        try:
+            async with limiter.semaphore:
+                yield
+        finally:
+            limiter.users -= 1
+            if limiter.users == 0 and state.host_limiters.get(host) is limiter:
+                del state.host_limiters[host]
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        return CACHE_KEY_PREFIX + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cache_ttl(status_code: int) -> int:
+        """成功类结果长 TTL，失败类结果（404/5xx 可能是临时问题）短 TTL"""
+        if status_code < 400 or status_code in (403, 412):
+            return settings.URL_VERIFY_CACHE_TTL_SECONDS
+        return settings.URL_VERIFY_NEGATIVE_CACHE_TTL_SECONDS
+
+    async def _get_cached(self, url: str) -> URLVerdict | None:
+        try:
+            data = await redis_client.get_json(self._cache_key(url))
+        except Exception as e:
+            logger.warning("url_verdict_cache_get_failed", error=str(e))
+            return None
+        if data is None:
+            return None
+        return URLVerdict(
+            url=url,
+            final_url=data["final_url"],
+            status_code=data["status_code"],
+            from_cache=True,
+        )
+
+    async def _set_cached(self, verdict: URLVerdict) -> None:
+        try:
+            await redis_client.set_json(
+                self._cache_key(verdict.url),
+                {"status_code": verdict.status_code, "final_url": verdict.final_url},
+                ex=self._cache_ttl(verdict.status_code),
+            )
+        except Exception as e:
+            logger.warning("url_verdict_cache_set_failed", error=str(e))
+
+    async def verify(self, url: str) -> URLVerdict:
+        """
+        验证单个 URL（HEAD 请求，跟随重定向）
+
+        超时和网络错误不抛出异常，也不写入缓存，由调用方决定如何处理。
+
+        Args:
+            url: 待验证的 URL
+
+        Returns:
+            验证结果
+        """
+        self._check_fork()
+
+        if settings.URL_VERIFY_CACHE_ENABLED:
+            cached = await self._get_cached(url)
+            if cached is not None:
+                self._cache_hits += 1
+                return cached
+
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).hostname or ""
+        client = self._get_client(loop)
+        state = self._get_loop_state(loop)
+
+        # 先占域名名额再占全局名额：等待繁忙域名的请求不占用全局名额，不阻塞其他域名
+        async with self._host_slot(state, host), state.global_semaphore:
+            self._requests += 1
+            try:
+                response = await client.head(url)
+            except httpx.TimeoutException:
+                return URLVerdict(url=url, final_url=url, timed_out=True)
+            except Exception as e:
+                return URLVerdict(url=url, final_url=url, error=str(e)[:100])
+
+        verdict = URLVerdict(
+            url=url,
+            final_url=str(response.url),
+            status_code=response.status_code,
+        )
+        if settings.URL_VERIFY_CACHE_ENABLED:
+            await self._set_cached(verdict)
+        return verdict
+
+    async def close(self) -> None:
+        """关闭当前事件循环的客户端（在应用/Worker 关闭时调用）"""
+        self._check_fork()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        state = self._loops.pop(id(loop), None) if loop is not None else None
+        if state is not None and state.belongs_to(loop) and state.client is not None:
+            try:
+                await state.client.aclose()
+            except Exception as e:
+                logger.warning("url_verifier_client_close_failed", error=str(e))
+
+        self._loops = {}
+
+    def reset(self) -> None:
+        """
+        重置验证器（Celery worker_process_init 中调用）
+
+        不关闭继承的客户端，仅丢弃引用。
+        """
+        self._pid = os.getpid()
+        self._loops = {}
+        self._requests = 0
+        self._cache_hits = 0
+
+    def get_stats(self) -> dict:
+        """获取验证统计（用于健康检查和监控）"""
+        total = self._requests + self._cache_hits
+        return {
+            "active_clients": sum(1 for state in self._loops.values() if state.client is not None),
+            "tracked_hosts": sum(len(state.host_limiters) for state in self._loops.values()),
+            "requests": self._requests,
+            "cache_hits": self._cache_hits,
+            "cache_hit_ratio": round(self._cache_hits / total * 100, 2) if total else 0.0,
+        }
+
+
+# 全局单例
+url_verifier = URLVerifier()
@@ -6,6 +6,7 @@ Web Search Router（搜索工具路由器）
 - 处理回退逻辑
 - 统一错误处理
 - 支持预分配 Tavily API Key（优化性能）
+- 搜索结果缓存（Redis，规范化查询，节省 Tavily 配额）
 
 优先级：
 1. Tavily API（使用预分配 Key 或从数据库读取配额）
@@ -21,6 +22,7 @@ from app.models.domain import SearchQuery, SearchResult
 from app.config.settings import settings
 from app.tools.search.tavily_api_search import TavilyAPISearchTool
 from app.tools.search.duckduckgo_search import DuckDuckGoSearchTool
+from app.tools.search.search_cache import search_result_cache
 from app.db.session import get_db
 
 logger = structlog.get_logger()
@@ -108,7 +110,6 @@ class WebSearchRouter(BaseTool[SearchQuery, SearchResult]):
                 )
             return False
     
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     async def execute(
         self, 
         input_data: SearchQuery, 
@@ -116,7 +117,44 @@ class WebSearchRouter(BaseTool[SearchQuery, SearchResult]):
         pre_allocated_tavily_key: Optional[str] = None
     ) -> SearchResult:
         """
-        执行网络搜索（按优先级路由）
+        执行网络搜索（优先读取缓存，未命中时按优先级路由）
+        
+        Args:
+            input_data: 搜索查询
+            db_session: 数据库会话（用于 Tavily API Key 查询，仅在未提供预分配 Key 时使用）
+            pre_allocated_tavily_key: 预分配的 Tavily API Key（如果提供，跳过数据库查询）
+            
+        Returns:
+            搜索结果
+            
+        Raises:
+            ValueError: 如果所有搜索引擎都不可用或都失败
+        """
+        if search_result_cache.enabled:
+            cached = await search_result_cache.get(input_data)
+            if cached is not None:
+                return cached
+        
+        result = await self._route(
+            input_data,
+            db_session=db_session,
+            pre_allocated_tavily_key=pre_allocated_tavily_key,
+        )
+        
+        if search_result_cache.enabled:
+            await search_result_cache.set(input_data, result)
+        
+        return result
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
+    async def _route(
+        self, 
+        input_data: SearchQuery, 
+        db_session: Optional[AsyncSession] = None,
+        pre_allocated_tavily_key: Optional[str] = None
+    ) -> SearchResult:
+        """
+        按优先级路由到搜索引擎（带重试）
         
         优先级：
         1. Tavily API（使用预分配 Key 或从数据库读取配额）
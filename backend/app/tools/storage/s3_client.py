@@ -14,6 +14,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 from app.tools.base import BaseTool
 from app.models.domain import S3UploadRequest, S3UploadResult, S3DownloadRequest, S3DownloadResult
 from app.config.settings import settings
+from app.tools.storage.s3_client_pool import CLIENT_INVALIDATING_ERRORS, s3_client_pool
 
 logger = structlog.get_logger()
 
@@ -35,11 +36,27 @@ class S3StorageTool(BaseTool[S3UploadRequest, S3UploadResult]):
             endpoint=self.endpoint_url,
             region=self.region,
             bucket=self.default_bucket,
+            client_pool_enabled=settings.S3_CLIENT_POOL_ENABLED,
         )
     
     @asynccontextmanager
     async def _get_client(self) -> AsyncGenerator:
-        """获取 S3 异步客户端（上下文管理器）"""
+        """
+        获取 S3 异步客户端（上下文管理器）
+        
+        启用连接池时复用进程级共享客户端（退出上下文时不关闭），
+        否则每次创建独立客户端。
+        """
+        if settings.S3_CLIENT_POOL_ENABLED:
+            async with s3_client_pool.acquire() as client:
+                try:
+                    yield client
+                except CLIENT_INVALIDATING_ERRORS:
+                    # 底层连接异常：从池中摘除该客户端，下次调用时重建
+                    await s3_client_pool.invalidate(client)
+                    raise
+            return
+        
         async with self.session.client(
             "s3",
             endpoint_url=self.endpoint_url,
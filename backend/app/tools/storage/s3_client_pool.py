@@ -0,0 +1,340 @@
+"""
+S3 客户端连接池（进程级单例）
+
+设计说明：
+- 每个进程 + 事件循环维护一个长生命周期的 aioboto3 客户端，所有上传/下载共享
+- 客户端内部的 aiohttp 连接池复用 TCP/TLS 连接（max_pool_connections 可配置）
+- Fork 安全：检测进程 ID 变化（Celery prefork），丢弃继承的客户端引用
+- 事件循环感知：aiohttp 会话绑定到创建时的事件循环，循环切换时重建客户端；
+  条目同时保存循环的弱引用，循环已关闭或被回收（id 可能被新循环复用）时丢弃该客户端
+- 引用计数：连接异常后只摘除池中的引用，客户端在最后一个使用者释放后才关闭，
+  不影响同一循环中仍在使用该客户端的其他上传/下载
+
+问题背景：
+- 原实现每次 execute/download 都 `async with session.client(...)`
+- 一次内容生成需要上传 30+ 教程，每次都要重新握手 TLS 和初始化 botocore 客户端
+"""
+import asyncio
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import aioboto3
+from botocore.config import Config
+from botocore.exceptions import ConnectionError as BotocoreConnectionError, HTTPClientError
+import structlog
+
+from app.config.settings import settings
+from app.utils.metrics import counter, histogram
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+s3_client_acquisitions = counter(
+    "s3_client_acquisitions_total",
+    "Number of S3 client acquisitions",
+    labelnames=["result"],  # reused / created
+)
+
+s3_client_create_seconds = histogram(
+    "s3_client_create_seconds",
+    "Time spent creating a new S3 client",
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5],
+)
+
+
+# 需要丢弃共享客户端的异常：botocore 底层连接异常
+# - botocore ConnectionError：EndpointConnectionError / ConnectTimeoutError
+# - botocore HTTPClientError：ConnectionClosedError / ReadTimeoutError
+# 不包含内置 ConnectionError / OSError：调用方代码中的 TimeoutError、FileNotFoundError 等
+# 均为 OSError 子类，与客户端状态无关。
+# 已关闭事件循环的客户端由 _PooledClient.is_stale() 淘汰，无需依赖异常
+CLIENT_INVALIDATING_ERRORS = (
+    BotocoreConnectionError,
+    HTTPClientError,
+)
+
+
+@dataclass(eq=False)
+class _PooledClient:
+    """事件循环的共享客户端"""
+    loop_ref: weakref.ReferenceType
+    client_cm: Any
+    client: Any
+    # 正在使用该客户端的调用方数量
+    users: int = 0
+    # 已从池中摘除，最后一个使用者释放后关闭
+    retired: bool = False
+
+    def belongs_to(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self.loop_ref() is loop and not loop.is_closed()
+
+    def is_stale(self) -> bool:
+        loop = self.loop_ref()
+        return loop is None or loop.is_closed()
+
+
+class S3ClientPool:
+    """
+    进程级 S3 客户端池
+
+    按事件循环缓存已进入上下文的 aioboto3 客户端。同一事件循环中的所有调用
+    共享一个客户端（及其底层 HTTP 连接池）。
+    """
+
+    def __init__(self):
+        self._pid: int = os.getpid()
+        self._session: aioboto3.Session | None = None
+        # loop_id -> 共享客户端（通过 loop 弱引用校验，防止 id 复用）
+        self._clients: dict[int, _PooledClient] = {}
+        # 已摘除但仍有使用者的客户端（等待空闲后关闭）
+        self._retired: list[_PooledClient] = []
+        self._locks: dict[int, asyncio.Lock] = {}
+
+        # 统计信息
+        self._created_count: int = 0
+        self._reused_count: int = 0
+        self._create_seconds_total: float = 0.0
+
+    def _check_fork(self) -> None:
+        """
+        检测进程 fork
+
+        子进程继承的客户端持有父进程的 socket 和事件循环引用，
+        不能关闭也不能复用，直接丢弃引用即可。
+        """
+        current_pid = os.getpid()
+        if current_pid != self._pid:
+            logger.info(
+                "s3_client_pool_fork_detected",
+                parent_pid=self._pid,
+                child_pid=current_pid,
+                dropped_clients=len(self._clients),
+            )
+            self._pid = current_pid
+            self._session = None
+            self._clients = {}
+            self._retired = []
+            self._locks = {}
+
+    def _get_lock(self, loop_id: int) -> asyncio.Lock:
+        """获取当前事件循环的创建锁"""
+        lock = self._locks.get(loop_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[loop_id] = lock
+        return lock
+
+    async def _create_client(self) -> tuple[Any, Any]:
+        """创建并进入一个新的 aioboto3 客户端上下文"""
+        if self._session is None:
+            self._session = aioboto3.Session()
+
+        client_cm = self._session.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            region_name=settings.S3_REGION or "auto",
+            config=Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+            ),
+        )
+        client = await client_cm.__aenter__()
+        return client_cm, client
+
+    def _prune_stale(self) -> None:
+        """
+        丢弃已关闭或已回收事件循环的客户端
+
+        这些客户端的 aiohttp 会话绑定在不可用的循环上，无法在当前循环中关闭，只丢弃引用；
+        同时避免循环 id 被新循环复用时拿到绑定旧循环的客户端。
+        """
+        stale = [loop_id for loop_id, entry in self._clients.items() if entry.is_stale()]
+        for loop_id in stale:
+            del self._clients[loop_id]
+            self._locks.pop(loop_id, None)
+        self._retired = [entry for entry in self._retired if not entry.is_stale()]
+        if stale:
+            logger.info("s3_pooled_clients_dropped_for_dead_loops", count=len(stale))
+
+    def _get_reusable(self, loop: asyncio.AbstractEventLoop) -> _PooledClient | None:
+        entry = self._clients.get(id(loop))
+        if entry is None or not entry.belongs_to(loop):
+            return None
+        self._reused_count += 1
+        s3_client_acquisitions.labels(result="reused").inc()
+        return entry
+
+    async def _get_entry(self) -> _PooledClient:
+        """获取当前事件循环的共享客户端条目，不存在时创建"""
+        self._check_fork()
+
+        loop = asyncio.get_running_loop()
+        loop_id = id(loop)
+        entry = self._get_reusable(loop)
+        if entry is not None:
+            return entry
+
+        self._prune_stale()
+        async with self._get_lock(loop_id):
+            # 双重检查：等待锁期间可能已被其他协程创建
+            entry = self._get_reusable(loop)
+            if entry is not None:
+                return entry
+
+            start_time = time.time()
+            client_cm, client = await self._create_client()
+            create_seconds = time.time() - start_time
+
+            entry = _PooledClient(weakref.ref(loop), client_cm, client)
+            self._clients[loop_id] = entry
+            self._created_count += 1
+            self._create_seconds_total += create_seconds
+
+            s3_client_acquisitions.labels(result="created").inc()
+            s3_client_create_seconds.observe(create_seconds)
+
+            logger.info(
+                "s3_pooled_client_created",
+                pid=self._pid,
+                loop_id=loop_id,
+                create_seconds=round(create_seconds, 3),
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            )
+            return entry
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """
+        占用当前事件循环的共享 S3 客户端（上下文管理器）
+
+        退出上下文时不关闭客户端；客户端已被 invalidate() 摘除且没有其他使用者时才关闭。
+
+        Yields:
+            aioboto3 S3 客户端（调用方不应关闭）
+        """
+        entry = await self._get_entry()
+        entry.users += 1
+        try:
+            yield entry.client
+        finally:
+            entry.users -= 1
+            if entry.retired and entry.users == 0:
+                await self._close_entry(entry)
+
+    async def _close_entry(self, entry: _PooledClient) -> None:
+        """关闭已摘除的客户端"""
+        if entry in self._retired:
+            self._retired.remove(entry)
+        try:
+            await entry.client_cm.__aexit__(None, None, None)
+        except Exception as e:
+            logger.warning("s3_pooled_client_close_failed", error=str(e))
+
+    async def invalidate(self, client: Any) -> None:
+        """
+        从池中摘除出错的客户端（如连接异常后），下次调用时重建
+
+        只处理仍是当前客户端的情况：客户端已被其他调用方摘除并重建时不做任何事，
+        避免关闭刚创建的新客户端。仍有其他使用者时延迟到最后一个使用者释放后关闭。
+
+        Args:
+            client: 出错的客户端
+        """
+        self._check_fork()
+        loop = asyncio.get_running_loop()
+        loop_id = id(loop)
+        entry = self._clients.get(loop_id)
+        if entry is None or entry.client is not client or not entry.belongs_to(loop):
+            return
+        del self._clients[loop_id]
+        entry.retired = True
+        logger.info("s3_pooled_client_invalidated", loop_id=loop_id, users=entry.users)
+        if entry.users == 0:
+            await self._close_entry(entry)
+        else:
+            self._retired.append(entry)
+
+    async def close(self) -> None:
+        """
+        关闭当前事件循环的客户端（在应用/Worker 关闭时调用）
+
+        其他事件循环的客户端无法在当前循环中安全关闭，仅丢弃引用。
+        """
+        self._check_fork()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.pop(id(loop), None) if loop is not None else None
+        entries = [entry] if entry is not None else []
+        entries += self._retired
+        for entry in entries:
+            if loop is not None and entry.belongs_to(loop):
+                await self._close_entry(entry)
+
+        self._clients = {}
+        self._retired = []
+        self._locks = {}
+        logger.info("s3_client_pool_closed")
+
+    def reset(self) -> None:
+        """
+        重置连接池（Celery worker_process_init 中调用）
+
+        不关闭继承的客户端，仅丢弃引用。
+        """
+        self._pid = os.getpid()
+        self._session = None
+        self._clients = {}
+        self._retired = []
+        self._locks = {}
+        self._created_count = 0
+        self._reused_count = 0
+        self._create_seconds_total = 0.0
+
+    def get_stats(self) -> dict:
+        """
+        获取连接复用统计（用于健康检查和监控）
+
+        estimated_saved_seconds = 复用次数 × 平均客户端创建耗时
+        """
+        avg_create_seconds = (
+            self._create_seconds_total / self._created_count
+            if self._created_count > 0
+            else 0.0
+        )
+        total = self._created_count + self._reused_count
+        return {
+            "pid": self._pid,
+            "active_clients": len(self._clients),
+            "retired_clients": len(self._retired),
+            "max_pool_connections": settings.S3_MAX_POOL_CONNECTIONS,
+            "created": self._created_count,
+            "reused": self._reused_count,
+            "reuse_ratio": round(self._reused_count / total * 100, 2) if total else 0.0,
+            "avg_create_ms": round(avg_create_seconds * 1000, 2),
+            "estimated_saved_seconds": round(avg_create_seconds * self._reused_count, 3),
+        }
+
+
+# 全局单例
+s3_client_pool = S3ClientPool()
+
+
+def reset_s3_client_pool() -> None:
+    """
+    重置 S3 客户端池
+
+    ⚠️ 用于 Celery Worker 进程初始化时调用
+    """
+    s3_client_pool.reset()
+    logger.info("s3_client_pool_reset", pid=os.getpid())
@@ -30,8 +30,28 @@ class CostTracker:
     
     def __init__(self):
         self.total_cost: float = 0.0
+        self.total_saved_cost: float = 0.0
         self.usage_by_agent: Dict[str, Dict[str, float]] = {}
     
+    def _calculate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """按模型定价计算调用成本（美元）"""
+        pricing = self.MODEL_PRICING.get(model, {})
+        prompt_cost = (prompt_tokens / 1_000_000) * pricing.get("prompt", 0.0)
+        completion_cost = (completion_tokens / 1_000_000) * pricing.get("completion", 0.0)
+        return prompt_cost + completion_cost
+    
+    def _get_agent_usage(self, agent_id: str) -> Dict[str, float]:
+        """获取（或初始化）Agent 使用统计"""
+        if agent_id not in self.usage_by_agent:
+            self.usage_by_agent[agent_id] = {
+                "total_cost": 0.0,
+                "total_tokens": 0,
+                "call_count": 0,
+                "cache_hits": 0,
+                "saved_cost": 0.0,
+            }
+        return self.usage_by_agent[agent_id]
+    
     def track(
         self,
         agent_id: str,
@@ -51,30 +71,16 @@ class CostTracker:
         Returns:
             本次调用的成本（美元）
         """
-        # 获取模型定价
-        pricing = self.MODEL_PRICING.get(model, {})
-        prompt_price_per_million = pricing.get("prompt", 0.0)
-        completion_price_per_million = pricing.get("completion", 0.0)
-        
-        # 计算成本
-        prompt_cost = (prompt_tokens / 1_000_000) * prompt_price_per_million
-        completion_cost = (completion_tokens / 1_000_000) * completion_price_per_million
-        total_cost = prompt_cost + completion_cost
+        total_cost = self._calculate_cost(model, prompt_tokens, completion_tokens)
         
         # 更新总成本
         self.total_cost += total_cost
         
         # 更新 Agent 使用统计
-        if agent_id not in self.usage_by_agent:
-            self.usage_by_agent[agent_id] = {
-                "total_cost": 0.0,
-                "total_tokens": 0,
-                "call_count": 0,
-            }
-        
-        self.usage_by_agent[agent_id]["total_cost"] += total_cost
-        self.usage_by_agent[agent_id]["total_tokens"] += prompt_tokens + completion_tokens
-        self.usage_by_agent[agent_id]["call_count"] += 1
+        usage = self._get_agent_usage(agent_id)
+        usage["total_cost"] += total_cost
+        usage["total_tokens"] += prompt_tokens + completion_tokens
+        usage["call_count"] += 1
         
         logger.info(
             "cost_tracked",
@@ -88,6 +94,49 @@ class CostTracker:
         
         return total_cost
     
+    def track_cache_hit(
+        self,
+        agent_id: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> float:
+        """
+        追踪一次缓存命中（零成本调用）
+        
+        不计入 total_cost，按原始 token 数估算节省的成本。
+        
+        Args:
+            agent_id: Agent ID
+            model: 模型名称
+            prompt_tokens: 缓存响应的 Prompt tokens 数量
+            completion_tokens: 缓存响应的 Completion tokens 数量
+            
+        Returns:
+            节省的成本（美元）
+        """
+        saved_cost = self._calculate_cost(model, prompt_tokens, completion_tokens)
+        self.total_saved_cost += saved_cost
+        
+        usage = self._get_agent_usage(agent_id)
+        usage["call_count"] += 1
+        usage["cache_hits"] += 1
+        usage["saved_cost"] += saved_cost
+        
+        logger.info(
+            "cost_tracked",
+            agent_id=agent_id,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=0.0,
+            saved_cost_usd=saved_cost,
+            cache_hit=True,
+            total_cost_usd=self.total_cost,
+        )
+        
+        return saved_cost
+    
     def get_total_cost(self) -> float:
         """获取总成本"""
         return self.total_cost
@@ -99,6 +148,7 @@ class CostTracker:
     def reset(self):
         """重置统计信息"""
         self.total_cost = 0.0
+        self.total_saved_cost = 0.0
         self.usage_by_agent = {}
 
 
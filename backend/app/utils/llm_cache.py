@@ -0,0 +1,183 @@
+"""
+LLM 响应缓存（内容寻址）
+
+使用场景：
+- 内容重试（content_retry_tasks、retry_service）重新发送相同的 Prompt
+- 从 checkpoint 恢复工作流时重复执行已完成的节点
+- 热门主题的路线图产生完全相同的 Prompt
+
+设计原则：
+- 按 Agent 显式开启（LLM_CACHE_AGENTS），默认关闭
+- 缓存键 = sha256(model, messages, tools, temperature, max_tokens, response_format)
+- 两级存储：进程内 LRU（TTLCache）→ Redis（跨进程/跨 Worker 共享）
+- 温度高于 LLM_CACHE_MAX_TEMPERATURE 的调用自动绕过缓存（需要输出多样性）
+- 只缓存 Agent 已解析、校验成功的响应（BaseAgent._store_cached_response），
+  格式错误的输出不会在重试中被反复返回；只有写入缓存的 Agent（CACHE_WRITING_AGENTS）可以开启，
+  其他 Agent 即使在 LLM_CACHE_AGENTS 中（或配置为 '*'）也不读取缓存，避免无法命中的 Redis 查询
+- 缓存读写失败只记录日志，不影响 LLM 调用
+"""
+import hashlib
+import json
+from typing import Any
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.utils.ttl_cache import TTLCache
+
+logger = structlog.get_logger()
+
+# Redis 键前缀
+CACHE_KEY_PREFIX = "llm_cache:"
+
+
+# 在输出解析、校验成功后调用 _store_cached_response 的 Agent
+CACHE_WRITING_AGENTS = frozenset({
+    "intent_analyzer",
+    "resource_recommender",
+    "tutorial_generator",
+    "quiz_generator",
+})
+
+
+class LLMResponseCache:
+    """
+    LLM 响应两级缓存
+
+    缓存值为 LiteLLM ModelResponse 的字典形式（model_dump()），
+    命中时由调用方重建响应对象。
+    """
+
+    def __init__(self):
+        self._memory: TTLCache[dict] = TTLCache(
+            max_entries=settings.LLM_CACHE_MEMORY_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            max_bytes=settings.LLM_CACHE_MEMORY_MAX_BYTES,
+        )
+        self._enabled_agents = {
+            agent.strip()
+            for agent in settings.LLM_CACHE_AGENTS.split(",")
+            if agent.strip()
+        }
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+
+    def is_enabled_for(self, agent_id: str) -> bool:
+        """判断指定 Agent 是否开启响应缓存（从不写入缓存的 Agent 始终返回 False）"""
+        if not settings.LLM_CACHE_ENABLED or agent_id not in CACHE_WRITING_AGENTS:
+            return False
+        return "*" in self._enabled_agents or agent_id in self._enabled_agents
+
+    @staticmethod
+    def should_bypass(temperature: float) -> bool:
+        """高温度调用绕过缓存（只做判断，绕过次数由调用方通过 record_bypass 记录）"""
+        return temperature > settings.LLM_CACHE_MAX_TEMPERATURE
+
+    def record_bypass(self) -> None:
+        """记录一次绕过缓存的调用"""
+        self.bypassed += 1
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: list[dict],
+        tools: list[dict] | None,
+        temperature: float,
+        max_tokens: int,
+        response_format: dict | None,
+    ) -> str:
+        """
+        计算缓存键（内容寻址）
+
+        使用排序键的 JSON 规范化，保证相同请求得到相同哈希。
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "tools": tools,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_format": response_format,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> dict | None:
+        """
+        读取缓存（先内存后 Redis，Redis 命中时回填内存）
+
+        Returns:
+            ModelResponse 字典，未命中返回 None
+        """
+        cached = self._memory.get(key)
+        if cached is not None:
+            self.memory_hits += 1
+            return cached
+
+        try:
+            data = await redis_client.get_json(f"{CACHE_KEY_PREFIX}{key}")
+        except Exception as e:
+            logger.warning("llm_cache_redis_get_failed", error=str(e))
+            data = None
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.redis_hits += 1
+        self._memory.set(key, data, size_bytes=len(json.dumps(data, default=str)))
+        return data
+
+    async def set(self, key: str, response_data: dict) -> None:
+        """
+        写入缓存（内存 + Redis）
+
+        超过 LLM_CACHE_MAX_ENTRY_BYTES 的响应不缓存。
+        """
+        serialized = json.dumps(response_data, ensure_ascii=False, default=str)
+        size_bytes = len(serialized.encode("utf-8"))
+        if size_bytes > settings.LLM_CACHE_MAX_ENTRY_BYTES:
+            logger.debug("llm_cache_entry_too_large", size_bytes=size_bytes)
+            return
+
+        self._memory.set(key, response_data, size_bytes=size_bytes)
+        self.stores += 1
+
+        try:
+            await redis_client.connect()
+            await redis_client._client.set(
+                f"{CACHE_KEY_PREFIX}{key}",
+                serialized,
+                ex=settings.LLM_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning("llm_cache_redis_set_failed", error=str(e))
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "agents": sorted(self._enabled_agents),
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "stores": self.stores,
+            "hit_ratio": round(hits / lookups * 100, 2) if lookups else 0.0,
+            "memory": self._memory.get_stats(),
+        }
+
+
+# 全局单例
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,389 @@
+"""
+LLM 并发调控器（集群级，AIMD）
+
+使用场景：
+- 内容生成时每个概念并发调用 3 个 Agent，Worker 内 LLM 并发无上限，跨 Worker 也无协调
+- 原实现只在收到 RateLimitError 后由 tenacity 重试，容易形成重试风暴
+
+设计原则：
+- 按 (provider, model) 维护集群共享的并发上限，状态存储在 Redis
+- 每次 LLM 调用先获取租约（lease），调用结束后释放
+- AIMD 调整：成功调用加性增长（limit += increase / limit，约每轮 +increase），
+  收到 429 或延迟突增时乘性减半（冷却期内只减一次，避免同一批 429 连续减半）
+- 租约键带 Redis 端过期时间（PX），Worker 崩溃时泄漏的租约会自动回收，
+  不依赖各主机时钟一致
+- 同一模型的所有键使用相同的哈希标签（{provider:model}），脚本访问的键都在 KEYS 中声明，
+  兼容 Redis Cluster 和按键路由的代理
+- Redis 异常时放行（fail open），不影响 LLM 调用
+"""
+import asyncio
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+import structlog
+
+from app.config.settings import settings
+from app.db.redis_client import redis_client
+from app.utils.metrics import counter, gauge, histogram
+
+logger = structlog.get_logger()
+
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+llm_governor_limit = gauge(
+    "llm_governor_limit",
+    "Current cluster-wide LLM concurrency limit",
+    labelnames=["provider", "model"],
+)
+
+llm_governor_adjustments = counter(
+    "llm_governor_adjustments_total",
+    "Number of AIMD limit adjustments",
+    labelnames=["provider", "model", "decision"],  # increase / decrease / hold
+)
+
+llm_governor_wait_seconds = histogram(
+    "llm_governor_wait_seconds",
+    "Time spent waiting for an LLM concurrency lease",
+    labelnames=["provider", "model"],
+    buckets=[0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 120],
+)
+
+# Redis 键前缀
+KEY_PREFIX = "llm_governor:"
+
+# 获取租约（原子操作）
+# 每个租约是一个带 PX 过期时间的独立键，过期由 Redis 判断，不比较各主机的时钟；
+# 租约集合只作为索引，获取时清理键已过期的成员
+# 租约键由 KEYS[4]（租约键前缀，与其他键哈希标签相同，位于同一槽位）拼接租约 ID 得到
+# KEYS[1]: 状态 Hash，KEYS[2]: 租约 ID 集合，KEYS[3]: 本次租约键，KEYS[4]: 租约键前缀
+# ARGV: lease_id, lease_ttl_ms, initial_limit
+_ACQUIRE_SCRIPT = """
+for _, id in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if redis.call('EXISTS', KEYS[4] .. id) == 0 then
+        redis.call('SREM', KEYS[2], id)
+    end
+end
+local limit = tonumber(redis.call('HGET', KEYS[1], 'limit'))
+if not limit then
+    limit = tonumber(ARGV[3])
+    redis.call('HSET', KEYS[1], 'limit', limit)
+end
+redis.call('EXPIRE', KEYS[1], 86400)
+if redis.call('SCARD', KEYS[2]) < math.max(1, math.floor(limit)) then
+    redis.call('SET', KEYS[3], 1, 'PX', ARGV[2])
+    redis.call('SADD', KEYS[2], ARGV[1])
+    redis.call('PEXPIRE', KEYS[2], tonumber(ARGV[2]) * 2)
+    return 1
+end
+return 0
+"""
+
+# 释放租约并按 AIMD 调整上限（原子操作，冷却期使用 Redis 服务器时间）
+# KEYS[1]: 状态 Hash，KEYS[2]: 租约 ID 集合，KEYS[3]: 租约键
+# ARGV: lease_id, outcome(ok/throttled/error), latency_metric,
+#       initial_limit, min_limit, max_limit, increase, decrease_factor,
+#       cooldown_seconds, spike_factor, min_samples, ewma_alpha
+_RELEASE_SCRIPT = """
+redis.replicate_commands()
+redis.call('DEL', KEYS[3])
+redis.call('SREM', KEYS[2], ARGV[1])
+local outcome = ARGV[2]
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local metric = tonumber(ARGV[3])
+local limit = tonumber(redis.call('HGET', KEYS[1], 'limit')) or tonumber(ARGV[4])
+local min_limit = tonumber(ARGV[5])
+local max_limit = tonumber(ARGV[6])
+local decision = 'hold'
+
+if outcome == 'ok' then
+    local ewma = tonumber(redis.call('HGET', KEYS[1], 'latency_ewma'))
+    local samples = tonumber(redis.call('HGET', KEYS[1], 'samples')) or 0
+    if ewma and samples >= tonumber(ARGV[11]) and metric > ewma * tonumber(ARGV[10]) then
+        outcome = 'throttled'
+    end
+    local alpha = tonumber(ARGV[12])
+    if ewma then
+        ewma = alpha * metric + (1 - alpha) * ewma
+    else
+        ewma = metric
+    end
+    redis.call('HSET', KEYS[1], 'latency_ewma', ewma, 'samples', samples + 1)
+    if outcome == 'ok' then
+        limit = math.min(max_limit, limit + tonumber(ARGV[7]) / math.max(limit, 1))
+        decision = 'increase'
+    end
+end
+
+if outcome == 'throttled' then
+    local last_decrease = tonumber(redis.call('HGET', KEYS[1], 'last_decrease')) or 0
+    if now - last_decrease >= tonumber(ARGV[9]) then
+        limit = math.max(min_limit, limit * tonumber(ARGV[8]))
+        redis.call('HSET', KEYS[1], 'last_decrease', now)
+        decision = 'decrease'
+    end
+end
+
+redis.call('HSET', KEYS[1], 'limit', limit)
+redis.call('EXPIRE', KEYS[1], 86400)
+return {tostring(limit), decision}
+"""
+
+
+class GovernorLease:
+    """
+    LLM 并发租约
+
+    调用方在调用结束前通过 record_usage / mark_rate_limited 报告结果，
+    释放租约时据此调整并发上限。provider 调用（含流式输出的每次读取）
+    放在 measure() 中计时，延迟指标不包含调用方处理结果的时间。
+    """
+
+    def __init__(self, provider: str, model: str, lease_id: str | None):
+        self.provider = provider
+        self.model = model
+        self.lease_id = lease_id  # None 表示未经 Redis 授权（调控器关闭或 fail open）
+        self.started_at = time.monotonic()
+        self.provider_seconds: float | None = None
+        self.completion_tokens: int | None = None
+        self.rate_limited = False
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """计时一段 provider 调用（可多次进入，累加）"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.provider_seconds = (self.provider_seconds or 0.0) + time.monotonic() - start
+
+    def record_usage(self, completion_tokens: int | None) -> None:
+        """记录输出 token 数（用于按 token 归一化延迟）"""
+        self.completion_tokens = completion_tokens
+
+    def mark_rate_limited(self) -> None:
+        """标记本次调用收到 429"""
+        self.rate_limited = True
+
+    @property
+    def latency_metric(self) -> float:
+        """
+        延迟指标：有输出 token 数时为每 token 耗时，否则为总耗时
+
+        不同 Agent 的输出长度差异很大（教程 vs 测验），按 token 归一化后
+        才能用同一个 EWMA 检测延迟突增。未使用 measure() 时按租约持有时间计算。
+        """
+        elapsed = self.provider_seconds
+        if elapsed is None:
+            elapsed = time.monotonic() - self.started_at
+        if self.completion_tokens:
+            return elapsed / self.completion_tokens
+        return elapsed
+
+
+class LLMConcurrencyGovernor:
+    """
+    集群级 LLM 并发调控器（AIMD）
+    """
+
+    def __init__(self):
+        self.acquired = 0
+        self.failed_open = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+        # (provider, model) -> 最近一次观察到的上限
+        self._last_limits: dict[tuple[str, str], float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LLM_GOVERNOR_ENABLED
+
+    @staticmethod
+    def _keys(provider: str, model: str) -> tuple[str, str, str]:
+        """状态 Hash、租约 ID 集合、租约键前缀（共享哈希标签，Redis Cluster 下位于同一槽位）"""
+        base = f"{KEY_PREFIX}{{{provider}:{model}}}"
+        return f"{base}:state", f"{base}:lease_ids", f"{base}:lease:"
+
+    async def _acquire(self, provider: str, model: str) -> str | None:
+        """
+        获取租约（等待直到有可用并发）
+
+        Returns:
+            租约 ID；Redis 异常时返回 None（放行）
+
+        Raises:
+            TimeoutError: 超过 LLM_GOVERNOR_ACQUIRE_TIMEOUT_SECONDS 仍未获取到租约
+        """
+        state_key, leases_key, lease_prefix = self._keys(provider, model)
+        lease_id = uuid.uuid4().hex
+        start_time = time.monotonic()
+        delay = 0.05
+
+        while True:
+            try:
+                await redis_client.connect()
+                granted = await redis_client._client.eval(
+                    _ACQUIRE_SCRIPT,
+                    4,
+                    state_key,
+                    leases_key,
+                    f"{lease_prefix}{lease_id}",
+                    lease_prefix,
+                    lease_id,
+                    int(settings.LLM_GOVERNOR_LEASE_TTL_SECONDS * 1000),
+                    settings.LLM_GOVERNOR_INITIAL_LIMIT,
+                )
+            except Exception as e:
+                self.failed_open += 1
+                logger.warning(
+                    "llm_governor_acquire_failed_open",
+                    provider=provider,
+                    model=model,
+                    error=str(e),
+                )
+                return None
+
+            waited = time.monotonic() - start_time
+            if granted:
+                self.acquired += 1
+                self.total_wait_seconds += waited
+                llm_governor_wait_seconds.labels(provider=provider, model=model).observe(waited)
+                if waited > 1.0:
+                    logger.info(
+                        "llm_governor_lease_acquired_after_wait",
+                        provider=provider,
+                        model=model,
+                        wait_seconds=round(waited, 2),
+                    )
+                return lease_id
+
+            if waited >= settings.LLM_GOVERNOR_ACQUIRE_TIMEOUT_SECONDS:
+                raise TimeoutError(
+                    f"LLM governor timeout after {waited:.0f}s ({provider}/{model})"
+                )
+
+            # 带抖动的指数退避，避免多个协程同时重试
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, 1.0)
+
+    async def _release(self, lease: GovernorLease, outcome: str) -> None:
+        """释放租约并按 AIMD 调整上限"""
+        state_key, leases_key, lease_prefix = self._keys(lease.provider, lease.model)
+        try:
+            limit, decision = await redis_client._client.eval(
+                _RELEASE_SCRIPT,
+                3,
+                state_key,
+                leases_key,
+                f"{lease_prefix}{lease.lease_id}",
+                lease.lease_id,
+                outcome,
+                lease.latency_metric,
+                settings.LLM_GOVERNOR_INITIAL_LIMIT,
+                settings.LLM_GOVERNOR_MIN_LIMIT,
+                settings.LLM_GOVERNOR_MAX_LIMIT,
+                settings.LLM_GOVERNOR_ADDITIVE_INCREASE,
+                settings.LLM_GOVERNOR_DECREASE_FACTOR,
+                settings.LLM_GOVERNOR_DECREASE_COOLDOWN_SECONDS,
+                settings.LLM_GOVERNOR_LATENCY_SPIKE_FACTOR,
+                settings.LLM_GOVERNOR_MIN_LATENCY_SAMPLES,
+                0.2,
+            )
+        except Exception as e:
+            logger.warning(
+                "llm_governor_release_failed",
+                provider=lease.provider,
+                model=lease.model,
+                error=str(e),
+            )
+            return
+
+        if isinstance(limit, bytes):
+            limit = limit.decode()
+        if isinstance(decision, bytes):
+            decision = decision.decode()
+        limit = float(limit)
+        self._last_limits[(lease.provider, lease.model)] = limit
+
+        llm_governor_limit.labels(provider=lease.provider, model=lease.model).set(limit)
+        llm_governor_adjustments.labels(
+            provider=lease.provider, model=lease.model, decision=decision
+        ).inc()
+
+        if decision == "decrease":
+            logger.warning(
+                "llm_governor_limit_decreased",
+                provider=lease.provider,
+                model=lease.model,
+                new_limit=round(limit, 2),
+                reason="rate_limited" if lease.rate_limited else "latency_spike",
+            )
+
+    @asynccontextmanager
+    async def lease(self, provider: str, model: str) -> AsyncIterator[GovernorLease]:
+        """
+        获取一次 LLM 调用的并发租约
+
+        用法：
+            async with llm_governor.lease(provider, model) as lease:
+                try:
+                    with lease.measure():
+                        response = await litellm.acompletion(...)
+                except litellm.RateLimitError:
+                    lease.mark_rate_limited()
+                    raise
+                lease.record_usage(response.usage.completion_tokens)
+
+        调控器关闭时直接放行。
+        """
+        if not self.enabled:
+            yield GovernorLease(provider, model, lease_id=None)
+            return
+
+        lease = GovernorLease(provider, model, await self._acquire(provider, model))
+        outcome = "error"
+        try:
+            yield lease
+            outcome = "ok"
+        finally:
+            if lease.rate_limited:
+                outcome = "throttled"
+                self.rate_limited += 1
+            if lease.lease_id is not None:
+                await self._release(lease, outcome)
+
+    async def get_state(self, provider: str, model: str) -> dict:
+        """读取指定模型的集群共享状态"""
+        state_key, leases_key, _ = self._keys(provider, model)
+        await redis_client.connect()
+        state = await redis_client._client.hgetall(state_key)
+        # 可能包含已过期、尚未在下次获取时清理的租约
+        inflight = await redis_client._client.scard(leases_key)
+        decoded = {
+            (k.decode() if isinstance(k, bytes) else k): float(v)
+            for k, v in state.items()
+        }
+        return {"inflight": inflight, **decoded}
+
+    def get_stats(self) -> dict:
+        """获取本进程调控统计（用于健康检查和监控）"""
+        return {
+            "enabled": self.enabled,
+            "acquired": self.acquired,
+            "rate_limited": self.rate_limited,
+            "failed_open": self.failed_open,
+            "avg_wait_ms": round(self.total_wait_seconds / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "limits": {
+                f"{provider}/{model}": round(limit, 2)
+                for (provider, model), limit in self._last_limits.items()
+            },
+        }
+
+
+# 全局单例
+llm_governor = LLMConcurrencyGovernor()
@@ -0,0 +1,65 @@
+"""
+Prometheus 指标工厂（prometheus_client 为可选依赖）
+
+未安装 prometheus_client 时返回空操作指标，调用方可以直接调用
+labels/inc/dec/set/observe，无需各自 try/except ImportError。
+
+仅当采集指标前需要额外计算（如读取连接池状态）时，才需判断 PROMETHEUS_ENABLED。
+"""
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    import prometheus_client
+
+    PROMETHEUS_ENABLED = True
+except ImportError:
+    prometheus_client = None
+    PROMETHEUS_ENABLED = False
+    logger.warning("prometheus_client_not_installed", message="Prometheus 指标将被禁用")
+
+
+class _NoopMetric:
+    """空操作指标（未安装 prometheus_client 时使用）"""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+_NOOP_METRIC = _NoopMetric()
+
+
+def counter(name: str, documentation: str, **kwargs: Any) -> Any:
+    """创建 Counter（未安装 prometheus_client 时返回空操作指标）"""
+    if not PROMETHEUS_ENABLED:
+        return _NOOP_METRIC
+    return prometheus_client.Counter(name, documentation, **kwargs)
+
+
+def gauge(name: str, documentation: str, **kwargs: Any) -> Any:
+    """创建 Gauge（未安装 prometheus_client 时返回空操作指标）"""
+    if not PROMETHEUS_ENABLED:
+        return _NOOP_METRIC
+    return prometheus_client.Gauge(name, documentation, **kwargs)
+
+
+def histogram(name: str, documentation: str, **kwargs: Any) -> Any:
+    """创建 Histogram（未安装 prometheus_client 时返回空操作指标）"""
+    if not PROMETHEUS_ENABLED:
+        return _NOOP_METRIC
+    return prometheus_client.Histogram(name, documentation, **kwargs)
@@ -1,15 +1,41 @@
 """
 Prompt 模板加载器（Jinja2）
+
+进程级单例（get_prompt_loader）：
+- 所有 Agent 共享同一个 Jinja2 Environment，模板只解析/编译一次
+- 启动时预编译 prompts/ 下的全部模板
+- 可选磁盘字节码缓存（PROMPT_BYTECODE_CACHE_DIR），加速新进程冷启动
+- 开发模式可开启自动重载（PROMPT_AUTO_RELOAD），修改模板无需重启
 """
 import os
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
 import json
 import structlog
 
+from app.config.settings import settings
+from app.utils.metrics import histogram
+
 logger = structlog.get_logger()
 
+# ============================================================
+# Prometheus 指标定义（可选）
+# ============================================================
+prompt_render_seconds = histogram(
+    "prompt_render_seconds",
+    "Time spent rendering prompt templates",
+    labelnames=["template"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5],
+)
+
 
 def to_json_filter(value):
     """Jinja2 自定义过滤器：将对象转换为 JSON 字符串"""
@@ -35,12 +61,21 @@ def to_json_filter(value):
 class PromptLoader:
     """Prompt 模板加载器"""
     
-    def __init__(self, template_dir: str | None = None):
+    def __init__(
+        self,
+        template_dir: str | None = None,
+        auto_reload: bool | None = None,
+        bytecode_cache_dir: str | None = None,
+    ):
         """
         初始化 Prompt 加载器
         
+        通常应通过 get_prompt_loader() 获取共享实例，而不是直接实例化。
+        
         Args:
             template_dir: 模板目录路径，默认为项目根目录下的 prompts/
+            auto_reload: 模板文件变化时自动重新编译（默认 settings.PROMPT_AUTO_RELOAD）
+            bytecode_cache_dir: 磁盘字节码缓存目录（默认 settings.PROMPT_BYTECODE_CACHE_DIR）
         """
         if template_dir is None:
             # 获取项目根目录（backend/）
@@ -48,16 +83,74 @@ class PromptLoader:
             project_root = current_file.parent.parent.parent
             template_dir = str(project_root / "prompts")
         
+        if auto_reload is None:
+            auto_reload = settings.PROMPT_AUTO_RELOAD
+        if bytecode_cache_dir is None:
+            bytecode_cache_dir = settings.PROMPT_BYTECODE_CACHE_DIR
+        
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        
         self.template_dir = template_dir
+        self.auto_reload = auto_reload
         self.env = Environment(
             loader=FileSystemLoader(template_dir),
             autoescape=select_autoescape(['html', 'xml']),
             trim_blocks=True,
             lstrip_blocks=True,
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache,
+            # 模板数量很少，不限制缓存大小，避免 LRU 淘汰导致重新编译
+            cache_size=-1,
         )
         # 注册自定义过滤器
         self.env.filters['to_json'] = to_json_filter
-        logger.info("prompt_loader_initialized", template_dir=template_dir)
+        
+        # 渲染耗时统计：template_name -> {count, total_seconds, max_seconds}
+        self._render_stats: Dict[str, Dict[str, float]] = {}
+        self._precompiled_count = 0
+        self._precompile_seconds = 0.0
+        
+        logger.info(
+            "prompt_loader_initialized",
+            template_dir=template_dir,
+            auto_reload=auto_reload,
+            bytecode_cache_dir=bytecode_cache_dir,
+        )
+    
+    def precompile(self) -> int:
+        """
+        预编译模板目录下的全部模板
+        
+        编译结果缓存在 Environment 中，后续 get_template() 直接命中。
+        单个模板编译失败只记录日志（渲染时会再次抛出）。
+        
+        Returns:
+            成功编译的模板数量
+        """
+        start_time = time.perf_counter()
+        compiled = 0
+        for template_name in self.env.list_templates(extensions=["j2"]):
+            try:
+                self.env.get_template(template_name)
+                compiled += 1
+            except Exception as e:
+                logger.error(
+                    "prompt_precompile_failed",
+                    template_name=template_name,
+                    error=str(e),
+                )
+        
+        self._precompiled_count = compiled
+        self._precompile_seconds = time.perf_counter() - start_time
+        logger.info(
+            "prompt_templates_precompiled",
+            count=compiled,
+            duration_ms=round(self._precompile_seconds * 1000, 2),
+        )
+        return compiled
     
     def render(self, template_name: str, **kwargs) -> str:
         """
@@ -70,9 +163,10 @@ class PromptLoader:
         Returns:
             渲染后的字符串
         """
+        start_time = time.perf_counter()
         try:
             template = self.env.get_template(template_name)
-            return template.render(**kwargs)
+            result = template.render(**kwargs)
         except Exception as e:
             logger.error(
                 "prompt_render_failed",
@@ -80,4 +174,65 @@ class PromptLoader:
                 error=str(e)
             )
             raise
+        
+        self._record_render(template_name, time.perf_counter() - start_time)
+        return result
+    
+    def _record_render(self, template_name: str, seconds: float) -> None:
+        """记录一次渲染耗时"""
+        stats = self._render_stats.get(template_name)
+        if stats is None:
+            stats = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            self._render_stats[template_name] = stats
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        
+        prompt_render_seconds.labels(template=template_name).observe(seconds)
+    
+    def get_stats(self) -> dict:
+        """
+        获取模板缓存和渲染耗时统计（用于健康检查和监控）
+        """
+        templates = {
+            name: {
+                "count": int(stats["count"]),
+                "avg_ms": round(stats["total_seconds"] / stats["count"] * 1000, 3),
+                "max_ms": round(stats["max_seconds"] * 1000, 3),
+            }
+            for name, stats in self._render_stats.items()
+        }
+        return {
+            "template_dir": self.template_dir,
+            "auto_reload": self.auto_reload,
+            "bytecode_cache": self.env.bytecode_cache is not None,
+            "precompiled": self._precompiled_count,
+            "precompile_ms": round(self._precompile_seconds * 1000, 2),
+            "render_count": sum(t["count"] for t in templates.values()),
+            "templates": templates,
+        }
+
+
+# 全局单例
+_prompt_loader: PromptLoader | None = None
+_prompt_loader_lock = threading.Lock()
+
+
+def get_prompt_loader() -> PromptLoader:
+    """
+    获取进程级共享的 PromptLoader
+    
+    首次调用时创建并预编译全部模板（PROMPT_PRECOMPILE_ON_STARTUP）。
+    Celery Worker 在 worker_init 信号中（父进程，fork 之前）调用，编译好的模板是
+    纯 Python 对象，prefork 子进程直接复用。
+    """
+    global _prompt_loader
+    if _prompt_loader is None:
+        with _prompt_loader_lock:
+            if _prompt_loader is None:
+                loader = PromptLoader()
+                if settings.PROMPT_PRECOMPILE_ON_STARTUP:
+                    loader.precompile()
+                _prompt_loader = loader
+    return _prompt_loader
 
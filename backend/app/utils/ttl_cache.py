@@ -0,0 +1,121 @@
+"""
+进程内 LRU + TTL 缓存
+
+用于缓存热点数据（LLM 响应、搜索结果等）的进程内一级缓存。
+
+特性：
+- LRU 淘汰：超过条目上限或总字节上限时淘汰最久未访问的条目
+- TTL 过期：读取时惰性检查过期
+- 非线程安全：仅在单个事件循环内使用（asyncio 协程之间无需加锁）
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    带 TTL 和容量上限的 LRU 缓存
+
+    Args:
+        max_entries: 最大条目数
+        ttl_seconds: 默认过期时间（秒）
+        max_bytes: 最大总字节数（可选，需在 set 时传入 size_bytes）
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: int | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        # key -> (value, expires_at, size_bytes)
+        self._data: OrderedDict[str, tuple[V, float, int]] = OrderedDict()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> V | None:
+        """读取缓存（过期条目视为未命中并删除）"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: str,
+        value: V,
+        ttl_seconds: float | None = None,
+        size_bytes: int = 0,
+    ) -> None:
+        """
+        写入缓存
+
+        单个条目超过 max_bytes 时不缓存。
+        """
+        if self.max_bytes is not None and size_bytes > self.max_bytes:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (value, time.monotonic() + ttl, size_bytes)
+        self._total_bytes += size_bytes
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self._total_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """删除缓存条目"""
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+        self._total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, size_bytes = self._data.pop(key)
+        self._total_bytes -= size_bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取缓存统计"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "total_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total * 100, 2) if total else 0.0,
+        }
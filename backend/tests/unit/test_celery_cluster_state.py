@@ -0,0 +1,242 @@
+"""
+Celery 集群状态模型单元测试
+
+测试内容：
+- 任务生命周期事件驱动状态变化
+- 排队等待 / 运行时间直方图
+- Worker 心跳与离线判断
+- 离线 Worker 上的任务标记为 LOST
+- 任务数上限淘汰
+- 快照导出与恢复
+- 事件消费线程重启时旧线程退出、不影响新线程
+"""
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core.celery_cluster_state import (
+    CeleryClusterState,
+    CeleryEventMonitor,
+    DurationHistogram,
+)
+
+
+def _task_events(task_id: str, name: str = "tasks.generate", base: float = 1000.0):
+    return [
+        {"type": "task-sent", "uuid": task_id, "name": name, "queue": "content_generation", "timestamp": base},
+        {"type": "task-received", "uuid": task_id, "name": name, "hostname": "w1", "args": "('r1',)", "timestamp": base + 1},
+        {"type": "task-started", "uuid": task_id, "hostname": "w1", "timestamp": base + 3},
+    ]
+
+
+class TestTaskLifecycle:
+    """测试任务生命周期"""
+
+    def test_states_follow_events(self):
+        state = CeleryClusterState()
+        sent, received, started = _task_events("t1")
+
+        state.apply_event(sent)
+        assert state.tasks["t1"].state == "SENT"
+        state.apply_event(received)
+        assert state.tasks["t1"].state == "RECEIVED"
+        assert state.tasks["t1"].worker == "w1"
+        state.apply_event(started)
+        assert state.tasks["t1"].state == "STARTED"
+
+        state.apply_event({"type": "task-succeeded", "uuid": "t1", "runtime": 2.5, "timestamp": 1005.5})
+
+        assert state.tasks["t1"].state == "SUCCESS"
+        assert state.snapshot()["tasks"] == []
+
+    def test_late_received_does_not_regress_started(self):
+        state = CeleryClusterState()
+        sent, received, started = _task_events("t1")
+
+        for event in (sent, started, received):
+            state.apply_event(event)
+
+        assert state.tasks["t1"].state == "STARTED"
+
+
+class TestHistograms:
+    """测试直方图"""
+
+    def test_queue_wait_and_runtime_recorded(self):
+        state = CeleryClusterState()
+        for event in _task_events("t1"):
+            state.apply_event(event)
+        state.apply_event({"type": "task-failed", "uuid": "t1", "exception": "boom", "timestamp": 1010.0})
+
+        snapshot = state.snapshot()
+
+        assert snapshot["queue_wait"]["tasks.generate"]["count"] == 1
+        assert snapshot["queue_wait"]["tasks.generate"]["sum"] == 3.0
+        assert snapshot["runtime"]["tasks.generate"]["sum"] == 7.0
+        assert state.tasks["t1"].error == "boom"
+
+    def test_eta_tasks_excluded_from_queue_wait(self):
+        state = CeleryClusterState()
+        sent, received, started = _task_events("t1")
+        received["eta"] = "2026-01-01T00:00:00"
+
+        for event in (sent, received, started):
+            state.apply_event(event)
+
+        assert state.queue_wait == {}
+
+    def test_histogram_percentiles(self):
+        histogram = DurationHistogram((1.0, 5.0))
+        for value in (0.5, 2.0, 3.0, 10.0):
+            histogram.observe(value)
+
+        data = histogram.to_dict()
+
+        assert data["buckets"] == {"1.0": 1, "5.0": 2, "+Inf": 1}
+        assert data["count"] == 4
+        assert data["p50"] == 3.0
+        assert data["p95"] == 10.0
+
+
+class TestWorkers:
+    """测试 Worker 状态"""
+
+    def test_heartbeat_and_offline(self):
+        state = CeleryClusterState()
+        state.apply_event({
+            "type": "worker-heartbeat", "hostname": "w1", "active": 2,
+            "processed": 10, "freq": 2.0, "timestamp": 1000.0,
+        })
+
+        worker = state.workers["w1"]
+        assert worker.active == 2
+        assert worker.processed == 10
+        assert worker.is_online(1030.0)
+        assert not worker.is_online(1100.0)
+
+        state.apply_event({"type": "worker-offline", "hostname": "w1", "timestamp": 1031.0})
+
+        assert not state.workers["w1"].is_online(1032.0)
+
+
+class TestLostTasks:
+    """测试离线 Worker 上的任务清理"""
+
+    def test_tasks_on_offline_worker_marked_lost(self):
+        state = CeleryClusterState()
+        state.apply_event({"type": "worker-heartbeat", "hostname": "w1", "timestamp": 1000.0})
+        for event in _task_events("t1"):
+            state.apply_event(event)
+
+        assert state.expire_lost_tasks(now=1010.0) == 0
+        state.apply_event({"type": "worker-offline", "hostname": "w1", "timestamp": 1011.0})
+        assert state.expire_lost_tasks(now=1012.0) == 1
+
+        assert state.tasks["t1"].state == "LOST"
+        assert state.snapshot()["tasks"] == []
+        assert state.lost_tasks == 1
+
+    def test_tasks_on_silent_worker_marked_lost(self):
+        state = CeleryClusterState()
+        state.apply_event({"type": "worker-heartbeat", "hostname": "w1", "timestamp": 1000.0})
+        for event in _task_events("t1"):
+            state.apply_event(event)
+
+        # 心跳超时（未收到 worker-offline）
+        assert state.expire_lost_tasks(now=1100.0) == 1
+        assert state.tasks["t1"].state == "LOST"
+
+    def test_unknown_worker_waits_for_heartbeat_timeout(self):
+        state = CeleryClusterState()
+        for event in _task_events("t1"):
+            state.apply_event(event)
+
+        assert state.expire_lost_tasks(now=1010.0) == 0
+        assert state.expire_lost_tasks(now=1100.0) == 1
+
+    def test_queued_tasks_kept(self):
+        state = CeleryClusterState()
+        state.apply_event(_task_events("t1")[0])
+
+        assert state.expire_lost_tasks(now=99999.0) == 0
+        assert state.tasks["t1"].state == "SENT"
+
+
+class _FakeReceiver:
+    def __init__(self, connection, handlers):
+        self.should_stop = False
+
+    def capture(self, limit, timeout, wakeup):
+        while not self.should_stop:
+            time.sleep(0.01)
+
+
+def _fake_celery_app():
+    @contextmanager
+    def connection_for_read():
+        yield object()
+
+    return SimpleNamespace(
+        connection_for_read=connection_for_read,
+        events=SimpleNamespace(Receiver=_FakeReceiver),
+    )
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestConsumerThread:
+    """测试事件消费线程重启"""
+
+    async def test_restart_stops_old_thread(self):
+        monitor = CeleryEventMonitor()
+        fake_module = SimpleNamespace(celery_app=_fake_celery_app())
+
+        with patch.dict("sys.modules", {"app.core.celery_app": fake_module}):
+            await monitor._start_consumer_thread()
+            first = monitor._consumer_thread
+            assert _wait_for(lambda: first.receiver is not None)
+
+            await monitor._start_consumer_thread()
+            second = monitor._consumer_thread
+
+            assert not first.is_alive()
+            assert second is not first
+            assert _wait_for(lambda: second.receiver is not None)
+            assert not second.stop_event.is_set()
+
+            await monitor._stop_consumer_thread()
+
+        assert not second.is_alive()
+        assert monitor._consumer_thread is None
+
+
+class TestEvictionAndSnapshot:
+    """测试淘汰与快照恢复"""
+
+    def test_finished_tasks_evicted_first(self):
+        state = CeleryClusterState(max_tasks=2)
+        state.apply_event(_task_events("live")[0])
+        state.apply_event({"type": "task-revoked", "uuid": "done", "timestamp": 1.0})
+        state.apply_event(_task_events("new")[0])
+
+        assert list(state.tasks) == ["live", "new"]
+
+    def test_restore_round_trip(self):
+        state = CeleryClusterState()
+        for event in _task_events("t1"):
+            state.apply_event(event)
+        state.apply_event({"type": "worker-heartbeat", "hostname": "w1", "timestamp": 1000.0})
+        state.set_queue_depths({"content_generation": 4})
+
+        restored = CeleryClusterState()
+        restored.restore(state.snapshot())
+
+        assert restored.tasks["t1"].state == "STARTED"
+        assert restored.tasks["t1"].args == "('r1',)"
+        assert restored.workers["w1"].last_heartbeat == 1000.0
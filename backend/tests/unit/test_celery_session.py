@@ -0,0 +1,87 @@
+"""
+Celery Worker 数据库会话单元测试
+
+测试内容：
+- 持久连接池模式下同一事件循环复用同一个引擎
+- 事件循环或进程变化时重建引擎
+- 非 Worker 持久循环回退到 NullPool 引擎
+"""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.db import celery_session
+
+
+@pytest.fixture
+def fresh_engines():
+    """每个测试使用独立的引擎缓存，引擎创建被替换为 MagicMock"""
+    celery_session.reset_celery_engine_cache()
+    with patch.object(celery_session, "create_celery_pooled_engine", side_effect=lambda: MagicMock()) as pooled, \
+         patch.object(celery_session, "create_celery_engine", side_effect=lambda: MagicMock()) as null_pool:
+        yield pooled, null_pool
+    celery_session.reset_celery_engine_cache()
+
+
+class TestPooledEngine:
+    """测试持久连接池引擎复用"""
+
+    def test_same_loop_reuses_engine(self, fresh_engines):
+        pooled, _ = fresh_engines
+        loop = asyncio.new_event_loop()
+        try:
+            first = celery_session._get_pooled_engine(loop)
+            assert celery_session._get_pooled_engine(loop) is first
+        finally:
+            loop.close()
+
+        assert pooled.call_count == 1
+
+    def test_new_loop_rebuilds_engine(self, fresh_engines):
+        pooled, _ = fresh_engines
+        first_loop = asyncio.new_event_loop()
+        second_loop = asyncio.new_event_loop()
+        try:
+            first = celery_session._get_pooled_engine(first_loop)
+            second = celery_session._get_pooled_engine(second_loop)
+        finally:
+            first_loop.close()
+            second_loop.close()
+
+        assert second is not first
+        assert pooled.call_count == 2
+
+    def test_forked_process_rebuilds_engine(self, fresh_engines):
+        pooled, _ = fresh_engines
+        loop = asyncio.new_event_loop()
+        try:
+            first = celery_session._get_pooled_engine(loop)
+            with patch.object(celery_session.os, "getpid", return_value=-1):
+                assert celery_session._get_pooled_engine(loop) is not first
+        finally:
+            loop.close()
+
+        assert pooled.call_count == 2
+
+    async def test_non_worker_loop_uses_null_pool(self, fresh_engines):
+        pooled, null_pool = fresh_engines
+
+        with patch.object(celery_session.settings, "CELERY_DB_POOL_ENABLED", True), \
+             patch("app.tasks.content_utils.is_worker_loop", return_value=False):
+            engine = celery_session.get_celery_engine()
+            assert celery_session.get_celery_engine() is engine
+
+        pooled.assert_not_called()
+        assert null_pool.call_count == 1
+
+    async def test_worker_loop_reuses_pooled_engine(self, fresh_engines):
+        pooled, null_pool = fresh_engines
+
+        with patch.object(celery_session.settings, "CELERY_DB_POOL_ENABLED", True), \
+             patch("app.tasks.content_utils.is_worker_loop", return_value=True):
+            engine = celery_session.get_celery_engine()
+            assert celery_session.get_celery_engine() is engine
+
+        assert pooled.call_count == 1
+        null_pool.assert_not_called()
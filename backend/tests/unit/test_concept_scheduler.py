@@ -0,0 +1,174 @@
+"""
+概念优先级调度器单元测试
+
+测试内容：
+- 前置依赖深度计算（含环）
+- 按优先级启动概念，当前查看的概念最先启动
+- 并发上限与跨路线图公平调度
+- 概念任务在开始执行前被取消时释放名额
+- 上报当前查看的概念时校验概念属于该路线图
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.tasks.concept_scheduler import (
+    ConceptScheduler,
+    compute_prerequisite_depths,
+)
+
+
+@pytest.fixture
+def no_hint():
+    with patch("app.tasks.concept_scheduler.get_viewing_hint", AsyncMock(return_value=None)) as hint:
+        yield hint
+
+
+def _job(started: list, name: str, seconds: float = 0.01):
+    async def run():
+        started.append(name)
+        await asyncio.sleep(seconds)
+    return run
+
+
+class TestPrerequisiteDepths:
+    """测试前置依赖深度"""
+
+    def test_chain_depth(self):
+        depths = compute_prerequisite_depths({"a": [], "b": ["a"], "c": ["b", "a"], "d": []})
+
+        assert depths == {"a": 0, "b": 1, "c": 2, "d": 0}
+
+    def test_unknown_prerequisite_ignored(self):
+        assert compute_prerequisite_depths({"a": ["missing"]}) == {"a": 0}
+
+    def test_cycle_terminates(self):
+        depths = compute_prerequisite_depths({"a": ["b"], "b": ["a"]})
+
+        assert set(depths) == {"a", "b"}
+
+
+class TestConceptScheduler:
+    """测试 ConceptScheduler"""
+
+    async def test_runs_in_priority_order(self, no_hint):
+        """并发为 1 时按优先级顺序执行"""
+        started = []
+        scheduler = ConceptScheduler(max_concurrent=1)
+        jobs = {
+            "s2_m0": ((2, 0, 0, 0), _job(started, "s2_m0")),
+            "s1_m1": ((1, 1, 0, 0), _job(started, "s1_m1")),
+            "s1_m0": ((1, 0, 0, 0), _job(started, "s1_m0")),
+        }
+
+        await scheduler.run("roadmap-1", jobs)
+
+        assert started == ["s1_m0", "s1_m1", "s2_m0"]
+
+    async def test_viewing_hint_first(self, no_hint):
+        """当前查看的概念最先启动"""
+        no_hint.return_value = "s2_m0"
+        started = []
+        scheduler = ConceptScheduler(max_concurrent=1)
+        jobs = {
+            "s1_m0": ((1, 0, 0, 0), _job(started, "s1_m0")),
+            "s2_m0": ((2, 0, 0, 0), _job(started, "s2_m0")),
+        }
+
+        await scheduler.run("roadmap-1", jobs)
+
+        assert started[0] == "s2_m0"
+
+    async def test_concurrency_limit(self, no_hint):
+        """同时运行的概念数不超过上限"""
+        running = {"now": 0, "peak": 0}
+
+        async def run():
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+        scheduler = ConceptScheduler(max_concurrent=3)
+        jobs = {f"c{i}": ((1, 0, 0, i), run) for i in range(10)}
+
+        await scheduler.run("roadmap-1", jobs)
+
+        assert running["peak"] == 3
+
+    async def test_fair_share_across_roadmaps(self, no_hint):
+        """后到的小路线图不必等待大路线图全部完成"""
+        started = []
+        scheduler = ConceptScheduler(max_concurrent=2)
+        large = {f"big{i}": ((1, 0, 0, i), _job(started, f"big{i}", 0.05)) for i in range(10)}
+        small = {"small0": ((1, 0, 0, 0), _job(started, "small0", 0.05))}
+
+        large_run = asyncio.create_task(scheduler.run("large", large))
+        await asyncio.sleep(0.01)
+        await scheduler.run("small", small)
+
+        assert started.index("small0") <= 3
+        await large_run
+
+    async def test_failed_job_does_not_stop_others(self, no_hint):
+        """单个概念失败不影响其他概念，完成回调照常执行"""
+        done = []
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        scheduler = ConceptScheduler(max_concurrent=2)
+        jobs = {
+            "bad": ((1, 0, 0, 0), boom),
+            "good": ((1, 0, 0, 1), _job([], "good")),
+        }
+
+        await scheduler.run("roadmap-1", jobs, on_done=done.append)
+
+        assert sorted(done) == ["bad", "good"]
+        assert scheduler.get_stats()["running"] == {}
+
+    async def test_cancel_before_job_starts_releases_slots(self, no_hint):
+        """概念任务尚未开始执行就被取消时，路线图的运行名额仍被释放"""
+        scheduler = ConceptScheduler(max_concurrent=2)
+        jobs = {f"c{i}": ((1, 0, 0, i), _job([], f"c{i}", 1)) for i in range(5)}
+
+        run = asyncio.create_task(scheduler.run("roadmap-1", jobs))
+        # 调度协程启动两个概念任务后等待名额，概念任务尚未开始执行
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["running"] == {"roadmap-1": 2}
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+        assert scheduler.get_stats()["running"] == {}
+
+
+class TestReportViewingConcept:
+    """测试上报当前查看的概念"""
+
+    async def test_known_concept_sets_hint(self):
+        from app.api.v1.endpoints.concept_status import ViewingConceptRequest, report_viewing_concept
+
+        snapshot = SimpleNamespace(concept_index={"c1": (0, 0, 0)})
+        with patch("app.api.v1.endpoints.concept_status.framework_cache.get", AsyncMock(return_value=snapshot)), \
+             patch("app.api.v1.endpoints.concept_status.set_viewing_hint", AsyncMock()) as set_hint:
+            await report_viewing_concept("r1", ViewingConceptRequest(concept_id="c1"), db=MagicMock())
+
+        set_hint.assert_awaited_once_with("r1", "c1")
+
+    async def test_unknown_concept_or_roadmap_404(self):
+        from app.api.v1.endpoints.concept_status import ViewingConceptRequest, report_viewing_concept
+
+        snapshot = SimpleNamespace(concept_index={"c1": (0, 0, 0)})
+        for found in (snapshot, None):
+            with patch("app.api.v1.endpoints.concept_status.framework_cache.get", AsyncMock(return_value=found)), \
+                 patch("app.api.v1.endpoints.concept_status.set_viewing_hint", AsyncMock()) as set_hint:
+                with pytest.raises(HTTPException) as exc_info:
+                    await report_viewing_concept("r1", ViewingConceptRequest(concept_id="other"), db=MagicMock())
+
+            assert exc_info.value.status_code == 404
+            set_hint.assert_not_called()
@@ -0,0 +1,119 @@
+"""
+概念阶段 DAG 单元测试
+
+测试内容：
+- 互不依赖的阶段并发执行
+- 单个阶段失败不影响其他阶段
+- 上游阶段失败时下游阶段被跳过
+- 部分阶段失败时完成日志记为部分完成
+"""
+import asyncio
+import time
+import pytest
+
+from app.tasks.concept_generator import (
+    ConceptStage,
+    UpstreamStageFailed,
+    concept_completion_message,
+    run_concept_stages,
+)
+
+
+def _sleeping_stage(content_type: str, seconds: float, result=None, depends_on=()):
+    async def run(upstream):
+        await asyncio.sleep(seconds)
+        return result if result is not None else content_type
+    return ConceptStage(content_type=content_type, run=run, depends_on=depends_on)
+
+
+def _failing_stage(content_type: str, depends_on=()):
+    async def run(upstream):
+        raise RuntimeError(f"{content_type} boom")
+    return ConceptStage(content_type=content_type, run=run, depends_on=depends_on)
+
+
+class TestRunConceptStages:
+    """测试 run_concept_stages"""
+
+    async def test_independent_stages_run_concurrently(self):
+        """三个独立阶段的总耗时约等于最慢阶段"""
+        stages = [
+            _sleeping_stage("tutorial", 0.2),
+            _sleeping_stage("resources", 0.2),
+            _sleeping_stage("quiz", 0.2),
+        ]
+
+        start = time.perf_counter()
+        results, errors = await run_concept_stages(stages)
+        elapsed = time.perf_counter() - start
+
+        assert results == {"tutorial": "tutorial", "resources": "resources", "quiz": "quiz"}
+        assert errors == {}
+        assert elapsed < 0.5
+
+    async def test_failure_isolated(self):
+        """单个阶段失败时其他阶段的结果仍然保留"""
+        stages = [
+            _sleeping_stage("tutorial", 0.01),
+            _failing_stage("resources"),
+            _sleeping_stage("quiz", 0.01),
+        ]
+
+        results, errors = await run_concept_stages(stages)
+
+        assert set(results) == {"tutorial", "quiz"}
+        assert isinstance(errors["resources"], RuntimeError)
+
+    async def test_downstream_skipped_when_upstream_fails(self):
+        """上游失败时下游阶段不执行，记为 UpstreamStageFailed"""
+        ran = []
+
+        async def downstream(upstream):
+            ran.append(True)
+
+        stages = [
+            _failing_stage("tutorial"),
+            ConceptStage(content_type="quiz", run=downstream, depends_on=("tutorial",)),
+        ]
+
+        results, errors = await run_concept_stages(stages)
+
+        assert results == {}
+        assert isinstance(errors["quiz"], UpstreamStageFailed)
+        assert ran == []
+
+    async def test_downstream_receives_upstream_output(self):
+        """下游阶段接收上游输出"""
+        async def downstream(upstream):
+            return upstream["tutorial"] + "+quiz"
+
+        stages = [
+            _sleeping_stage("tutorial", 0.01, result="tutorial"),
+            ConceptStage(content_type="quiz", run=downstream, depends_on=("tutorial",)),
+        ]
+
+        results, _ = await run_concept_stages(stages)
+
+        assert results["quiz"] == "tutorial+quiz"
+
+    async def test_unknown_dependency_rejected(self):
+        """依赖未声明的阶段时报错"""
+        with pytest.raises(ValueError):
+            await run_concept_stages([_sleeping_stage("quiz", 0, depends_on=("tutorial",))])
+
+
+class TestConceptCompletionMessage:
+    """测试概念完成日志"""
+
+    def test_all_stages_succeeded(self):
+        message, log_type = concept_completion_message("变量", ["tutorial", "resources", "quiz"], [])
+
+        assert log_type == "concept_completed"
+        assert message.startswith("🎉 All content generated")
+
+    def test_partial_failure_not_reported_as_complete(self):
+        message, log_type = concept_completion_message("变量", ["resources", "quiz"], ["tutorial"])
+
+        assert log_type == "concept_partially_completed"
+        assert "All content generated" not in message
+        assert "failed: tutorial" in message
@@ -0,0 +1,219 @@
+"""
+内容生成分片模式单元测试
+
+测试内容：
+- 待生成概念按分片大小拆分为 chord 子任务
+- 分片子任务异常时保留已完成的内容，其余内容记为失败项
+- chord 失败时由 link_error 回调将任务标记为失败
+- 运行被打断时取消 Worker 事件循环上的派生任务
+- 运行结束时发送缓冲中的执行日志
+- 持久连接池模式下数据库并发数不超过连接池容量
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.tasks import content_generation_tasks
+from app.tasks.content_generation_tasks import (
+    MAX_DB_CONCURRENT,
+    _dispatch_content_shards,
+    fail_content_shards,
+    generate_content_shard,
+    get_max_db_concurrent,
+)
+from app.tasks.content_utils import run_async, run_async_cancel_on_interrupt
+
+
+class TestMaxDbConcurrent:
+    """测试数据库并发数推导"""
+
+    def test_null_pool_uses_default(self):
+        with patch.object(content_generation_tasks.settings, "CELERY_DB_POOL_ENABLED", False):
+            assert get_max_db_concurrent() == MAX_DB_CONCURRENT
+
+    def test_pooled_engine_leaves_headroom(self):
+        """连接池 2 + 3 → 预留 2 个连接给状态更新和失败标记，最多 3 个并发写入"""
+        settings = content_generation_tasks.settings
+        with patch.object(settings, "CELERY_DB_POOL_ENABLED", True), \
+             patch.object(settings, "CELERY_DB_POOL_SIZE", 2), \
+             patch.object(settings, "CELERY_DB_MAX_OVERFLOW", 3):
+            assert get_max_db_concurrent() == 3
+
+    def test_pooled_engine_capped_and_at_least_one(self):
+        settings = content_generation_tasks.settings
+        with patch.object(settings, "CELERY_DB_POOL_ENABLED", True), \
+             patch.object(settings, "CELERY_DB_MAX_OVERFLOW", 0):
+            with patch.object(settings, "CELERY_DB_POOL_SIZE", 50):
+                assert get_max_db_concurrent() == MAX_DB_CONCURRENT
+            with patch.object(settings, "CELERY_DB_POOL_SIZE", 1):
+                assert get_max_db_concurrent() == 1
+
+
+class TestDispatchContentShards:
+    """测试分片分发"""
+
+    def test_concepts_split_into_shards(self):
+        """12 个概念、分片大小 5 → 3 个分片，进度偏移量互不重叠"""
+        chord_result = MagicMock(id="finalizer-id")
+        chord_mock = MagicMock(return_value=MagicMock(return_value=chord_result))
+
+        with patch.object(content_generation_tasks.settings, "CONTENT_GENERATION_SHARD_SIZE", 5), \
+             patch("celery.chord", chord_mock), \
+             patch("celery.group", side_effect=lambda sigs: list(sigs)):
+            summary = _dispatch_content_shards(
+                task_id="task-1",
+                roadmap_id="roadmap-1",
+                roadmap_framework_data={},
+                user_preferences_data={},
+                pending_concept_ids=[f"c{i}" for i in range(12)],
+                total_concepts=15,
+                skipped_count=3,
+            )
+
+        header = chord_mock.call_args.args[0]
+        assert [sig.kwargs["concept_ids"] for sig in header] == [
+            [f"c{i}" for i in range(0, 5)],
+            [f"c{i}" for i in range(5, 10)],
+            ["c10", "c11"],
+        ]
+        assert [sig.kwargs["progress_offset"] for sig in header] == [0, 5, 10]
+        assert summary["mode"] == "sharded"
+        assert summary["shard_count"] == 3
+        assert summary["finalizer_task_id"] == "finalizer-id"
+
+        callback = chord_mock.return_value.call_args.args[0]
+        [errback] = callback.options["link_error"]
+        assert errback["task"] == fail_content_shards.name
+        assert errback["kwargs"] == {"task_id": "task-1", "roadmap_id": "roadmap-1"}
+
+
+class TestFailContentShards:
+    """测试 chord 失败回调"""
+
+    def test_marks_task_failed_and_notifies(self):
+        error = TimeoutError("hard time limit exceeded")
+        publish_failed = AsyncMock()
+
+        with patch.object(content_generation_tasks, "_mark_task_failed") as mark_failed, \
+             patch.object(content_generation_tasks.notification_service, "publish_failed", publish_failed), \
+             patch.object(content_generation_tasks, "run_async", side_effect=asyncio.run):
+            fail_content_shards.run(
+                MagicMock(id="shard-id"), error, None,
+                task_id="task-1", roadmap_id="roadmap-1",
+            )
+
+        mark_failed.assert_called_once_with("task-1", error)
+        publish_failed.assert_awaited_once()
+        assert publish_failed.await_args.kwargs["task_id"] == "task-1"
+
+
+class TestGenerateContentShard:
+    """测试分片子任务"""
+
+    def test_failure_keeps_completed_and_marks_rest(self):
+        """异常中断时已完成的教程保留，其余内容记为失败项"""
+        tutorial = MagicMock()
+        tutorial.model_dump.return_value = {"tutorial_id": "t1"}
+
+        def fake_run_async(coro):
+            coro.close()
+            # 模拟 c1 的教程已完成后被超时中断
+            kwargs = fake_run_async.kwargs
+            kwargs["tutorial_refs"]["c1"] = tutorial
+            raise TimeoutError("soft time limit")
+
+        def capture(**kwargs):
+            fake_run_async.kwargs = kwargs
+            return MagicMock(close=lambda: None)
+
+        with patch.object(content_generation_tasks, "_async_generate_shard", new=capture), \
+             patch.object(content_generation_tasks, "run_async_cancel_on_interrupt", side_effect=fake_run_async):
+            result = generate_content_shard.run(
+                task_id="task-1",
+                roadmap_id="roadmap-1",
+                roadmap_framework_data={},
+                user_preferences_data={},
+                concept_ids=["c1", "c2"],
+                progress_offset=0,
+                total_concepts=2,
+            )
+
+        assert result["tutorial_refs"] == {"c1": {"tutorial_id": "t1"}}
+        assert "c1:tutorial" not in result["failed_concepts"]
+        assert set(result["failed_concepts"]) == {
+            "c1:resources", "c1:quiz",
+            "c2:tutorial", "c2:resources", "c2:quiz",
+        }
+
+
+class TestRunAsyncCancelOnInterrupt:
+    """测试运行被打断时的任务清理"""
+
+    def test_interrupt_cancels_spawned_tasks(self):
+        """异常从 run_until_complete 中抛出时，派生任务被取消并结束"""
+        loop = asyncio.new_event_loop()
+        spawned: list[asyncio.Task] = []
+
+        async def child():
+            await asyncio.sleep(3600)
+
+        async def main():
+            task = asyncio.create_task(child())
+            spawned.append(task)
+            try:
+                await asyncio.sleep(3600)
+            except BaseException:
+                task.cancel()
+                raise
+
+        def interrupt():
+            # 模拟 Celery 软超时信号在事件循环中抛出异常
+            raise KeyboardInterrupt
+
+        loop.call_later(0.01, interrupt)
+        try:
+            with patch("app.tasks.content_utils.get_worker_loop", return_value=loop):
+                with pytest.raises(KeyboardInterrupt):
+                    run_async_cancel_on_interrupt(main())
+
+            assert spawned and spawned[0].cancelled()
+            assert not [t for t in asyncio.all_tasks(loop) if not t.done()]
+        finally:
+            loop.close()
+
+    def test_completed_run_leaves_background_tasks(self):
+        """正常完成时不取消其他任务（如执行日志的后台刷新任务）"""
+        loop = asyncio.new_event_loop()
+        background: list[asyncio.Task] = []
+
+        async def main():
+            background.append(asyncio.create_task(asyncio.sleep(3600)))
+            return "done"
+
+        try:
+            with patch("app.tasks.content_utils.get_worker_loop", return_value=loop):
+                assert run_async_cancel_on_interrupt(main()) == "done"
+
+            assert not background[0].done()
+        finally:
+            background[0].cancel()
+            loop.run_until_complete(asyncio.gather(*background, return_exceptions=True))
+            loop.close()
+
+
+class TestRunAsyncFlushesExecutionLogs:
+    """测试 Worker 事件循环运行结束时发送执行日志"""
+
+    def test_flush_before_return(self):
+        """任务之间事件循环空闲，任务末尾写入的日志在返回前发送"""
+        loop = asyncio.new_event_loop()
+        flush = AsyncMock()
+        try:
+            with patch("app.tasks.content_utils.get_worker_loop", return_value=loop), \
+                 patch("app.services.execution_logger.execution_logger.flush", flush):
+                assert run_async(asyncio.sleep(0, result="done")) == "done"
+
+            flush.assert_awaited_once()
+        finally:
+            loop.close()
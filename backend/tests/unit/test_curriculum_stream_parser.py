@@ -0,0 +1,106 @@
+"""
+路线图框架增量解析器单元测试
+
+测试内容：
+- JSON / YAML 输出中 Module、Stage 闭合后立即产出事件
+- 字符串中的括号和转义引号不影响 JSON 扫描
+- roadmap_id 提前识别
+"""
+import json
+
+import yaml
+
+from app.agents.curriculum_stream_parser import IncrementalCurriculumParser
+
+
+FRAMEWORK = {
+    "roadmap_id": "python-web",
+    "title": "Python Web",
+    "stages": [
+        {
+            "stage_id": "s1",
+            "name": "基础 \"入门\"",
+            "order": 1,
+            "modules": [
+                {
+                    "module_id": "m1",
+                    "name": "语法",
+                    "concepts": [
+                        {"concept_id": "c-1-1-1", "name": "dict {key: value}", "prerequisites": []},
+                    ],
+                },
+                {"module_id": "m2", "name": "函数", "concepts": []},
+            ],
+        },
+        {
+            "stage_id": "s2",
+            "name": "进阶",
+            "order": 2,
+            "modules": [{"module_id": "m3", "name": "Web", "concepts": []}],
+        },
+    ],
+}
+
+
+def _feed_in_chunks(parser: IncrementalCurriculumParser, text: str, size: int = 7):
+    """按固定大小分块输入，返回 (事件, 产生事件时已输入的长度)"""
+    events = []
+    for i in range(0, len(text), size):
+        for event in parser.feed(text[i:i + size]):
+            events.append((event, i + size))
+    for event in parser.finish():
+        events.append((event, len(text)))
+    return events
+
+
+class TestIncrementalCurriculumParser:
+    """测试 IncrementalCurriculumParser"""
+
+    def test_json_modules_emitted_before_stream_ends(self):
+        text = "```json\n" + json.dumps(FRAMEWORK, ensure_ascii=False, indent=2) + "\n```"
+        parser = IncrementalCurriculumParser()
+
+        events = _feed_in_chunks(parser, text)
+
+        assert parser.format == "json"
+        kinds = [(e.kind, e.stage_index, e.module_index) for e, _ in events]
+        assert kinds == [
+            ("module", 0, 0),
+            ("module", 0, 1),
+            ("stage", 0, None),
+            ("module", 1, 0),
+            ("stage", 1, None),
+        ]
+        first_module, emitted_at = events[0]
+        assert emitted_at < text.index('"m2"')
+        assert first_module.module == FRAMEWORK["stages"][0]["modules"][0]
+        assert first_module.stage == {"stage_id": "s1", "name": "基础 \"入门\"", "order": 1}
+
+    def test_yaml_modules_emitted_when_block_closes(self):
+        text = "```yaml\n" + yaml.safe_dump(FRAMEWORK, allow_unicode=True, sort_keys=False) + "```"
+        parser = IncrementalCurriculumParser()
+
+        events = _feed_in_chunks(parser, text)
+
+        assert parser.format == "yaml"
+        modules = [e.module["module_id"] for e, _ in events if e.kind == "module"]
+        assert modules == ["m1", "m2", "m3"]
+        assert events[0][0].module == FRAMEWORK["stages"][0]["modules"][0]
+        assert events[0][0].stage["stage_id"] == "s1"
+        assert events[0][1] < text.index("stage_id: s2")
+
+    def test_yaml_last_stage_closed_on_finish(self):
+        text = yaml.safe_dump(FRAMEWORK, allow_unicode=True, sort_keys=False, indent=4)
+        parser = IncrementalCurriculumParser()
+
+        events = _feed_in_chunks(parser, text)
+
+        assert [e.kind for e, _ in events][-2:] == ["module", "stage"]
+        assert events[-1][0].stage["stage_id"] == "s2"
+
+    def test_roadmap_id_detected_early(self):
+        parser = IncrementalCurriculumParser()
+
+        parser.feed('{"roadmap_id": "python-web", "title": "Py')
+
+        assert parser.roadmap_id == "python-web"
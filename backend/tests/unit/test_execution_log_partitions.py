@@ -0,0 +1,105 @@
+"""
+执行日志月度分区维护单元测试
+
+测试内容：
+- 月份计算与分区命名
+- 只创建缺失分区
+- 只删除整体早于保留期的分区
+"""
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db.execution_log_partitions import (
+    add_months,
+    drop_expired_partitions,
+    ensure_partitions,
+    is_missing_partition_error,
+    maintain_partitions,
+    partition_name,
+)
+
+
+def _conn(existing: list[str]):
+    conn = MagicMock()
+    statements = []
+
+    async def execute(statement, params=None):
+        sql = str(statement)
+        statements.append(sql)
+        if "pg_inherits" in sql:
+            return [(name,) for name in existing]
+        return MagicMock()
+
+    conn.execute = AsyncMock(side_effect=execute)
+    return conn, statements
+
+
+class TestMonthMath:
+    """测试月份计算"""
+
+    def test_add_months_across_years(self):
+        assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+        assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name(date(2026, 3, 1)) == "execution_logs_p202603"
+
+    def test_missing_partition_error(self):
+        error = Exception('no partition of relation "execution_logs" found for row')
+        assert is_missing_partition_error(error)
+        assert not is_missing_partition_error(Exception("duplicate key"))
+
+
+class TestEnsurePartitions:
+    """测试分区创建"""
+
+    async def test_creates_only_missing_months(self):
+        conn, statements = _conn(["execution_logs_p202610"])
+
+        created = await ensure_partitions(
+            conn, [datetime(2026, 10, 16, 12), datetime(2026, 11, 2), date(2026, 11, 30)]
+        )
+
+        assert created == ["execution_logs_p202611"]
+        ddl = [s for s in statements if s.startswith("CREATE TABLE")]
+        assert len(ddl) == 1
+        assert "FROM ('2026-11-01') TO ('2026-12-01')" in ddl[0]
+
+
+class TestDropExpiredPartitions:
+    """测试过期分区删除"""
+
+    async def test_drops_only_fully_expired(self):
+        conn, statements = _conn([
+            "execution_logs_p202606",
+            "execution_logs_p202607",
+            "execution_logs_p202608",
+            "execution_logs_legacy_backup",
+        ])
+
+        # 截止日期 2026-07-18：7 月分区仍有未过期日志
+        dropped = await drop_expired_partitions(conn, 90, now=datetime(2026, 10, 16))
+
+        assert dropped == ["execution_logs_p202606"]
+        assert "DROP TABLE IF EXISTS execution_logs_p202606" in statements
+
+
+class TestMaintainPartitions:
+    """测试分区维护"""
+
+    async def test_creates_current_and_future_months(self):
+        conn, statements = _conn([])
+
+        with patch("app.db.execution_log_partitions.settings") as settings:
+            settings.EXECUTION_LOG_PARTITIONS_AHEAD = 2
+            settings.EXECUTION_LOG_RETENTION_DAYS = 90
+            result = await maintain_partitions(conn, now=datetime(2026, 12, 5))
+
+        assert result["created"] == [
+            "execution_logs_p202612",
+            "execution_logs_p202701",
+            "execution_logs_p202702",
+        ]
+        assert result["dropped"] == []
+        assert statements[0].startswith("SET LOCAL lock_timeout")
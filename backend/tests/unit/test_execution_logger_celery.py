@@ -3,13 +3,14 @@ ExecutionLogger Celery 版本单元测试
 
 测试场景：
 1. 日志写入不阻塞主流程
-2. 批量发送逻辑正确
+2. 后台刷新协程按数量/时间触发批量发送
 3. 优雅关闭时刷新所有日志
 4. Celery 任务失败时的降级处理
+5. 环形缓冲区满时丢弃最旧日志
 """
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 from app.services.execution_logger import ExecutionLogger, LogLevel, LogCategory
 
 
@@ -17,17 +18,17 @@ class TestExecutionLoggerCelery:
     """ExecutionLogger Celery 版本测试"""
     
     @pytest.fixture
-    def logger(self):
-        """创建 ExecutionLogger 实例"""
-        return ExecutionLogger()
+    async def logger(self):
+        """创建 ExecutionLogger 实例（测试结束时停止后台刷新协程）"""
+        execution_logger = ExecutionLogger()
+        yield execution_logger
+        execution_logger._log_buffer.clear()
+        await execution_logger.stop()
     
     @pytest.mark.asyncio
     async def test_log_non_blocking(self, logger):
         """测试：日志写入不阻塞主流程"""
-        # 模拟 Celery 任务
-        with patch('app.services.execution_logger.batch_write_logs') as mock_task:
-            mock_task.apply_async = MagicMock()
-            
+        with patch.object(ExecutionLogger, '_publish') as mock_publish:
             # 写入一条日志
             result = await logger.info(
                 task_id="test-123",
@@ -45,16 +46,14 @@ class TestExecutionLoggerCelery:
             assert len(logger._log_buffer) == 1
             
             # 验证没有立即发送到 Celery（因为没达到批量大小）
-            mock_task.apply_async.assert_not_called()
+            mock_publish.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_batch_flush_on_size(self, logger):
-        """测试：达到批量大小时自动刷新"""
-        with patch('app.services.execution_logger.batch_write_logs') as mock_task:
-            mock_task.apply_async = MagicMock()
-            
+        """测试：达到批量大小时后台刷新协程立即发送"""
+        with patch.object(ExecutionLogger, '_publish') as mock_publish:
             # 设置较小的批量大小
-            logger._buffer_size = 3
+            logger._batch_size = 3
             
             # 写入 3 条日志（达到批量大小）
             for i in range(3):
@@ -64,18 +63,20 @@ class TestExecutionLoggerCelery:
                     message=f"测试日志 {i}",
                 )
             
+            # 等待后台刷新协程发送
+            await asyncio.sleep(0.1)
+            
             # 验证发送到 Celery
-            mock_task.apply_async.assert_called_once()
+            mock_publish.assert_called_once()
+            assert len(mock_publish.call_args.args[0]) == 3
             
             # 验证缓冲区已清空
             assert len(logger._log_buffer) == 0
     
     @pytest.mark.asyncio
     async def test_batch_flush_on_timeout(self, logger):
-        """测试：超时时自动刷新"""
-        with patch('app.services.execution_logger.batch_write_logs') as mock_task:
-            mock_task.apply_async = MagicMock()
-            
+        """测试：超时时后台刷新协程自动发送（不依赖后续日志写入）"""
+        with patch.object(ExecutionLogger, '_publish') as mock_publish:
             # 设置较短的刷新间隔
             logger._flush_interval = 0.1
             
@@ -87,24 +88,16 @@ class TestExecutionLoggerCelery:
             )
             
             # 等待超过刷新间隔
-            await asyncio.sleep(0.2)
-            
-            # 再写入一条日志，触发超时检查
-            await logger.info(
-                task_id="test-456",
-                category=LogCategory.WORKFLOW,
-                message="测试日志 2",
-            )
+            await asyncio.sleep(0.3)
             
             # 验证发送到 Celery
-            mock_task.apply_async.assert_called_once()
+            mock_publish.assert_called_once()
+            assert len(logger._log_buffer) == 0
     
     @pytest.mark.asyncio
     async def test_manual_flush(self, logger):
         """测试：手动刷新所有日志"""
-        with patch('app.services.execution_logger.batch_write_logs') as mock_task:
-            mock_task.apply_async = MagicMock()
-            
+        with patch.object(ExecutionLogger, '_publish') as mock_publish:
             # 写入几条日志
             for i in range(5):
                 await logger.info(
@@ -120,20 +113,38 @@ class TestExecutionLoggerCelery:
             await logger.flush()
             
             # 验证发送到 Celery
-            mock_task.apply_async.assert_called_once()
+            mock_publish.assert_called_once()
             
             # 验证缓冲区已清空
             assert len(logger._log_buffer) == 0
     
+    @pytest.mark.asyncio
+    async def test_stop_sends_remaining_logs(self, logger):
+        """测试：停止时取消后台刷新协程并发送剩余日志"""
+        with patch.object(ExecutionLogger, '_publish') as mock_publish:
+            logger._batch_size = 2
+            for i in range(3):
+                await logger.info(
+                    task_id=f"test-{i}",
+                    category=LogCategory.WORKFLOW,
+                    message=f"测试日志 {i}",
+                )
+            
+            await logger.stop()
+            
+            # 3 条日志按批量大小 2 分两批发送
+            assert sum(len(call.args[0]) for call in mock_publish.call_args_list) == 3
+            assert len(logger._log_buffer) == 0
+            assert not logger.get_stats()["flusher_running"]
+    
     @pytest.mark.asyncio
     async def test_celery_send_failure_fallback(self, logger):
         """测试：Celery 发送失败时的降级处理"""
-        with patch('app.services.execution_logger.batch_write_logs') as mock_task:
-            # 模拟 Celery 发送失败
-            mock_task.apply_async = MagicMock(side_effect=Exception("Celery 不可用"))
-            
+        with patch.object(
+            ExecutionLogger, '_publish', MagicMock(side_effect=Exception("Celery 不可用"))
+        ) as mock_publish:
             # 设置较小的批量大小
-            logger._buffer_size = 3
+            logger._batch_size = 3
             
             # 写入 3 条日志（触发发送）
             for i in range(3):
@@ -142,17 +153,45 @@ class TestExecutionLoggerCelery:
                     category=LogCategory.WORKFLOW,
                     message=f"测试日志 {i}",
                 )
+            await asyncio.sleep(0.1)
             
             # 验证尝试发送
-            mock_task.apply_async.assert_called_once()
+            mock_publish.assert_called_once()
+            
+            # 验证日志按原顺序放回缓冲区（降级处理）
+            assert [log["task_id"] for log in logger._log_buffer] == ["test-0", "test-1", "test-2"]
+            assert logger.send_failures == 1
+    
+    @pytest.mark.asyncio
+    async def test_buffer_bounded_drops_oldest(self, logger):
+        """测试：缓冲区满时丢弃最旧日志并计数"""
+        with patch.object(ExecutionLogger, '_publish'):
+            logger._log_buffer = type(logger._log_buffer)(maxlen=3)
             
-            # 验证日志重新放回缓冲区（降级处理）
-            assert len(logger._log_buffer) == 3
+            for i in range(5):
+                await logger.info(
+                    task_id=f"test-{i}",
+                    category=LogCategory.WORKFLOW,
+                    message=f"测试日志 {i}",
+                )
+            
+            assert [log["task_id"] for log in logger._log_buffer] == ["test-2", "test-3", "test-4"]
+            assert logger.dropped == 2
+    
+    def test_requeue_respects_buffer_limit(self):
+        """测试：发送失败的批次放回缓冲区时不超过上限"""
+        logger = ExecutionLogger()
+        logger._log_buffer = type(logger._log_buffer)([{"task_id": "new"}], maxlen=3)
+        
+        logger._requeue([{"task_id": "a"}, {"task_id": "b"}, {"task_id": "c"}])
+        
+        assert [log["task_id"] for log in logger._log_buffer] == ["b", "c", "new"]
+        assert logger.dropped == 1
     
     @pytest.mark.asyncio
     async def test_log_level_methods(self, logger):
         """测试：不同日志级别的便捷方法"""
-        with patch('app.services.execution_logger.batch_write_logs'):
+        with patch.object(ExecutionLogger, '_publish'):
             # 测试 debug
             result = await logger.debug(
                 task_id="test-123",
@@ -188,7 +227,7 @@ class TestExecutionLoggerCelery:
     @pytest.mark.asyncio
     async def test_workflow_methods(self, logger):
         """测试：工作流相关的便捷方法"""
-        with patch('app.services.execution_logger.batch_write_logs'):
+        with patch.object(ExecutionLogger, '_publish'):
             # 测试 log_workflow_start
             result = await logger.log_workflow_start(
                 task_id="test-123",
@@ -215,7 +254,7 @@ class TestExecutionLoggerCelery:
     @pytest.mark.asyncio
     async def test_agent_methods(self, logger):
         """测试：Agent 相关的便捷方法"""
-        with patch('app.services.execution_logger.batch_write_logs'):
+        with patch.object(ExecutionLogger, '_publish'):
             # 测试 log_agent_start
             result = await logger.log_agent_start(
                 task_id="test-123",
@@ -251,7 +290,7 @@ class TestExecutionLoggerCelery:
     @pytest.mark.asyncio
     async def test_timed_operation_success(self, logger):
         """测试：计时上下文管理器（成功场景）"""
-        with patch('app.services.execution_logger.batch_write_logs'):
+        with patch.object(ExecutionLogger, '_publish'):
             async with logger.timed_operation(
                 task_id="test-123",
                 category=LogCategory.AGENT,
@@ -279,7 +318,7 @@ class TestExecutionLoggerCelery:
     @pytest.mark.asyncio
     async def test_timed_operation_failure(self, logger):
         """测试：计时上下文管理器（失败场景）"""
-        with patch('app.services.execution_logger.batch_write_logs'):
+        with patch.object(ExecutionLogger, '_publish'):
             with pytest.raises(ValueError):
                 async with logger.timed_operation(
                     task_id="test-123",
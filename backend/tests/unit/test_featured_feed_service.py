@@ -0,0 +1,101 @@
+"""
+精选路线图 Feed 缓存单元测试
+
+测试内容：
+- 命中 / 过期（stale-while-revalidate）/ 未命中
+- 失效通知按 Featured 用户过滤
+"""
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.featured_feed_service import FeaturedFeedService
+
+
+def _feed(built_from: float, built_at: float | None = None) -> dict:
+    return {
+        "etag": "abc",
+        "built_from": built_from,
+        "built_at": built_at if built_at is not None else built_from,
+        "featured_user_id": "u-featured",
+        "featured_user_email": "admin@example.com",
+        "roadmaps": [],
+    }
+
+
+def _redis(raw_feed, stale_marker):
+    client = MagicMock()
+    client._client.mget = AsyncMock(return_value=[raw_feed, stale_marker])
+    client.connect = AsyncMock()
+    client.set_json = AsyncMock()
+    return client
+
+
+class TestGetFeed:
+    """测试 Feed 读取"""
+
+    async def test_fresh_feed_served_without_database(self):
+        service = FeaturedFeedService()
+        now = time.time()
+        redis = _redis(json.dumps(_feed(now)), str(now - 10))
+
+        with patch("app.services.featured_feed_service.redis_client", redis), \
+                patch.object(service, "build_feed", AsyncMock()) as build:
+            feed, status = await service.get_feed(db=None)
+
+        assert status == "hit"
+        assert feed["etag"] == "abc"
+        build.assert_not_called()
+
+    async def test_invalidated_feed_served_stale_and_rebuilt(self):
+        service = FeaturedFeedService()
+        now = time.time()
+        redis = _redis(json.dumps(_feed(now - 5)), str(now))
+
+        with patch("app.services.featured_feed_service.redis_client", redis), \
+                patch.object(service, "_schedule_rebuild") as schedule:
+            feed, status = await service.get_feed(db=None)
+
+        assert status == "stale"
+        assert feed["etag"] == "abc"
+        schedule.assert_called_once()
+
+    async def test_expired_feed_served_stale(self):
+        service = FeaturedFeedService()
+        old = time.time() - 3600
+        redis = _redis(json.dumps(_feed(old)), None)
+
+        with patch("app.services.featured_feed_service.redis_client", redis), \
+                patch.object(service, "_schedule_rebuild"):
+            _, status = await service.get_feed(db=None)
+
+        assert status == "stale"
+
+    async def test_miss_builds_and_stores(self):
+        service = FeaturedFeedService()
+        redis = _redis(None, None)
+        built = _feed(time.time())
+
+        with patch("app.services.featured_feed_service.redis_client", redis), \
+                patch.object(service, "build_feed", AsyncMock(return_value=built)):
+            feed, status = await service.get_feed(db=None)
+
+        assert status == "miss"
+        assert feed is built
+        redis.set_json.assert_awaited_once()
+
+
+class TestInvalidation:
+    """测试失效通知"""
+
+    async def test_unrelated_user_ignored_once_featured_user_known(self):
+        service = FeaturedFeedService()
+        service._featured_user_id = "u-featured"
+
+        with patch.object(service, "invalidate", AsyncMock()) as invalidate:
+            service.notify_roadmaps_changed({"u-other"})
+            assert not service._background_tasks
+            service.notify_roadmaps_changed({"u-featured"})
+            await next(iter(service._background_tasks))
+
+        invalidate.assert_awaited_once()
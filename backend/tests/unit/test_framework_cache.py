@@ -0,0 +1,111 @@
+"""
+路线图框架缓存与概念索引单元测试
+
+测试内容：
+- 概念索引构建
+- 快照按索引定位概念、按路径浅拷贝合并覆盖
+- 缓存按 updated_at 校验版本
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.database import build_concept_index
+from app.services.framework_cache import FrameworkCache, FrameworkSnapshot
+
+
+FRAMEWORK = {
+    "title": "Python",
+    "stages": [
+        {
+            "name": "基础",
+            "modules": [
+                {"name": "语法", "concepts": [{"concept_id": "c1", "name": "变量"}, {"concept_id": "c2"}]},
+                {"name": "函数", "concepts": [{"concept_id": "c3"}]},
+            ],
+        },
+        {"name": "进阶", "modules": [{"name": "Web", "concepts": [{"concept_id": "c4"}, {"concept_id": "c1"}]}]},
+    ],
+}
+
+V1 = datetime(2026, 1, 1)
+V2 = datetime(2026, 1, 2)
+
+
+def _snapshot() -> FrameworkSnapshot:
+    return FrameworkSnapshot(
+        roadmap_id="r1",
+        user_id="u1",
+        updated_at=V1,
+        framework_data=FRAMEWORK,
+        concept_index=build_concept_index(FRAMEWORK),
+    )
+
+
+class TestConceptIndex:
+    """测试概念索引"""
+
+    def test_paths_and_first_duplicate_wins(self):
+        index = build_concept_index(FRAMEWORK)
+
+        assert index == {"c1": [0, 0, 0], "c2": [0, 0, 1], "c3": [0, 1, 0], "c4": [1, 0, 0]}
+
+
+class TestFrameworkSnapshot:
+    """测试框架快照"""
+
+    def test_find_concept(self):
+        stage, module, concept = _snapshot().find_concept("c3")
+
+        assert stage["name"] == "基础"
+        assert module["name"] == "函数"
+        assert concept == {"concept_id": "c3"}
+        assert _snapshot().find_concept("missing") is None
+
+    def test_overrides_do_not_mutate_snapshot(self):
+        snapshot = _snapshot()
+
+        framework = snapshot.copy_with_concept_overrides({
+            "c1": {"content_status": "completed"},
+            "c2": {"quiz_status": "failed"},
+            "unknown": {"x": 1},
+        })
+
+        concepts = framework["stages"][0]["modules"][0]["concepts"]
+        assert concepts[0] == {"concept_id": "c1", "name": "变量", "content_status": "completed"}
+        assert concepts[1]["quiz_status"] == "failed"
+        assert "content_status" not in FRAMEWORK["stages"][0]["modules"][0]["concepts"][0]
+        # 未覆盖的部分与快照共享
+        assert framework["stages"][1] is FRAMEWORK["stages"][1]
+
+
+class TestFrameworkCache:
+    """测试框架缓存"""
+
+    async def test_reloads_only_when_version_changes(self):
+        cache = FrameworkCache()
+        repo = MagicMock()
+        repo.get_framework_version = AsyncMock(side_effect=[V1, V1, V2])
+        repo.get_by_roadmap_id = AsyncMock(side_effect=[
+            SimpleNamespace(user_id="u1", updated_at=V1, framework_data=FRAMEWORK, concept_index=None),
+            SimpleNamespace(user_id="u1", updated_at=V2, framework_data={"stages": []}, concept_index={}),
+        ])
+
+        with patch("app.services.framework_cache.RoadmapMetadataRepository", return_value=repo):
+            first = await cache.get(MagicMock(), "r1")
+            second = await cache.get(MagicMock(), "r1")
+            third = await cache.get(MagicMock(), "r1")
+
+        assert second is first
+        assert first.concept_index["c4"] == [1, 0, 0]
+        assert third.updated_at == V2
+        assert repo.get_by_roadmap_id.await_count == 2
+        assert cache.get_stats()["stale"] == 1
+
+    async def test_missing_roadmap(self):
+        cache = FrameworkCache()
+        repo = MagicMock()
+        repo.get_framework_version = AsyncMock(return_value=None)
+
+        with patch("app.services.framework_cache.RoadmapMetadataRepository", return_value=repo):
+            assert await cache.get(MagicMock(), "r1") is None
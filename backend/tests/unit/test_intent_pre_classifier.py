@@ -0,0 +1,133 @@
+"""
+伴学意图规则预分类器单元测试
+
+测试内容：
+- 明确的测验/笔记/提问直接由规则识别
+- 否定、多意图冲突、无法判断时回退到 LLM
+- 陈述句中的字面命中（"出题人"、"记下来了"）不识别为测验/笔记
+- MentorAgent 规则命中时不调用 LLM 意图识别
+"""
+from unittest.mock import AsyncMock, patch
+
+from app.agents.intent_pre_classifier import IntentPreClassifier
+from app.models.domain import IntentRecognitionResult, MentorAgentInput
+
+
+MIN_CONFIDENCE = 0.85
+
+
+class TestIntentPreClassifier:
+    """测试规则预分类"""
+
+    def test_obvious_intents(self):
+        cases = [
+            ("考考我", "quiz_request"),
+            ("给我出三道练习题吧", "quiz_request"),
+            ("来几道题", "quiz_request"),
+            ("Quiz me on closures", "quiz_request"),
+            ("帮我记录一下要点", "note_record"),
+            ("笔记：闭包会捕获外部变量", "note_record"),
+            ("帮我把这段记下来", "note_record"),
+            ("能打个比方吗", "analogy_request"),
+            ("没看懂，再详细解释一下", "explanation_request"),
+            ("什么是闭包", "qa"),
+            ("装饰器和闭包有什么区别？", "qa"),
+            ("How does the event loop work", "qa"),
+        ]
+        classifier = IntentPreClassifier()
+
+        for message, intent in cases:
+            result = classifier.classify(message, MIN_CONFIDENCE)
+            assert result is not None, message
+            assert result.intent == intent, message
+
+    def test_falls_back_to_llm(self):
+        messages = [
+            "不要出题，先讲讲概念",    # 否定
+            "详细解释一下然后出几道题",  # 多意图冲突
+            "好的",                    # 无法判断
+            "x" * 400 + "?",           # 超长消息
+        ]
+        classifier = IntentPreClassifier()
+
+        for message in messages:
+            assert classifier.classify(message, MIN_CONFIDENCE) is None, message
+
+    def test_declarative_mentions_not_quiz_or_note(self):
+        cases = [
+            ("这道题出题人想考什么？", "qa"),
+            ("看来题目里有个坑", None),
+            ("我已经记下来了，谢谢", None),
+            ("I take notes every day", None),
+        ]
+        classifier = IntentPreClassifier()
+
+        for message, intent in cases:
+            result = classifier.classify(message, MIN_CONFIDENCE)
+            assert (result.intent if result else None) == intent, message
+
+    def test_question_lowers_quiz_confidence(self):
+        classifier = IntentPreClassifier()
+
+        assert classifier.classify("能给我出几道题吗？", MIN_CONFIDENCE) is None
+        assert classifier.classify("给我出几道题", MIN_CONFIDENCE).intent == "quiz_request"
+
+    def test_below_min_confidence(self):
+        classifier = IntentPreClassifier()
+
+        assert classifier.classify("什么是闭包", min_confidence=0.99) is None
+        assert classifier.get_stats()["fallbacks"] == 1
+
+    def test_stats(self):
+        classifier = IntentPreClassifier()
+        classifier.classify("考考我", MIN_CONFIDENCE)
+        classifier.classify("好的", MIN_CONFIDENCE)
+
+        stats = classifier.get_stats()
+        assert stats["rule_hits"] == {"quiz_request": 1}
+        assert stats["fallbacks"] == 1
+        assert stats["hit_ratio"] == 50.0
+
+
+class TestMentorAgentIntent:
+    """测试 MentorAgent 意图识别"""
+
+    def _input(self, message: str) -> MentorAgentInput:
+        return MentorAgentInput(user_message=message, user_id="u1", roadmap_id="r1")
+
+    async def test_rule_hit_skips_llm(self):
+        from app.agents.mentor_agent import MentorAgent
+
+        agent = MentorAgent()
+        with patch.object(agent.intent_recognizer, "execute", AsyncMock()) as llm:
+            result = await agent.recognize_intent(self._input("考考我"))
+
+        assert result.intent == "quiz_request"
+        llm.assert_not_called()
+
+    async def test_ambiguous_message_uses_llm(self):
+        from app.agents.mentor_agent import MentorAgent
+
+        agent = MentorAgent()
+        llm_result = IntentRecognitionResult(intent="note_record", confidence=0.9, reason="llm")
+        with patch.object(agent.intent_recognizer, "execute", AsyncMock(return_value=llm_result)) as llm:
+            result = await agent.recognize_intent(self._input("好的"))
+
+        assert result == llm_result
+        llm.assert_awaited_once()
+
+    async def test_stream_reuses_given_intent(self):
+        from app.agents.mentor_agent import MentorAgent
+
+        agent = MentorAgent()
+        given = IntentRecognitionResult(intent="qa", confidence=0.6, reason="given")
+
+        async def fake_stream(input_data):
+            yield "answer"
+
+        with patch.object(agent, "recognize_intent", AsyncMock()) as recognize, \
+             patch.object(agent.qa_agent, "execute_stream", fake_stream):
+            chunks = [c async for c in agent.execute_stream(self._input("好的"), intent_result=given)]
+
+        assert chunks == ["answer"]
+        recognize.assert_not_called()
@@ -0,0 +1,218 @@
+"""
+伴学对话上下文组装单元测试
+
+测试内容：
+- 路线图标题与概念信息按 roadmap_id 缓存
+- 一轮对话在同一会话中完成会话创建、消息保存、历史读取和上下文读取
+- 上下文查询失败不影响对话
+- 路线图查询失败时回滚后继续读取教程摘要和用户画像
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.database import build_concept_index
+from app.services.framework_cache import FrameworkSnapshot
+from app.services.learning_context_service import LearningContextService
+
+
+FRAMEWORK = {
+    "stages": [
+        {
+            "name": "基础",
+            "modules": [
+                {
+                    "name": "语法",
+                    "concepts": [{"concept_id": "c1", "name": "变量", "description": "变量与赋值"}],
+                },
+            ],
+        },
+    ],
+}
+
+SNAPSHOT = FrameworkSnapshot(
+    roadmap_id="r1",
+    user_id="u1",
+    updated_at=datetime(2026, 1, 1),
+    framework_data=FRAMEWORK,
+    concept_index=build_concept_index(FRAMEWORK),
+)
+
+PER_TURN_ROW = SimpleNamespace(
+    tutorial_summary="变量教程摘要",
+    industry="金融",
+    current_role="分析师",
+    has_tech_stack=True,
+)
+
+
+def _session(per_turn_row=PER_TURN_ROW):
+    session = MagicMock()
+    result = MagicMock()
+    result.one.return_value = per_turn_row
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def _chat_repo(existing_session=True):
+    repo = MagicMock()
+    chat_session = SimpleNamespace(session_id="s1")
+    repo.get_session = AsyncMock(return_value=chat_session if existing_session else None)
+    repo.create_session = AsyncMock(return_value=chat_session)
+    repo.create_message = AsyncMock()
+    repo.get_recent_messages = AsyncMock(return_value=[
+        SimpleNamespace(
+            message_id="m1",
+            session_id="s1",
+            role="user",
+            content="什么是变量",
+            intent_type=None,
+            created_at=datetime(2026, 1, 1),
+        ),
+    ])
+    return repo
+
+
+def _patch_roadmap(title="Python 入门"):
+    meta_repo = MagicMock()
+    meta_repo.get_summary_by_roadmap_id = AsyncMock(
+        return_value=SimpleNamespace(title=title) if title else None
+    )
+    return (
+        patch("app.services.learning_context_service.RoadmapMetadataRepository", return_value=meta_repo),
+        patch("app.services.framework_cache.framework_cache.get", AsyncMock(return_value=SNAPSHOT)),
+        meta_repo,
+    )
+
+
+class TestRoadmapContextCache:
+    """测试路线图上下文缓存"""
+
+    async def test_cached_per_roadmap(self):
+        service = LearningContextService()
+        patch_repo, patch_framework, meta_repo = _patch_roadmap()
+
+        with patch_repo, patch_framework as framework_get:
+            first = await service.get_roadmap_context(_session(), "r1")
+            second = await service.get_roadmap_context(_session(), "r1")
+
+        assert first is second
+        assert first.title == "Python 入门"
+        assert first.concepts == {"c1": ("变量", "变量与赋值")}
+        meta_repo.get_summary_by_roadmap_id.assert_awaited_once()
+        framework_get.assert_awaited_once()
+
+    async def test_missing_roadmap_not_cached(self):
+        service = LearningContextService()
+        patch_repo, patch_framework, meta_repo = _patch_roadmap(title=None)
+
+        with patch_repo, patch_framework:
+            assert await service.get_roadmap_context(_session(), "r1") is None
+            assert await service.get_roadmap_context(_session(), "r1") is None
+
+        assert meta_repo.get_summary_by_roadmap_id.await_count == 2
+
+
+class TestPrepareTurn:
+    """测试一轮对话的上下文准备"""
+
+    async def test_new_session_single_db_session(self):
+        service = LearningContextService()
+        session = _session()
+        chat_repo = _chat_repo()
+        patch_repo, patch_framework, _ = _patch_roadmap()
+
+        with patch("app.services.learning_context_service.ChatRepository", return_value=chat_repo), \
+             patch_repo, patch_framework:
+            turn = await service.prepare_turn(
+                session,
+                user_id="u1",
+                roadmap_id="r1",
+                concept_id="c1",
+                message="什么是变量",
+            )
+
+        chat_repo.create_session.assert_awaited_once()
+        chat_repo.create_message.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        assert turn.session_id == "s1"
+        assert [m.message_id for m in turn.history] == ["m1"]
+        assert turn.context == {
+            "roadmap_title": "Python 入门",
+            "concept_name": "变量",
+            "concept_description": "变量与赋值",
+            "tutorial_summary": "变量教程摘要",
+            "user_background": "金融 分析师",
+            "user_level": "intermediate",
+        }
+
+    async def test_unknown_session(self):
+        service = LearningContextService()
+        session = _session()
+        chat_repo = _chat_repo(existing_session=False)
+
+        with patch("app.services.learning_context_service.ChatRepository", return_value=chat_repo):
+            turn = await service.prepare_turn(
+                session,
+                user_id="u1",
+                roadmap_id="r1",
+                concept_id=None,
+                message="hi",
+                session_id="missing",
+            )
+
+        assert turn is None
+        chat_repo.create_message.assert_not_called()
+        session.commit.assert_not_called()
+
+    async def test_context_failure_keeps_turn(self):
+        service = LearningContextService()
+        session = _session()
+        session.execute = AsyncMock(side_effect=RuntimeError("db down"))
+        chat_repo = _chat_repo()
+        patch_repo, patch_framework, _ = _patch_roadmap()
+
+        with patch("app.services.learning_context_service.ChatRepository", return_value=chat_repo), \
+             patch_repo, patch_framework:
+            turn = await service.prepare_turn(
+                session,
+                user_id="u1",
+                roadmap_id="r1",
+                concept_id="c1",
+                message="什么是变量",
+                session_id="s1",
+            )
+
+        session.commit.assert_awaited_once()
+        assert turn.context == {
+            "roadmap_title": "Python 入门",
+            "concept_name": "变量",
+            "concept_description": "变量与赋值",
+        }
+
+    async def test_roadmap_failure_keeps_profile_context(self):
+        service = LearningContextService()
+        session = _session()
+        chat_repo = _chat_repo()
+        patch_repo, _, meta_repo = _patch_roadmap()
+        meta_repo.get_summary_by_roadmap_id.side_effect = RuntimeError("roadmap query failed")
+
+        with patch("app.services.learning_context_service.ChatRepository", return_value=chat_repo), \
+             patch_repo:
+            turn = await service.prepare_turn(
+                session,
+                user_id="u1",
+                roadmap_id="r1",
+                concept_id="c1",
+                message="什么是变量",
+                session_id="s1",
+            )
+
+        session.rollback.assert_awaited_once()
+        assert turn.context == {
+            "tutorial_summary": "变量教程摘要",
+            "user_background": "金融 分析师",
+            "user_level": "intermediate",
+        }
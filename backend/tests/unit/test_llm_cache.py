@@ -0,0 +1,173 @@
+"""
+LLM 响应缓存单元测试
+
+测试内容：
+- TTLCache 的 LRU 淘汰、TTL 过期和字节上限
+- 缓存键对请求内容敏感、对字典键顺序不敏感
+- 缓存命中按零成本记录到 cost_tracker
+- Agent 调用 LLM 时只读缓存，解析成功后才写入
+- 从不写入缓存的 Agent 即使配置为 '*' 也不读取缓存
+"""
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.utils.cost_tracker import CostTracker
+from app.utils.llm_cache import LLMResponseCache
+from app.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """测试进程内 LRU + TTL 缓存"""
+
+    def test_lru_eviction(self):
+        """超过条目上限时淘汰最久未访问的条目"""
+        cache: TTLCache[int] = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # a 变为最近访问
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self):
+        """过期条目视为未命中"""
+        cache: TTLCache[int] = TTLCache(max_entries=10, ttl_seconds=60)
+        cache.set("a", 1, ttl_seconds=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_byte_limit(self):
+        """超过总字节上限时淘汰，超大条目不缓存"""
+        cache: TTLCache[str] = TTLCache(max_entries=10, ttl_seconds=60, max_bytes=100)
+        cache.set("big", "x", size_bytes=101)
+        assert cache.get("big") is None
+
+        cache.set("a", "a", size_bytes=60)
+        cache.set("b", "b", size_bytes=60)
+        assert cache.get("a") is None
+        assert cache.get("b") == "b"
+
+
+class TestLLMResponseCache:
+    """测试 LLM 响应缓存"""
+
+    def test_make_key_is_content_addressed(self):
+        """相同请求得到相同键，任一参数变化得到不同键"""
+        messages = [{"role": "user", "content": "你好"}]
+        base = dict(
+            model="openai/gpt-4o-mini",
+            messages=messages,
+            tools=None,
+            temperature=0.2,
+            max_tokens=1024,
+            response_format={"type": "json_object"},
+        )
+        key = LLMResponseCache.make_key(**base)
+
+        assert key == LLMResponseCache.make_key(**base)
+        assert key != LLMResponseCache.make_key(**{**base, "temperature": 0.3})
+        assert key != LLMResponseCache.make_key(**{**base, "response_format": None})
+        assert key != LLMResponseCache.make_key(
+            **{**base, "messages": [{"role": "user", "content": "您好"}]}
+        )
+
+    def test_should_bypass_has_no_side_effects(self):
+        """判断是否绕过不计数，计数由调用方记录"""
+        cache = LLMResponseCache()
+
+        with patch("app.utils.llm_cache.settings.LLM_CACHE_MAX_TEMPERATURE", 0.5):
+            assert cache.should_bypass(0.7)
+            assert cache.should_bypass(0.7)
+            assert not cache.should_bypass(0.5)
+
+        assert cache.bypassed == 0
+        cache.record_bypass()
+        assert cache.bypassed == 1
+
+    async def test_memory_tier_serves_repeated_lookups(self):
+        """写入后从进程内缓存读取，不访问 Redis"""
+        cache = LLMResponseCache()
+        data = {"choices": [{"message": {"content": "ok"}}]}
+
+        with patch("app.utils.llm_cache.redis_client") as redis:
+            redis.connect = AsyncMock()
+            redis._client.set = AsyncMock()
+            redis.get_json = AsyncMock(return_value=None)
+
+            await cache.set("k", data)
+            result = await cache.get("k")
+
+        assert result == data
+        assert cache.memory_hits == 1
+        redis.get_json.assert_not_awaited()
+
+
+class TestCacheEnabledAgents:
+    """测试按 Agent 开启缓存"""
+
+    def test_wildcard_skips_agents_that_never_store(self):
+        with patch("app.utils.llm_cache.settings.LLM_CACHE_ENABLED", True), \
+             patch("app.utils.llm_cache.settings.LLM_CACHE_AGENTS", "*"):
+            cache = LLMResponseCache()
+
+            assert cache.is_enabled_for("quiz_generator")
+            assert cache.is_enabled_for("tutorial_generator")
+            assert not cache.is_enabled_for("curriculum_architect")
+
+
+class TestAgentResponseCaching:
+    """测试 Agent 只缓存解析成功的响应"""
+
+    async def test_call_llm_reads_but_does_not_store(self):
+        """_call_llm 不写入缓存，由 Agent 解析成功后调用 _store_cached_response 写入"""
+        from app.agents.base import BaseAgent
+
+        class _Agent(BaseAgent):
+            async def execute(self, input_data):
+                raise NotImplementedError
+
+        agent = _Agent(
+            agent_id="intent_analyzer",
+            model_provider="openai",
+            model_name="gpt-4o-mini",
+            temperature=0.2,
+        )
+        messages = [{"role": "user", "content": "你好"}]
+        response = MagicMock(usage=None)
+
+        with patch("app.agents.base.llm_response_cache") as cache, \
+             patch("app.utils.llm_governor.settings.LLM_GOVERNOR_ENABLED", False), \
+             patch("app.agents.base.litellm.acompletion", AsyncMock(return_value=response)):
+            cache.is_enabled_for.return_value = True
+            cache.should_bypass.return_value = False
+            cache.make_key.return_value = "key"
+            cache.get = AsyncMock(return_value=None)
+            cache.set = AsyncMock()
+
+            result = await agent._call_llm(messages)
+            cache.get.assert_awaited_once_with("key")
+            cache.set.assert_not_awaited()
+
+            await agent._store_cached_response(messages, result)
+
+        cache.set.assert_awaited_once_with("key", response.model_dump.return_value)
+
+
+class TestCostTrackerCacheHit:
+    """测试缓存命中的成本记录"""
+
+    def test_cache_hit_is_zero_cost(self):
+        """缓存命中不计入总成本，但记录节省的成本"""
+        tracker = CostTracker()
+        tracker.track_cache_hit("quiz_generator", "gpt-4o-mini", 1_000_000, 0)
+
+        usage = tracker.get_agent_stats("quiz_generator")
+        assert tracker.get_total_cost() == 0.0
+        assert usage["cache_hits"] == 1
+        assert usage["saved_cost"] == pytest.approx(0.15)
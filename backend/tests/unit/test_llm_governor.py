@@ -0,0 +1,123 @@
+"""
+LLM 并发调控器单元测试
+
+测试内容：
+- 调控器关闭时直接放行，不访问 Redis
+- 租约释放时根据调用结果上报 ok / throttled / error
+- Redis 不可用时放行（fail open）
+- 延迟只统计 provider 调用时间
+- 租约过期由 Redis 端 TTL（毫秒）控制
+- 脚本访问的键都在 KEYS 中声明，且共享哈希标签
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.utils.llm_governor import GovernorLease, LLMConcurrencyGovernor
+
+
+@pytest.fixture
+def governor_enabled():
+    with patch("app.utils.llm_governor.settings") as mock_settings:
+        mock_settings.LLM_GOVERNOR_ENABLED = True
+        yield mock_settings
+
+
+class TestLease:
+    """测试租约上下文管理器"""
+
+    async def test_disabled_passes_through(self):
+        """调控器关闭时不获取租约"""
+        governor = LLMConcurrencyGovernor()
+        with patch("app.utils.llm_governor.settings") as mock_settings, \
+             patch.object(governor, "_acquire", AsyncMock()) as acquire:
+            mock_settings.LLM_GOVERNOR_ENABLED = False
+            async with governor.lease("openai", "gpt-4o-mini") as lease:
+                assert lease.lease_id is None
+
+        acquire.assert_not_awaited()
+
+    async def test_success_reports_ok(self, governor_enabled):
+        """正常结束上报 ok"""
+        governor = LLMConcurrencyGovernor()
+        with patch.object(governor, "_acquire", AsyncMock(return_value="lease-1")), \
+             patch.object(governor, "_release", AsyncMock()) as release:
+            async with governor.lease("openai", "gpt-4o-mini") as lease:
+                lease.record_usage(100)
+
+        assert release.await_args.args[1] == "ok"
+
+    async def test_rate_limited_reports_throttled(self, governor_enabled):
+        """标记 429 后上报 throttled"""
+        governor = LLMConcurrencyGovernor()
+        with patch.object(governor, "_acquire", AsyncMock(return_value="lease-1")), \
+             patch.object(governor, "_release", AsyncMock()) as release:
+            with pytest.raises(RuntimeError):
+                async with governor.lease("openai", "gpt-4o-mini") as lease:
+                    lease.mark_rate_limited()
+                    raise RuntimeError("429")
+
+        assert release.await_args.args[1] == "throttled"
+        assert governor.rate_limited == 1
+
+    async def test_other_error_reports_error(self, governor_enabled):
+        """其他异常上报 error（不调整上限）"""
+        governor = LLMConcurrencyGovernor()
+        with patch.object(governor, "_acquire", AsyncMock(return_value="lease-1")), \
+             patch.object(governor, "_release", AsyncMock()) as release:
+            with pytest.raises(ValueError):
+                async with governor.lease("openai", "gpt-4o-mini"):
+                    raise ValueError("bad response")
+
+        assert release.await_args.args[1] == "error"
+
+    async def test_redis_failure_fails_open(self, governor_enabled):
+        """Redis 异常时放行且不释放租约"""
+        governor = LLMConcurrencyGovernor()
+        with patch("app.utils.llm_governor.redis_client") as redis, \
+             patch.object(governor, "_release", AsyncMock()) as release:
+            redis.connect = AsyncMock(side_effect=ConnectionError("redis down"))
+            async with governor.lease("openai", "gpt-4o-mini") as lease:
+                assert lease.lease_id is None
+
+        release.assert_not_awaited()
+        assert governor.failed_open == 1
+
+
+class TestLatencyMetric:
+    """测试延迟指标"""
+
+    def test_measure_excludes_consumer_time(self):
+        """多段 provider 调用累加，段之间调用方处理的时间不计入"""
+        with patch("app.utils.llm_governor.time.monotonic", side_effect=[0.0, 1.0, 2.0, 10.0, 11.5]):
+            lease = GovernorLease("openai", "gpt-4o-mini", "lease-1")
+            with lease.measure():
+                pass
+            with lease.measure():
+                pass
+
+        lease.record_usage(5)
+        assert lease.latency_metric == pytest.approx(2.5 / 5)
+
+
+class TestAcquire:
+    """测试租约获取"""
+
+    async def test_lease_uses_redis_ttl(self, governor_enabled):
+        """租约键带毫秒 TTL，不传入本机时间"""
+        governor_enabled.LLM_GOVERNOR_LEASE_TTL_SECONDS = 900
+        governor_enabled.LLM_GOVERNOR_INITIAL_LIMIT = 8
+        governor = LLMConcurrencyGovernor()
+
+        with patch("app.utils.llm_governor.redis_client") as redis:
+            redis.connect = AsyncMock()
+            redis._client.eval = AsyncMock(return_value=1)
+            lease_id = await governor._acquire("openai", "gpt-4o-mini")
+
+        _, numkeys, state_key, ids_key, lease_key, lease_prefix, *argv = redis._client.eval.await_args.args
+        assert numkeys == 4
+        assert lease_key == f"llm_governor:{{openai:gpt-4o-mini}}:lease:{lease_id}"
+        assert lease_prefix == "llm_governor:{openai:gpt-4o-mini}:lease:"
+        assert argv == [lease_id, 900000, 8]
+        # 所有键共享哈希标签，Redis Cluster 下位于同一槽位
+        for key in (state_key, ids_key, lease_key, lease_prefix):
+            assert key.startswith("llm_governor:{openai:gpt-4o-mini}:")
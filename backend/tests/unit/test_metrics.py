@@ -0,0 +1,26 @@
+"""
+Prometheus 指标工厂单元测试
+
+测试内容：
+- 未安装 prometheus_client 时返回可直接调用的空操作指标
+"""
+from unittest.mock import patch
+
+from app.utils import metrics
+
+
+class TestMetricFactories:
+    """测试可选的 Prometheus 指标工厂"""
+
+    def test_noop_when_disabled(self):
+        with patch.object(metrics, "PROMETHEUS_ENABLED", False):
+            counter = metrics.counter("test_total", "test", labelnames=["result"])
+            gauge = metrics.gauge("test_gauge", "test")
+            histogram = metrics.histogram("test_seconds", "test", buckets=[1, 5])
+
+        counter.labels(result="hit").inc()
+        gauge.inc()
+        gauge.dec()
+        gauge.set(3)
+        histogram.observe(0.5)
+        assert counter is gauge is histogram
@@ -0,0 +1,64 @@
+"""
+进度事件日志写入与发布单元测试
+
+测试内容：
+- 事件日志写入成功时发布的事件带 event_id，且不修改调用方的事件
+- 事件日志写入失败或超时时仍然发布
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.notification_service import NotificationService
+
+
+def _client(xadd=None):
+    client = MagicMock()
+    client.xadd = xadd or AsyncMock(return_value=b"1-0")
+    client.expire = AsyncMock()
+    client.publish = AsyncMock()
+    return client
+
+
+def _published(client) -> dict:
+    return json.loads(client.publish.call_args.args[1])
+
+
+class TestAppendAndPublish:
+    """测试事件日志写入与发布"""
+
+    async def test_event_id_added_to_copy(self):
+        client = _client()
+        event = {"type": "progress"}
+
+        with patch("app.services.notification_service.redis_client") as redis, \
+             patch("app.services.notification_service.settings.NOTIFICATION_STREAM_ENABLED", True):
+            redis._client = client
+            await NotificationService()._append_and_publish("task-1", "ch", event)
+
+        assert _published(client) == {"type": "progress", "event_id": "1-0"}
+        assert event == {"type": "progress"}
+
+    async def test_stream_failure_still_publishes(self):
+        client = _client(xadd=AsyncMock(side_effect=ConnectionError("stream down")))
+
+        with patch("app.services.notification_service.redis_client") as redis, \
+             patch("app.services.notification_service.settings.NOTIFICATION_STREAM_ENABLED", True):
+            redis._client = client
+            await NotificationService()._append_and_publish("task-1", "ch", {"type": "progress"})
+
+        assert _published(client) == {"type": "progress"}
+
+    async def test_stream_timeout_still_publishes(self):
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(3600)
+
+        client = _client(xadd=AsyncMock(side_effect=hang))
+
+        with patch("app.services.notification_service.redis_client") as redis, \
+             patch("app.services.notification_service.settings.NOTIFICATION_STREAM_ENABLED", True), \
+             patch("app.services.notification_service.STREAM_WRITE_TIMEOUT_SECONDS", 0.01):
+            redis._client = client
+            await NotificationService()._append_and_publish("task-1", "ch", {"type": "progress"})
+
+        assert _published(client) == {"type": "progress"}
@@ -0,0 +1,68 @@
+"""
+OrchestratorFactory Worker 进程级复用单元测试
+
+测试内容：
+- get_worker_executor 在同一进程/事件循环内复用同一个 executor
+- 初始化状态属于其他进程（prefork 继承）时丢弃并重新初始化
+"""
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.orchestrator_factory import OrchestratorFactory
+
+
+@pytest.fixture(autouse=True)
+def reset_factory_state():
+    """每个测试前后重置工厂类状态"""
+    OrchestratorFactory._reset_state()
+    yield
+    OrchestratorFactory._reset_state()
+
+
+def _fake_initialize():
+    """模拟 initialize()：只设置初始化标记和归属信息"""
+    async def _initialize(cls=OrchestratorFactory):
+        cls._initialized = True
+        cls._owner_pid = os.getpid()
+        cls._owner_loop_id = id(asyncio.get_running_loop())
+    return AsyncMock(side_effect=_initialize)
+
+
+class TestGetWorkerExecutor:
+    """测试 get_worker_executor"""
+
+    async def test_executor_reused_across_calls(self):
+        """同一进程和事件循环内多次调用返回同一个 executor，只初始化一次"""
+        initialize = _fake_initialize()
+        executor = MagicMock()
+
+        with patch.object(OrchestratorFactory, "initialize", initialize), \
+             patch.object(OrchestratorFactory, "create_workflow_executor", return_value=executor) as create:
+            first = await OrchestratorFactory.get_worker_executor()
+            second = await OrchestratorFactory.get_worker_executor()
+
+        assert first is executor
+        assert second is executor
+        assert initialize.await_count == 1
+        assert create.call_count == 1
+
+    async def test_stale_state_from_parent_process_reinitialized(self):
+        """继承自父进程的初始化状态被丢弃，重新初始化并创建新的 executor"""
+        initialize = _fake_initialize()
+        stale_executor = MagicMock()
+        new_executor = MagicMock()
+
+        OrchestratorFactory._initialized = True
+        OrchestratorFactory._owner_pid = os.getpid() + 1  # 模拟父进程 PID
+        OrchestratorFactory._owner_loop_id = id(asyncio.get_running_loop())
+        OrchestratorFactory._worker_executor = stale_executor
+
+        with patch.object(OrchestratorFactory, "initialize", initialize), \
+             patch.object(OrchestratorFactory, "create_workflow_executor", return_value=new_executor):
+            executor = await OrchestratorFactory.get_worker_executor()
+
+        assert executor is new_executor
+        assert initialize.await_count == 1
+        assert OrchestratorFactory._owner_pid == os.getpid()
@@ -0,0 +1,66 @@
+"""
+PromptLoader 单元测试
+
+测试内容：
+- get_prompt_loader 返回进程级共享实例
+- 预编译后 get_template 命中缓存，不再重新编译
+- 渲染耗时统计
+"""
+import pytest
+
+from app.utils import prompt_loader as prompt_loader_module
+from app.utils.prompt_loader import PromptLoader, get_prompt_loader
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    """创建临时模板目录"""
+    (tmp_path / "greeting.j2").write_text("你好，{{ name }}", encoding="utf-8")
+    (tmp_path / "data.j2").write_text("{{ payload | to_json }}", encoding="utf-8")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def reset_singleton():
+    """重置全局单例"""
+    prompt_loader_module._prompt_loader = None
+    yield
+    prompt_loader_module._prompt_loader = None
+
+
+class TestPromptLoader:
+    """测试模板预编译与渲染统计"""
+
+    def test_precompile_caches_templates(self, template_dir):
+        """预编译后再次获取模板返回同一个已编译对象"""
+        loader = PromptLoader(template_dir=template_dir, auto_reload=False)
+
+        assert loader.precompile() == 2
+        template = loader.env.get_template("greeting.j2")
+        assert loader.env.get_template("greeting.j2") is template
+
+    def test_render_records_timings(self, template_dir):
+        """渲染结果正确并记录耗时统计"""
+        loader = PromptLoader(template_dir=template_dir, auto_reload=False)
+
+        assert loader.render("greeting.j2", name="世界") == "你好，世界"
+        loader.render("greeting.j2", name="路线图")
+
+        stats = loader.get_stats()
+        assert stats["render_count"] == 2
+        assert stats["templates"]["greeting.j2"]["count"] == 2
+
+    def test_bytecode_cache_enabled(self, template_dir, tmp_path_factory):
+        """配置字节码缓存目录后启用磁盘缓存"""
+        cache_dir = str(tmp_path_factory.mktemp("bytecode"))
+        loader = PromptLoader(template_dir=template_dir, bytecode_cache_dir=cache_dir)
+
+        assert loader.get_stats()["bytecode_cache"] is True
+
+
+class TestGetPromptLoader:
+    """测试进程级单例"""
+
+    def test_returns_shared_instance(self, reset_singleton):
+        """多次调用返回同一个实例"""
+        assert get_prompt_loader() is get_prompt_loader()
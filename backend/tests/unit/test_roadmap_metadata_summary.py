@@ -0,0 +1,60 @@
+"""
+路线图元数据摘要列单元测试
+
+测试内容：
+- 从 framework_data 计算概念总数、阶段数、阶段摘要
+- refresh_summary 同步摘要字段
+"""
+from app.models.database import RoadmapMetadata, summarize_framework
+
+
+FRAMEWORK = {
+    "stages": [
+        {"name": "基础", "order": 1, "modules": [{"concepts": [{}, {}]}, {"concepts": [{}]}]},
+        {"name": "进阶", "description": "d", "modules": [{"concepts": []}]},
+    ],
+}
+
+
+class TestSummarizeFramework:
+    """测试框架摘要计算"""
+
+    def test_counts_and_stage_summaries(self):
+        summary = summarize_framework(FRAMEWORK)
+
+        assert summary["total_concepts"] == 3
+        assert summary["stages_count"] == 2
+        assert summary["stage_summaries"] == [
+            {"name": "基础", "description": None, "order": 1},
+            {"name": "进阶", "description": "d", "order": 2},
+        ]
+
+    def test_empty_framework(self):
+        assert summarize_framework({}) == {
+            "total_concepts": 0,
+            "stages_count": 0,
+            "stage_summaries": [],
+        }
+
+
+class TestRefreshSummary:
+    """测试 RoadmapMetadata.refresh_summary"""
+
+    def test_refresh_after_framework_change(self):
+        metadata = RoadmapMetadata(
+            roadmap_id="r1",
+            user_id="u1",
+            title="t",
+            total_estimated_hours=1.0,
+            recommended_completion_weeks=1,
+            framework_data=FRAMEWORK,
+        )
+        metadata.refresh_summary()
+        assert metadata.total_concepts == 3
+
+        metadata.framework_data = {"stages": [FRAMEWORK["stages"][1]]}
+        metadata.refresh_summary()
+
+        assert metadata.total_concepts == 0
+        assert metadata.stages_count == 1
+        assert metadata.stage_summaries[0]["name"] == "进阶"
@@ -0,0 +1,155 @@
+"""
+S3 客户端池单元测试
+
+测试内容：
+- 同一事件循环复用同一个客户端
+- 事件循环关闭后丢弃其客户端，循环 id 被复用时不会拿到旧客户端
+- botocore 连接异常丢弃共享客户端，其他异常（含内置 OSError 子类）不丢弃
+- 摘除的客户端在最后一个使用者释放后才关闭，不会关闭已重建的新客户端
+"""
+import asyncio
+import weakref
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+from app.tools.storage.s3_client_pool import S3ClientPool, _PooledClient
+
+
+def _pool() -> S3ClientPool:
+    pool = S3ClientPool()
+
+    async def create_client():
+        client_cm = MagicMock()
+        client_cm.__aexit__ = AsyncMock()
+        return client_cm, object()
+
+    pool._create_client = create_client
+    return pool
+
+
+async def _get_client(pool: S3ClientPool):
+    async with pool.acquire() as client:
+        return client
+
+
+class TestS3ClientPool:
+    """测试按事件循环缓存客户端"""
+
+    async def test_reused_within_loop(self):
+        pool = _pool()
+
+        first = await _get_client(pool)
+
+        assert await _get_client(pool) is first
+        assert pool.get_stats()["created"] == 1
+        assert pool.get_stats()["reused"] == 1
+
+    def test_closed_loop_client_dropped(self):
+        pool = _pool()
+        old_loop = asyncio.new_event_loop()
+        old_client = old_loop.run_until_complete(_get_client(pool))
+        old_loop.close()
+
+        new_loop = asyncio.new_event_loop()
+        try:
+            new_client = new_loop.run_until_complete(_get_client(pool))
+        finally:
+            new_loop.close()
+
+        assert new_client is not old_client
+        assert len(pool._clients) == 1
+
+    async def test_recycled_loop_id_not_reused(self):
+        """条目 id 与当前循环相同但属于另一个循环时重建客户端"""
+        pool = _pool()
+        other_loop = asyncio.new_event_loop()
+        other_loop.close()
+        stale_client = object()
+        pool._clients[id(asyncio.get_running_loop())] = _PooledClient(
+            weakref.ref(other_loop), MagicMock(), stale_client
+        )
+
+        client = await _get_client(pool)
+
+        assert client is not stale_client
+        assert pool._clients[id(asyncio.get_running_loop())].client is client
+
+    async def test_invalidate_closes_idle_client(self):
+        pool = _pool()
+        first = await _get_client(pool)
+        client_cm = pool._clients[id(asyncio.get_running_loop())].client_cm
+
+        await pool.invalidate(first)
+
+        client_cm.__aexit__.assert_awaited_once()
+        assert await _get_client(pool) is not first
+
+    async def test_invalidated_client_closed_after_last_user(self):
+        """其他调用方仍在使用时只摘除引用，最后一个使用者释放后关闭"""
+        pool = _pool()
+
+        async with pool.acquire() as first:
+            client_cm = pool._clients[id(asyncio.get_running_loop())].client_cm
+            async with pool.acquire() as same:
+                assert same is first
+                await pool.invalidate(first)
+            client_cm.__aexit__.assert_not_awaited()
+            assert await _get_client(pool) is not first
+
+        client_cm.__aexit__.assert_awaited_once()
+        assert pool.get_stats()["retired_clients"] == 0
+
+    async def test_invalidate_ignores_replaced_client(self):
+        """失败的客户端已被摘除并重建时，不影响新客户端"""
+        pool = _pool()
+        first = await _get_client(pool)
+        await pool.invalidate(first)
+        second = await _get_client(pool)
+        second_cm = pool._clients[id(asyncio.get_running_loop())].client_cm
+
+        await pool.invalidate(first)
+
+        second_cm.__aexit__.assert_not_awaited()
+        assert await _get_client(pool) is second
+
+
+def _mock_pool(pool: MagicMock, client: object) -> None:
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=client)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    pool.acquire = MagicMock(return_value=acquire)
+    pool.invalidate = AsyncMock()
+
+
+class TestS3StorageToolInvalidation:
+    """测试存储工具在连接异常时丢弃共享客户端"""
+
+    async def test_botocore_connection_error_invalidates(self):
+        from app.tools.storage.s3_client import S3StorageTool
+
+        with patch("app.tools.storage.s3_client.settings.S3_CLIENT_POOL_ENABLED", True), \
+             patch("app.tools.storage.s3_client.s3_client_pool") as pool:
+            client = object()
+            _mock_pool(pool, client)
+
+            with pytest.raises(EndpointConnectionError):
+                async with S3StorageTool()._get_client():
+                    raise EndpointConnectionError(endpoint_url="https://r2.example.com")
+
+        pool.invalidate.assert_awaited_once_with(client)
+
+    @pytest.mark.parametrize("error", [RuntimeError("bug in caller"), TimeoutError("caller timeout")])
+    async def test_unrelated_error_keeps_client(self, error):
+        from app.tools.storage.s3_client import S3StorageTool
+
+        with patch("app.tools.storage.s3_client.settings.S3_CLIENT_POOL_ENABLED", True), \
+             patch("app.tools.storage.s3_client.s3_client_pool") as pool:
+            _mock_pool(pool, object())
+
+            with pytest.raises(type(error)):
+                async with S3StorageTool()._get_client():
+                    raise error
+
+        pool.invalidate.assert_not_called()
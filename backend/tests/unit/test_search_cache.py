@@ -0,0 +1,82 @@
+"""
+搜索结果缓存单元测试
+
+测试内容：
+- 查询规范化（大小写、空白、冠词；词序保留）
+- 缓存键包含影响结果的参数
+- TTL 随 time_range 变化
+"""
+from app.models.domain import SearchQuery
+from app.tools.search.search_cache import SearchResultCache, normalize_query
+
+
+class TestNormalizeQuery:
+    """测试查询规范化"""
+
+    def test_case_and_whitespace(self):
+        """大小写和多余空白不影响规范化结果"""
+        assert normalize_query("  Python   Tutorial ") == normalize_query("python tutorial")
+
+    def test_articles_removed(self):
+        """冠词被移除"""
+        assert normalize_query("the Python tutorial") == normalize_query("python tutorial")
+
+    def test_word_order_preserved(self):
+        """词序决定含义的查询得到不同的规范化结果"""
+        assert normalize_query("python to javascript") != normalize_query("javascript to python")
+
+    def test_meaningful_words_preserved(self):
+        """介词、疑问词、best 等改变搜索意图的词不会被移除"""
+        assert normalize_query("how to learn python") != normalize_query("learn python")
+        assert normalize_query("best python tutorial") != normalize_query("python tutorial")
+
+    def test_edge_punctuation_stripped(self):
+        """词项首尾标点被移除"""
+        assert normalize_query("React: hooks?") == normalize_query("react hooks")
+
+    def test_language_symbols_preserved(self):
+        """C++ / C# 等带符号的词项不会被规范化为同一个词"""
+        assert normalize_query("C++ tutorial") != normalize_query("C# tutorial")
+
+    def test_only_stopwords_not_empty(self):
+        """全部是冠词的查询不会规范化为空字符串"""
+        assert normalize_query("The") != ""
+
+    def test_chinese_query(self):
+        """中文查询只规范化空白与大小写"""
+        assert normalize_query("Python  入门 教程") == normalize_query("python 入门 教程")
+
+
+class TestCacheKey:
+    """测试缓存键"""
+
+    def test_equivalent_queries_share_key(self):
+        """规范化后相同且参数相同的查询共享缓存键"""
+        a = SearchQuery(query="Python Tutorial", include_domains=["GitHub.com", "docs.python.org"])
+        b = SearchQuery(query="  python  tutorial", include_domains=["docs.python.org", "github.com"])
+
+        assert SearchResultCache.make_key(a) == SearchResultCache.make_key(b)
+
+    def test_direction_sensitive_queries_differ(self):
+        """方向相反的查询不共享缓存键"""
+        a = SearchQuery(query="python to javascript")
+        b = SearchQuery(query="javascript to python")
+
+        assert SearchResultCache.make_key(a) != SearchResultCache.make_key(b)
+
+    def test_filters_change_key(self):
+        """深度、时间范围和域名过滤都会改变缓存键"""
+        base = SearchQuery(query="python tutorial")
+        key = SearchResultCache.make_key(base)
+
+        assert key != SearchResultCache.make_key(base.model_copy(update={"search_depth": "basic"}))
+        assert key != SearchResultCache.make_key(base.model_copy(update={"time_range": "week"}))
+        assert key != SearchResultCache.make_key(base.model_copy(update={"exclude_domains": ["medium.com"]}))
+
+    def test_ttl_depends_on_time_range(self):
+        """时间窗口越短，TTL 越短"""
+        day = SearchResultCache.get_ttl(SearchQuery(query="q", time_range="day"))
+        year = SearchResultCache.get_ttl(SearchQuery(query="q", time_range="year"))
+        unbounded = SearchResultCache.get_ttl(SearchQuery(query="q"))
+
+        assert day < year <= unbounded
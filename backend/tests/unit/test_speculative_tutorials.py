@@ -0,0 +1,76 @@
+"""
+推测性教程预生成单元测试
+
+测试内容：
+- module_ready 中格式错误的概念被跳过，不中断路线图生成
+- 启动数量不超过上限
+- 概念变化后推测结果被丢弃
+"""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from app.api.v1.endpoints.streaming import (
+    _SpeculativeTutorials,
+    _build_concept,
+    _build_concept_context,
+)
+from app.models.domain import LearningPreferences
+
+
+def _concept(concept_id: str, name: str = "变量") -> dict:
+    return {"concept_id": concept_id, "name": name, "description": "desc"}
+
+
+def _event(concepts: list) -> dict:
+    return {
+        "roadmap_id": "r1",
+        "stage": {"stage_id": "s1", "name": "基础"},
+        "module": {"module_id": "m1", "name": "语法", "concepts": concepts},
+    }
+
+
+def _speculative(max_concepts: int = 3) -> _SpeculativeTutorials:
+    preferences = LearningPreferences.model_construct()
+    return _SpeculativeTutorials(preferences, max_concepts=max_concepts)
+
+
+class TestSpeculativeTutorials:
+    """测试推测性教程预生成"""
+
+    async def test_malformed_concept_skipped(self):
+        """缺少必填字段的概念被跳过，其余概念照常启动"""
+        speculative = _speculative()
+
+        with patch("app.api.v1.endpoints.streaming.TutorialGeneratorAgent", MagicMock()), \
+             patch.object(_SpeculativeTutorials, "_collect", side_effect=lambda *a: asyncio.sleep(0)):
+            speculative.on_module_ready(_event([{"concept_id": "bad"}, _concept("c2")]))
+
+        assert list(speculative._tasks) == ["c2"]
+        speculative.discard_all()
+
+    async def test_respects_max_concepts(self):
+        """启动数量不超过上限"""
+        speculative = _speculative(max_concepts=1)
+
+        with patch("app.api.v1.endpoints.streaming.TutorialGeneratorAgent", MagicMock()), \
+             patch.object(_SpeculativeTutorials, "_collect", side_effect=lambda *a: asyncio.sleep(0)):
+            speculative.on_module_ready(_event([_concept("c1"), _concept("c2")]))
+
+        assert list(speculative._tasks) == ["c1"]
+        speculative.discard_all()
+
+    async def test_changed_concept_discarded(self):
+        """最终框架中概念有变化时不复用推测结果"""
+        speculative = _speculative()
+
+        with patch("app.api.v1.endpoints.streaming.TutorialGeneratorAgent", MagicMock()), \
+             patch.object(_SpeculativeTutorials, "_collect", side_effect=lambda *a: asyncio.sleep(3600)):
+            speculative.on_module_ready(_event([_concept("c1")]))
+
+        task = speculative._tasks["c1"][1]
+        event = _event([])
+        context = _build_concept_context("r1", event["stage"], event["module"])
+
+        assert speculative.claim(_build_concept(_concept("c1", name="常量")), context) is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
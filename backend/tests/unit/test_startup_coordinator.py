@@ -0,0 +1,170 @@
+"""
+启动协调器单元测试
+
+测试内容：
+- 关键依赖并发初始化与就绪状态（任一失败时取消其余步骤）
+- 后台任务分布式锁（持锁执行、锁被占用跳过、Redis 不可用仍执行）
+- 冷却标记
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.startup import DONE_KEY_PREFIX, LOCK_KEY_PREFIX, StartupCoordinator
+
+
+def _redis(lock_acquired=True, done_marker=None, holder="other:1:abc"):
+    client = MagicMock()
+    client.connect = AsyncMock()
+    store = {}
+
+    async def get(key):
+        if key.startswith(DONE_KEY_PREFIX):
+            return done_marker
+        return store.get(key, holder)
+
+    async def set_(key, value, nx=False, ex=None):
+        if key.startswith(LOCK_KEY_PREFIX):
+            if not lock_acquired:
+                return None
+        store[key] = value
+        return True
+
+    client._client.get = AsyncMock(side_effect=get)
+    client._client.set = AsyncMock(side_effect=set_)
+    client._client.delete = AsyncMock()
+    client._client.expire = AsyncMock()
+    return client
+
+
+class TestCriticalSteps:
+    """测试关键依赖初始化"""
+
+    async def test_steps_run_concurrently(self):
+        coordinator = StartupCoordinator()
+        running = set()
+        overlap = []
+
+        async def step(name):
+            running.add(name)
+            await asyncio.sleep(0.01)
+            overlap.append(len(running))
+            running.discard(name)
+
+        assert not coordinator.ready
+        await coordinator.run_critical({
+            "a": lambda: step("a"),
+            "b": lambda: step("b"),
+        })
+
+        assert max(overlap) == 2
+        assert coordinator.ready
+        assert coordinator.readiness()["critical"]["a"]["status"] == "completed"
+
+    async def test_failure_propagates_and_not_ready(self):
+        coordinator = StartupCoordinator()
+
+        async def boom():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await coordinator.run_critical({"orchestrator": boom})
+
+        assert not coordinator.ready
+        assert coordinator.steps["orchestrator"].status == "failed"
+
+    async def test_failure_cancels_other_steps(self):
+        coordinator = StartupCoordinator()
+        slow_finished = False
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("bucket check failed")
+
+        async def slow():
+            nonlocal slow_finished
+            await asyncio.sleep(3600)
+            slow_finished = True
+
+        with pytest.raises(RuntimeError, match="bucket check failed"):
+            await asyncio.wait_for(
+                coordinator.run_critical({"orchestrator": slow, "s3_bucket": boom}),
+                timeout=5,
+            )
+
+        assert not slow_finished
+        assert coordinator.steps["orchestrator"].status == "failed"
+        assert coordinator.steps["orchestrator"].detail == "cancelled"
+
+
+class TestBackgroundJobs:
+    """测试后台启动任务"""
+
+    async def test_runs_with_lock_and_releases(self):
+        coordinator = StartupCoordinator(instance_id="me")
+        redis = _redis()
+        job = AsyncMock(return_value={"recovered": 2})
+
+        with patch("app.core.startup.redis_client", redis):
+            coordinator.start_background("task_recovery", job)
+            await coordinator._tasks[0]
+
+        step = coordinator.readiness()["background_jobs"]["task_recovery"]
+        assert step["status"] == "completed"
+        assert step["result"] == {"recovered": 2}
+        redis._client.delete.assert_awaited_once_with(f"{LOCK_KEY_PREFIX}task_recovery")
+        # 未设置冷却时不写完成标记
+        assert all(
+            not call.args[0].startswith(DONE_KEY_PREFIX)
+            for call in redis._client.set.await_args_list
+        )
+
+    async def test_skipped_when_lock_held_elsewhere(self):
+        coordinator = StartupCoordinator(instance_id="me")
+        redis = _redis(lock_acquired=False)
+        job = AsyncMock()
+
+        with patch("app.core.startup.redis_client", redis):
+            coordinator.start_background("task_recovery", job)
+            await coordinator._tasks[0]
+
+        job.assert_not_called()
+        assert coordinator.steps["task_recovery"].status == "skipped"
+        redis._client.delete.assert_not_called()
+
+    async def test_skipped_during_cooldown(self):
+        coordinator = StartupCoordinator(instance_id="me")
+        redis = _redis(done_marker="other:1:abc")
+        job = AsyncMock()
+
+        with patch("app.core.startup.redis_client", redis):
+            coordinator.start_background("tech_assessments", job, cooldown_seconds=600)
+            await coordinator._tasks[0]
+
+        job.assert_not_called()
+        assert coordinator.steps["tech_assessments"].status == "skipped"
+
+    async def test_cooldown_marker_written_on_success(self):
+        coordinator = StartupCoordinator(instance_id="me")
+        redis = _redis()
+
+        with patch("app.core.startup.redis_client", redis):
+            coordinator.start_background("tech_assessments", AsyncMock(return_value={}), cooldown_seconds=600)
+            await coordinator._tasks[0]
+
+        redis._client.set.assert_any_await(f"{DONE_KEY_PREFIX}tech_assessments", "me", ex=600)
+
+    async def test_runs_without_redis_and_failure_is_contained(self):
+        coordinator = StartupCoordinator(instance_id="me")
+        redis = MagicMock()
+        redis.connect = AsyncMock(side_effect=ConnectionError("redis down"))
+        job = AsyncMock(side_effect=ValueError("bad"))
+
+        with patch("app.core.startup.redis_client", redis):
+            coordinator.start_background("tech_assessments", job)
+            await coordinator._tasks[0]
+
+        job.assert_awaited_once()
+        assert coordinator.steps["tech_assessments"].status == "failed"
+        assert "ValueError" in coordinator.steps["tech_assessments"].detail
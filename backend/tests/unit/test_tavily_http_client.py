@@ -0,0 +1,194 @@
+"""
+Tavily HTTP 客户端池单元测试
+
+测试内容：
+- 同一事件循环、同一 API Key 复用同一个客户端，不同 Key 使用不同客户端
+- 进程 fork 后丢弃继承的客户端
+- 事件循环关闭后丢弃其客户端，循环 id 被复用时不会拿到旧客户端
+- 关闭时只关闭当前事件循环的客户端
+- 搜索请求携带 Key 并抛出错误状态码
+- 搜索工具将 REST 响应映射为 SearchResult
+"""
+import asyncio
+import json
+import weakref
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.models.domain import SearchQuery
+from app.tools.search import tavily_http_client
+from app.tools.search.tavily_http_client import TavilyHTTPClientPool, _LoopClient
+
+
+def _mock_transport(handler=None):
+    """用 MockTransport 替换真实网络请求"""
+    handler = handler or (lambda request: httpx.Response(200, json={"results": []}))
+    return patch.object(
+        tavily_http_client.httpx,
+        "AsyncClient",
+        partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)),
+    )
+
+
+class TestTavilyHTTPClientPool:
+    """测试客户端缓存与生命周期"""
+
+    async def test_reused_per_loop_and_key(self):
+        pool = TavilyHTTPClientPool()
+
+        with _mock_transport():
+            first = pool.get_client("tvly-key-a")
+            other_key = pool.get_client("tvly-key-b")
+
+        assert pool.get_client("tvly-key-a") is first
+        assert other_key is not first
+        assert pool.get_stats()["created"] == 2
+        await pool.close()
+
+    async def test_fork_drops_inherited_clients(self):
+        pool = TavilyHTTPClientPool()
+
+        with _mock_transport():
+            first = pool.get_client("tvly-key-a")
+            with patch.object(tavily_http_client.os, "getpid", return_value=-1):
+                assert pool.get_client("tvly-key-a") is not first
+
+        assert len(pool._clients) == 1
+        await first.aclose()
+        await pool.close()
+
+    def test_closed_loop_client_dropped(self):
+        pool = TavilyHTTPClientPool()
+        old_loop = asyncio.new_event_loop()
+        new_loop = asyncio.new_event_loop()
+        try:
+            with _mock_transport():
+                old_client = old_loop.run_until_complete(self._get(pool, "tvly-key-a"))
+                old_loop.close()
+                new_client = new_loop.run_until_complete(self._get_and_close(pool, "tvly-key-a"))
+
+            assert new_client is not old_client
+        finally:
+            new_loop.close()
+
+    async def test_recycled_loop_id_not_reused(self):
+        """条目 id 与当前循环相同但属于另一个循环时重建客户端"""
+        pool = TavilyHTTPClientPool()
+        other_loop = asyncio.new_event_loop()
+        other_loop.close()
+        stale_client = MagicMock(is_closed=False)
+        cache_key = (id(asyncio.get_running_loop()), "tvly-key-a")
+        pool._clients[cache_key] = _LoopClient(weakref.ref(other_loop), stale_client)
+
+        with _mock_transport():
+            client = pool.get_client("tvly-key-a")
+
+        assert client is not stale_client
+        assert pool._clients[cache_key].client is client
+        await pool.close()
+
+    def test_close_skips_other_loops(self):
+        pool = TavilyHTTPClientPool()
+        other_loop = asyncio.new_event_loop()
+        try:
+            with _mock_transport():
+                other_client = other_loop.run_until_complete(self._get(pool, "tvly-key-a"))
+                current_client = asyncio.run(self._get_and_close(pool, "tvly-key-b"))
+
+            assert current_client.is_closed
+            assert not other_client.is_closed
+            assert pool._clients == {}
+        finally:
+            other_loop.run_until_complete(other_client.aclose())
+            other_loop.close()
+
+    @staticmethod
+    async def _get(pool: TavilyHTTPClientPool, api_key: str) -> httpx.AsyncClient:
+        return pool.get_client(api_key)
+
+    @staticmethod
+    async def _get_and_close(pool: TavilyHTTPClientPool, api_key: str) -> httpx.AsyncClient:
+        client = pool.get_client(api_key)
+        await pool.close()
+        return client
+
+    async def test_search_sends_key_and_payload(self):
+        pool = TavilyHTTPClientPool()
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"results": [{"title": "t"}]})
+
+        with _mock_transport(handler):
+            data = await pool.search("tvly-key-a", {"query": "python"})
+
+        assert data == {"results": [{"title": "t"}]}
+        assert requests[0].url.path == "/search"
+        assert requests[0].headers["Authorization"] == "Bearer tvly-key-a"
+        assert json.loads(requests[0].content) == {"query": "python"}
+        await pool.close()
+
+    async def test_search_raises_on_error_status(self):
+        pool = TavilyHTTPClientPool()
+
+        with _mock_transport(lambda request: httpx.Response(432, json={"detail": "quota"})):
+            with pytest.raises(httpx.HTTPStatusError):
+                await pool.search("tvly-key-a", {"query": "python"})
+
+        await pool.close()
+
+    async def test_reset_drops_clients(self):
+        pool = TavilyHTTPClientPool()
+
+        with _mock_transport():
+            client = pool.get_client("tvly-key-a")
+        pool.reset()
+
+        assert pool._clients == {}
+        assert pool.get_stats()["created"] == 0
+        await client.aclose()
+
+
+class TestTavilyAPISearchTool:
+    """测试搜索工具的请求构造与结果映射"""
+
+    async def test_maps_results(self):
+        from app.tools.search.tavily_api_search import TavilyAPISearchTool
+
+        rate_limiter = MagicMock()
+        rate_limiter.acquire = AsyncMock()
+        rate_limiter.get_current_count = AsyncMock(return_value=1)
+        search = AsyncMock(return_value={
+            "results": [
+                {"title": "A", "url": "https://a.dev", "content": "x" * 300, "published_date": "2026-01-01"},
+                {"title": "B", "url": "https://b.dev", "content": None},
+            ],
+        })
+
+        with patch("app.tools.search.tavily_api_search.get_tavily_rate_limiter", AsyncMock(return_value=rate_limiter)), \
+             patch("app.tools.search.tavily_api_search.tavily_client_pool.search", search):
+            result = await TavilyAPISearchTool(pre_allocated_key="tvly-key-a").execute(
+                SearchQuery(query="python", max_results=2, time_range="week")
+            )
+
+        api_key, payload = search.await_args.args
+        assert api_key == "tvly-key-a"
+        assert payload == {
+            "query": "python",
+            "search_depth": "advanced",
+            "max_results": 2,
+            "time_range": "week",
+        }
+        assert result.total_found == 2
+        assert result.results[0]["snippet"] == "x" * 200
+        assert result.results[1] == {
+            "title": "B",
+            "url": "https://b.dev",
+            "snippet": "",
+            "published_date": "",
+        }
+        rate_limiter.acquire.assert_awaited_once()
@@ -0,0 +1,194 @@
+"""
+执行日志摘要与分页单元测试
+
+测试内容：
+- GROUPING SETS 结果解析
+- keyset 游标编解码
+- 已结束任务摘要缓存命中、进行中任务不缓存
+- 日志总数只在摘要已缓存时读取摘要，否则单独计数
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.trace import _count_logs, decode_cursor, encode_cursor
+from app.db.repositories.roadmap_repo import RoadmapRepository
+from app.models.database import beijing_now
+from app.services.trace_summary_cache import TraceSummaryCache
+
+
+def _row(grouping, level=None, category=None, count=0, duration_ms=None, first=None, last=None):
+    return SimpleNamespace(
+        grouping=grouping,
+        level=level,
+        category=category,
+        count=count,
+        duration_ms=duration_ms,
+        first=first,
+        last=last,
+    )
+
+
+def _db(status: str | None, updated_at: datetime | None = None):
+    db = MagicMock()
+    result = MagicMock()
+    result.one_or_none.return_value = (
+        None if status is None else SimpleNamespace(status=status, updated_at=updated_at)
+    )
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+SUMMARY = {"task_id": "task-1", "total_logs": 3}
+
+
+class TestSummarizeGroupingRows:
+    """测试 GROUPING SETS 结果解析"""
+
+    def test_builds_level_category_and_totals(self):
+        first = datetime(2026, 10, 16, 10, 0, 0)
+        last = datetime(2026, 10, 16, 10, 5, 0)
+        rows = [
+            _row(1, level="info", count=2),
+            _row(1, level="error", count=1),
+            _row(2, category="agent", count=3),
+            _row(3, count=3, duration_ms=1500, first=first, last=last),
+        ]
+
+        summary = RoadmapRepository._summarize_grouping_rows("task-1", rows)
+
+        assert summary == {
+            "task_id": "task-1",
+            "level_stats": {"info": 2, "error": 1},
+            "category_stats": {"agent": 3},
+            "total_duration_ms": 1500,
+            "first_log_at": first.isoformat(),
+            "last_log_at": last.isoformat(),
+            "total_logs": 3,
+        }
+
+    def test_empty_trace(self):
+        summary = RoadmapRepository._summarize_grouping_rows(
+            "task-1", [_row(3, count=0, duration_ms=None)]
+        )
+
+        assert summary["total_logs"] == 0
+        assert summary["total_duration_ms"] == 0
+        assert summary["first_log_at"] is None
+
+
+class TestCursor:
+    """测试 keyset 游标"""
+
+    def test_round_trip(self):
+        created_at = datetime(2026, 10, 16, 10, 0, 0, 123456)
+
+        assert decode_cursor(encode_cursor(created_at, "log-1")) == (created_at, "log-1")
+
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+
+        assert exc_info.value.status_code == 400
+
+
+class TestTraceSummaryCache:
+    """测试摘要缓存"""
+
+    async def test_running_task_not_cached(self):
+        cache = TraceSummaryCache()
+        db = _db("processing", beijing_now() - timedelta(hours=1))
+
+        with patch("app.services.trace_summary_cache.redis_client") as redis, \
+             patch.object(RoadmapRepository, "get_execution_logs_summary", AsyncMock(return_value=SUMMARY)):
+            redis.get_json = AsyncMock()
+            assert await cache.get_summary(db, "task-1") == SUMMARY
+
+        redis.get_json.assert_not_called()
+        assert cache.get_stats()["uncacheable"] == 1
+
+    async def test_recently_finished_task_not_cached(self):
+        cache = TraceSummaryCache()
+        db = _db("completed", beijing_now())
+
+        with patch("app.services.trace_summary_cache.redis_client") as redis, \
+             patch.object(RoadmapRepository, "get_execution_logs_summary", AsyncMock(return_value=SUMMARY)):
+            redis.get_json = AsyncMock()
+            await cache.get_summary(db, "task-1")
+
+        redis.get_json.assert_not_called()
+
+    async def test_finished_task_miss_then_hit(self):
+        cache = TraceSummaryCache()
+        updated_at = beijing_now() - timedelta(hours=1)
+
+        with patch("app.services.trace_summary_cache.redis_client") as redis, \
+             patch.object(
+                 RoadmapRepository, "get_execution_logs_summary", AsyncMock(return_value=SUMMARY)
+             ) as summarize:
+            redis.get_json = AsyncMock(side_effect=[None, SUMMARY])
+            redis.set_json = AsyncMock()
+
+            assert await cache.get_summary(_db("completed", updated_at), "task-1") == SUMMARY
+            assert await cache.get_summary(_db("completed", updated_at), "task-1") == SUMMARY
+
+        summarize.assert_awaited_once()
+        key = redis.set_json.call_args.args[0]
+        assert key.endswith(f"task-1:{updated_at.isoformat()}")
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    async def test_redis_failure_falls_back_to_database(self):
+        cache = TraceSummaryCache()
+        db = _db("failed", beijing_now() - timedelta(hours=1))
+
+        with patch("app.services.trace_summary_cache.redis_client") as redis, \
+             patch.object(RoadmapRepository, "get_execution_logs_summary", AsyncMock(return_value=SUMMARY)):
+            redis.get_json = AsyncMock(side_effect=ConnectionError("down"))
+            redis.set_json = AsyncMock(side_effect=ConnectionError("down"))
+            assert await cache.get_summary(db, "task-1") == SUMMARY
+
+        assert cache.get_stats()["errors"] == 2
+
+    async def test_get_cached_never_aggregates(self):
+        cache = TraceSummaryCache()
+        finished_at = beijing_now() - timedelta(hours=1)
+
+        with patch("app.services.trace_summary_cache.redis_client") as redis, \
+             patch.object(
+                 RoadmapRepository, "get_execution_logs_summary", AsyncMock(return_value=SUMMARY)
+             ) as summarize:
+            redis.get_json = AsyncMock(side_effect=[None, SUMMARY])
+
+            assert await cache.get_cached(_db("processing", finished_at), "task-1") is None
+            assert await cache.get_cached(_db("completed", finished_at), "task-1") is None
+            assert await cache.get_cached(_db("completed", finished_at), "task-1") == SUMMARY
+
+        summarize.assert_not_called()
+
+
+class TestCountLogs:
+    """测试日志总数"""
+
+    async def test_uncached_summary_uses_count(self):
+        with patch("app.api.v1.endpoints.trace.trace_summary_cache.get_cached", AsyncMock(return_value=None)), \
+             patch.object(RoadmapRepository, "count_execution_logs_by_trace", AsyncMock(return_value=7)) as count, \
+             patch.object(RoadmapRepository, "get_execution_logs_summary", AsyncMock()) as summarize:
+            assert await _count_logs(MagicMock(), "task-1", "info", None) == 7
+
+        count.assert_awaited_once()
+        summarize.assert_not_called()
+
+    async def test_cached_summary_used(self):
+        summary = {**SUMMARY, "level_stats": {"info": 2}, "category_stats": {"agent": 1}}
+
+        with patch("app.api.v1.endpoints.trace.trace_summary_cache.get_cached", AsyncMock(return_value=summary)), \
+             patch.object(RoadmapRepository, "count_execution_logs_by_trace", AsyncMock()) as count:
+            assert await _count_logs(MagicMock(), "task-1", None, None) == 3
+            assert await _count_logs(MagicMock(), "task-1", "info", None) == 2
+            assert await _count_logs(MagicMock(), "task-1", None, "agent") == 1
+
+        count.assert_not_called()
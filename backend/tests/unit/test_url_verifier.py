@@ -0,0 +1,177 @@
+"""
+URLVerifier 单元测试
+
+测试内容：
+- 同一事件循环内复用同一个 HTTP 客户端
+- 事件循环关闭后丢弃其客户端和信号量，循环 id 被复用时不会拿到旧状态
+- 验证结果写入缓存，缓存命中时不再发送请求
+- 超时不写入缓存
+- 域名信号量在请求结束后移除，并发请求仍受每域名上限约束
+- 等待繁忙域名的请求不占用全局名额
+"""
+import asyncio
+import weakref
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.tools.search.url_verifier import URLVerifier, _LoopState
+
+
+@pytest.fixture
+def fake_redis():
+    """内存版 redis_client（只实现 get_json/set_json）"""
+    store = {}
+
+    async def get_json(key):
+        return store.get(key)
+
+    async def set_json(key, value, ex=None):
+        store[key] = value
+
+    with patch("app.tools.search.url_verifier.redis_client") as redis:
+        redis.get_json = AsyncMock(side_effect=get_json)
+        redis.set_json = AsyncMock(side_effect=set_json)
+        yield store
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+
+
+class TestURLVerifier:
+    """测试 URL 验证与结果缓存"""
+
+    async def test_client_reused_within_loop(self):
+        """同一事件循环内返回同一个客户端"""
+        verifier = URLVerifier()
+        loop = asyncio.get_running_loop()
+        first = verifier._get_client(loop)
+
+        assert verifier._get_client(loop) is first
+        await verifier.close()
+        assert first.is_closed
+
+    def test_closed_loop_state_dropped(self):
+        """事件循环关闭后，新循环创建客户端时丢弃旧循环的状态"""
+        verifier = URLVerifier()
+        old_loop = asyncio.new_event_loop()
+        old_client = old_loop.run_until_complete(self._get_client(verifier))
+        old_loop.run_until_complete(old_client.aclose())
+        old_loop.close()
+
+        new_loop = asyncio.new_event_loop()
+        try:
+            new_client = new_loop.run_until_complete(self._get_client(verifier))
+            assert [state.client for state in verifier._loops.values()] == [new_client]
+            new_loop.run_until_complete(verifier.close())
+        finally:
+            new_loop.close()
+
+        assert new_client is not old_client
+
+    @staticmethod
+    async def _get_client(verifier: URLVerifier) -> httpx.AsyncClient:
+        return verifier._get_client(asyncio.get_running_loop())
+
+    async def test_recycled_loop_id_not_reused(self):
+        """状态 id 与当前循环相同但属于另一个循环时重建客户端和信号量"""
+        verifier = URLVerifier()
+        loop = asyncio.get_running_loop()
+        other_loop = asyncio.new_event_loop()
+        other_loop.close()
+        stale = _LoopState(weakref.ref(other_loop), asyncio.Semaphore(1))
+        verifier._loops[id(loop)] = stale
+
+        client = verifier._get_client(loop)
+
+        assert verifier._loops[id(loop)] is not stale
+        assert verifier._loops[id(loop)].client is client
+        await verifier.close()
+
+    async def test_verdict_cached(self, fake_redis):
+        """第二次验证同一 URL 命中缓存，不发送请求"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(200)
+
+        verifier = URLVerifier()
+        client = _mock_client(handler)
+        with patch.object(verifier, "_get_client", return_value=client):
+            async with client:
+                first = await verifier.verify("https://docs.python.org/3/")
+                second = await verifier.verify("https://docs.python.org/3/")
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.from_cache is True
+        assert len(calls) == 1
+
+    async def test_timeout_not_cached(self, fake_redis):
+        """超时结果不写入缓存"""
+        def handler(request):
+            raise httpx.ConnectTimeout("timeout", request=request)
+
+        verifier = URLVerifier()
+        client = _mock_client(handler)
+        with patch.object(verifier, "_get_client", return_value=client):
+            async with client:
+                verdict = await verifier.verify("https://example.com/slow")
+
+        assert verdict.timed_out is True
+        assert fake_redis == {}
+
+    async def test_host_semaphores_pruned(self, fake_redis):
+        """并发请求受每域名上限约束，请求结束后不保留域名信号量"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        verifier = URLVerifier()
+        client = _mock_client(handler)
+        with patch.object(verifier, "_get_client", return_value=client), \
+                patch("app.tools.search.url_verifier.settings.URL_VERIFY_PER_HOST_LIMIT", 2):
+            async with client:
+                await asyncio.gather(*(
+                    verifier.verify(f"https://example.com/page/{i}") for i in range(6)
+                ))
+
+        assert peak == 2
+        assert verifier.get_stats()["tracked_hosts"] == 0
+
+    async def test_busy_host_does_not_block_other_hosts(self, fake_redis):
+        """繁忙域名的排队请求不占用全局名额，其他域名的验证照常进行"""
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.host == "slow.example.com":
+                await release.wait()
+            return httpx.Response(200)
+
+        verifier = URLVerifier()
+        client = _mock_client(handler)
+        with patch.object(verifier, "_get_client", return_value=client), \
+                patch("app.tools.search.url_verifier.settings.URL_VERIFY_MAX_CONCURRENCY", 2), \
+                patch("app.tools.search.url_verifier.settings.URL_VERIFY_PER_HOST_LIMIT", 1):
+            async with client:
+                slow = [
+                    asyncio.create_task(verifier.verify(f"https://slow.example.com/{i}"))
+                    for i in range(3)
+                ]
+                await asyncio.sleep(0.01)
+
+                verdict = await asyncio.wait_for(verifier.verify("https://fast.example.com/"), 1)
+                assert verdict.status_code == 200
+
+                release.set()
+                await asyncio.gather(*slow)
@@ -0,0 +1,108 @@
+"""
+WebSocket ConnectionManager 单元测试
+
+测试内容：
+- 事件按 task_id 分发到对应连接的队列
+- 队列满时驱逐慢消费者，不影响同一任务的其他连接
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.v1.websocket import ConnectionManager, _EVICTED
+
+
+def _make_websocket() -> MagicMock:
+    websocket = MagicMock()
+    websocket.accept = AsyncMock()
+    return websocket
+
+
+@pytest.fixture
+def manager():
+    """队列容量为 2 的连接管理器（不启动 Redis 分发协程）"""
+    with patch.object(ConnectionManager, "_ensure_dispatcher"):
+        yield ConnectionManager(queue_size=2)
+
+
+class TestConnectionManagerDispatch:
+    """测试事件分发"""
+
+    async def test_dispatch_routes_by_task_id(self, manager):
+        """事件只投递给对应 task_id 的订阅"""
+        sub_a = await manager.connect(_make_websocket(), "task-a")
+        sub_b = await manager.connect(_make_websocket(), "task-b")
+
+        manager.dispatch("task-a", {"type": "progress"})
+
+        assert sub_a.queue.qsize() == 1
+        assert sub_b.queue.qsize() == 0
+        assert sub_a.queue.get_nowait() == {"type": "progress"}
+
+    async def test_dispatch_unknown_task_is_noop(self, manager):
+        """没有订阅的任务事件直接丢弃"""
+        manager.dispatch("task-unknown", {"type": "progress"})
+        assert manager.get_stats()["dispatched"] == 0
+
+    async def test_slow_consumer_evicted(self, manager):
+        """队列满的连接被驱逐，其他连接继续接收事件"""
+        slow = await manager.connect(_make_websocket(), "task-a")
+        fast = await manager.connect(_make_websocket(), "task-a")
+
+        for i in range(3):
+            manager.dispatch("task-a", {"type": "progress", "index": i})
+            # 快速消费者及时取走事件
+            fast.queue.get_nowait()
+
+        assert slow.evicted is True
+        assert slow.queue.get_nowait() is _EVICTED
+        assert fast.evicted is False
+
+        # 被驱逐后不再接收事件
+        manager.dispatch("task-a", {"type": "progress", "index": 3})
+        assert slow.queue.empty()
+        assert fast.queue.qsize() == 1
+
+        stats = manager.get_stats()
+        assert stats["evicted"] == 1
+        assert stats["subscribers"] == 1
+
+    async def test_disconnect_removes_subscriber(self, manager):
+        """断开连接后清理订阅"""
+        websocket = _make_websocket()
+        await manager.connect(websocket, "task-a")
+
+        manager.disconnect(websocket, "task-a")
+
+        assert manager.get_connection_count("task-a") == 0
+        assert manager.get_stats()["tasks"] == 0
+
+
+class TestSubscriberReplayDedup:
+    """测试断线续传后的实时事件去重"""
+
+    async def test_live_events_already_replayed_are_skipped(self, manager):
+        """回放过的 event_id 及更早的事件视为重复"""
+        subscriber = manager.subscribe("task-a")
+        subscriber.mark_sent({"type": "concept_complete", "event_id": "1700000000000-1"})
+
+        assert subscriber.is_duplicate({"event_id": "1700000000000-0"}) is True
+        assert subscriber.is_duplicate({"event_id": "1700000000000-1"}) is True
+        assert subscriber.is_duplicate({"event_id": "1700000000000-2"}) is False
+        assert subscriber.is_duplicate({"event_id": "1700000000001-0"}) is False
+
+    async def test_events_without_id_are_never_duplicates(self, manager):
+        """未启用事件日志时（无 event_id）不做去重"""
+        subscriber = manager.subscribe("task-a")
+
+        assert subscriber.is_duplicate({"type": "progress"}) is False
+        subscriber.mark_sent({"type": "progress"})
+        assert subscriber.last_event_id is None
+
+    async def test_unsubscribe_removes_sse_subscriber(self, manager):
+        """SSE 订阅结束后被移除"""
+        subscriber = manager.subscribe("task-a")
+        manager.unsubscribe(subscriber)
+
+        manager.dispatch("task-a", {"type": "progress"})
+        assert subscriber.queue.empty()
+        assert manager.get_stats()["subscribers"] == 0
@@ -58,9 +58,10 @@ export function parseContentGenerationStatus(
 /**
  * 从日志中更新概念状态
  * 
- * 注意：后端只发送两种状态：
+ * 后端发送的状态：
  * - concept_completed: 概念的所有内容（tutorial + resources + quiz）生成成功
- * - content_generation_failed: 概念生成失败
+ * - concept_partially_completed: 部分内容生成成功（completed_content / failed_content）
+ * - content_generation_failed: 生成失败（带 content_type 时只有该项失败，否则三项都失败）
  */
 function updateConceptStatusFromLogs(
   conceptStatusMap: Map<string, ConceptGenerationStatus>,
@@ -101,12 +102,33 @@ function updateConceptStatusFromLogs(
       };
     }
     
-    // 内容生成失败 - 三种内容都标记为失败
+    // 部分完成 - 只把成功的内容标记为完成（失败项由 content_generation_failed 日志标记）
+    else if (logType === 'concept_partially_completed') {
+      const completed: string[] = log.details.completed_content || [];
+      if (completed.includes('tutorial')) {
+        conceptStatus.tutorial = { status: 'completed', tutorial_id: log.details.concept_id };
+      }
+      if (completed.includes('resources')) {
+        conceptStatus.resources = { status: 'completed', resources_id: log.details.concept_id, resources_count: 0 };
+      }
+      if (completed.includes('quiz')) {
+        conceptStatus.quiz = { status: 'completed', quiz_id: log.details.concept_id, questions_count: 0 };
+      }
+    }
+    
+    // 内容生成失败 - 带 content_type 时只标记该项，否则三种内容都标记为失败
     else if (logType === 'content_generation_failed') {
       const error = log.details.error || 'Unknown error';
-      conceptStatus.tutorial = { status: 'failed', error };
-      conceptStatus.resources = { status: 'failed', error };
-      conceptStatus.quiz = { status: 'failed', error };
+      const contentType = log.details.content_type;
+      if (!contentType || contentType === 'tutorial') {
+        conceptStatus.tutorial = { status: 'failed', error };
+      }
+      if (!contentType || contentType === 'resources') {
+        conceptStatus.resources = { status: 'failed', error };
+      }
+      if (!contentType || contentType === 'quiz') {
+        conceptStatus.quiz = { status: 'failed', error };
+      }
     }
   }
 }
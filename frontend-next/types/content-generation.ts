@@ -108,9 +108,11 @@ export interface ExecutionLog {
  * 后端实际发送的日志类型：
  * - content_generation_start: 开始生成某个概念的内容
  * - concept_completed: 某个概念的所有内容（tutorial + resources + quiz）生成成功
- * - content_generation_failed: 某个概念生成失败
+ * - concept_partially_completed: 某个概念的部分内容生成成功
+ * - content_generation_failed: 某个概念（或其中一项内容）生成失败
  */
 export type ContentLogType =
   | 'content_generation_start'
   | 'concept_completed'
+  | 'concept_partially_completed'
   | 'content_generation_failed';